@@ -6,15 +6,15 @@ Simple web UI for CV management and job viewing
 
 import os
 import sys
-from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, session, Response, jsonify, send_file, g
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from authlib.integrations.flask_client import OAuth
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import json
 import time
-import queue
 import threading
+import multiprocessing
 import numpy as np
 
 # Add src to path
@@ -63,58 +63,78 @@ MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+from src.utils.llm_telemetry import configure_telemetry, set_llm_user, reset_llm_user
+from src.utils.stats_cache import stats_cache
+from src.utils.progress_bus import progress_bus, StatusBoard
+from src.cv.ingestion import CVIngestionPipeline
+from src.resume.pdf_renderer import get_pdf_renderer
+from src.utils.profiler import ProfileRun, ProfileStore
+from src.matching.cv_embeddings import ensure_cv_embedding, refresh_cv_embedding
+from src.matching.description_embeddings import encode_jobs as encode_description_chunks
+from psycopg2.pool import PoolError
+
+# Spawned PDF pool processes (src.resume.pdf_renderer, src.parsers.pdf_extraction)
+# re-import this file as __mp_main__ under `python app.py`. They only run the
+# pools' own functions, so they skip the startup side effects below: DB pools,
+# telemetry, render pool warm-up and resumed CV ingestion.
+IS_POOL_WORKER = multiprocessing.parent_process() is not None
+
 # Initialize components
-db_path = os.getenv('DATABASE_PATH', 'data/jobs.db')
-job_db = get_database()  # Auto-detects SQLite or PostgreSQL based on DATABASE_URL
-
-# Initialize CV Manager - use PostgreSQL if DATABASE_URL is set, otherwise SQLite
-database_url = os.getenv('DATABASE_URL')
-if database_url and database_url.startswith('postgres'):
-    from src.database.postgres_cv_operations import PostgresCVManager
-    # Reuse the connection pool from job_db if it's PostgreSQL
-    if hasattr(job_db, 'connection_pool'):
-        cv_manager = PostgresCVManager(job_db.connection_pool)
-        print("✓ Using PostgreSQL for user/CV operations")
+if IS_POOL_WORKER:
+    job_db = cv_manager = analyzer = handler = None
+    resume_ops = resume_generator = None
+else:
+    db_path = os.getenv('DATABASE_PATH', 'data/jobs.db')
+    job_db = get_database()  # Auto-detects SQLite or PostgreSQL based on DATABASE_URL
+
+    # Initialize CV Manager - use PostgreSQL if DATABASE_URL is set, otherwise SQLite
+    database_url = os.getenv('DATABASE_URL')
+    if database_url and database_url.startswith('postgres'):
+        from src.database.postgres_cv_operations import PostgresCVManager
+        # Reuse the connection pool from job_db if it's PostgreSQL
+        if hasattr(job_db, 'connection_pool'):
+            cv_manager = PostgresCVManager(job_db.connection_pool)
+            print("✓ Using PostgreSQL for user/CV operations")
+        else:
+            # Fallback to SQLite if job_db is not PostgreSQL
+            cv_manager = CVManager(db_path)
+            print("✓ Using SQLite for user/CV operations")
     else:
-        # Fallback to SQLite if job_db is not PostgreSQL
         cv_manager = CVManager(db_path)
         print("✓ Using SQLite for user/CV operations")
-else:
-    cv_manager = CVManager(db_path)
-    print("✓ Using SQLite for user/CV operations")
 
-parser = CVParser()
+    parser = CVParser()
 
-# Initialize CV analyzer
-anthropic_key = os.getenv('ANTHROPIC_API_KEY')
-if not anthropic_key:
-    print("Warning: ANTHROPIC_API_KEY not set. CV upload will not work.")
-    analyzer = None
-else:
-    analyzer = CVAnalyzer(anthropic_key)
+    # Initialize CV analyzer
+    anthropic_key = os.getenv('ANTHROPIC_API_KEY')
+    if not anthropic_key:
+        print("Warning: ANTHROPIC_API_KEY not set. CV upload will not work.")
+        analyzer = None
+    else:
+        analyzer = CVAnalyzer(anthropic_key)
 
-handler = CVHandler(cv_manager, parser, analyzer, storage_root='data/cvs') if analyzer else None
+    handler = CVHandler(cv_manager, parser, analyzer, storage_root='data/cvs') if analyzer else None
 
-# Initialize Resume Generator and Operations
-resume_ops = None
-resume_generator = None
-if database_url and database_url.startswith('postgres') and hasattr(job_db, 'connection_pool'):
-    from src.database.postgres_resume_operations import PostgresResumeOperations
-    from src.resume.resume_generator import ResumeGenerator
+    # LLM call telemetry: buffered writes to llm_calls (PostgreSQL only)
+    configure_telemetry(job_db)
 
-    resume_ops = PostgresResumeOperations(job_db.connection_pool)
+    # Initialize Resume Generator and Operations
+    resume_ops = None
+    resume_generator = None
+    if database_url and database_url.startswith('postgres') and hasattr(job_db, 'connection_pool'):
+        from src.database.postgres_resume_operations import PostgresResumeOperations
+        from src.resume.resume_generator import ResumeGenerator
 
-    if anthropic_key:
-        gemini_key = os.getenv('GOOGLE_GEMINI_API_KEY') if os.getenv('ENABLE_GEMINI') == 'true' else None
-        resume_generator = ResumeGenerator(anthropic_key, gemini_api_key=gemini_key)
-        print("✓ Resume generation enabled")
-    else:
-        print("Warning: Resume generation disabled (ANTHROPIC_API_KEY not set)")
-else:
-    print("Warning: Resume generation disabled (PostgreSQL required)")
+        resume_ops = PostgresResumeOperations(job_db.connection_pool)
 
-# Progress tracking for job search
-search_progress = {}
+        if anthropic_key:
+            gemini_key = os.getenv('GOOGLE_GEMINI_API_KEY') if os.getenv('ENABLE_GEMINI') == 'true' else None
+            resume_generator = ResumeGenerator(anthropic_key, gemini_api_key=gemini_key)
+            print("✓ Resume generation enabled")
+        else:
+            print("Warning: Resume generation disabled (ANTHROPIC_API_KEY not set)")
+    else:
+        print("Warning: Resume generation disabled (PostgreSQL required)")
 
 # Semantic search models (lazy loading)
 _semantic_models = {}
@@ -239,6 +259,54 @@ def get_user_id():
     return user['id']
 
 
+@app.before_request
+def attribute_llm_calls():
+    """Attribute LLM calls made while handling this request to the logged-in user"""
+    if current_user.is_authenticated:
+        g.llm_user_token = set_llm_user(current_user.id)
+
+
+@app.teardown_request
+def clear_llm_user(exc=None):
+    token = g.pop('llm_user_token', None)
+    if token is not None:
+        reset_llm_user(token)
+
+
+def is_admin():
+    """Whether the logged-in user is listed in ADMIN_EMAILS"""
+    if not current_user.is_authenticated:
+        return False
+    admins = {email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}
+    return (current_user.email or '').lower() in admins
+
+
+@app.before_request
+def start_request_profile():
+    """Profile this request for admins sending X-Profile: cprofile|sample (or ?_profile=)"""
+    mode = request.headers.get('X-Profile') or request.args.get('_profile')
+    if mode and is_admin():
+        g.profile_run = ProfileRun('request', f"{request.method} {request.path}", mode=mode,
+                                   user_id=current_user.id, path=request.full_path).start()
+
+
+@app.after_request
+def finish_request_profile(response):
+    run = g.pop('profile_run', None)
+    if run is not None:
+        entry = run.finish(status=response.status_code)
+        response.headers['X-Profile-Id'] = entry['id']
+    return response
+
+
+@app.teardown_request
+def abandon_request_profile(exc=None):
+    # Requests that never reached after_request (unhandled errors)
+    run = g.pop('profile_run', None)
+    if run is not None:
+        run.finish(error=f"{type(exc).__name__}: {exc}" if exc else None)
+
+
 def get_user_context():
     """Get user and CV statistics"""
     email = get_user_email()
@@ -261,6 +329,40 @@ def get_user_context():
     return user, stats
 
 
+def refresh_match_maps_async(user_id: int):
+    """Rebuild a user's materialized match maps in the background after a CV change"""
+    if not hasattr(job_db, 'save_match_maps_batch'):
+        return
+
+    def _refresh():
+        try:
+            from src.matching.match_maps import materialize_match_maps
+            profile = cv_manager.get_primary_profile(user_id)
+            materialize_match_maps(job_db, user_id, profile)
+        except Exception as e:
+            print(f"Warning: Could not refresh match maps for user {user_id}: {e}")
+
+    threading.Thread(target=_refresh, daemon=True).start()
+
+
+def on_cv_ingested(user_id: int, cv_id: int, result: dict):
+    """Follow-up work once a background CV ingestion finished"""
+    if result.get('success') and result.get('is_primary'):
+        refresh_match_maps_async(user_id)
+
+
+# Resume / cover letter PDFs: pre-warmed render pool + content-hash cache (src.resume.pdf_renderer)
+pdf_renderer = get_pdf_renderer()
+if resume_generator:
+    pdf_renderer.warm_async()
+
+
+# Background CV ingestion: /upload only stores the file (src.cv.ingestion)
+cv_ingestion = CVIngestionPipeline(handler, on_complete=on_cv_ingested) if handler else None
+if cv_ingestion:
+    cv_ingestion.start_resume_loop()
+
+
 # ============ Authentication Routes ============
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -606,11 +708,12 @@ def upload_cv():
         file.save(temp_path)
 
         try:
-            # Upload CV
-            result = handler.upload_cv(email, temp_path, set_as_primary=set_primary)
+            # Store the CV; extraction, parsing and embedding run in the background
+            result = handler.store_cv(email, temp_path)
 
             if result['success']:
-                flash(f"✓ {result['message']} (Cost: ${result['parsing_cost']:.4f})", 'success')
+                cv_ingestion.submit(result['cv_id'], result['user_id'], set_as_primary=set_primary)
+                flash("✓ CV uploaded. We're analyzing it now - your profile will appear here in a moment.", 'success')
                 session['user_email'] = email  # Save email to session
 
                 # Clean up temp file
@@ -633,6 +736,16 @@ def upload_cv():
     return render_template('upload.html', email=email)
 
 
+@app.route('/upload/status/<int:cv_id>')
+@login_required
+def upload_status(cv_id):
+    """Background processing status of an uploaded CV"""
+    status = cv_ingestion.status(cv_id) if cv_ingestion else None
+    if not status or status['user_id'] != get_user_id():
+        return jsonify({'error': 'CV not found'}), 404
+    return jsonify(status)
+
+
 @app.route('/profile')
 @login_required
 def view_profile():
@@ -641,6 +754,8 @@ def view_profile():
 
     # Get all CVs for the user
     all_cvs = cv_manager.get_user_cvs(user['id'])
+    # Uploads still being analyzed in the background
+    processing_cvs = cv_manager.get_user_cvs(user['id'], status='processing')
     
     # Get primary CV and profile
     cv = cv_manager.get_primary_cv(user['id'])
@@ -652,7 +767,8 @@ def view_profile():
             cv = all_cvs[0]
             flash(f"Showing most recent CV: {cv['file_name']}. Click 'Set as Primary' to make it your default.", 'info')
         else:
-            return render_template('profile.html', user=user, profile=None, cv=None, all_cvs=[])
+            return render_template('profile.html', user=user, profile=None, cv=None, all_cvs=[],
+                                   processing_cvs=processing_cvs)
 
     profile = cv_manager.get_cv_profile(cv['id'])
     
@@ -693,7 +809,8 @@ def view_profile():
         except Exception as e:
             print(f"Warning: Could not fetch claimed data: {e}")
 
-    return render_template('profile.html', user=user, profile=profile, cv=cv, all_cvs=all_cvs, claimed_data=claimed_data)
+    return render_template('profile.html', user=user, profile=profile, cv=cv, all_cvs=all_cvs, claimed_data=claimed_data,
+                           processing_cvs=processing_cvs)
 
 
 @app.route('/delete-cv/<int:cv_id>', methods=['POST'])
@@ -737,6 +854,7 @@ def set_primary_cv(cv_id):
         
         # Set as primary
         cv_manager.set_primary_cv(user['id'], cv_id)
+        refresh_match_maps_async(user['id'])
         
         flash('✓ Primary CV updated', 'success')
         return redirect(url_for('view_profile'))
@@ -848,20 +966,15 @@ def add_job_submit():
 
         # Store embedding in database
         import json
-        conn = job_db._get_connection()
-        cursor = conn.cursor()
         embedding_json = json.dumps(title_embedding)
-
-        cursor.execute("""
-            UPDATE jobs
-            SET embedding_jobbert_title = %s::jsonb,
-                embedding_date = NOW()
-            WHERE id = %s
-        """, (embedding_json, job_id))
-        conn.commit()
-        cursor.close()
-        if not hasattr(job_db, 'connection_pool'):
-            conn.close()
+        with job_db._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE jobs
+                SET embedding_jobbert_title = %s::jsonb,
+                    embedding_date = NOW()
+                WHERE id = %s
+            """, (embedding_json, job_id))
+            conn.commit()
 
         # Add embedding to job_data for scoring
         job_data['embedding_jobbert_title'] = title_embedding
@@ -871,8 +984,7 @@ def add_job_submit():
 
         if user_profile:
             # 1. Semantic score using filter_jobs functions
-            cv_text = filter_module.build_cv_text(user_profile)
-            cv_embedding = model.encode(cv_text)
+            cv_embedding = ensure_cv_embedding(cv_manager, user_profile, model)
 
             # Get job embedding (we just encoded the title, need full job text)
             job_text = filter_module.build_job_text(job_data)
@@ -1130,7 +1242,8 @@ def run_semantic_search():
         query_sql = """
             SELECT id, title, company, location, description,
                    discovered_date, url, ai_work_arrangement,
-                   cities_derived, locations_derived, embedding_jobbert_title
+                   cities_derived, locations_derived, embedding_jobbert_title,
+                   embedding_jobbert_description
             FROM jobs
         """
         params = []
@@ -1185,12 +1298,13 @@ def run_semantic_search():
         job_embeddings = {}
         jobs_needing_encoding = []
 
+        # Title embeddings, or pooled description chunks (src/matching/description_embeddings.py)
+        embedding_column = 'embedding_jobbert_title' if match_mode == 'title_only' else 'embedding_jobbert_description'
         for job in jobs:
-            # For title_only mode, use pre-computed embeddings
-            if match_mode == 'title_only' and job.get('embedding_jobbert_title'):
+            if job.get(embedding_column):
                 try:
                     import json
-                    embedding_json = job['embedding_jobbert_title']
+                    embedding_json = job[embedding_column]
                     if isinstance(embedding_json, str):
                         embedding_data = json.loads(embedding_json)
                     else:
@@ -1200,34 +1314,19 @@ def run_semantic_search():
                     print(f"⚠️  Failed to load embedding for job {job['id']}: {e}")
                     jobs_needing_encoding.append(job)
             else:
-                # Need to encode (full_text mode or missing embedding)
+                # Need to encode (embedding not computed yet)
                 jobs_needing_encoding.append(job)
 
         load_time = time.time() - load_start
 
         # Encode jobs that don't have pre-computed embeddings (fallback)
         encode_start = time.time()
-        for job in jobs_needing_encoding:
-            # Build job text based on mode
-            if match_mode == 'title_only':
-                job_text = job.get('title', '')
-            else:  # full_text
-                parts = []
-                if job.get('title'):
-                    parts.append(job['title'])
-                    parts.append(job['title'])  # Add title twice for emphasis
-                if job.get('company'):
-                    parts.append(f"Company: {job['company']}")
-                if job.get('location'):
-                    parts.append(f"Location: {job['location']}")
-                if job.get('description'):
-                    desc = job['description'][:3000]
-                    parts.append(desc)
-                job_text = " ".join(parts)
-
-            # Encode job on-the-fly
-            job_embedding = model.encode(job_text, show_progress_bar=False)
-            job_embeddings[job['id']] = job_embedding
+        if match_mode == 'title_only':
+            for job in jobs_needing_encoding:
+                job_embeddings[job['id']] = model.encode(job.get('title', ''), show_progress_bar=False)
+        elif jobs_needing_encoding:
+            # Same chunking/pooling as the background stage, batched across jobs
+            job_embeddings.update(encode_description_chunks(model, jobs_needing_encoding))
 
         encode_time = time.time() - encode_start
 
@@ -1468,245 +1567,28 @@ def job_detail(job_id):
     # Note: match_score, priority, match_reasoning, key_alignments, and potential_gaps
     # are already set and parsed by get_job_with_user_data()
 
-    # Fetch User Profile for accurate matching
+    # Fetch User Profile (rendered alongside the job)
     user_cv_profile = cv_manager.get_primary_profile(user_id)
-    
-    user_skills = set()
-    user_competencies = set()
-    
-    if user_cv_profile:
-        # Normalize for matching
-        raw_skills = user_cv_profile.get('technical_skills', []) or []
-        user_skills = set(str(s).lower().strip() for s in raw_skills)
-        
-        raw_comps = user_cv_profile.get('competencies', []) or []
-        user_competencies = set(str(c).lower().strip() for c in raw_comps)
 
     claimed_competency_names = set()
     claimed_skill_names = set()
 
-    # Calculate match status for UI visualization
     if job:
-        # Debug: Check what we got from database
-        print(f"DEBUG job_detail: competency_mappings type={type(job.get('competency_mappings'))}, value={job.get('competency_mappings')}")
-        print(f"DEBUG job_detail: skill_mappings type={type(job.get('skill_mappings'))}, value={job.get('skill_mappings')}")
-        print(f"DEBUG job_detail: ai_competencies exists? {job.get('ai_competencies') is not None}, count={len(job.get('ai_competencies') or [])}")
-        print(f"DEBUG job_detail: ai_key_skills exists? {job.get('ai_key_skills') is not None}, count={len(job.get('ai_key_skills') or [])}")
-
-        # Normalize: deduplicate case/alias/German before matching and display
+        # Normalize: deduplicate case/alias/German before display
         from analysis.skill_normalizer import normalize_and_deduplicate
         if job.get('ai_competencies'):
             job['ai_competencies'] = normalize_and_deduplicate(job['ai_competencies'])
         if job.get('ai_key_skills'):
             job['ai_key_skills'] = normalize_and_deduplicate(job['ai_key_skills'])
 
-        # 1. Competencies Matching (HYBRID: Claude → Keyword → Semantic)
-        if job.get('ai_competencies'):
-            matches = {}
-
-            # Option 1: Try using Claude's structured mappings first (NEW JOBS)
-            claude_comp_mappings = job.get('competency_mappings')
-            if claude_comp_mappings and isinstance(claude_comp_mappings, list):
-                # Use Claude's expert mappings
-                print(f"✨ Using Claude competency mappings ({len(claude_comp_mappings)} mappings)")
-                mapped_comps = set()
-                for mapping in claude_comp_mappings:
-                    if isinstance(mapping, dict):
-                        job_req = mapping.get('job_requirement', '')
-                        if job_req:
-                            matches[job_req] = True
-                            mapped_comps.add(job_req.lower())
-                
-                # Mark unmapped competencies as unmatched
-                for comp in job['ai_competencies']:
-                    if comp.lower() not in mapped_comps:
-                        matches[comp] = False
-            else:
-                # Option 2: Fallback to keyword/semantic matching (EXISTING JOBS)
-                print(f"🔄 Using fallback matching for competencies")
-                
-                # Prepare alignment texts (from Claude's reasoning)
-                align_texts = []
-                if job.get('key_alignments'):
-                    for a in job['key_alignments']:
-                        if isinstance(a, str):
-                            align_texts.append(a.lower())
-                        elif isinstance(a, dict):
-                            align_texts.append(str(a.get('text', '')).lower())
-                
-                for comp in job['ai_competencies']:
-                    is_matched = False
-                    comp_lower = comp.lower().strip()
-                    
-                    # A. Check User Profile directly (Strongest evidence)
-                    if comp_lower in user_competencies or comp_lower in user_skills:
-                        is_matched = True
-                    
-                    # Fuzzy profile match
-                    if not is_matched and (user_competencies or user_skills):
-                         all_user_terms = user_competencies.union(user_skills)
-                         for term in all_user_terms:
-                             if term and (comp_lower in term or term in comp_lower):
-                                 if len(term) > 3 and len(comp_lower) > 3:
-                                     is_matched = True
-                                     break
-
-                    # B. Check against Key Alignments
-                    if not is_matched and align_texts:
-                        for align in align_texts:
-                            if comp_lower in align:
-                                is_matched = True
-                                break
-                        
-                        if not is_matched:
-                            comp_words = set(w for w in comp_lower.split() if len(w) > 3)
-                            if comp_words:
-                                for align in align_texts:
-                                    align_words = set(w for w in align.split() if len(w) > 3)
-                                    overlap = comp_words.intersection(align_words)
-                                    if len(overlap) / len(comp_words) >= 0.5:
-                                        is_matched = True
-                                        break
-                                
-                    matches[comp] = is_matched
-                
-                # C. Semantic matching fallback for unmatched competencies
-                unmatched_comps = [comp for comp, matched in matches.items() if not matched]
-                if unmatched_comps and user_cv_profile:
-                    try:
-                        from src.analysis.semantic_matcher import get_semantic_matcher
-                        semantic_matcher = get_semantic_matcher()
-                        
-                        user_comp_list = user_cv_profile.get('competencies', []) or []
-                        user_skill_list = user_cv_profile.get('technical_skills', []) or []
-                        
-                        # Parse JSON if needed
-                        import json
-                        if isinstance(user_comp_list, str):
-                            try:
-                                user_comp_list = json.loads(user_comp_list)
-                            except:
-                                user_comp_list = []
-                        if isinstance(user_skill_list, str):
-                            try:
-                                user_skill_list = json.loads(user_skill_list)
-                            except:
-                                user_skill_list = []
-                        
-                        # Extract 'name' from competency dicts
-                        comp_names = []
-                        for comp in user_comp_list:
-                            if isinstance(comp, dict):
-                                comp_names.append(comp.get('name', str(comp)))
-                            else:
-                                comp_names.append(str(comp))
-                        
-                        skill_names = [str(s) for s in user_skill_list]
-                        
-                        semantic_matches = semantic_matcher.match_competencies(
-                            unmatched_comps,
-                            comp_names,
-                            skill_names,
-                            threshold=0.45
-                        )
-                        
-                        # Update matches with semantic results
-                        for comp, sem_matched in semantic_matches.items():
-                            if sem_matched:
-                                matches[comp] = True
-                                print(f"✓ Semantic match: {comp}")
-                                
-                    except Exception as e:
-                        import logging
-                        logging.getLogger(__name__).warning(f"Semantic matching failed: {e}")
-            
-            job['competency_match_map'] = matches
-
-        # 2. Skills Matching (HYBRID: Claude → Keyword → Semantic)
-        if job.get('ai_key_skills'):
-            skill_matches = {}
-            
-            # Option 1: Try using Claude's structured skill mappings first (NEW JOBS)
-            claude_skill_mappings = job.get('skill_mappings')
-            if claude_skill_mappings and isinstance(claude_skill_mappings, list):
-                # Use Claude's expert mappings
-                print(f"✨ Using Claude skill mappings ({len(claude_skill_mappings)} mappings)")
-                mapped_skills = set()
-                for mapping in claude_skill_mappings:
-                    if isinstance(mapping, dict):
-                        job_skill = mapping.get('job_skill', '')
-                        if job_skill:
-                            skill_matches[job_skill] = True
-                            mapped_skills.add(job_skill.lower())
-                
-                # Mark unmapped skills as unmatched
-                for skill in job['ai_key_skills']:
-                    if skill.lower() not in mapped_skills:
-                        skill_matches[skill] = False
-            else:
-                # Option 2: Fallback to keyword/semantic matching (EXISTING JOBS)
-                print(f"🔄 Using fallback matching for skills")
-                
-                for skill in job['ai_key_skills']:
-                    s_lower = str(skill).lower().strip()
-                    is_matched = False
-                    
-                    # Check direct match
-                    if s_lower in user_skills:
-                        is_matched = True
-                    
-                    # Check fuzzy match
-                    if not is_matched:
-                         for us in user_skills:
-                             if len(us) > 2 and len(s_lower) > 2:
-                                 if s_lower in us or us in s_lower:
-                                     is_matched = True
-                                     break
-                    
-                    skill_matches[skill] = is_matched
-                
-                # C. Semantic matching fallback for unmatched skills
-                unmatched_skills = [skill for skill, matched in skill_matches.items() if not matched]
-                if unmatched_skills and user_cv_profile:
-                    try:
-                        from src.analysis.semantic_matcher import get_semantic_matcher
-                        semantic_matcher = get_semantic_matcher()
-                        
-                        user_skill_list = user_cv_profile.get('technical_skills', []) or []
-                        
-                        # Parse JSON if needed
-                        import json
-                        if isinstance(user_skill_list, str):
-                            try:
-                                user_skill_list = json.loads(user_skill_list)
-                            except:
-                                user_skill_list = []
-                        
-                        # Extract names if dict format
-                        skill_names = []
-                        for s in user_skill_list:
-                            if isinstance(s, dict):
-                                skill_names.append(s.get('name', str(s)))
-                            else:
-                                skill_names.append(str(s))
-                        
-                        semantic_matches = semantic_matcher.match_skills(
-                            unmatched_skills,
-                            skill_names,
-                            threshold=0.45
-                        )
-                        
-                        # Update matches with semantic results
-                        for skill, sem_matched in semantic_matches.items():
-                            if sem_matched:
-                                skill_matches[skill] = True
-                                print(f"✓ Semantic skill match: {skill}")
-                                
-                    except Exception as e:
-                        import logging
-                        logging.getLogger(__name__).warning(f"Semantic skill matching failed: {e}")
-            
-            job['skill_match_map'] = skill_matches
+        # Match maps are materialized when the match is scored or the CV changes.
+        # Only legacy/invalidated rows are computed here, once, and then stored.
+        if job.get('competency_match_map') is None or job.get('skill_match_map') is None:
+            from src.matching.match_maps import build_match_maps
+            maps = build_match_maps(job, user_cv_profile)
+            job.update(maps)
+            if hasattr(job_db, 'save_match_maps_batch') and (job.get('claude_score') or job.get('semantic_score')):
+                job_db.save_match_maps_batch([{'user_id': user_id, 'job_id': job_id, **maps}])
 
         # Load previously claimed competencies/skills for UI
         if resume_ops:
@@ -1856,8 +1738,6 @@ def save_cover_letter(job_id):
         # Generate PDF bytes
         pdf_data = None
         try:
-            import io
-            from weasyprint import HTML as WeasyHTML
             # Wrap plain text in a styled HTML shell for PDF rendering
             html_for_pdf = (
                 '<html><head><style>'
@@ -1872,9 +1752,7 @@ def save_cover_letter(job_id):
                 f'<div style="white-space: pre-wrap;">{cover_letter_text}</div>'
                 '</body></html>'
             )
-            buf = io.BytesIO()
-            WeasyHTML(string=html_for_pdf).write_pdf(buf)
-            pdf_data = buf.getvalue()
+            pdf_data = pdf_renderer.render(html_for_pdf)
             print(f"Cover letter PDF generated ({len(pdf_data):,} bytes)")
         except Exception as e:
             print(f"Cover letter PDF generation failed: {e}")
@@ -2011,294 +1889,29 @@ def update_job_status(job_id, status):
     return redirect(url_for('jobs'))
 
 
+@app.route('/progress-stream')
+@login_required
+def progress_stream():
+    """Stream matching, backfill and search progress via Server-Sent Events
 
-# Deprecated: run_search_background removed - use run_job_matching instead
-    """Run job search in background with progress updates"""
-    
-    def send_progress(percent, message, msg_type='info'):
-        """Send progress update"""
-        if search_id in search_progress:
-            search_progress[search_id].put({
-                'type': 'progress',
-                'percent': percent,
-                'message': message,
-                'msg_type': msg_type
-            })
-    
-    def send_complete(message):
-        """Send completion message"""
-        if search_id in search_progress:
-            search_progress[search_id].put({
-                'type': 'complete',
-                'message': message
-            })
-    
-    def send_error(message):
-        """Send error message"""
-        if search_id in search_progress:
-            search_progress[search_id].put({
-                'type': 'error',
-                'message': message
-            })
-    
+    Resumes after the Last-Event-ID header (sent by EventSource on reconnect)
+    or the last_event_id query parameter; without either it starts from the
+    latest event of each type. Answers 503 when this process already has
+    PROGRESS_MAX_STREAMS streams open; EventSource then stops and pages poll.
+    """
+    user_id = get_user_id()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
     try:
-        send_progress(5, "Loading configuration...")
-        
-        # Import required modules
-        from collectors.indeed import IndeedCollector
-        from collectors.jsearch import JSearchCollector
-        from utils.helpers import deduplicate_jobs, filter_new_jobs, categorize_jobs
-        import yaml
-        
-        # Load config
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
-        
-        send_progress(10, "Getting your CV profile...")
-        
-        # Get user's CV profile
-        cv_profile = cv_manager.get_profile_by_user(user['id'])
-        if not cv_profile:
-            send_error('Please upload your CV first before running a search')
-            return
-        
-        send_progress(15, "Loading search preferences...")
-        
-        # Get user's search preferences
-        user_prefs = cv_manager.get_user_search_preferences(user['id'])
-        keywords = user_prefs['keywords'] if user_prefs['keywords'] else config['search_config']['keywords']
-        locations = user_prefs['locations'] if user_prefs['locations'] else config['search_config']['locations']
-        
-        if not keywords or not locations:
-            send_error('Please configure your search preferences first')
-            return
-        
-        prefs_source = "custom preferences" if user_prefs['keywords'] else "default configuration"
-        send_progress(20, f"Using {prefs_source}: {len(keywords)} keywords, {len(locations)} locations")
-        
-        # Initialize collectors
-        collectors = []
-        source_config = config.get('preferences', {}).get('source_filtering', {})
-        
-        # Active Jobs DB API (Re-enabled - hourly rate limit should be reset)
-        activejobs_key = os.getenv('ACTIVEJOBS_API_KEY')
-        
-        if activejobs_key:
-            collectors.append(('ActiveJobs', ActiveJobsCollector(
-                activejobs_key,
-                enable_filtering=source_config.get('enabled', True),
-                min_quality=source_config.get('min_quality', 2)
-            )))
-            send_progress(18, "Initialized Active Jobs DB (5000 jobs/month, 40k-50k Germany jobs)")
-        
-        # Adzuna API (Disabled - poor Germany coverage)
-        # adzuna_id = os.getenv('ADZUNA_APP_ID')
-        # adzuna_key = os.getenv('ADZUNA_APP_KEY')
-        # 
-        # if adzuna_id and adzuna_key:
-        #     collectors.append(('Adzuna', AdzunaCollector(
-        #         adzuna_id,
-        #         adzuna_key,
-        #         enable_filtering=source_config.get('enabled', True),
-        #         min_quality=source_config.get('min_quality', 2)
-        #     )))
-        #     send_progress(20, "Initialized Adzuna collector (250 requests/month)")
-        
-        # JSearch API (Re-enable to test if quota reset)
-        jsearch_key = os.getenv('JSEARCH_API_KEY')
-        
-        if jsearch_key and jsearch_key != 'your_rapidapi_key_for_jsearch':
-            collectors.append(('JSearch', JSearchCollector(
-                jsearch_key,
-                enable_filtering=source_config.get('enabled', True),
-                min_quality=source_config.get('min_quality', 2)
-            )))
-            send_progress(25, "Initialized JSearch collector (LinkedIn, Google Jobs, Indeed)")
-        
-        if not collectors:
-            send_error('No job collectors configured. All API quotas exhausted. Please upgrade your plan or wait for monthly reset.')
-            return
-        
-        # Collect jobs
-        send_progress(30, f"Starting job collection: {len(keywords) * len(locations)} searches...")
-        all_jobs = []
-        total_searches = len(keywords) * len(locations)
-        search_count = 0
-        
-        for name, collector in collectors:
-            for keyword in keywords:
-                for location in locations:
-                    search_count += 1
-                    progress_percent = 30 + int((search_count / total_searches) * 40)
-                    send_progress(progress_percent, f"[{search_count}/{total_searches}] {name}: '{keyword}' in '{location}'")
-                    
-                    try:
-                        # Determine country code
-                        country = 'de'  # Default to Germany
-                        if 'germany' in location.lower() or 'deutschland' in location.lower():
-                            country = 'de'
-                        elif 'remote' in location.lower():
-                            country = 'de'  # Assume remote in Germany
-                        
-                        if name == 'ActiveJobs':
-                            results = collector.search_jobs(
-                                query=keyword,
-                                location=location,
-                                num_pages=1,
-                                results_per_page=5,  # Reduced from 10 to 5 to speed up searches
-                                date_posted="week",
-                                description_type="text"
-                            )
-                        elif name == 'Adzuna':
-                            results = collector.search_jobs(
-                                query=keyword,
-                                location=location,
-                                num_pages=1,
-                                results_per_page=5,  # Reduced from 10 to 5
-                                country=country,
-                                max_days_old=7
-                            )
-                        elif name == 'JSearch':
-                            results = collector.search_jobs(
-                                query=keyword,
-                                location=location,
-                                num_pages=1,
-                                date_posted="week",
-                                country=country
-                            )
-                        else:
-                            results = []
-                        
-                        all_jobs.extend(results)
-                        if results:
-                            send_progress(progress_percent, f"  → Found {len(results)} jobs", 'success')
-                        
-                        # Reduced delay to prevent Railway timeout (was 3s, now 0.5s)
-                        # Railway has ~300s timeout, with 90 searches: 0.5s delay = 45s of waiting vs 270s
-                        if search_count < total_searches:
-                            time.sleep(0.5)
-                            
-                    except Exception as e:
-                        send_progress(progress_percent, f"  → Error: {str(e)}", 'warning')
-        
-        send_progress(70, f"Collection complete! Found {len(all_jobs)} total jobs", 'success')
-        
-        # Process jobs
-        send_progress(72, "Removing duplicates...")
-        unique_jobs = deduplicate_jobs(all_jobs)
-        send_progress(74, f"Filtered to {len(unique_jobs)} unique jobs")
-        
-        send_progress(76, "Checking against database...")
-        new_jobs = filter_new_jobs(unique_jobs, job_db)
-        send_progress(78, f"Found {len(new_jobs)} new jobs to analyze")
-        
-        if not new_jobs:
-            send_complete(f'No new jobs found. Checked {len(all_jobs)} listings, all were duplicates or previously seen.')
-            return
-        
-        # Analyze jobs
-        send_progress(80, f"Analyzing {len(new_jobs)} jobs with Claude AI...")
-        from analysis.claude_analyzer import ClaudeJobAnalyzer
-        
-        # Initialize analyzer
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        analyzer = ClaudeJobAnalyzer(
-            api_key=api_key,
-            model=config.get('analysis', {}).get('model', 'claude-3-5-haiku-20241022'),
-            db=job_db,
-            user_email=user['email']
-        )
-        
-        # Set CV profile for analysis
-        analyzer.set_profile_from_cv(cv_profile.get('parsed_cv', {}))
-        
-        analyzed_jobs = []
-        for idx, job in enumerate(new_jobs, 1):
-            progress_percent = 80 + int((idx / len(new_jobs)) * 15)
-            send_progress(progress_percent, f"Analyzing job {idx}/{len(new_jobs)}: {job.get('title', 'Unknown')}")
-            
-            analyzed = analyzer.analyze_job(job)
-            if analyzed:
-                analyzed_jobs.append(analyzed)
-        
-        send_progress(95, f"Analysis complete! {len(analyzed_jobs)} jobs scored", 'success')
-        
-        # Store jobs and create user matches
-        send_progress(96, "Saving jobs to database...")
-        stored_count = 0
-        matched_count = 0
-        for job in analyzed_jobs:
-            job['user_id'] = user['id']
-            job['cv_profile_id'] = cv_profile.get('id')
-            job_id = job_db.add_job(job)
-            if job_id:
-                stored_count += 1
-                # Create user_job_match entry
-                match_success = job_db.add_user_job_match(
-                    user_id=user['id'],
-                    job_id=job_id,
-                    claude_score=job.get('match_score'),
-                    priority=job.get('priority', 'medium'),
-                    match_reasoning=job.get('match_reasoning'),
-                    key_alignments=job.get('key_alignments', []),
-                    potential_gaps=job.get('potential_gaps', [])
-                )
-                if match_success:
-                    matched_count += 1
-        
-        categorized = categorize_jobs(analyzed_jobs)
-        
-        send_progress(98, f"Stored {stored_count} jobs, created {matched_count} matches", 'success')
-        send_progress(100, f"Complete!", 'success')
-        
-        summary = f"Found {stored_count} new jobs: {len(categorized['high'])} high priority, {len(categorized['medium'])} medium, {len(categorized['low'])} low priority"
-        send_complete(summary)
-        
-    except Exception as e:
-        send_error(f'Search error: {str(e)}')
-        print(f"Search error: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-# Deprecated: search_stream removed - use matching-status instead
-
-@app.errorhandler(404)
-def not_found(e):
-    """Stream search progress via Server-Sent Events"""
-    search_id = session.get('current_search_id')
-    
-    if not search_id or search_id not in search_progress:
-        def error_stream():
-            yield f"data: {json.dumps({'type': 'error', 'message': 'No active search found'})}\n\n"
-        return Response(error_stream(), mimetype='text/event-stream')
-    
-    def generate():
-        q = search_progress[search_id]
-        try:
-            while True:
-                try:
-                    msg = q.get(timeout=30)
-                    
-                    if msg['type'] == 'progress':
-                        yield f"event: progress\ndata: {json.dumps({'percent': msg['percent'], 'message': msg['message'], 'type': msg.get('msg_type', 'info')})}\n\n"
-                    elif msg['type'] == 'complete':
-                        yield f"event: complete\ndata: {json.dumps({'message': msg['message']})}\n\n"
-                        break
-                    elif msg['type'] == 'error':
-                        yield f"event: error\ndata: {json.dumps({'message': msg['message']})}\n\n"
-                        break
-                        
-                except queue.Empty:
-                    # Keepalive ping
-                    yield f": keepalive\n\n"
-                    
-        finally:
-            # Cleanup
-            if search_id in search_progress:
-                del search_progress[search_id]
-    
-    return Response(generate(), mimetype='text/event-stream')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    stream = progress_bus.open_stream(user_id, last_event_id)
+    if stream is None:
+        return jsonify({'error': 'Too many progress streams, poll instead'}), 503
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @app.errorhandler(404)
@@ -2347,17 +1960,26 @@ def cost_dashboard():
     """Cost tracking dashboard - shows usage and billing information"""
     user, stats = get_user_context()
     
-    # TODO: Once cost_sessions table is created, fetch real data
-    # For now, show placeholder data
+    usage = {'totals': {}, 'by_operation': [], 'daily': []}
+    if hasattr(job_db, 'get_llm_usage_summary'):
+        try:
+            usage = job_db.get_llm_usage_summary(user_id=get_user_id(), days=30)
+        except Exception as e:
+            print(f"Error loading LLM usage: {e}")
+    
+    totals = usage['totals']
+    calls = totals.get('calls') or 0
+    total_30days = float(totals.get('total_cost') or 0)
     
     return render_template('cost_dashboard.html',
                          user=user,
                          stats=stats,
-                         total_month=0.00,
-                         total_30days=0.00,
-                         session_count=0,
-                         avg_session=0.00,
-                         sessions=[])
+                         total_month=float(totals.get('month_cost') or 0),
+                         total_30days=total_30days,
+                         call_count=calls,
+                         cache_hit_rate=float(totals.get('cache_hit_rate') or 0),
+                         by_operation=usage['by_operation'],
+                         daily=usage['daily'])
 
 
 @app.route('/learning-insights')
@@ -2623,15 +2245,9 @@ def job_feedback(job_id):
     
     # Get original job score
     # Get original job score for this user
-    conn = job_db._get_connection()
-    try:
-        cursor = conn.cursor()
+    with job_db._connection() as conn, conn.cursor() as cursor:
         cursor.execute('SELECT claude_score FROM user_job_matches WHERE job_id = %s AND user_id = %s', (job_id, user['id']))
         row = cursor.fetchone()
-    finally:
-        # Proper pool management
-        cursor.close()
-        job_db._return_connection(conn)
     
     # If no match record found, default to 0
     original_score = row[0] if row else 0
@@ -2758,6 +2374,7 @@ def update_search_preferences():
 
         except Exception as load_error:
             print(f"⚠️ Warning: Backfill failed: {load_error}", flush=True)
+            progress_bus.publish(user['id'], 'backfill', stage='error', message=str(load_error))
             import traceback
             traceback.print_exc()
             flash('Search preferences updated, but job loading failed. Will retry on next daily update.', 'warning')
@@ -2790,8 +2407,8 @@ def update_search_preferences():
     return redirect(url_for('search_preferences'))
 
 
-# Global dictionary to track matching status
-matching_status = {}
+# Matching status per user; every change is also published on the progress bus
+matching_status = StatusBoard(progress_bus)
 
 def run_background_filtering(user_id: int):
     """Run semantic filtering and Claude analysis in background"""
@@ -2857,6 +2474,15 @@ def server_error(e):
     return render_template('base.html'), 500
 
 
+@app.errorhandler(PoolError)
+def database_busy(e):
+    """All database connections stayed checked out for the pool timeout"""
+    print(f"Database pool exhausted on {request.path}: {e}")
+    if request.path.startswith('/api/') or request.is_json:
+        return jsonify({'error': 'Database busy, please retry shortly'}), 503
+    return render_template('base.html'), 503
+
+
 @app.route('/test-bulk-fetch')
 def test_bulk_fetch():
     """Test endpoint to fetch all recent jobs at once"""
@@ -2931,6 +2557,28 @@ def admin_stats():
     return render_template('admin_stats.html')
 
 
+@app.route('/admin/profiles')
+@login_required
+def admin_profiles():
+    """Stored profiling runs (requests, background jobs, scripts)"""
+    if not is_admin():
+        flash('Admin access required', 'error')
+        return redirect(url_for('dashboard'))
+    return render_template('admin_profiles.html', profiles=ProfileStore().list())
+
+
+@app.route('/admin/profiles/<entry_id>/<fmt>')
+@login_required
+def download_profile(entry_id, fmt):
+    """Download a run as json (metadata + spans), prof (pstats) or folded (flame graph)"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    path = ProfileStore().path(entry_id, fmt)
+    if not path:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=f"{entry_id}.{fmt}")
+
+
 @app.route('/api/stats')
 @login_required
 def api_stats():
@@ -2940,142 +2588,21 @@ def api_stats():
     
     stats = {}
     
-    # 1. JOB DATABASE STATS
-    try:
-        # Jobs by source
-        jobs_by_source = job_db.execute_query("""
-            SELECT source, COUNT(*) as count
-            FROM jobs
-            GROUP BY source
-            ORDER BY count DESC
-        """)
-        stats['jobs_by_source'] = [{'source': row[0], 'count': row[1]} for row in jobs_by_source] if jobs_by_source else []
-        
-        # Jobs by date (last 30 days)
-        jobs_by_date = job_db.execute_query("""
-            SELECT DATE(discovered_date) as date, COUNT(*) as count
-            FROM jobs
-            WHERE discovered_date >= NOW() - INTERVAL '30 days'
-            GROUP BY DATE(discovered_date)
-            ORDER BY date DESC
-        """)
-        stats['jobs_by_date'] = [{'date': str(row[0]), 'count': row[1]} for row in jobs_by_date] if jobs_by_date else []
-        
-        # Total jobs
-        total_jobs = job_db.execute_query("SELECT COUNT(*) FROM jobs")
-        stats['total_jobs'] = total_jobs[0][0] if total_jobs else 0
-        
-        # Jobs today
-        jobs_today = job_db.execute_query("""
-            SELECT COUNT(*) FROM jobs 
-            WHERE DATE(discovered_date) = CURRENT_DATE
-        """)
-        stats['jobs_today'] = jobs_today[0][0] if jobs_today else 0
-        
-    except Exception as e:
-        print(f"Error fetching job stats: {e}")
-        stats['jobs_by_source'] = []
-        stats['jobs_by_date'] = []
-        stats['total_jobs'] = 0
-        stats['jobs_today'] = 0
-    
-    # 2. USER ACTIVITY STATS
+    # 1-4. JOB, USER ACTIVITY, CLAUDE USAGE, TOP COMPANIES & LOCATIONS
+    # (one read of the stats rollup instead of a dozen full-table counts)
     try:
-        # Total users
-        total_users = job_db.execute_query("SELECT COUNT(*) FROM users")
-        stats['total_users'] = total_users[0][0] if total_users else 0
-        
-        # Total CVs
-        total_cvs = job_db.execute_query("SELECT COUNT(*) FROM cvs")
-        stats['total_cvs'] = total_cvs[0][0] if total_cvs else 0
-        
-        # Total matches
-        total_matches = job_db.execute_query("SELECT COUNT(*) FROM user_job_matches")
-        stats['total_matches'] = total_matches[0][0] if total_matches else 0
-        
-        # Matches today
-        matches_today = job_db.execute_query("""
-            SELECT COUNT(*) FROM user_job_matches 
-            WHERE DATE(matched_date) = CURRENT_DATE
-        """)
-        stats['matches_today'] = matches_today[0][0] if matches_today else 0
-        
-        # Match quality distribution
-        match_distribution = job_db.execute_query("""
-            SELECT 
-                CASE 
-                    WHEN semantic_score >= 85 THEN '85-100%'
-                    WHEN semantic_score >= 70 THEN '70-84%'
-                    WHEN semantic_score >= 50 THEN '50-69%'
-                    ELSE '30-49%'
-                END as range,
-                COUNT(*) as count
-            FROM user_job_matches
-            WHERE semantic_score IS NOT NULL
-            GROUP BY range
-            ORDER BY range DESC
-        """)
-        stats['match_distribution'] = [{'range': row[0], 'count': row[1]} for row in match_distribution] if match_distribution else []
-        
-    except Exception as e:
-        print(f"Error fetching user stats: {e}")
-        stats['total_users'] = 0
-        stats['total_cvs'] = 0
-        stats['total_matches'] = 0
-        stats['matches_today'] = 0
-        stats['match_distribution'] = []
-    
-    # 3. CLAUDE API USAGE
-    try:
-        # Total Claude analyses
-        claude_analyses = job_db.execute_query("""
-            SELECT COUNT(*) FROM user_job_matches 
-            WHERE claude_score IS NOT NULL
-        """)
-        stats['claude_analyses_total'] = claude_analyses[0][0] if claude_analyses else 0
-        
-        # Claude analyses today
-        claude_today = job_db.execute_query("""
-            SELECT COUNT(*) FROM user_job_matches 
-            WHERE claude_score IS NOT NULL 
-            AND DATE(matched_date) = CURRENT_DATE
-        """)
-        stats['claude_analyses_today'] = claude_today[0][0] if claude_today else 0
-        
-        # Estimated cost (assuming $0.03 per analysis)
-        stats['claude_estimated_cost'] = stats['claude_analyses_total'] * 0.03
-        
+        stats.update(job_db.get_dashboard_statistics())
     except Exception as e:
-        print(f"Error fetching Claude stats: {e}")
-        stats['claude_analyses_total'] = 0
-        stats['claude_analyses_today'] = 0
-        stats['claude_estimated_cost'] = 0
+        print(f"Error fetching dashboard stats: {e}")
+        stats.update({
+            'jobs_by_source': [], 'jobs_by_date': [], 'total_jobs': 0, 'jobs_today': 0,
+            'total_users': 0, 'total_cvs': 0, 'total_matches': 0, 'matches_today': 0,
+            'match_distribution': [], 'claude_analyses_total': 0, 'claude_analyses_today': 0,
+            'top_companies': [], 'top_locations': []
+        })
     
-    # 4. TOP COMPANIES & LOCATIONS
-    try:
-        top_companies = job_db.execute_query("""
-            SELECT company, COUNT(*) as count
-            FROM jobs
-            GROUP BY company
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        stats['top_companies'] = [{'company': row[0], 'count': row[1]} for row in top_companies] if top_companies else []
-        
-        top_locations = job_db.execute_query("""
-            SELECT location, COUNT(*) as count
-            FROM jobs
-            WHERE location IS NOT NULL AND location != ''
-            GROUP BY location
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        stats['top_locations'] = [{'location': row[0], 'count': row[1]} for row in top_locations] if top_locations else []
-        
-    except Exception as e:
-        print(f"Error fetching top companies/locations: {e}")
-        stats['top_companies'] = []
-        stats['top_locations'] = []
+    # Estimated cost (assuming $0.03 per analysis)
+    stats['claude_estimated_cost'] = stats['claude_analyses_total'] * 0.03
     
     # 5. API QUOTA TRACKING
     stats['api_quotas'] = {}
@@ -3170,6 +2697,11 @@ def api_stats():
         'database': 'PostgreSQL (Railway)',
         'environment': os.getenv('FLASK_ENV', 'development')
     }
+    pool = getattr(job_db, 'connection_pool', None)
+    if hasattr(pool, 'stats'):
+        stats['system']['db_pool'] = pool.stats()
+    stats['system']['stats_cache'] = stats_cache.stats()
+    stats['system']['pdf_render'] = pdf_renderer.stats()
     
     return jsonify(stats)
 
@@ -3339,9 +2871,7 @@ def generate_resume(job_id):
         # Get user's contact information for resume header
         # Use resume-specific fields if set, otherwise fall back to login credentials
         user_info = None
-        conn = cv_manager.connection_pool.getconn()
-        try:
-            cur = conn.cursor()
+        with cv_manager._connection() as conn, conn.cursor() as cur:
             cur.execute("""
                 SELECT name, email, phone, resume_name, resume_email, resume_phone
                 FROM users WHERE id = %s
@@ -3353,8 +2883,6 @@ def generate_resume(job_id):
                     'email': user_row[4] or user_row[1],  # resume_email or fallback to email
                     'phone': user_row[5] or user_row[2]   # resume_phone or fallback to phone
                 }
-        finally:
-            cv_manager.connection_pool.putconn(conn)
 
         # Generate resume HTML
         print(f"Generating resume for user {user_id}, job {job_id} in {language}...")
@@ -3438,11 +2966,7 @@ def save_resume_route(job_id):
         # Generate PDF bytes in memory
         pdf_data = None
         try:
-            import io
-            from weasyprint import HTML as WeasyHTML
-            buf = io.BytesIO()
-            WeasyHTML(string=resume_html).write_pdf(buf)
-            pdf_data = buf.getvalue()
+            pdf_data = pdf_renderer.render(resume_html)
             print(f"✅ PDF generated ({len(pdf_data):,} bytes)")
         except Exception as pdf_error:
             print(f"⚠️  PDF generation failed: {pdf_error}")
@@ -3512,10 +3036,7 @@ def update_contact_info():
                 }), 400
 
         # Update user record with resume-specific fields
-        conn = cv_manager.connection_pool.getconn()
-        try:
-            cur = conn.cursor()
-
+        with cv_manager._connection() as conn, conn.cursor() as cur:
             # Update resume contact fields
             cur.execute("""
                 UPDATE users
@@ -3528,8 +3049,6 @@ def update_contact_info():
             user_row = cur.fetchone()
 
             conn.commit()
-        finally:
-            cv_manager.connection_pool.putconn(conn)
 
         fallback_name = user_row[0] if user_row else 'Not set'
         fallback_email = user_row[1] if user_row else 'Not set'
@@ -3664,6 +3183,7 @@ def save_projects():
         # Update profile with projects
         profile['projects'] = projects
         cv_manager.update_cv_profile(profile['cv_id'], profile)
+        refresh_cv_embedding(cv_manager, profile['cv_id'])
 
         print(f"Saved {len(projects)} projects for user {user_id}")
 
@@ -3726,6 +3246,13 @@ def download_resume(resume_id):
         elif download_format == 'pdf':
             pdf_data = resume.get('resume_pdf_data')
 
+            if not pdf_data and resume.get('resume_html'):
+                # Not stored (e.g. rendering failed at save time): render now, cached by content hash
+                try:
+                    pdf_data = pdf_renderer.render(resume['resume_html'])
+                except Exception as pdf_error:
+                    print(f"⚠️  PDF generation failed: {pdf_error}")
+
             if not pdf_data:
                 flash('PDF not available. Downloading HTML version instead.', 'info')
                 from flask import make_response
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Archive Stale Jobs
+
+Moves jobs discovered more than JOB_RETENTION_DAYS ago into the monthly
+jobs_archive partitions (see src/database/job_archive.py). Shortlisted or
+applied-to jobs, and jobs with feedback or generated resumes, are kept.
+
+Usage:
+    python scripts/archive_stale_jobs.py --dry-run
+    python scripts/archive_stale_jobs.py --retention-days 60
+    python scripts/archive_stale_jobs.py --drop-older-than 24   # also drop archive months > 2 years old
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.factory import get_database
+from src.database.job_archive import JobArchiver
+
+
+def archive_stale_jobs(retention_days: Optional[int] = None, dry_run: bool = False,
+                       drop_older_than: Optional[int] = None, db=None) -> dict:
+    """
+    Archive stale jobs and apply the archive retention
+
+    Returns:
+        Dict with cutoff, archived, batches, partitions and dropped
+    """
+    db = db or get_database()
+    if not hasattr(db, '_connection'):
+        print("ℹ️  Job archiving needs PostgreSQL, skipping")
+        return {'archived': 0, 'dropped': []}
+
+    archiver = JobArchiver(db, retention_days=retention_days)
+    if not archiver.has_schema():
+        print("ℹ️  jobs_archive not created yet (run scripts/migrations/add_jobs_archive.py), skipping")
+        return {'archived': 0, 'dropped': []}
+
+    result = archiver.archive_stale(dry_run=dry_run)
+    verb = 'would be archived' if dry_run else 'archived'
+    print(f"  ✓ {result['archived']} jobs discovered before {result['cutoff'][:10]} {verb}")
+
+    result['dropped'] = [] if dry_run else archiver.drop_partitions(drop_older_than)
+    for name in result['dropped']:
+        print(f"  🗑  Dropped {name}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move stale jobs into jobs_archive')
+    parser.add_argument('--retention-days', type=int, help='Archive jobs older than this (default: JOB_RETENTION_DAYS or 90)')
+    parser.add_argument('--drop-older-than', type=int, help='Drop archive partitions older than this many months')
+    parser.add_argument('--dry-run', action='store_true', help='Only count stale jobs')
+    args = parser.parse_args()
+
+    result = archive_stale_jobs(args.retention_days, args.dry_run, args.drop_older_than)
+    print(f"\nDone: {result}")
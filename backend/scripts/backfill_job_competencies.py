@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Backfill Job Competencies
+
+Extracts ai_competencies/ai_key_skills for jobs that have none yet, so
+matching runs can reuse them instead of extracting on demand. Jobs are
+claimed through EnrichmentQueue, so several workers can run at once
+(see scripts/parallel_enrich_jobs.py --task competency_backfill).
+
+Usage:
+    python scripts/backfill_job_competencies.py --limit 200
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.factory import get_database
+from src.database.work_queue import EnrichmentQueue
+from src.analysis.claude_analyzer import ClaudeJobAnalyzer
+
+# Jobs claimed per extraction round (the analyzer packs them into prompts)
+CLAIM_SIZE = 40
+
+
+def backfill_job_competencies(limit: int = 200, worker_id: Optional[str] = None, db=None) -> dict:
+    """
+    Extract and store competencies for up to limit jobs
+
+    Returns:
+        Dict with processed/success/failed counts
+    """
+    stats = {'processed': 0, 'success': 0, 'failed': 0}
+
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
+        print("❌ ANTHROPIC_API_KEY not set")
+        return stats
+
+    db = db or get_database()
+    analyzer = ClaudeJobAnalyzer(api_key=api_key)
+    queue = EnrichmentQueue(db, 'competency_backfill', worker_id=worker_id)
+
+    while stats['processed'] < limit:
+        jobs = queue.claim_batch(min(CLAIM_SIZE, limit - stats['processed']),
+                                 columns=('id', 'title', 'company', 'description'))
+        if not jobs:
+            break
+        stats['processed'] += len(jobs)
+
+        analyzer._extract_and_merge(jobs)
+        extracted = [job for job in jobs if job.get('ai_competencies') or job.get('ai_key_skills')]
+        extracted_ids = {job['id'] for job in extracted}
+        failed_ids = [job['id'] for job in jobs if job['id'] not in extracted_ids]
+
+        updated = db.update_jobs_competencies_batch([
+            {'job_id': job['id'],
+             'ai_competencies': job.get('ai_competencies', []),
+             'ai_key_skills': job.get('ai_key_skills', [])}
+            for job in extracted
+        ]) if extracted else 0
+
+        if updated:
+            queue.complete(extracted_ids)
+            stats['success'] += len(extracted)
+        else:
+            failed_ids += list(extracted_ids)
+        if failed_ids:
+            queue.fail(failed_ids, 'no competencies extracted')
+            stats['failed'] += len(failed_ids)
+
+        print(f"  ✓ {stats['success']}/{stats['processed']} jobs backfilled")
+
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill job competencies/skills')
+    parser.add_argument('--limit', type=int, default=200, help='Maximum jobs to process')
+    args = parser.parse_args()
+
+    result = backfill_job_competencies(limit=args.limit)
+    print(f"\nDone: {result}")
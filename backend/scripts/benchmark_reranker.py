@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Cross-Encoder Reranker Latency Benchmark
+
+Measures how long the reranking stage adds to a matching run: model load
+time, then per-batch and per-pair latency for several batch sizes. Pairs
+come from a user's stored matches, or are synthetic when no user is given.
+
+Usage:
+    python scripts/benchmark_reranker.py                          # 200 synthetic pairs
+    python scripts/benchmark_reranker.py --pairs 500 --batch-sizes 8 16 32
+    python scripts/benchmark_reranker.py --user-id 4              # real CV and matches
+    python scripts/benchmark_reranker.py --model cross-encoder/ms-marco-MiniLM-L-6-v2
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.reranker import CrossEncoderReranker, cv_summary, job_passage
+
+SYNTHETIC_PROFILE = {
+    'expertise_summary': 'Data engineer with 8 years of Python, SQL and cloud data platforms',
+    'preferred_roles': ['Data Engineer', 'Analytics Engineer'],
+    'technical_skills': ['Python', 'SQL', 'Airflow', 'dbt', 'Spark', 'AWS', 'Docker'],
+}
+
+SYNTHETIC_TITLES = ['Senior Data Engineer', 'Backend Developer (Python)', 'Business Analyst',
+                    'Machine Learning Engineer', 'Projektmanager IT', 'Cloud Architect AWS']
+
+
+def load_pairs(user_id, n):
+    """(profile, jobs) from the database, or synthetic ones"""
+    if user_id is None:
+        jobs = [{'id': i, 'title': SYNTHETIC_TITLES[i % len(SYNTHETIC_TITLES)],
+                 'description': 'We are looking for someone to build data pipelines and APIs. ' * 20}
+                for i in range(n)]
+        return SYNTHETIC_PROFILE, jobs
+
+    from src.database.postgres_operations import PostgresDatabase
+    from src.database.postgres_cv_operations import PostgresCVManager
+
+    db = PostgresDatabase(os.getenv('DATABASE_URL'))
+    cv_manager = PostgresCVManager(db.connection_pool)
+    profile = cv_manager.get_primary_profile(user_id)
+    if not profile:
+        print(f"❌ No primary CV profile for user {user_id}")
+        sys.exit(1)
+    matches = db.get_user_job_matches(user_id, min_semantic_score=0, limit=n)
+    jobs = [{'id': m['job_id'], 'title': m.get('title'), 'description': m.get('description'),
+             'ai_key_skills': m.get('ai_key_skills')} for m in matches]
+    db.close()
+    return profile, jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cross-encoder reranking latency')
+    parser.add_argument('--pairs', type=int, default=200, help='Pairs scored per run (default: 200)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per batch size (default: 3)')
+    parser.add_argument('--user-id', type=int, help='Use this user\'s CV and stored matches')
+    parser.add_argument('--model', help='CrossEncoder name (default: RERANK_MODEL)')
+    args = parser.parse_args()
+
+    profile, jobs = load_pairs(args.user_id, args.pairs)
+    if not jobs:
+        print("❌ No jobs to score")
+        sys.exit(1)
+    query = cv_summary(profile)
+    passages = [job_passage(job) for job in jobs]
+
+    print("\n" + "=" * 60)
+    print("CROSS-ENCODER RERANK BENCHMARK")
+    print("=" * 60)
+    reranker = CrossEncoderReranker(model_name=args.model)
+    print(f"Model: {reranker.model_name}")
+    print(f"Pairs: {len(passages)} (avg passage {statistics.mean(len(p) for p in passages):.0f} chars)")
+
+    start = time.time()
+    reranker.model
+    print(f"Model load: {time.time() - start:.2f}s")
+    reranker.score(query, passages[:2])  # warm-up
+
+    print(f"\n{'batch':>6} {'total s':>9} {'ms/pair':>9} {'pairs/s':>9}")
+    for batch_size in args.batch_sizes:
+        reranker.batch_size = batch_size
+        timings = []
+        for _ in range(args.repeats):
+            start = time.time()
+            reranker.score(query, passages)
+            timings.append(time.time() - start)
+        best = min(timings)
+        print(f"{batch_size:>6} {best:>9.2f} {best / len(passages) * 1000:>9.1f} {len(passages) / best:>9.1f}")
+
+    reranker.batch_size = args.batch_sizes[0]
+    scores = reranker.score(query, passages)
+    kept = sum(1 for s in scores if s >= reranker.min_score)
+    print(f"\nScore range: {scores.min():.3f} - {scores.max():.3f}, median {float(statistics.median(scores)):.3f}")
+    print(f"Kept for Claude: {min(kept, reranker.top_n or kept)}/{len(passages)} "
+          f"(top_n={reranker.top_n}, min_score={reranker.min_score})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,17 @@
 #!/usr/bin/env python3
-"""Check completeness of AI metadata fields in raw_jobs_test"""
+"""Check completeness of AI metadata fields in raw Active Jobs payloads
+
+Reads the Parquet raw archive (RAW_ARCHIVE_DIR) when it has data, otherwise
+raw_jobs_test in Postgres.
+"""
 import os
 import sys
-import psycopg2
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 load_dotenv()
 
-conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-cursor = conn.cursor()
-
-cursor.execute('SELECT COUNT(*) FROM raw_jobs_test')
-total = cursor.fetchone()[0]
+from src.utils.raw_archive import RawArchiveReader
 
 # Check completeness of text fields
 fields = [
@@ -22,17 +21,6 @@ fields = [
     ('ai_job_language', 'Job Language'),
 ]
 
-print('AI Metadata Field Coverage:')
-print('=' * 80)
-for field, label in fields:
-    cursor.execute(f"""
-        SELECT COUNT(*) FROM raw_jobs_test
-        WHERE {field} IS NOT NULL AND {field} != ''
-    """)
-    count = cursor.fetchone()[0]
-    percentage = (count / total * 100) if total > 0 else 0
-    print(f'{label:30s}: {count:3d}/{total} ({percentage:5.1f}%)')
-
 # Check array fields
 array_fields = [
     ('ai_benefits', 'Benefits'),
@@ -42,20 +30,78 @@ array_fields = [
     ('countries_derived', 'Countries'),
 ]
 
+
+def coverage_from_archive(reader):
+    """(total, {field: count}, remote_count) in one DuckDB scan of raw_jobs"""
+    text_counts = [
+        f"COUNT(*) FILTER (WHERE COALESCE(json_extract_string(payload, '$.{field}'), '') != '')"
+        for field, _ in fields
+    ]
+    array_counts = [
+        f"COUNT(*) FILTER (WHERE COALESCE(json_array_length(payload, '$.{field}'), 0) > 0)"
+        for field, _ in array_fields
+    ]
+    row = reader.query(f"""
+        SELECT COUNT(*), {', '.join(text_counts + array_counts)},
+               COUNT(*) FILTER (WHERE json_extract(payload, '$.remote_derived')::BOOLEAN)
+        FROM raw_jobs WHERE source = 'activejobs'
+    """)[0]
+    names = [field for field, _ in fields + array_fields]
+    return row[0], dict(zip(names, row[1:-1])), row[-1]
+
+
+def coverage_from_postgres():
+    """(total, {field: count}, remote_count) from raw_jobs_test"""
+    import psycopg2
+
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT COUNT(*) FROM raw_jobs_test')
+    total = cursor.fetchone()[0]
+
+    counts = {}
+    for field, _ in fields:
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM raw_jobs_test
+            WHERE {field} IS NOT NULL AND {field} != ''
+        """)
+        counts[field] = cursor.fetchone()[0]
+
+    for field, _ in array_fields:
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM raw_jobs_test
+            WHERE {field} IS NOT NULL AND array_length({field}, 1) > 0
+        """)
+        counts[field] = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM raw_jobs_test WHERE remote = true')
+    remote_count = cursor.fetchone()[0]
+
+    cursor.close()
+    conn.close()
+    return total, counts, remote_count
+
+
+reader = RawArchiveReader()
+if reader.has_data():
+    print(f'Source: raw archive ({reader.root})')
+    total, counts, remote_count = coverage_from_archive(reader)
+else:
+    print('Source: raw_jobs_test')
+    total, counts, remote_count = coverage_from_postgres()
+
+print('AI Metadata Field Coverage:')
+print('=' * 80)
+for field, label in fields:
+    count = counts[field]
+    percentage = (count / total * 100) if total > 0 else 0
+    print(f'{label:30s}: {count:3d}/{total} ({percentage:5.1f}%)')
+
 print()
 for field, label in array_fields:
-    cursor.execute(f"""
-        SELECT COUNT(*) FROM raw_jobs_test
-        WHERE {field} IS NOT NULL AND array_length({field}, 1) > 0
-    """)
-    count = cursor.fetchone()[0]
+    count = counts[field]
     percentage = (count / total * 100) if total > 0 else 0
     print(f'{label:30s}: {count:3d}/{total} ({percentage:5.1f}%)')
 
-# Check remote field
-cursor.execute('SELECT COUNT(*) FROM raw_jobs_test WHERE remote = true')
-remote_count = cursor.fetchone()[0]
-print(f'\nRemote jobs (remote_derived): {remote_count}/{total} ({remote_count/total*100:.1f}%)')
-
-cursor.close()
-conn.close()
+print(f'\nRemote jobs (remote_derived): {remote_count}/{total} ({remote_count/total*100 if total else 0:.1f}%)')
@@ -28,7 +28,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.collectors.activejobs import ActiveJobsCollector
 from src.database.factory import get_database
-from scripts.enrich_lightweight import run_lightweight_enrichment  # Lightweight enrichment only
+from scripts.enrich_lightweight import drain_enrichment_queue  # Lightweight enrichment only
+from scripts.encode_existing_jobs import store_embeddings
+from scripts.archive_stale_jobs import archive_stale_jobs
+from src.database.work_queue import EnrichmentQueue
+from src.matching.description_embeddings import encode_job_descriptions
 import psycopg2
 from psycopg2.extras import execute_values
 import json
@@ -36,6 +40,9 @@ import time
 
 load_dotenv()
 
+# Jobs claimed and encoded per round in encode_new_jobs
+ENCODE_BATCH_SIZE = 500
+
 # Lazy load sentence transformer model
 _encoding_model = None
 
@@ -55,22 +62,8 @@ def get_encoding_model():
     return _encoding_model
 
 
-def encode_new_jobs(db, limit=None):
-    """
-    Encode titles of jobs that don't have embeddings yet
-
-    Args:
-        db: Database instance
-        limit: Maximum number of jobs to encode (None = all)
-
-    Returns:
-        int: Number of jobs encoded
-    """
-    model = get_encoding_model()
-    if model is None:
-        return 0
-
-    # Get jobs without embeddings
+def _select_unencoded_jobs(db, limit=None):
+    """Jobs without embeddings (SQLite; PostgreSQL claims them through EnrichmentQueue)"""
     conn = db._get_connection()
     cursor = conn.cursor()
 
@@ -85,75 +78,66 @@ def encode_new_jobs(db, limit=None):
         query += f" LIMIT {limit}"
 
     cursor.execute(query)
-    jobs = cursor.fetchall()
+    jobs = [{'id': row[0], 'title': row[1]} for row in cursor.fetchall()]
 
-    if not jobs:
-        cursor.close()
-        if hasattr(db, '_return_connection'):
-            db._return_connection(conn)
-        else:
-            conn.close()
-        return 0
+    cursor.close()
+    conn.close()
+    return jobs
 
-    # Convert to list of dicts
-    job_list = [{'id': row[0], 'title': row[1]} for row in jobs]
 
-    cursor.close()
-    if hasattr(db, '_return_connection'):
-        db._return_connection(conn)
-    else:
-        conn.close()
+def encode_new_jobs(db, limit=None):
+    """
+    Encode titles of jobs that don't have embeddings yet
 
-    # Encode titles
-    start_time = time.time()
-    titles = [job['title'] for job in job_list]
-    job_ids = [job['id'] for job in job_list]
+    On PostgreSQL, jobs are claimed in batches of ENCODE_BATCH_SIZE so
+    concurrent encoders never embed the same job twice.
 
-    embeddings = model.encode(titles, show_progress_bar=False, convert_to_numpy=True)
+    Args:
+        db: Database instance
+        limit: Maximum number of jobs to encode (None = all)
 
-    # Store embeddings
-    conn = db._get_connection()
-    cursor = conn.cursor()
+    Returns:
+        int: Number of jobs encoded
+    """
+    model = get_encoding_model()
+    if model is None:
+        return 0
 
-    # Detect database type
-    is_postgres = hasattr(db, 'connection_pool') or os.getenv('DATABASE_URL', '').startswith('postgres')
+    start_time = time.time()
+    queue = EnrichmentQueue(db, 'encoding') if hasattr(db, 'connection_pool') else None
+    encoded = 0
 
-    try:
-        for job_id, embedding in zip(job_ids, embeddings):
-            embedding_json = json.dumps(embedding.tolist())
-
-            if is_postgres:
-                cursor.execute("""
-                    UPDATE jobs
-                    SET embedding_jobbert_title = %s::jsonb,
-                        embedding_date = NOW()
-                    WHERE id = %s
-                """, (embedding_json, job_id))
-            else:
-                cursor.execute("""
-                    UPDATE jobs
-                    SET embedding_jobbert_title = ?,
-                        embedding_date = ?
-                    WHERE id = ?
-                """, (embedding_json, datetime.now().isoformat(), job_id))
+    while limit is None or encoded < limit:
+        batch_limit = ENCODE_BATCH_SIZE if limit is None else min(ENCODE_BATCH_SIZE, limit - encoded)
+        if queue:
+            job_list = queue.claim_batch(batch_limit, columns=('id', 'title'))
+        else:
+            job_list = _select_unencoded_jobs(db, limit)
+        if not job_list:
+            break
 
-        conn.commit()
+        titles = [job['title'] for job in job_list]
+        job_ids = [job['id'] for job in job_list]
 
-    except Exception as e:
-        conn.rollback()
-        raise e
+        try:
+            embeddings = model.encode(titles, show_progress_bar=False, convert_to_numpy=True)
+            # Store embeddings in one bulk statement
+            store_embeddings(db, job_ids, embeddings)
+        except Exception as e:
+            if queue:
+                queue.fail(job_ids, str(e))
+            raise
 
-    finally:
-        cursor.close()
-        if hasattr(db, '_return_connection'):
-            db._return_connection(conn)
-        else:
-            conn.close()
+        encoded += len(job_list)
+        if not queue:
+            break
+        queue.complete(job_ids)
 
-    encode_time = time.time() - start_time
-    print(f"   ✓ Encoded {len(job_list)} jobs in {encode_time:.2f}s ({len(job_list)/encode_time:.1f} jobs/sec)")
+    if encoded:
+        encode_time = time.time() - start_time
+        print(f"   ✓ Encoded {encoded} jobs in {encode_time:.2f}s ({encoded/encode_time:.1f} jobs/sec)")
 
-    return len(job_list)
+    return encoded
 
 
 def run_canonical_map_refresh():
@@ -343,8 +327,9 @@ def run_daily_job():
 
     Collects jobs posted in the last 24 hours from Active Jobs DB
     """
+    run_started = datetime.now()
     print("\n" + "=" * 80)
-    print(f"DAILY JOB STARTED - {datetime.now().strftime('%Y-%m-%d %H:%M:%S %Z')}")
+    print(f"DAILY JOB STARTED - {run_started.strftime('%Y-%m-%d %H:%M:%S %Z')}")
     print("=" * 80)
 
     try:
@@ -377,16 +362,18 @@ def run_daily_job():
 
         print(f"   • Total jobs in database: {total:,}")
 
-        # --- Trigger Lightweight Enrichment ---
-        if stats['new_jobs'] > 0:
-            print(f"\n🎯 Lightweight enrichment starting ({stats['new_jobs']} new jobs)...")
-            print("   Extracts: location, work arrangement, employment type")
-            print(f"   Estimated cost: ${stats['new_jobs'] * 0.0003:.2f}")
-            try:
-                run_lightweight_enrichment(limit=stats['new_jobs'])
-                print(f"   ✓ Lightweight enrichment complete")
-            except Exception as e:
-                print(f"   ⚠️  Lightweight enrichment failed: {e}")
+        # --- Lightweight Enrichment ---
+        # Drains the enrichment queue (new jobs and earlier leftovers) up to
+        # LIGHTWEIGHT_CRON_MAX_JOBS; an enrich worker, if deployed, shares it
+        print(f"\n🎯 Lightweight enrichment starting ({stats['new_jobs']} new jobs)...")
+        print("   Extracts: location, work arrangement, employment type")
+        try:
+            enrich_stats = drain_enrichment_queue()
+            print(f"   ✓ Lightweight enrichment complete: {enrich_stats['success']} enriched, "
+                  f"{enrich_stats['failed']} failed")
+            print(f"   Estimated cost: ${enrich_stats['success'] * 0.0003:.2f}")
+        except Exception as e:
+            print(f"   ⚠️  Lightweight enrichment failed: {e}")
         # -----------------------------------------
 
         # --- Encode New Jobs with TechWolf JobBERT-v3 ---
@@ -406,6 +393,32 @@ def run_daily_job():
                 traceback.print_exc()
         # -------------------------------------------------
 
+        # --- Encode job descriptions (chunked, pooled) for full-text search ---
+        if stats['new_jobs'] > 0 and hasattr(db, 'connection_pool'):
+            print(f"\n📄 Encoding job descriptions ({stats['new_jobs']} new jobs)...")
+            try:
+                model = get_encoding_model()
+                described = encode_job_descriptions(db, model, limit=stats['new_jobs']) if model else 0
+                print(f"   ✓ Encoded {described} descriptions")
+            except Exception as e:
+                print(f"   ⚠️  Description encoding failed: {e}")
+        # ----------------------------------------------------------------------
+
+        # --- Match all active users against the new jobs ---
+        if stats['new_jobs'] > 0 and hasattr(db, 'connection_pool'):
+            print(f"\n🧮 Fleet matching (all active users × new jobs)...")
+            try:
+                from src.database.postgres_cv_operations import PostgresCVManager
+                from src.matching.fleet_matcher import run_fleet_matching
+
+                fleet = run_fleet_matching(db, PostgresCVManager(db.connection_pool),
+                                           since=run_started, model=get_encoding_model())
+                print(f"   ✓ {fleet['matches']} matches for {fleet['users']} users × "
+                      f"{fleet['jobs']} jobs in {fleet['seconds']}s")
+            except Exception as e:
+                print(f"   ⚠️  Fleet matching failed: {e}")
+        # ----------------------------------------------------
+
         # --- Refresh canonical skill map (runs unconditionally) ---
         print(f"\n📚 Refreshing canonical skill map...")
         try:
@@ -414,6 +427,21 @@ def run_daily_job():
             print(f"   ⚠️  Canonical map refresh failed: {e}")
         # -----------------------------------------------------------
 
+        # --- Archive jobs past the retention window ---
+        print(f"\n🗄  Archiving stale jobs...")
+        try:
+            archive_stale_jobs(db=db)
+        except Exception as e:
+            print(f"   ⚠️  Job archiving failed: {e}")
+        # -----------------------------------------------
+
+        # --- Refresh dashboard statistics rollup ---
+        if hasattr(db, 'refresh_statistics'):
+            print(f"\n📊 Refreshing dashboard statistics...")
+            if db.refresh_statistics():
+                print(f"   ✓ Statistics rollup refreshed")
+        # -------------------------------------------
+
         db.close()
         return True
 
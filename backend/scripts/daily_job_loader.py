@@ -117,10 +117,6 @@ class DailyJobLoader:
         all_jobs = []
         seen_job_ids = set()
 
-        # Get already deleted job IDs to avoid re-adding
-        deleted_ids = self.db.get_deleted_job_ids()
-        print(f"Skipping {len(deleted_ids)} previously deleted jobs")
-
         # Strategy 1: Fetch all jobs in key cities
         if key_cities:
             print(f"\n{'='*70}")
@@ -131,7 +127,7 @@ class DailyJobLoader:
                 print(f"\nFetching jobs in {city}...")
                 jobs = self._fetch_city_jobs(city, max_pages, date_posted)
 
-                new_jobs = self._deduplicate_jobs(jobs, seen_job_ids, deleted_ids)
+                new_jobs = self._deduplicate_jobs(jobs, seen_job_ids)
                 all_jobs.extend(new_jobs)
 
                 self.stats['by_category'][f'{city} (all)'] = len(new_jobs)
@@ -149,7 +145,7 @@ class DailyJobLoader:
                     country, work_type, max_pages, date_posted
                 )
 
-                new_jobs = self._deduplicate_jobs(jobs, seen_job_ids, deleted_ids)
+                new_jobs = self._deduplicate_jobs(jobs, seen_job_ids)
                 all_jobs.extend(new_jobs)
 
                 self.stats['by_category'][f'{country} ({work_type})'] = len(new_jobs)
@@ -209,8 +205,7 @@ class DailyJobLoader:
     def _deduplicate_jobs(
         self,
         jobs: List[Dict],
-        seen_job_ids: Set[str],
-        deleted_ids: Set[str]
+        seen_job_ids: Set[str]
     ) -> List[Dict]:
         """
         Remove duplicate and deleted jobs
@@ -218,13 +213,17 @@ class DailyJobLoader:
         Args:
             jobs: List of job dictionaries
             seen_job_ids: Set of job IDs already seen in this run
-            deleted_ids: Set of job IDs previously deleted
 
         Returns:
             List of unique, non-deleted jobs
         """
         unique_jobs = []
 
+        # Previously deleted jobs among this batch only (one indexed lookup)
+        deleted_ids = self.db.find_deleted_job_ids([
+            job.get('external_id') or job.get('url', '') for job in jobs
+        ])
+
         for job in jobs:
             job_id = job.get('external_id') or job.get('url', '')
 
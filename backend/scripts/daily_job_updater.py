@@ -217,22 +217,26 @@ class SmartJobUpdater:
         
         saved_count = 0
         
+        # Check the whole batch against the database in one query
+        try:
+            existing_ids, deleted_ids = self.db.get_known_job_ids(
+                job.get('job_id') for job in jobs if job.get('job_id') not in self.seen_job_ids
+            )
+        except Exception as e:
+            logger.error(f"Error checking existing jobs: {e}")
+            self.stats['errors'] += 1
+            return 0
+        self.seen_job_ids.update(existing_ids | deleted_ids)
+        
         for job in jobs:
             job_id = job.get('job_id')
             
-            # Skip if already seen in this session
+            # Skip if already in the database or seen in this session
             if job_id in self.seen_job_ids:
                 self.stats['duplicates_skipped'] += 1
                 continue
             
             try:
-                # Check if job exists in database
-                existing = self.db.get_job_by_id(job_id)
-                if existing:
-                    self.stats['duplicates_skipped'] += 1
-                    self.seen_job_ids.add(job_id)
-                    continue
-                
                 # Save new job
                 self.db.add_job(job)
                 saved_count += 1
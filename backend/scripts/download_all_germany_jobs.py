@@ -4,6 +4,8 @@ Download ALL jobs in Germany from Active Jobs DB (last 7 days)
 
 This downloads every job posting in Germany without any filtering,
 storing them in raw_jobs_test for custom matching experiments.
+Raw API responses also go to the Parquet raw archive when RAW_ARCHIVE_DIR
+(or --archive-dir) is set; see src/utils/raw_archive.py.
 """
 import os
 import sys
@@ -17,6 +19,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 load_dotenv()
 
 from src.collectors.activejobs import ActiveJobsCollector
+from src.utils.raw_archive import archive_raw_payloads, get_raw_archive
 
 def store_jobs_batch(conn, jobs_batch, raw_jobs_batch):
     """Store a batch of jobs in raw_jobs_test table with ALL AI metadata
@@ -324,6 +327,8 @@ def download_all_jobs(max_pages=500, start_page=0):
                 print(f"  No more results")
                 break
 
+            archive_raw_payloads('activejobs', jobs_data)
+
             # Parse jobs and keep raw responses
             for job in jobs_data:
                 try:
@@ -358,6 +363,11 @@ def download_all_jobs(max_pages=500, start_page=0):
     print(f"{'='*80}")
     print(f"Total jobs fetched: {len(all_jobs)}")
 
+    raw_archive = get_raw_archive()
+    if raw_archive:
+        raw_archive.flush()
+        print(f"Raw payloads archived: {raw_archive.rows_written} ({raw_archive.root})")
+
     if not all_jobs:
         print("No jobs found!")
         conn.close()
@@ -464,7 +474,11 @@ if __name__ == "__main__":
                         help='Number of pages to fetch (default: 1, each page = 100 jobs)')
     parser.add_argument('--start-page', type=int, default=0,
                         help='Starting page number for offset (default: 0)')
+    parser.add_argument('--archive-dir',
+                        help='Also write raw responses to this Parquet archive (default: RAW_ARCHIVE_DIR)')
 
     args = parser.parse_args()
+    if args.archive_dir:
+        os.environ['RAW_ARCHIVE_DIR'] = args.archive_dir
 
     download_all_jobs(max_pages=args.max_pages, start_page=args.start_page)
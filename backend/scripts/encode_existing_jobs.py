@@ -101,32 +101,27 @@ def store_embeddings(db, job_ids, embeddings, dry_run=False):
     if dry_run:
         return
 
+    # PostgreSQL: one UPDATE ... FROM (VALUES ...) for the whole batch
+    if hasattr(db, 'update_job_embeddings_batch'):
+        db.update_job_embeddings_batch([
+            {'job_id': job_id, 'embedding': embedding}
+            for job_id, embedding in zip(job_ids, embeddings)
+        ])
+        return
+
+    # SQLite
     conn = db._get_connection()
     cursor = conn.cursor()
 
-    # Detect database type
-    is_postgres = hasattr(db, 'connection_pool') or os.getenv('DATABASE_URL', '').startswith('postgres')
-
     try:
-        for job_id, embedding in zip(job_ids, embeddings):
-            # Convert numpy array to JSON
-            embedding_json = json.dumps(embedding.tolist())
-
-            if is_postgres:
-                cursor.execute("""
-                    UPDATE jobs
-                    SET embedding_jobbert_title = %s::jsonb,
-                        embedding_date = NOW()
-                    WHERE id = %s
-                """, (embedding_json, job_id))
-            else:
-                # SQLite
-                cursor.execute("""
-                    UPDATE jobs
-                    SET embedding_jobbert_title = ?,
-                        embedding_date = ?
-                    WHERE id = ?
-                """, (embedding_json, datetime.now().isoformat(), job_id))
+        now = datetime.now().isoformat()
+        cursor.executemany("""
+            UPDATE jobs
+            SET embedding_jobbert_title = ?,
+                embedding_date = ?
+            WHERE id = ?
+        """, [(json.dumps(embedding.tolist()), now, job_id)
+              for job_id, embedding in zip(job_ids, embeddings)])
 
         conn.commit()
 
@@ -136,10 +131,7 @@ def store_embeddings(db, job_ids, embeddings, dry_run=False):
 
     finally:
         cursor.close()
-        if hasattr(db, '_return_connection'):
-            db._return_connection(conn)
-        else:
-            conn.close()
+        conn.close()
 
 
 def run_encoding(limit=None, batch_size=100, dry_run=False):
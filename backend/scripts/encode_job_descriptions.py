@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Encode Job Descriptions with TechWolf JobBERT-v3
+
+Backfills jobs.embedding_jobbert_description (chunked, pooled description
+vectors) used by full-text semantic search. Jobs are claimed through the
+enrichment work queue, so the script can be stopped and re-run at any time
+and several copies can run side by side.
+
+Run scripts/migrations/add_description_embeddings.py once beforehand.
+
+Usage:
+    python scripts/encode_job_descriptions.py --limit 1000       # Encode 1000 jobs
+    python scripts/encode_job_descriptions.py                    # Encode all jobs
+    python scripts/encode_job_descriptions.py --pooling max      # Max-pool chunks
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.factory import get_database
+from src.matching.description_embeddings import (DESCRIPTION_BATCH_SIZE, POOLING_MODES,
+                                                 encode_job_descriptions)
+from scripts.encode_existing_jobs import load_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Encode job descriptions for full-text semantic search')
+    parser.add_argument('--limit', type=int, help='Maximum jobs to encode (default: all)')
+    parser.add_argument('--batch-size', type=int, default=DESCRIPTION_BATCH_SIZE,
+                        help=f'Jobs claimed per round (default: {DESCRIPTION_BATCH_SIZE})')
+    parser.add_argument('--pooling', choices=POOLING_MODES, default='mean',
+                        help='How chunk embeddings are combined (default: mean)')
+    args = parser.parse_args()
+
+    db = get_database()
+    if not hasattr(db, 'connection_pool'):
+        print("❌ Description encoding requires PostgreSQL (DATABASE_URL)")
+        sys.exit(1)
+
+    model = load_model()
+    if model is None:
+        sys.exit(1)
+
+    print(f"\n⚙️  Encoding job descriptions (pooling: {args.pooling})...")
+    start = time.time()
+    encoded = 0
+    # Encode in slices so progress is visible; each slice resumes from the queue
+    while args.limit is None or encoded < args.limit:
+        step = args.batch_size * 10 if args.limit is None else min(args.batch_size * 10, args.limit - encoded)
+        done = encode_job_descriptions(db, model, limit=step, batch_size=args.batch_size, pooling=args.pooling)
+        if not done:
+            break
+        encoded += done
+        elapsed = time.time() - start
+        print(f"  [{encoded:6d}] {encoded / elapsed:.1f} jobs/second")
+
+    print(f"\n✅ Encoded {encoded} job descriptions in {time.time() - start:.1f}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,24 @@
 Lightweight Job Enrichment Script
 Extracts only essential fields for pre-filtering: location, work arrangement, employment type
 Costs ~$0.0003 per job vs $0.00088 for full enrichment (66% cheaper)
+
+Jobs are sent BATCH_SIZE per prompt (answers keyed by job id), several
+prompts run concurrently under a shared rate limiter, and results are
+written back in bulk. --batch-size 1 sends one job per request.
+
+Every job that still needs enrichment is in the queue (see
+src.database.work_queue). The daily cron drains it after each collection,
+up to LIGHTWEIGHT_CRON_MAX_JOBS jobs (drain_enrichment_queue). `--worker`
+additionally runs a queue worker that claims and enriches jobs as they
+arrive (the optional `enrich` process in the Procfile); both can run at
+once. Without either flag, a single pass over --limit jobs runs and exits.
 """
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from anthropic import Anthropic
 import psycopg2
-from psycopg2.extras import RealDictCursor
 import json
 import logging
 
@@ -19,6 +29,31 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.database.postgres_operations import PostgresDatabase
+from src.database.work_queue import EnrichmentQueue
+from src.analysis.batch_planner import BatchPlanner, estimate_tokens
+from src.analysis.stream_parser import parse_job_entries
+from src.utils.llm_gateway import get_llm_client
+from src.utils.rate_limiter import RateLimiter
+
+MODEL = "claude-3-haiku-20240307"
+
+# Jobs per prompt, concurrent prompts, and the shared request budget
+BATCH_SIZE = int(os.getenv('LIGHTWEIGHT_BATCH_SIZE', '30'))
+CONCURRENCY = int(os.getenv('LIGHTWEIGHT_CONCURRENCY', '4'))
+REQUESTS_PER_MINUTE = float(os.getenv('LIGHTWEIGHT_RPM', '50'))
+
+# Description characters sent per job in batched prompts
+BATCH_DESCRIPTION_CHARS = 1500
+
+# Worker mode: jobs claimed per pass, and the wait when the queue is empty
+WORKER_CLAIM = int(os.getenv('LIGHTWEIGHT_WORKER_CLAIM', '200'))
+WORKER_POLL_SECONDS = float(os.getenv('LIGHTWEIGHT_POLL_SECONDS', '60'))
+
+# Jobs the daily cron enriches per run (drain_enrichment_queue)
+CRON_MAX_JOBS = int(os.getenv('LIGHTWEIGHT_CRON_MAX_JOBS', '1000'))
+
 def create_lightweight_prompt(job):
     """Create minimal prompt to extract only location/work/employment fields"""
     return f"""Extract ONLY these fields from this job posting. Be concise.
@@ -65,10 +100,11 @@ def enrich_job_lightweight(client, job):
         prompt = create_lightweight_prompt(job)
         
         response = client.messages.create(
-            model="claude-3-haiku-20240307",
+            model=MODEL,
             max_tokens=200,  # Much smaller! Only need ~100 tokens
             temperature=0,
-            messages=[{"role": "user", "content": prompt}]
+            messages=[{"role": "user", "content": prompt}],
+            operation='lightweight_enrichment'
         )
         
         return parse_llm_response(response.content[0].text)
@@ -76,98 +112,274 @@ def enrich_job_lightweight(client, job):
         logger.error(f"Error enriching job {job.get('id')}: {e}")
         return None
 
-def update_job_lightweight(conn, job_id, data):
-    """Update job with lightweight fields only"""
-    cursor = conn.cursor()
+def format_job_for_batch(job):
+    """One job block of a batched prompt, headed by its database id"""
+    return f"""
+JOB {job['id']}:
+Title: {job.get('title', 'Unknown')}
+Company: {job.get('company', 'Unknown')}
+Location: {job.get('location', '')}
+Description: {(job.get('description') or '')[:BATCH_DESCRIPTION_CHARS]}
+"""
+
+def create_lightweight_batch_prompt(jobs):
+    """Same fields as create_lightweight_prompt for several jobs, answered keyed by job id"""
+    job_blocks = ''.join(format_job_for_batch(job) for job in jobs)
+    return f"""Extract ONLY these fields from each job posting below. Be concise.
+{job_blocks}
+OUTPUT (JSON only), one entry per job, keyed by the job number:
+{{
+  "<job number>": {{
+    "work_arrangement": "On-site" | "Hybrid" | "Remote",
+    "employment_type": ["FULL_TIME" | "PART_TIME" | "CONTRACT" | "INTERN"],
+    "experience_level": "Student" | "Entry Level" | "Mid Level" | "Senior" | "Lead" | "Executive",
+    "cities": ["CityName"],
+    "country_code": "de" | "us" | "gb" | etc
+  }}
+}}
+
+RULES:
+- Include every job number listed above
+- work_arrangement: Infer from description if not explicit
+- cities: Extract mentioned cities (max 2)
+- country_code: ISO 2-letter code from location
+- Output PURE JSON only, no markdown
+"""
+
+def enrich_jobs_lightweight_batch(client, jobs, planner, limiter=None):
+    """
+    Extract lightweight fields for several jobs with one request
     
+    Returns:
+        Dict of job id -> extracted fields; jobs the response did not
+        cover (or a failed request) are simply absent
+    """
+    prompt = create_lightweight_batch_prompt(jobs)
+    if limiter:
+        limiter.acquire()
     try:
-        cursor.execute("""
-            UPDATE jobs 
-            SET 
-                ai_work_arrangement = %s,
-                ai_employment_type = %s,
-                ai_experience_level = %s,
-                cities_derived = %s,
-                source_type = 'lightweight_enriched',
-                updated_at = NOW()
-            WHERE id = %s
-        """, (
-            data.get('work_arrangement'),
-            data.get('employment_type', []),
-            data.get('experience_level'),
-            data.get('cities', []),
-            job_id
-        ))
-        
+        response = client.messages.create(
+            model=MODEL,
+            max_tokens=planner.output_limit,
+            temperature=0,
+            messages=[{"role": "user", "content": prompt}],
+            operation='lightweight_enrichment',
+            batch_size=len(jobs)
+        )
+    except Exception as e:
+        logger.error(f"Error enriching batch of {len(jobs)} jobs: {e}")
+        return {}
+    
+    usage = getattr(response, 'usage', None)
+    if usage is not None and getattr(response, 'stop_reason', None) != 'max_tokens':
+        planner.record_output(len(jobs), getattr(usage, 'output_tokens', 0) or 0)
+    
+    # Salvage every complete entry, even from a truncated response
+    entries = parse_job_entries(response.content[0].text)
+    ids = {str(job['id']): job['id'] for job in jobs}
+    return {ids[key]: value for key, value in entries.items()
+            if key in ids and isinstance(value, dict)}
+
+def _as_list(value):
+    """Model output as a list of strings for TEXT[] columns (None -> [], scalar -> [scalar])"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v]
+    return [str(value)]
+
+def update_jobs_lightweight(conn, updates):
+    """
+    Write lightweight fields for many jobs in one statement
+
+    Args:
+        conn: psycopg2 connection
+        updates: List of (job_id, data) tuples
+
+    Returns:
+        Number of jobs updated (0 if the write failed)
+    """
+    if not updates:
+        return 0
+
+    rows = [
+        {
+            'id': job_id,
+            'ai_work_arrangement': data.get('work_arrangement'),
+            'ai_employment_type': _as_list(data.get('employment_type')),
+            'ai_experience_level': data.get('experience_level'),
+            'cities_derived': _as_list(data.get('cities'))
+        }
+        for job_id, data in updates
+    ]
+    cursor = conn.cursor()
+    try:
+        updated = PostgresDatabase.execute_bulk_update(
+            cursor, 'jobs', 'id', rows,
+            extra_set="source_type = 'lightweight_enriched', last_updated = NOW()"
+        )
         conn.commit()
-        cursor.close()
-        return True
+        return updated
     except Exception as e:
         conn.rollback()
+        logger.error(f"DB error updating {len(rows)} jobs: {e}")
+        return 0
+    finally:
         cursor.close()
-        logger.error(f"DB error updating job {job_id}: {e}")
-        return False
 
-def run_lightweight_enrichment(limit=100):
-    """Run lightweight enrichment on unenriched jobs"""
+def run_lightweight_enrichment(limit=100, worker_id=None, batch_size=BATCH_SIZE,
+                               concurrency=CONCURRENCY, requests_per_minute=REQUESTS_PER_MINUTE):
+    """
+    Run lightweight enrichment on unenriched jobs
+    
+    Jobs are claimed through EnrichmentQueue, so several runs can work in
+    parallel without enriching (and paying for) the same job twice.
+    
+    Args:
+        limit: Maximum jobs to enrich
+        worker_id: Claim owner (default: host:pid)
+        batch_size: Maximum jobs per prompt (1 = one request per job)
+        concurrency: Prompts in flight at once
+        requests_per_minute: Shared request budget across all threads
+    
+    Returns:
+        Dict with processed/success/failed counts
+    """
+    stats = {'processed': 0, 'success': 0, 'failed': 0}
     api_key = os.getenv('ANTHROPIC_API_KEY')
     db_url = os.getenv('DATABASE_URL')
     
     if not api_key or not db_url:
         logger.error("Missing ANTHROPIC_API_KEY or DATABASE_URL")
-        return
+        return stats
     
-    client = Anthropic(api_key=api_key)
+    client = get_llm_client(api_key)
     conn = psycopg2.connect(db_url)
     
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        queue = EnrichmentQueue(conn, 'lightweight_enrichment', worker_id=worker_id)
+        jobs = [dict(job) for job in queue.claim_batch(limit)]
         
-        # Find jobs without lightweight enrichment
-        cursor.execute("""
-            SELECT id, title, company, location, description 
-            FROM jobs 
-            WHERE (source_type IS NULL OR source_type = '')
-            AND description IS NOT NULL
-            LIMIT %s
-        """, (limit,))
-        
-        jobs = cursor.fetchall()
-        cursor.close()
+        logger.info(f"Claimed {len(jobs)} jobs to enrich (lightweight)")
+        stats['processed'] = len(jobs)
+        if not jobs:
+            return stats
         
-        logger.info(f"Found {len(jobs)} jobs to enrich (lightweight)")
+        start = time.time()
+        planner = BatchPlanner(MODEL, output_tokens_per_item=80, max_items=max(1, batch_size))
+        batches = planner.plan(
+            jobs,
+            lambda job: estimate_tokens(format_job_for_batch(job)),
+            base_input_tokens=estimate_tokens(create_lightweight_batch_prompt([]))
+        )
+        limiter = RateLimiter(requests_per_minute, burst=concurrency)
         
-        success_count = 0
-        failed_count = 0
+        def run_batch(batch):
+            if len(batch) == 1:
+                limiter.acquire()
+                data = enrich_job_lightweight(client, batch[0])
+                return batch, {batch[0]['id']: data} if data else {}
+            return batch, enrich_jobs_lightweight_batch(client, batch, planner, limiter)
         
-        for idx, job in enumerate(jobs, 1):
-            logger.info(f"[{idx}/{len(jobs)}] {job['title']}")
-            
-            data = enrich_job_lightweight(client, dict(job))
-            
-            if data:
-                if update_job_lightweight(conn, job['id'], data):
-                    success_count += 1
-                    logger.info(f"  ✓ Work: {data.get('work_arrangement')}, Type: {data.get('employment_type')}")
-                else:
-                    failed_count += 1
-            else:
-                failed_count += 1
-            
-            # Small delay to avoid rate limits
-            if idx < len(jobs):
-                time.sleep(0.3)
+        # Requests run on worker threads; results are written here, one
+        # bulk UPDATE per batch, so the connection stays single-threaded
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [executor.submit(run_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                batch, results = future.result()
+                updates = list(results.items())
+                written = update_jobs_lightweight(conn, updates)
+                
+                done_ids = {job_id for job_id, _ in updates} if written else set()
+                failed_ids = [job['id'] for job in batch if job['id'] not in done_ids]
+                queue.complete(done_ids)
+                queue.fail(failed_ids, 'extraction failed' if updates else 'no result')
+                
+                stats['success'] += written
+                stats['failed'] += len(batch) - written
+                logger.info(f"  ✓ Batch of {len(batch)}: {written} enriched "
+                            f"({stats['success'] + stats['failed']}/{len(jobs)})")
         
-        logger.info(f"\nCompleted: {success_count} success, {failed_count} failed")
-        logger.info(f"Estimated cost: ${success_count * 0.0003:.2f}")
+        elapsed = time.time() - start
+        logger.info(f"\nCompleted: {stats['success']} success, {stats['failed']} failed "
+                    f"in {elapsed:.1f}s ({len(batches)} requests)")
+        logger.info(f"Estimated cost: ${stats['success'] * 0.0003:.2f}")
+        return stats
         
     finally:
         conn.close()
 
+def run_enrichment_worker(claim=WORKER_CLAIM, poll_seconds=WORKER_POLL_SECONDS, max_passes=None,
+                          run=run_lightweight_enrichment, sleep=time.sleep, **kwargs):
+    """
+    Queue worker: claim and enrich pending jobs until stopped
+
+    Passes run back to back while the queue has work; an empty pass waits
+    poll_seconds before claiming again. Several workers can run at once,
+    EnrichmentQueue keeps them on disjoint jobs.
+
+    Args:
+        claim: Jobs claimed per pass
+        poll_seconds: Wait after a pass that found nothing to do
+        max_passes: Stop after this many passes (None = run forever)
+        run: One claim-and-enrich pass (run_lightweight_enrichment)
+        **kwargs: Passed to run (batch_size, concurrency, ...)
+
+    Returns:
+        Totals of processed/success/failed over all passes
+    """
+    totals = {'processed': 0, 'success': 0, 'failed': 0}
+    passes = 0
+    logger.info(f"Lightweight enrichment worker started ({claim} jobs per pass, poll {poll_seconds:.0f}s)")
+    while max_passes is None or passes < max_passes:
+        passes += 1
+        try:
+            stats = run(limit=claim, **kwargs)
+        except Exception as e:
+            logger.error(f"Enrichment pass failed: {e}")
+            stats = {'processed': 0, 'success': 0, 'failed': 0}
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        if not stats.get('processed'):
+            sleep(poll_seconds)
+    return totals
+
+def drain_enrichment_queue(max_jobs=CRON_MAX_JOBS, claim=WORKER_CLAIM,
+                           run=run_lightweight_enrichment, **kwargs):
+    """
+    Enrich queued jobs until the queue is empty or max_jobs were claimed
+
+    Run by the daily cron, so new jobs are enriched even where no --worker
+    process is deployed.
+
+    Args:
+        max_jobs: Maximum jobs claimed over all passes
+        claim: Jobs claimed per pass
+        run: One claim-and-enrich pass (run_lightweight_enrichment)
+        **kwargs: Passed to run (batch_size, concurrency, ...)
+
+    Returns:
+        Totals of processed/success/failed over all passes
+    """
+    totals = {'processed': 0, 'success': 0, 'failed': 0}
+    while totals['processed'] < max_jobs:
+        stats = run(limit=min(claim, max_jobs - totals['processed']), **kwargs)
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        if not stats.get('processed'):
+            break
+    return totals
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--limit', type=int, default=100, help='Number of jobs to process')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Jobs per prompt (1 = one request per job)')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='Prompts in flight at once')
+    parser.add_argument('--worker', action='store_true', help='Run as a queue worker until stopped')
     args = parser.parse_args()
     
-    run_lightweight_enrichment(limit=args.limit)
+    if args.worker:
+        run_enrichment_worker(batch_size=args.batch_size, concurrency=args.concurrency)
+    else:
+        run_lightweight_enrichment(limit=args.limit, batch_size=args.batch_size, concurrency=args.concurrency)
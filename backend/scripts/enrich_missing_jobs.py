@@ -8,11 +8,13 @@ from datetime import datetime
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
-from anthropic import Anthropic
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from src.database.work_queue import EnrichmentQueue
+from src.utils.llm_gateway import LLMGateway, get_llm_client
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -86,7 +88,7 @@ def parse_llm_response(response_text: str) -> Optional[Dict[str, Any]]:
         logger.debug(f"Raw text: {response_text}")
         return None
 
-def enrich_job_row(client: Anthropic, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def enrich_job_row(client: LLMGateway, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Enrich a single job using Claude"""
     try:
         prompt = create_enrichment_prompt(job)
@@ -95,6 +97,7 @@ def enrich_job_row(client: Anthropic, job: Dict[str, Any]) -> Optional[Dict[str,
             model="claude-3-haiku-20240307", # Using Haiku for speed and availability
             max_tokens=2000,
             temperature=0,
+            operation='job_enrichment',
             messages=[
                 {"role": "user", "content": prompt}
             ]
@@ -157,14 +160,18 @@ def update_job_in_db(conn, job_id: int, data: Dict[str, Any]):
     conn.commit()
     cursor.close()
 
-def enrich_jobs(db_connection=None, limit: int = 50):
+def enrich_jobs(db_connection=None, limit: int = 50, worker_id: Optional[str] = None):
     """
     Main function to enrich missing jobs.
     Can be imported and called by cron script.
     
+    Jobs are claimed through EnrichmentQueue, so parallel workers never
+    enrich the same job.
+    
     Args:
         db_connection: Optional existing DB connection
         limit: Max jobs to process in one run (default 50 to avoid timeouts/rate limits)
+        worker_id: Claim owner (default: host:pid)
     """
     stats = {'processed': 0, 'success': 0, 'failed': 0}
     
@@ -174,7 +181,7 @@ def enrich_jobs(db_connection=None, limit: int = 50):
         logger.error("ANTHROPIC_API_KEY not found")
         return stats
 
-    client = Anthropic(api_key=api_key)
+    client = get_llm_client(api_key)
     
     should_close_conn = False
     if not db_connection:
@@ -186,26 +193,17 @@ def enrich_jobs(db_connection=None, limit: int = 50):
             return stats
 
     try:
-        cursor = db_connection.cursor(cursor_factory=RealDictCursor)
-        
-        # Find candidate jobs
-        # source_type IS NULL or empty string
-        logger.info("Searching for unenriched jobs...")
-        cursor.execute("""
-            SELECT id, title, company, location, description 
-            FROM jobs 
-            WHERE (source_type IS NULL OR source_type = '') 
-            LIMIT %s
-        """, (limit,))
+        queue = EnrichmentQueue(db_connection, 'full_enrichment', worker_id=worker_id)
         
-        jobs = cursor.fetchall()
-        cursor.close()
+        # Claim candidate jobs (source_type IS NULL or empty string)
+        logger.info("Claiming unenriched jobs...")
+        jobs = queue.claim_batch(limit)
         
         if not jobs:
             logger.info("No jobs found needing enrichment.")
             return stats
             
-        logger.info(f"Found {len(jobs)} jobs to enrich.")
+        logger.info(f"Claimed {len(jobs)} jobs to enrich.")
         
         for job in jobs:
             stats['processed'] += 1
@@ -216,13 +214,17 @@ def enrich_jobs(db_connection=None, limit: int = 50):
             if enriched_data:
                 try:
                     update_job_in_db(db_connection, job['id'], enriched_data)
+                    queue.complete([job['id']])
                     stats['success'] += 1
                     logger.info("  -> Success")
                 except Exception as e:
+                    db_connection.rollback()
                     logger.error(f"  -> DB Update Failed: {e}")
+                    queue.fail([job['id']], str(e))
                     stats['failed'] += 1
             else:
                 logger.warning("  -> Extraction Failed")
+                queue.fail([job['id']], 'extraction failed')
                 stats['failed'] += 1
                 
     except Exception as e:
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Export raw_jobs_test to the Parquet raw archive
+
+Copies the raw API responses (raw_data) already stored in Postgres into
+RAW_ARCHIVE_DIR, partitioned by source and the day they were stored, so
+analysis scripts can read them without querying the database.
+
+Usage:
+    python scripts/export_raw_jobs_to_parquet.py
+    python scripts/export_raw_jobs_to_parquet.py --archive-dir data/raw_archive --since 2025-01-01
+"""
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+load_dotenv()
+
+from src.utils.raw_archive import RawArchiveWriter
+
+FETCH_SIZE = 2000
+
+
+def export_raw_jobs(archive_dir: str, since: str = None) -> int:
+    """Stream raw_jobs_test rows into the archive; returns rows exported"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    writer = RawArchiveWriter(archive_dir)
+    exported = 0
+    try:
+        # Named cursor: rows are streamed from the server, not loaded at once
+        with conn.cursor(name='raw_jobs_export') as cursor:
+            cursor.itersize = FETCH_SIZE
+            cursor.execute("""
+                SELECT raw_data, created_at FROM raw_jobs_test
+                WHERE raw_data IS NOT NULL AND (%s::date IS NULL OR created_at >= %s::date)
+                ORDER BY created_at
+            """, (since, since))
+            for raw_data, created_at in cursor:
+                writer.append('activejobs', [raw_data], fetched_at=created_at)
+                exported += 1
+                if exported % 10000 == 0:
+                    print(f"  ✓ {exported} rows exported")
+        writer.close()
+    finally:
+        conn.close()
+    return exported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export raw_jobs_test to Parquet')
+    parser.add_argument('--archive-dir', default=os.getenv('RAW_ARCHIVE_DIR', 'data/raw_archive'))
+    parser.add_argument('--since', help='Only rows stored on or after this date (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    total = export_raw_jobs(args.archive_dir, args.since)
+    print(f"\nDone: {total} raw payloads written to {args.archive_dir}")
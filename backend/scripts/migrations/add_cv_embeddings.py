@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Migration: Persist CV embeddings on cv_profiles
+
+This migration adds:
+1. cv_embedding (BYTEA) - float32 JobBERT embedding of the profile's CV text
+2. cv_embedding_model (TEXT) - model that produced it
+3. cv_embedding_hash (TEXT) - SHA-256 of the CV text it was computed from
+
+Matching reads the stored embedding when model and text hash still match and
+re-encodes otherwise (src/matching/cv_embeddings.py).
+
+Usage:
+    python scripts/migrations/add_cv_embeddings.py              # add columns
+    python scripts/migrations/add_cv_embeddings.py --backfill   # also encode existing profiles
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+
+def run_migration(backfill: bool = False):
+    """Add embedding columns to cv_profiles and optionally encode existing profiles"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        cursor = conn.cursor()
+
+        print("=" * 70)
+        print("🔄 CV EMBEDDINGS MIGRATION")
+        print("=" * 70)
+        print()
+
+        print("📋 Step 1: Adding embedding columns to cv_profiles table...")
+        # Fail fast instead of holding up CV reads behind a queued ACCESS EXCLUSIVE lock
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("""
+            ALTER TABLE cv_profiles
+            ADD COLUMN IF NOT EXISTS cv_embedding BYTEA,
+            ADD COLUMN IF NOT EXISTS cv_embedding_model TEXT,
+            ADD COLUMN IF NOT EXISTS cv_embedding_hash TEXT
+        """)
+        conn.commit()
+        print("   ✅ cv_embedding, cv_embedding_model, cv_embedding_hash added")
+        print()
+
+        if backfill:
+            print("📋 Step 2: Encoding primary CV profiles...")
+            from src.database.postgres_operations import PostgresDatabase
+            from src.database.postgres_cv_operations import PostgresCVManager
+            from src.matching.cv_embeddings import ensure_cv_embeddings
+
+            db = PostgresDatabase(os.getenv('DATABASE_URL'))
+            cv_manager = PostgresCVManager(db.connection_pool)
+            users = cv_manager.get_active_user_profiles()
+            ensure_cv_embeddings(cv_manager, users)
+            print(f"   ✅ {len(users)} profiles checked")
+            print()
+
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(cv_embedding) FROM cv_profiles
+        """)
+        row = cursor.fetchone()
+        print("=" * 70)
+        print("✅ MIGRATION COMPLETE!")
+        print("=" * 70)
+        print(f"   Total profiles: {row[0]}")
+        print(f"   Profiles with embeddings: {row[1]}")
+        print()
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migration failed: {e}")
+        import traceback
+        print(traceback.format_exc())
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration(backfill='--backfill' in sys.argv)
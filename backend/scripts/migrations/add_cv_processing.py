@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Migration: Track background CV ingestion on cvs
+
+This migration adds:
+1. processing_stage (TEXT) - current stage of src/cv/ingestion.py
+2. processing_error (TEXT) - why ingestion failed
+3. processing_updated (TIMESTAMP) - last stage change; stale rows are resumed
+
+Usage:
+    python scripts/migrations/add_cv_processing.py
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+
+def run_migration():
+    """Add processing_stage, processing_error and processing_updated columns"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        cursor = conn.cursor()
+
+        print("🔄 Adding ingestion progress columns to cvs...")
+
+        # Fail fast instead of holding up uploads behind a queued ACCESS EXCLUSIVE lock
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("""
+            ALTER TABLE cvs
+            ADD COLUMN IF NOT EXISTS processing_stage TEXT,
+            ADD COLUMN IF NOT EXISTS processing_error TEXT,
+            ADD COLUMN IF NOT EXISTS processing_updated TIMESTAMP
+        """)
+
+        conn.commit()
+        print("✅ Migration complete!")
+
+        cursor.execute("""
+            SELECT COUNT(*) FROM cvs WHERE status = 'processing'
+        """)
+        print(f"\n📊 CVs in processing: {cursor.fetchone()[0]}")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
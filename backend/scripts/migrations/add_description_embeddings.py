@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration: Add pooled description embeddings to jobs
+
+This migration adds:
+1. embedding_jobbert_description (JSONB) - pooled JobBERT vector of the description chunks
+2. embedding_description_date (TIMESTAMP) - when it was computed
+
+The vectors are filled by scripts/encode_job_descriptions.py and read by
+full-text semantic search (src/matching/description_embeddings.py).
+
+Usage:
+    python scripts/migrations/add_description_embeddings.py
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+
+def run_migration():
+    """Add embedding_jobbert_description and embedding_description_date columns"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        cursor = conn.cursor()
+
+        print("🔄 Adding description embedding columns to jobs...")
+
+        # ADD COLUMN takes an ACCESS EXCLUSIVE lock on jobs: give up rather than
+        # queue behind a long cron query and block every reader behind us
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("""
+            ALTER TABLE jobs
+            ADD COLUMN IF NOT EXISTS embedding_jobbert_description JSONB,
+            ADD COLUMN IF NOT EXISTS embedding_description_date TIMESTAMP
+        """)
+
+        conn.commit()
+        print("✅ Migration complete!")
+
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(embedding_jobbert_description) FROM jobs
+        """)
+        row = cursor.fetchone()
+        print(f"\n📊 Current state:")
+        print(f"   Total jobs: {row[0]}")
+        print(f"   With description embeddings: {row[1]}")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Migration: Add full-text and trigram search indexes to jobs
+
+- search_vector: tsvector over title, key skills and description (German and
+  English configurations), maintained by a trigger, with a GIN index
+- pg_trgm GIN indexes for the ILIKE '%x%' filters of search_jobs_with_filters
+
+Indexes are built CONCURRENTLY, so the jobs table stays writable.
+
+Rerun with --rebuild after the trigger function changed (e.g. key skills
+moved from the 'simple' to the German/English configurations), so existing
+rows are re-indexed too.
+
+Usage:
+    python scripts/migrations/add_job_search_index.py
+    python scripts/migrations/add_job_search_index.py --rebuild
+    python scripts/migrations/add_job_search_index.py --check "python entwickler"
+"""
+import os
+import sys
+import time
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+from src.database.job_search import (
+    SEARCH_VECTOR_SCHEMA_SQL, SEARCH_VECTOR_INDEX_SQL, BACKFILL_SQL, REBUILD_SQL,
+    SUBSTRING_FILTER_COLUMNS
+)
+
+BACKFILL_BATCH = 5000
+
+
+def run_migration(rebuild: bool = False):
+    """
+    Add search_vector (+ trigger, backfill, GIN index) and trigram indexes
+
+    Args:
+        rebuild: Recompute search_vector for every job, not only missing ones
+    """
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    conn.autocommit = True  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+    cursor = conn.cursor()
+    try:
+        print("🔄 Enabling pg_trgm...")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+        print("🔄 Adding search_vector column and trigger...")
+        cursor.execute(SEARCH_VECTOR_SCHEMA_SQL)
+
+        cursor.execute("SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM jobs")
+        low, high = cursor.fetchone()
+        print(f"🔄 Backfilling search_vector for ids {low}..{high}...")
+        updated = 0
+        for start in range(low, high + 1, BACKFILL_BATCH):
+            cursor.execute(REBUILD_SQL if rebuild else BACKFILL_SQL, (start, start + BACKFILL_BATCH))
+            updated += cursor.rowcount
+            print(f"   ✓ {updated} jobs indexed (through id {start + BACKFILL_BATCH - 1})")
+
+        print("🔄 Building GIN index on search_vector...")
+        cursor.execute(SEARCH_VECTOR_INDEX_SQL)
+
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'jobs' AND data_type IN ('text', 'character varying')
+        """)
+        text_columns = {row[0] for row in cursor.fetchall()}
+        for column in SUBSTRING_FILTER_COLUMNS.values():
+            if column not in text_columns:
+                print(f"   ℹ️  Skipping trigram index on {column} (not a text column)")
+                continue
+            print(f"🔄 Building trigram index on {column}...")
+            cursor.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_{column}_trgm
+                ON jobs USING GIN ({column} gin_trgm_ops)
+            """)
+
+        cursor.execute("ANALYZE jobs")
+        print("✅ Migration complete!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def check_search(keyword: str):
+    """Time a keyword search through search_jobs_with_filters"""
+    from src.database.postgres_operations import PostgresDatabase
+
+    db = PostgresDatabase(os.getenv('DATABASE_URL'))
+    start = time.perf_counter()
+    jobs = db.search_jobs_with_filters(keyword=keyword, status=None, limit=20)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n🔎 '{keyword}': {len(jobs)} results in {elapsed_ms:.0f} ms")
+    for job in jobs[:5]:
+        print(f"   {job['search_rank']:.3f}  {job['title']} ({job['company']})")
+    db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add job search indexes')
+    parser.add_argument('--check', metavar='KEYWORD', help='Only time a keyword search')
+    parser.add_argument('--rebuild', action='store_true', help='Re-index every job, not only new ones')
+    args = parser.parse_args()
+
+    if args.check:
+        check_search(args.check)
+    else:
+        run_migration(rebuild=args.rebuild)
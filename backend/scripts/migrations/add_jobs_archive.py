@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration: Add the jobs_archive table for job retention
+
+Creates jobs_archive (same columns as jobs plus archived_date, range-partitioned
+by month on discovered_date) and an index on jobs(discovered_date) for the
+retention cutoff. The jobs index is built CONCURRENTLY, so jobs stays
+writable. Stale jobs are then moved there by scripts/archive_stale_jobs.py,
+which the daily cron also runs (and skips until this migration has run).
+
+Usage:
+    python scripts/migrations/add_jobs_archive.py            # Create table, report stale jobs
+    python scripts/migrations/add_jobs_archive.py --archive  # Also archive stale jobs now
+"""
+import os
+import sys
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def run_migration(archive: bool = False):
+    """Create jobs_archive and optionally run the first archive pass"""
+    from src.database.postgres_operations import PostgresDatabase
+    from src.database.job_archive import JobArchiver
+
+    db = PostgresDatabase(os.getenv('DATABASE_URL'))
+    archiver = JobArchiver(db)
+    try:
+        print("🔄 Creating jobs_archive...")
+        archiver.ensure_schema()
+        print("✅ Migration complete!")
+
+        pending = archiver.archive_stale(dry_run=True)
+        print(f"\n📊 Current state:")
+        print(f"   Retention: {archiver.retention_days} days (cutoff {pending['cutoff'][:10]})")
+        print(f"   Jobs to archive: {pending['archived']}")
+
+        if archive and pending['archived']:
+            print("\n🔄 Archiving stale jobs...")
+            result = archiver.archive_stale()
+            print(f"✅ Archived {result['archived']} jobs into {len(result['partitions'])} partitions")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add the jobs_archive table')
+    parser.add_argument('--archive', action='store_true', help='Archive stale jobs after creating the table')
+    args = parser.parse_args()
+
+    run_migration(archive=args.archive)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Migration: Add materialized match maps to user_job_matches
+
+The job detail page used to rebuild competency/skill match maps on every view.
+These columns store them once, when a match is scored or the CV changes:
+- competency_match_map: {competency: matched}
+- skill_match_map: {skill: matched}
+- match_maps_date: when the maps were computed
+
+Usage:
+    python scripts/migrations/add_match_maps.py             # Add columns
+    python scripts/migrations/add_match_maps.py --backfill  # Add columns and compute maps for scored matches
+"""
+import os
+import sys
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+
+def run_migration():
+    """Add competency_match_map, skill_match_map and match_maps_date columns"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        cursor = conn.cursor()
+
+        print("🔄 Adding match map columns to user_job_matches...")
+
+        # Fail fast instead of holding up matching behind a queued ACCESS EXCLUSIVE lock
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("""
+            ALTER TABLE user_job_matches
+            ADD COLUMN IF NOT EXISTS competency_match_map JSONB,
+            ADD COLUMN IF NOT EXISTS skill_match_map JSONB,
+            ADD COLUMN IF NOT EXISTS match_maps_date TIMESTAMP;
+        """)
+
+        conn.commit()
+        print("✅ Migration complete!")
+
+        cursor.execute("""
+            SELECT COUNT(*) as total,
+                   COUNT(competency_match_map) as with_maps
+            FROM user_job_matches
+            WHERE claude_score IS NOT NULL
+        """)
+        row = cursor.fetchone()
+        print(f"\n📊 Current state:")
+        print(f"   Total Claude-analyzed matches: {row[0]}")
+        print(f"   With materialized maps: {row[1]}")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run_backfill():
+    """Compute match maps for every active user's Claude-scored matches"""
+    from src.database.postgres_operations import PostgresDatabase
+    from src.database.postgres_cv_operations import PostgresCVManager
+    from src.matching.match_maps import materialize_match_maps
+
+    job_db = PostgresDatabase(os.getenv('DATABASE_URL'))
+    cv_manager = PostgresCVManager(job_db.connection_pool)
+
+    users = cv_manager.get_all_active_users()
+    print(f"\n🔄 Backfilling match maps for {len(users)} users...")
+
+    total = 0
+    for user in users:
+        profile = cv_manager.get_primary_profile(user['id'])
+        if not profile:
+            continue
+        count = materialize_match_maps(job_db, user['id'], profile, only_missing=True)
+        total += count
+        print(f"   User {user['id']}: {count} matches")
+
+    print(f"✅ Backfill complete: {total} matches updated")
+    job_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Add materialized match maps to user_job_matches')
+    parser.add_argument('--backfill', action='store_true', help='Compute maps for existing scored matches')
+    args = parser.parse_args()
+
+    run_migration()
+    if args.backfill:
+        run_backfill()
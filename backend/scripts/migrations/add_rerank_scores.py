@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Migration: Add cross-encoder rerank scores to user_job_matches
+
+This migration adds:
+1. rerank_score (INTEGER) - cross-encoder score (0-100) of the match
+2. rerank_date (TIMESTAMP) - when it was computed
+
+The scores are written by matching (src/matching/reranker.py) for every
+candidate it reranks before Claude analysis.
+
+Usage:
+    python scripts/migrations/add_rerank_scores.py
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+
+def run_migration():
+    """Add rerank_score and rerank_date columns"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        cursor = conn.cursor()
+
+        print("🔄 Adding rerank columns to user_job_matches...")
+
+        # Fail fast instead of holding up matching behind a queued ACCESS EXCLUSIVE lock
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("""
+            ALTER TABLE user_job_matches
+            ADD COLUMN IF NOT EXISTS rerank_score INTEGER,
+            ADD COLUMN IF NOT EXISTS rerank_date TIMESTAMP
+        """)
+
+        conn.commit()
+        print("✅ Migration complete!")
+
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(rerank_score) FROM user_job_matches
+        """)
+        row = cursor.fetchone()
+        print(f"\n📊 Current state:")
+        print(f"   Total matches: {row[0]}")
+        print(f"   With rerank scores: {row[1]}")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
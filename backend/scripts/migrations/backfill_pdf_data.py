@@ -2,7 +2,8 @@
 """
 Backfill resume_pdf_data for existing resumes.
 
-Regenerates PDFs from stored resume_html using WeasyPrint and writes the
+Regenerates PDFs from stored resume_html using WeasyPrint (through the
+shared PDF renderer, so identical HTML renders once) and writes the
 bytes directly into the resume_pdf_data column.  Skips resumes that already
 have pdf_data populated.
 
@@ -11,7 +12,6 @@ Usage:
 """
 import os
 import sys
-import io
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
 from dotenv import load_dotenv
@@ -21,7 +21,9 @@ import psycopg2
 
 
 def run_backfill():
-    from weasyprint import HTML
+    from src.resume.pdf_renderer import get_pdf_renderer
+
+    renderer = get_pdf_renderer()
 
     conn = psycopg2.connect(os.getenv('DATABASE_URL'))
     conn.autocommit = False
@@ -44,9 +46,7 @@ def run_backfill():
     done = 0
     for resume_id, html in rows:
         try:
-            buf = io.BytesIO()
-            HTML(string=html).write_pdf(buf)
-            pdf_bytes = buf.getvalue()
+            pdf_bytes = renderer.render(html)
 
             cursor.execute(
                 "UPDATE user_generated_resumes SET resume_pdf_data = %s WHERE id = %s",
@@ -65,6 +65,7 @@ def run_backfill():
 
     cursor.close()
     conn.close()
+    renderer.shutdown()
 
 
 if __name__ == "__main__":
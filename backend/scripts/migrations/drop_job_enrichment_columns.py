@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration: Drop the enrichment_* claim columns from jobs
+
+An interim version of the enrichment work queue kept claim state on jobs
+itself (enrichment_state, enrichment_task, enrichment_claimed_by,
+enrichment_lease_expires, enrichment_attempts, enrichment_error and the
+idx_jobs_enrichment_state index). Claims now live in job_enrichment_claims
+(src/database/work_queue.py), so databases that ran that version only need
+the leftovers removed. Safe to run anywhere: everything is IF EXISTS.
+
+Usage:
+    python scripts/migrations/drop_job_enrichment_columns.py
+"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2
+
+COLUMNS = ['enrichment_state', 'enrichment_task', 'enrichment_claimed_by',
+           'enrichment_lease_expires', 'enrichment_attempts', 'enrichment_error']
+
+
+def run_migration():
+    """Drop idx_jobs_enrichment_state and the enrichment_* columns"""
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    conn.autocommit = True  # DROP INDEX CONCURRENTLY cannot run in a transaction
+    try:
+        cursor = conn.cursor()
+
+        print("🔄 Dropping idx_jobs_enrichment_state...")
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_jobs_enrichment_state")
+
+        print("🔄 Dropping enrichment_* columns from jobs...")
+        # DROP COLUMN only updates the catalog, but needs a brief ACCESS EXCLUSIVE
+        # lock: give up rather than queue behind a long cron query
+        cursor.execute("SET lock_timeout = '5s'")
+        cursor.execute("ALTER TABLE jobs " + ", ".join(f"DROP COLUMN IF EXISTS {c}" for c in COLUMNS))
+        print("✅ Migration complete!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_migration()
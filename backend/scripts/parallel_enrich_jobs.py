@@ -1,6 +1,11 @@
 """
 Parallel Job Enrichment Script
 Runs multiple enrichment workers concurrently for 5-10x speedup.
+
+Workers claim jobs through EnrichmentQueue (FOR UPDATE SKIP LOCKED with a
+lease), so no two workers ever enrich the same job.
+
+Tasks: full_enrichment (default), lightweight_enrichment, competency_backfill
 """
 import os
 import sys
@@ -10,14 +15,27 @@ from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from scripts.enrich_missing_jobs import enrich_jobs
+from scripts.enrich_missing_jobs import enrich_jobs, get_db_connection
+from src.database.work_queue import EnrichmentQueue, default_worker_id
 
 load_dotenv()
 
-def worker(worker_id, batch_size):
-    """Single worker that processes a batch"""
+def run_task(task, limit, worker_id):
+    """Run one claim-and-process pass of an enrichment task"""
+    if task == 'full_enrichment':
+        return enrich_jobs(limit=limit, worker_id=worker_id)
+    if task == 'lightweight_enrichment':
+        from scripts.enrich_lightweight import run_lightweight_enrichment
+        return run_lightweight_enrichment(limit=limit, worker_id=worker_id)
+    if task == 'competency_backfill':
+        from scripts.backfill_job_competencies import backfill_job_competencies
+        return backfill_job_competencies(limit=limit, worker_id=worker_id)
+    raise ValueError(f"Unknown task: {task}")
+
+def worker(worker_id, batch_size, task='full_enrichment'):
+    """Single worker that claims and processes a batch"""
     try:
-        stats = enrich_jobs(limit=batch_size)
+        stats = run_task(task, batch_size, default_worker_id(worker_id))
         return {
             'worker_id': worker_id,
             'success': True,
@@ -31,7 +49,7 @@ def worker(worker_id, batch_size):
             'stats': {'processed': 0, 'success': 0, 'failed': 0}
         }
 
-def run_parallel_enrichment(num_workers=5, batch_size=50, max_batches=None):
+def run_parallel_enrichment(num_workers=5, batch_size=50, max_batches=None, task='full_enrichment'):
     """
     Run enrichment with multiple parallel workers.
     
@@ -39,11 +57,19 @@ def run_parallel_enrichment(num_workers=5, batch_size=50, max_batches=None):
         num_workers: Number of parallel workers (default: 5)
         batch_size: Jobs per worker batch (default: 50)
         max_batches: Maximum rounds to run (None = unlimited)
+        task: Enrichment task to run (see src.database.work_queue.TASKS)
     """
+    # Add the claim columns once, before workers start claiming
+    conn = get_db_connection()
+    try:
+        EnrichmentQueue(conn, task).ensure_schema()
+    finally:
+        conn.close()
     
     print("=" * 60)
     print("🚀 PARALLEL JOB ENRICHMENT")
     print("=" * 60)
+    print(f"Task: {task}")
     print(f"Workers: {num_workers} parallel processes")
     print(f"Batch Size: {batch_size} jobs per worker")
     print(f"Throughput: ~{num_workers * batch_size} jobs per round")
@@ -70,7 +96,7 @@ def run_parallel_enrichment(num_workers=5, batch_size=50, max_batches=None):
             
             # Submit all workers
             futures = {
-                executor.submit(worker, i, batch_size): i 
+                executor.submit(worker, i, batch_size, task): i 
                 for i in range(num_workers)
             }
             
@@ -138,6 +164,9 @@ if __name__ == "__main__":
     parser.add_argument('--workers', type=int, default=5, help='Number of parallel workers (default: 5)')
     parser.add_argument('--batch-size', type=int, default=50, help='Jobs per worker (default: 50)')
     parser.add_argument('--max-batches', type=int, default=None, help='Maximum rounds (default: unlimited)')
+    parser.add_argument('--task', default='full_enrichment',
+                        choices=['full_enrichment', 'lightweight_enrichment', 'competency_backfill'],
+                        help='Enrichment task (default: full_enrichment)')
     
     args = parser.parse_args()
     
@@ -154,5 +183,6 @@ if __name__ == "__main__":
     run_parallel_enrichment(
         num_workers=args.workers,
         batch_size=args.batch_size,
-        max_batches=args.max_batches
+        max_batches=args.max_batches,
+        task=args.task
     )
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Profile a full matching run for one user
+
+Runs run_background_matching under a profiling run and saves it to the
+profile store (PROFILE_DIR), where /admin/profiles lists it. Prints the
+stage timings (spans) and the hottest functions.
+
+Usage:
+    python scripts/profile_matching.py --user-id 4
+    python scripts/profile_matching.py --user-id 4 --mode sample    # long runs, low overhead
+
+Inspect a cProfile run with pstats or snakeviz:
+    python -m pstats data/profiles/<id>.prof
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.matcher import run_background_matching
+from src.utils.profiler import profile_run
+
+
+def print_spans(node, depth=0):
+    attrs = ' '.join(f"{key}={value}" for key, value in node['attrs'].items())
+    print(f"{'  ' * depth}{node['name']:<{40 - 2 * depth}} {node['duration_ms']:>10.1f} ms  {attrs}")
+    for child in node['children']:
+        print_spans(child, depth + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile a full matching run')
+    parser.add_argument('--user-id', type=int, required=True, help='User to run matching for')
+    parser.add_argument('--mode', choices=['cprofile', 'sample'], default='cprofile',
+                        help='cprofile (exact call counts) or sample (stack sampling)')
+    parser.add_argument('--top', type=int, default=15, help='Functions to print')
+    args = parser.parse_args()
+
+    load_dotenv()
+    matching_status = {}
+
+    with profile_run('script', 'matching', mode=args.mode, user_id=args.user_id) as run:
+        run_background_matching(args.user_id, matching_status)
+
+    entry = run.entry
+    print("\n" + "=" * 80)
+    print(f"Profile {entry['id']}: {entry['duration_ms'] / 1000:.1f}s ({entry['mode']})")
+    print(f"Status: {matching_status.get(args.user_id, {}).get('status', 'unknown')}")
+    print("=" * 80)
+    print_spans(entry['spans'])
+
+    print(f"\nTop {args.top} functions:")
+    for row in entry['top'][:args.top]:
+        if entry['mode'] == 'cprofile':
+            print(f"  {row['cumtime_ms']:>10.1f} ms cum {row['tottime_ms']:>10.1f} ms own  {row['function']}")
+        else:
+            print(f"  {row['total_pct']:>5.1f}% total {row['self_pct']:>5.1f}% own  {row['function']}")
+    print(f"\nSaved to the profile store; download it from /admin/profiles ({entry['download']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -93,10 +93,6 @@ class UserQueryLoader:
             print(f"  No duplicate queries found")
             self.stats['query_deduplication_savings'] = 0
 
-        # Get deleted job IDs to skip
-        deleted_ids = self.db.get_deleted_job_ids()
-        print(f"Skipping {len(deleted_ids)} previously deleted jobs\n")
-
         all_jobs = []
         seen_job_ids = set()
 
@@ -110,7 +106,7 @@ class UserQueryLoader:
             jobs = self._execute_combination(combination, date_posted)
 
             # Deduplicate
-            new_jobs = self._deduplicate_jobs(jobs, seen_job_ids, deleted_ids)
+            new_jobs = self._deduplicate_jobs(jobs, seen_job_ids)
             all_jobs.extend(new_jobs)
 
             # Update stats
@@ -221,12 +217,16 @@ class UserQueryLoader:
     def _deduplicate_jobs(
         self,
         jobs: List[Dict],
-        seen_job_ids: Set[str],
-        deleted_ids: Set[str]
+        seen_job_ids: Set[str]
     ) -> List[Dict]:
         """Remove duplicate and deleted jobs"""
         unique_jobs = []
 
+        # Previously deleted jobs among this batch only (one indexed lookup)
+        deleted_ids = self.db.find_deleted_job_ids([
+            job.get('external_id') or job.get('url', '') for job in jobs
+        ])
+
         for job in jobs:
             job_id = job.get('external_id') or job.get('url', '')
 
@@ -0,0 +1,107 @@
+"""
+Token-budget batch planner for multi-job Claude calls
+
+Batch scoring used a fixed 15 jobs per call with max_tokens derived from a
+flat 200 tokens/job guess. Short jobs wasted the output budget, long ones
+overflowed it, and a truncated response failed to parse and dropped the whole
+batch onto the slow one-job-per-call path.
+
+The planner estimates input and output tokens per job and packs consecutive
+jobs into batches that stay under the model's context and output limits.
+Output estimates adapt to what the model actually returned (usage.output_tokens).
+"""
+
+import math
+from typing import Callable, List, Optional, Tuple
+
+# (context window, max output tokens)
+MODEL_LIMITS = {
+    'claude-3-5-haiku-20241022': (200000, 8192),
+    'claude-3-haiku-20240307': (200000, 4096),
+    'claude-3-5-sonnet-20241022': (200000, 8192),
+    'claude-sonnet-4-20250514': (200000, 8192),
+}
+DEFAULT_LIMITS = (200000, 4096)
+
+# Mixed German/English job text averages ~3.5 characters per token
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt text (no tokenizer dependency)"""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def get_model_limits(model: str) -> Tuple[int, int]:
+    """Return (context_tokens, output_tokens) for a model"""
+    return MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+
+
+class BatchPlanner:
+    """
+    Packs items into batches that fit a model's input and output budgets
+
+    Args:
+        model: Model name (looked up in MODEL_LIMITS)
+        output_tokens_per_item: Initial output estimate per item
+        base_output_tokens: Fixed output overhead per call (JSON braces, keys)
+        safety: Fraction of each limit the planner is allowed to fill
+        max_items: Hard cap on items per batch (None = budget only)
+    """
+
+    def __init__(self, model: str, output_tokens_per_item: int,
+                 base_output_tokens: int = 100, safety: float = 0.8,
+                 max_items: Optional[int] = None):
+        self.context_limit, self.output_limit = get_model_limits(model)
+        self.output_tokens_per_item = output_tokens_per_item
+        self.base_output_tokens = base_output_tokens
+        self.safety = safety
+        self.max_items = max_items
+
+    def plan(self, items: list, item_input_tokens: Callable[[object], int],
+             base_input_tokens: int = 0) -> List[list]:
+        """
+        Split items into consecutive batches that fit the token budgets
+
+        Args:
+            items: Items to pack (order is preserved)
+            item_input_tokens: Estimated prompt tokens contributed by one item
+            base_input_tokens: Prompt tokens shared by every call (instructions, profile)
+
+        Returns:
+            List of batches (lists of items)
+        """
+        input_budget = int(self.context_limit * self.safety) - self.output_limit - base_input_tokens
+        output_budget = int(self.output_limit * self.safety) - self.base_output_tokens
+        per_item_output = max(1, int(self.output_tokens_per_item))
+
+        batches = []
+        current = []
+        current_input = 0
+        for item in items:
+            cost = item_input_tokens(item)
+            full = current and (
+                current_input + cost > input_budget
+                or (len(current) + 1) * per_item_output > output_budget
+                or (self.max_items and len(current) >= self.max_items)
+            )
+            if full:
+                batches.append(current)
+                current = []
+                current_input = 0
+            # An oversized item still gets its own batch
+            current.append(item)
+            current_input += cost
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def record_output(self, batch_len: int, output_tokens: int):
+        """Fold observed output usage into the per-item estimate (moving average)"""
+        if batch_len <= 0 or output_tokens <= 0:
+            return
+        observed = max(1, (output_tokens - self.base_output_tokens) / batch_len)
+        self.output_tokens_per_item = 0.7 * self.output_tokens_per_item + 0.3 * observed
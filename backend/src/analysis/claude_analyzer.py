@@ -6,8 +6,10 @@ Uses Anthropic's Claude API to score and analyze job postings
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
-from anthropic import Anthropic
+from typing import Dict, Any, Optional, Callable
+from src.utils.llm_gateway import get_llm_client
+from src.analysis.batch_planner import BatchPlanner, estimate_tokens
+from src.analysis.stream_parser import JobObjectStreamParser
 import time
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,19 @@ class ClaudeJobAnalyzer:
             db: JobDatabase instance for feedback learning (optional)
             user_email: User email for personalized learning
         """
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_llm_client(api_key)
         self.model = model
         self.profile = None
         self.db = db
         self.user_email = user_email
         self.learning_context = None
         
+        # Batch planners: pack jobs by estimated tokens (mappings make scoring output ~450 tokens/job)
+        self.extraction_model = "claude-3-5-haiku-20241022"  # Use newer Haiku with 8192 token limit
+        self.extraction_content_chars = 4000
+        self.extraction_planner = BatchPlanner(self.extraction_model, output_tokens_per_item=150)
+        self.scoring_planner = BatchPlanner(model, output_tokens_per_item=450)
+        
         # Initialize feedback learner if database is provided
         if db:
             from src.analysis.feedback_learner import FeedbackLearner
@@ -153,6 +161,7 @@ class ClaudeJobAnalyzer:
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=1000,
+                operation='job_analysis',
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
@@ -176,20 +185,24 @@ class ClaudeJobAnalyzer:
                 'reasoning': f'Error during analysis: {str(e)}'
             }
     
-    def analyze_batch(self, jobs: list, batch_size: int = 15) -> list:
+    def analyze_batch(self, jobs: list, batch_size: Optional[int] = None,
+                      on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> list:
         """
         Analyze multiple jobs using true batch processing (multiple jobs per API call).
         
         This method:
         1. Extracts competencies for jobs that don't have them (batched)
-        2. Scores all jobs in batches using single API calls
+        2. Packs jobs into token-budgeted batches and scores each with one API call
+        3. Streams each response, merging every job's analysis as soon as it parses
+        4. Re-scores only the jobs a response left out (bisecting if a call fails)
         
         Args:
             jobs: List of job dictionaries
-            batch_size: Number of jobs to process per API call (default: 50)
+            batch_size: Optional cap on jobs per API call (default: token budget only)
+            on_result: Called with each job as soon as its analysis is merged
             
         Returns:
-            List of jobs with analysis added
+            List of jobs with analysis added (same order as input)
         """
         if not self.profile:
             raise ValueError("Profile not set. Call set_profile() or set_profile_from_cv() first.")
@@ -197,80 +210,122 @@ class ClaudeJobAnalyzer:
         if not jobs:
             return []
         
-        all_results = []
-        total_jobs = len(jobs)
+        # Step 1: Extract competencies for jobs missing them
+        jobs_needing_competencies = [j for j in jobs if not j.get('ai_competencies')]
+        if jobs_needing_competencies:
+            print(f"\n🔄 Extracting competencies + skills for {len(jobs_needing_competencies)} jobs...")
+            self._extract_and_merge(jobs_needing_competencies)
         
-        # Process in chunks of batch_size
-        for batch_start in range(0, total_jobs, batch_size):
-            batch_end = min(batch_start + batch_size, total_jobs)
-            batch = jobs[batch_start:batch_end]
-            batch_num = (batch_start // batch_size) + 1
-            total_batches = (total_jobs + batch_size - 1) // batch_size
-            
-            print(f"\n🔄 Processing batch {batch_num}/{total_batches} ({len(batch)} jobs)...")
-            
-            # Step 1: Extract competencies for jobs missing them
-            jobs_needing_competencies = [j for j in batch if not j.get('ai_competencies')]
-            if jobs_needing_competencies:
-                print(f"   Extracting competencies + skills for {len(jobs_needing_competencies)} jobs...")
-                try:
-                    extraction_map = self.extract_competencies_batch(jobs_needing_competencies)
-                    # Merge BOTH competencies and skills back into jobs
-                    for idx, job in enumerate(jobs_needing_competencies):
-                        job_key = f"job_{idx + 1}"
-                        extracted = extraction_map.get(job_key, {"competencies": [], "skills": []})
-                        job['ai_competencies'] = extracted.get('competencies', [])
-                        job['ai_key_skills'] = extracted.get('skills', [])
-
-                        # Normalize against canonical map before scoring/persistence
-                        from analysis.skill_normalizer import normalize_and_deduplicate
-                        job['ai_competencies'] = normalize_and_deduplicate(job['ai_competencies'])
-                        job['ai_key_skills'] = normalize_and_deduplicate(job['ai_key_skills'])
-                except Exception as e:
-                    logger.warning(f"Failed to extract competencies/skills: {e}")
-                    # Continue without competencies
-            
-            # Step 2: Score all jobs in this batch with one API call
-            print(f"   Scoring {len(batch)} jobs...")
+        # Step 2: Pack jobs into batches that fit the context/output budgets
+        self.scoring_planner.max_items = batch_size
+        base_tokens = estimate_tokens(self._create_batch_scoring_prompt([]))
+        batches = self.scoring_planner.plan(
+            jobs,
+            lambda job: estimate_tokens(self._format_job_for_scoring(1, job)),
+            base_input_tokens=base_tokens
+        )
+        
+        def merge(job, analysis):
+            job.update(analysis)
+            if on_result:
+                on_result(job)
+        
+        for batch_num, batch in enumerate(batches, 1):
+            print(f"\n🔄 Scoring batch {batch_num}/{len(batches)} ({len(batch)} jobs)...")
+            self._score_with_bisection(batch, merge)
+        
+        return jobs
+    
+    def _extract_and_merge(self, jobs: list):
+        """Extract competencies/skills in planned batches and merge them into the jobs"""
+        from src.analysis.skill_normalizer import normalize_and_deduplicate
+        
+        base_tokens = estimate_tokens(self._create_batch_extraction_prompt([]))
+        batches = self.extraction_planner.plan(
+            jobs,
+            lambda job: estimate_tokens(self._format_job_for_extraction(1, job)),
+            base_input_tokens=base_tokens
+        )
+        
+        for batch in batches:
             try:
-                batch_analyses = self._score_jobs_batch(batch)
-                
-                # Merge analyses into jobs
-                for job, analysis in zip(batch, batch_analyses):
-                    job.update(analysis)
-                
-                all_results.extend(batch)
+                extraction_map = self.extract_competencies_batch(batch)
+                # Merge BOTH competencies and skills back into jobs
+                for idx, job in enumerate(batch):
+                    job_key = f"job_{idx + 1}"
+                    extracted = extraction_map.get(job_key) or {"competencies": [], "skills": []}
+                    if not isinstance(extracted, dict):
+                        extracted = {"competencies": [], "skills": []}
+                    # Normalize against canonical map before scoring/persistence
+                    job['ai_competencies'] = normalize_and_deduplicate(extracted.get('competencies', []))
+                    job['ai_key_skills'] = normalize_and_deduplicate(extracted.get('skills', []))
             except Exception as e:
-                logger.error(f"Batch scoring failed: {e}")
-                # Fallback to sequential processing for this batch
-                print(f"   ⚠️  Falling back to sequential processing...")
-                for job in batch:
-                    try:
-                        analysis = self.analyze_job(job)
-                        job.update(analysis)
-                        all_results.append(job)
-                    except:
-                        # Add default low-score analysis
-                        job.update({
-                            'match_score': 30,
-                            'priority': 'low',
-                            'key_alignments': [],
-                            'potential_gaps': ['Analysis failed'],
-                            'reasoning': 'Could not analyze this job'
-                        })
-                        all_results.append(job)
-        
-        return all_results
+                logger.warning(f"Failed to extract competencies/skills: {e}")
+                # Continue without competencies
+    
+    def _score_with_bisection(self, jobs: list, on_analysis: Callable[[Dict[str, Any], Dict[str, Any]], None]):
+        """
+        Score a batch, re-scoring whatever the response did not deliver
+        
+        Entries that parsed are kept. Jobs a truncated, interrupted or partly
+        malformed response left out are scored again as a smaller batch; a call that
+        yields nothing usable is split in half. A single job that still fails
+        goes through analyze_job, then a default low-score analysis, so one bad
+        posting costs O(log n) extra calls instead of n sequential calls.
+        
+        Args:
+            jobs: Jobs to score
+            on_analysis: Called with (job, analysis) for every job, as results arrive
+        """
+        try:
+            analyses = self._score_jobs_batch(jobs, on_analysis)
+        except Exception as e:
+            logger.warning(f"Batch of {len(jobs)} failed ({e}), splitting")
+            analyses = None
+        
+        if analyses is not None:
+            missing = [job for job, analysis in zip(jobs, analyses) if analysis is None]
+            if missing:
+                print(f"   ⚠️  Re-scoring {len(missing)}/{len(jobs)} jobs missing from the response...")
+                self._score_with_bisection(missing, on_analysis)
+            return
+        
+        if len(jobs) > 1:
+            mid = len(jobs) // 2
+            print(f"   ⚠️  Retrying as batches of {mid} and {len(jobs) - mid} jobs...")
+            self._score_with_bisection(jobs[:mid], on_analysis)
+            self._score_with_bisection(jobs[mid:], on_analysis)
+            return
+        
+        try:
+            analysis = self.analyze_job(jobs[0])
+            if not analysis.get('reasoning', '').startswith('Error during analysis'):
+                on_analysis(jobs[0], analysis)
+                return
+        except Exception:
+            pass
+        
+        # Add default low-score analysis
+        on_analysis(jobs[0], {
+            'match_score': 30,
+            'priority': 'low',
+            'key_alignments': [],
+            'potential_gaps': ['Analysis failed'],
+            'reasoning': 'Could not analyze this job'
+        })
     
     def extract_competencies_batch(self, jobs: list) -> dict:
         """
         Extract competencies for multiple jobs in a single API call.
         
+        Entries are salvaged from a truncated or partly malformed response;
+        jobs it left out are extracted again in a smaller call.
+        
         Args:
             jobs: List of job dictionaries
             
         Returns:
-            Dictionary mapping job_N -> list of competencies
+            Dictionary mapping job_N -> {"competencies": [...], "skills": [...]}
         """
         if not jobs:
             return {}
@@ -278,33 +333,95 @@ class ClaudeJobAnalyzer:
         prompt = self._create_batch_extraction_prompt(jobs)
         
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-haiku-20241022",  # Use newer Haiku with 8192 token limit
-                max_tokens=4096,  # Safe limit for batch extraction
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}]
+            entries, response = self._stream_job_entries(
+                self.extraction_model, self.extraction_planner.output_limit, prompt,
+                operation='competency_extraction', batch_size=len(jobs)
             )
+            self._record_usage(self.extraction_planner, len(jobs), response)
+            result = self._normalize_extraction(entries, len(jobs))
             
-            return self._parse_batch_extraction(response.content[0].text, len(jobs))
+            # Retry only the jobs the response did not cover
+            missing = [i for i in range(len(jobs)) if f"job_{i + 1}" not in entries]
+            if missing and len(missing) < len(jobs):
+                logger.warning(f"Extraction returned {len(jobs) - len(missing)}/{len(jobs)} jobs, retrying the rest")
+                retried = self.extract_competencies_batch([jobs[i] for i in missing])
+                for n, i in enumerate(missing, 1):
+                    result[f"job_{i + 1}"] = retried.get(f"job_{n}", {"competencies": [], "skills": []})
+            elif missing and len(jobs) > 1 and getattr(response, 'stop_reason', None) == 'max_tokens':
+                mid = len(jobs) // 2
+                logger.warning(f"Extraction for {len(jobs)} jobs hit the output limit, splitting")
+                left = self.extract_competencies_batch(jobs[:mid])
+                right = self.extract_competencies_batch(jobs[mid:])
+                result = dict(left)
+                for i in range(len(jobs) - mid):
+                    result[f"job_{mid + i + 1}"] = right.get(f"job_{i + 1}", {"competencies": [], "skills": []})
+            
+            return result
         except Exception as e:
             logger.error(f"Batch competency extraction failed: {e}")
             # Return empty competencies for all jobs
-            return {f"job_{i+1}": [] for i in range(len(jobs))}
+            return {f"job_{i+1}": {"competencies": [], "skills": []} for i in range(len(jobs))}
     
-    def _create_batch_extraction_prompt(self, jobs: list) -> str:
-        """Create prompt to extract competencies AND key skills from multiple job descriptions"""
-        jobs_section = ""
-        for i, job in enumerate(jobs, 1):
-            # Use responsibilities if available, otherwise use description
-            content = job.get('ai_core_responsibilities', '') or job.get('description', '')[:2000]
-            
-            jobs_section += f"""
-JOB_{i}:
+    def _stream_job_entries(self, model: str, max_tokens: int, prompt: str,
+                            on_entry: Optional[Callable[[str, Any], None]] = None,
+                            operation: Optional[str] = None, batch_size: Optional[int] = None):
+        """
+        Run a batch prompt and parse its job_N entries as they arrive
+        
+        Streams when the client supports it (the LLM gateway does); otherwise the
+        full text is parsed once it returns. Either way every well-formed entry
+        is kept even if the response is truncated or another entry is malformed.
+        
+        Returns:
+            (entries dict keyed job_N, response with usage/stop_reason)
+        """
+        params = dict(model=model, max_tokens=max_tokens, temperature=0,
+                      messages=[{"role": "user", "content": prompt}],
+                      operation=operation, batch_size=batch_size)
+        parser = JobObjectStreamParser()
+        
+        def consume(chunk):
+            for key, value in parser.feed(chunk):
+                if on_entry:
+                    on_entry(key, value)
+        
+        stream_text = getattr(self.client.messages, 'stream_text', None)
+        if stream_text:
+            stream = stream_text(**params)
+            for chunk in stream:
+                consume(chunk)
+            response = stream.response
+        else:
+            response = self.client.messages.create(**params)
+            consume(response.content[0].text)
+        
+        if parser.skipped or getattr(response, 'stop_reason', None) == 'max_tokens':
+            logger.warning(f"Partial batch response: kept {len(parser.entries)} entries, "
+                           f"skipped {len(parser.skipped)}, stop_reason={getattr(response, 'stop_reason', None)}")
+        return parser.entries, response
+    
+    def _record_usage(self, planner: BatchPlanner, batch_len: int, response):
+        """Feed observed output tokens back into a planner's estimate"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            planner.record_output(batch_len, getattr(usage, 'output_tokens', 0) or 0)
+    
+    def _format_job_for_extraction(self, index: int, job: Dict[str, Any]) -> str:
+        """Format one job for the batch extraction prompt"""
+        # Use responsibilities if available, otherwise use description
+        content = job.get('ai_core_responsibilities', '') or (job.get('description', '') or '')[:self.extraction_content_chars]
+        
+        return f"""
+JOB_{index}:
 Title: {job.get('title', 'Unknown')}
 Company: {job.get('company', 'Unknown')}
 Content: {content}
 
 """
+    
+    def _create_batch_extraction_prompt(self, jobs: list) -> str:
+        """Create prompt to extract competencies AND key skills from multiple job descriptions"""
+        jobs_section = "".join(self._format_job_for_extraction(i, job) for i, job in enumerate(jobs, 1))
         
         return f"""Extract competencies AND key skills from the following {len(jobs)} job postings.
 
@@ -330,63 +447,67 @@ OUTPUT FORMAT (JSON):
 Output PURE JSON only, no markdown.
 """
     
-    def _parse_batch_extraction(self, response_text: str, expected_count: int) -> dict:
-        """Parse batch extraction response for both competencies and skills"""
-        try:
-            # Strip markdown if present
-            clean_text = response_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.startswith("```"):
-                clean_text = clean_text[3:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            
-            result = json.loads(clean_text.strip())
-            
-            # Validate and ensure all jobs have both fields
-            for i in range(1, expected_count + 1):
-                job_key = f"job_{i}"
-                if job_key not in result:
-                    result[job_key] = {"competencies": [], "skills": []}
-                elif not isinstance(result[job_key], dict):
-                    result[job_key] = {"competencies": [], "skills": []}
-                else:
-                    # Ensure both fields exist
-                    if 'competencies' not in result[job_key]:
-                        result[job_key]['competencies'] = []
-                    if 'skills' not in result[job_key]:
-                        result[job_key]['skills'] = []
-            
-            return result
-        except Exception as e:
-            logger.error(f"Failed to parse batch extraction: {e}")
-            return {f"job_{i+1}": {"competencies": [], "skills": []} for i in range(expected_count)}
+    def _normalize_extraction(self, entries: dict, expected_count: int) -> dict:
+        """Ensure every job_N has both competencies and skills lists"""
+        result = {}
+        for i in range(1, expected_count + 1):
+            job_key = f"job_{i}"
+            extracted = entries.get(job_key)
+            if not isinstance(extracted, dict):
+                extracted = {}
+            result[job_key] = {
+                'competencies': extracted.get('competencies') or [],
+                'skills': extracted.get('skills') or []
+            }
+        return result
     
-    def _score_jobs_batch(self, jobs: list) -> list:
+    def _score_jobs_batch(self, jobs: list, on_analysis: Optional[Callable] = None) -> list:
         """
-        Score multiple jobs in a single API call.
+        Score multiple jobs in a single streamed API call.
         
         Args:
             jobs: List of job dictionaries (with competencies already extracted)
+            on_analysis: Called with (job, analysis) as soon as each entry parses
             
         Returns:
-            List of analysis dictionaries in same order as jobs
+            List of analysis dictionaries in same order as jobs, None where the
+            response had no usable entry (truncated tail, malformed object or
+            a stream that failed before reaching it)
         """
         prompt = self._create_batch_scoring_prompt(jobs)
+        analyses = [None] * len(jobs)
+        
+        def on_entry(key, value):
+            try:
+                idx = int(key.split('_', 1)[1]) - 1
+            except (IndexError, ValueError):
+                return
+            analysis = self._validate_scoring_entry(value)
+            if 0 <= idx < len(jobs) and analysis is not None and analyses[idx] is None:
+                analyses[idx] = analysis
+                if on_analysis:
+                    on_analysis(jobs[idx], analysis)
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=min(8192, len(jobs) * 200 + 2000),  # Haiku max is 8192
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}]
+            entries, response = self._stream_job_entries(
+                self.model, self.scoring_planner.output_limit, prompt, on_entry,
+                operation='batch_scoring', batch_size=len(jobs)
             )
-            
-            return self._parse_batch_scoring_response(response.content[0].text, len(jobs))
         except Exception as e:
-            logger.error(f"Batch scoring failed: {e}")
-            raise  # Let analyze_batch handle fallback
+            # A stream that fails partway (dropped connection) is handled like
+            # a truncated one: entries already emitted are kept, not re-scored
+            if all(analysis is None for analysis in analyses):
+                raise
+            kept = sum(analysis is not None for analysis in analyses)
+            logger.warning(f"Batch stream failed after {kept}/{len(jobs)} entries: {e}")
+            return analyses
+        
+        if all(analysis is None for analysis in analyses):
+            raise ValueError(f"No parseable entries for {len(jobs)} jobs "
+                             f"(stop_reason={getattr(response, 'stop_reason', None)})")
+        
+        self._record_usage(self.scoring_planner, len(entries), response)
+        return analyses
     
     def _create_batch_scoring_prompt(self, jobs: list) -> str:
         """Create prompt to score multiple jobs in one API call"""
@@ -395,26 +516,7 @@ Output PURE JSON only, no markdown.
         profile_section = self._format_profile_for_batch()
         
         # Format all jobs compactly
-        jobs_section = ""
-        for i, job in enumerate(jobs, 1):
-            ai_key_skills = job.get('ai_key_skills', []) or []
-            ai_competencies = job.get('ai_competencies', []) or []
-            ai_keywords = job.get('ai_keywords', []) or []
-            
-            jobs_section += f"""
----
-JOB_{i}:
-Title: {job.get('title', 'Unknown')}
-Company: {job.get('company', 'Unknown')}
-Location: {job.get('location', '')}
-Skills: {', '.join(ai_key_skills[:12])}
-Competencies: {', '.join(ai_competencies)}
-Experience: {job.get('ai_experience_level', 'Not specified')}
-Work: {job.get('ai_work_arrangement', 'Not specified')}
-Responsibilities: {(job.get('ai_core_responsibilities', '') or '')[:250]}
-Requirements: {(job.get('ai_requirements_summary', '') or '')[:250]}
-
-"""
+        jobs_section = "".join(self._format_job_for_scoring(i, job) for i, job in enumerate(jobs, 1))
         
         return f"""You are an expert career advisor. Score these {len(jobs)} jobs against the candidate's profile.
 
@@ -463,6 +565,26 @@ SCORING GUIDELINES:
 - Use high confidence for direct matches, medium for related, low for weak
 
 Respond with ONLY valid JSON for ALL {len(jobs)} jobs, no additional text.
+"""
+    
+    def _format_job_for_scoring(self, index: int, job: Dict[str, Any]) -> str:
+        """Format one job compactly for the batch scoring prompt"""
+        ai_key_skills = job.get('ai_key_skills', []) or []
+        ai_competencies = job.get('ai_competencies', []) or []
+        
+        return f"""
+---
+JOB_{index}:
+Title: {job.get('title', 'Unknown')}
+Company: {job.get('company', 'Unknown')}
+Location: {job.get('location', '')}
+Skills: {', '.join(ai_key_skills[:12])}
+Competencies: {', '.join(ai_competencies)}
+Experience: {job.get('ai_experience_level', 'Not specified')}
+Work: {job.get('ai_work_arrangement', 'Not specified')}
+Responsibilities: {(job.get('ai_core_responsibilities', '') or '')[:250]}
+Requirements: {(job.get('ai_requirements_summary', '') or '')[:250]}
+
 """
     
     def _format_profile_for_batch(self) -> str:
@@ -488,49 +610,22 @@ CANDIDATE PROFILE:
 - Location: {self.profile.get('location', '')}
 """
     
-    def _parse_batch_scoring_response(self, response_text: str, expected_count: int) -> list:
-        """Parse batch scoring response and return list of analyses"""
+    def _validate_scoring_entry(self, analysis: Any) -> Optional[Dict[str, Any]]:
+        """Check one batch scoring entry and fix its priority; None if unusable"""
+        if not isinstance(analysis, dict) or 'match_score' not in analysis:
+            return None
         try:
-            # Strip markdown
-            clean_text = response_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.startswith("```"):
-                clean_text = clean_text[3:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            
-            result = json.loads(clean_text.strip())
-            
-            # Convert dict to list, maintaining order
-            analyses = []
-            for i in range(1, expected_count + 1):
-                job_key = f"job_{i}"
-                if job_key in result:
-                    analysis = result[job_key]
-                    
-                    # Validate and fix priority if needed
-                    score = analysis.get('match_score', 50)
-                    correct_priority = self._calculate_priority(score)
-                    if analysis.get('priority') != correct_priority:
-                        analysis['priority'] = correct_priority
-                    
-                    analyses.append(analysis)
-                else:
-                    # Missing job - add default
-                    analyses.append({
-                        'match_score': 50,
-                        'priority': 'medium',
-                        'key_alignments': [],
-                        'potential_gaps': ['Analysis incomplete'],
-                        'reasoning': 'Could not analyze this job'
-                    })
-            
-            return analyses
-        except Exception as e:
-            logger.error(f"Failed to parse batch scoring: {e}")
-            logger.debug(f"Response text: {response_text[:500]}")
-            raise
+            score = int(analysis.get('match_score'))
+        except (TypeError, ValueError):
+            return None
+        analysis['match_score'] = score
+        
+        # Validate and fix priority if needed
+        correct_priority = self._calculate_priority(score)
+        if analysis.get('priority') != correct_priority:
+            analysis['priority'] = correct_priority
+        
+        return analysis
     
     def _create_analysis_prompt(self, job: Dict[str, Any]) -> str:
         """Create the enhanced analysis prompt for Claude using rich AI metadata"""
@@ -3,7 +3,8 @@ Cover Letter Generator
 Uses Claude AI to generate personalized cover letters based on CV and job details
 """
 
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
+from src.utils.llm_telemetry import gemini_generate
 from typing import Dict, Optional
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
@@ -59,7 +60,7 @@ class CoverLetterGenerator:
             gemini_api_key: Google Gemini API key (primary, optional)
         """
         # Claude client (fallback)
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_llm_client(api_key)
         self.model = model
 
         # Gemini client (primary)
@@ -123,6 +124,8 @@ class CoverLetterGenerator:
                 response = self.client.messages.create(
                     model=self.model,
                     max_tokens=4000,
+                    cache=False,  # Regenerating should produce a fresh letter
+                    operation='cover_letter',
                     messages=[{
                         "role": "user",
                         "content": prompt
@@ -165,8 +168,10 @@ class CoverLetterGenerator:
         if not self.gemini_model:
             raise ValueError("Gemini not configured")
 
-        response = self.gemini_model.generate_content(
+        response = gemini_generate(
+            self.gemini_model,
             prompt,
+            operation='cover_letter',
             generation_config=genai.GenerationConfig(
                 max_output_tokens=4000,
                 temperature=0.7,
@@ -4,7 +4,8 @@ CV Analyzer - Uses Claude AI to parse CV text into structured profile data
 
 import json
 from typing import Dict, Any, List
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
+from src.utils.llm_telemetry import estimate_call_cost
 
 
 class CVAnalyzer:
@@ -16,7 +17,7 @@ class CVAnalyzer:
             api_key: Anthropic API key
             model: Claude model to use (Sonnet for better structured extraction)
         """
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_llm_client(api_key)
         self.model = model
 
     def analyze_cv(self, cv_text: str, user_email: str) -> Dict[str, Any]:
@@ -39,6 +40,7 @@ class CVAnalyzer:
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=2500,  # Increased for new fields
+                operation='cv_parsing',
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
@@ -53,7 +55,7 @@ class CVAnalyzer:
 
             # Add metadata
             profile['parsing_model'] = self.model
-            profile['parsing_cost'] = self._estimate_cost(cv_text, response_text)
+            profile['parsing_cost'] = self._estimate_cost(cv_text, response_text, getattr(response, 'usage', None))
             profile['full_text'] = cv_text
 
             return profile
@@ -302,28 +304,27 @@ Respond ONLY with valid JSON, no additional text."""
 
         return formatted_projects
 
-    def _estimate_cost(self, input_text: str, output_text: str) -> float:
+    def _estimate_cost(self, input_text: str, output_text: str, usage=None) -> float:
         """
         Estimate Claude API cost for CV parsing
 
         Args:
             input_text: Input text sent to Claude
             output_text: Output received from Claude
+            usage: Response usage metadata (exact token counts, when available)
 
         Returns:
             Estimated cost in USD
         """
-        # Rough token estimation (1 token ≈ 4 characters)
-        input_tokens = len(input_text) / 4
-        output_tokens = len(output_text) / 4
+        if usage is not None and getattr(usage, 'input_tokens', 0):
+            input_tokens = usage.input_tokens
+            output_tokens = usage.output_tokens
+        else:
+            # Rough token estimation (1 token ≈ 4 characters)
+            input_tokens = len(input_text) / 4
+            output_tokens = len(output_text) / 4
 
-        # Haiku pricing (as of Dec 2024)
-        # Input: $0.25 per million tokens
-        # Output: $1.25 per million tokens
-        input_cost = (input_tokens / 1_000_000) * 0.25
-        output_cost = (output_tokens / 1_000_000) * 1.25
-
-        return round(input_cost + output_cost, 4)
+        return round(estimate_call_cost(self.model, input_tokens, output_tokens), 4)
 
     @staticmethod
     def estimate_parsing_cost(text_length: int, model: str = "claude-3-haiku-20240307") -> float:
@@ -341,11 +342,7 @@ Respond ONLY with valid JSON, no additional text."""
         input_tokens = text_length / 4
         output_tokens = 1000  # Expected structured output size (increased for new fields)
 
-        # Haiku pricing
-        input_cost = (input_tokens / 1_000_000) * 0.25
-        output_cost = (output_tokens / 1_000_000) * 1.25
-
-        return round(input_cost + output_cost, 4)
+        return round(estimate_call_cost(model, input_tokens, output_tokens), 4)
 
 
 if __name__ == "__main__":
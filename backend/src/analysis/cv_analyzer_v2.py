@@ -1,7 +1,6 @@
 
 import json
 from typing import Dict, Any
-from anthropic import Anthropic
 from src.analysis.cv_analyzer import CVAnalyzer
 
 class CVAnalyzerV2(CVAnalyzer):
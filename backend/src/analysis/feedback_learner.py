@@ -3,10 +3,13 @@ Feedback Learning System
 Analyzes user feedback to improve job matching over time
 """
 
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Any, Dict
 import json
 
+from src.analysis.learning_profile import (
+    PROFILE_FORMAT, REBUILD_LIMIT, build_profile, cache_key, learning_cache, preferences_from_profile
+)
+
 
 class FeedbackLearner:
     """Learns from user feedback to improve job matching"""
@@ -20,6 +23,48 @@ class FeedbackLearner:
         """
         self.db = db
     
+    def get_profile(self, user_email: str) -> Dict:
+        """
+        User's materialized learning profile (see src.analysis.learning_profile)
+
+        Served from the in-process cache; on a miss read from
+        user_learning_profiles, or rebuilt from feedback history when the
+        database has no stored profile (or one of an older format).
+
+        Returns:
+            Cache entry {'version', 'profile', 'derived'}
+        """
+        key = cache_key(user_email)
+        entry = learning_cache.get(key)
+        if entry is not None:
+            return entry
+
+        stored = None
+        if hasattr(self.db, 'get_learning_profile'):
+            stored = self.db.get_learning_profile(user_email)
+        if stored and stored['profile'].get('format') == PROFILE_FORMAT:
+            version, profile = stored['version'], stored['profile']
+        else:
+            profile = build_profile(self.db.get_user_feedback(user_email, limit=REBUILD_LIMIT))
+            version = None
+            if hasattr(self.db, 'save_learning_profile'):
+                saved = self.db.save_learning_profile(user_email, profile)
+                if saved:
+                    # A concurrent add_feedback may have stored a newer profile
+                    version, profile = saved['version'], saved['profile']
+
+        entry = {'version': version, 'profile': profile, 'derived': {}}
+        learning_cache.set(key, entry)
+        return entry
+
+    def _derived(self, user_email: str, name: str, build) -> Any:
+        """Value computed from the profile once per cached profile version"""
+        entry = self.get_profile(user_email)
+        derived = entry['derived']
+        if name not in derived:
+            derived[name] = build(entry['profile'])
+        return derived[name]
+
     def analyze_user_preferences(self, user_email: str) -> Dict:
         """
         Analyze user's feedback history to extract preferences
@@ -30,148 +75,7 @@ class FeedbackLearner:
         Returns:
             Dictionary with learned preferences
         """
-        feedback_history = self.db.get_user_feedback(user_email, limit=100)
-        
-        if not feedback_history:
-            return {
-                'has_feedback': False,
-                'total_feedback': 0,
-                'preferences_summary': 'No feedback yet'
-            }
-        
-        # Categorize feedback
-        agreed = []
-        disagreed = []
-        too_high_scores = []
-        too_low_scores = []
-        
-        for fb in feedback_history:
-            if fb['feedback_type'] == 'agree':
-                agreed.append(fb)
-            elif fb['feedback_type'] == 'disagree':
-                disagreed.append(fb)
-            elif fb['feedback_type'] == 'too_high':
-                too_high_scores.append(fb)
-            elif fb['feedback_type'] == 'too_low':
-                too_low_scores.append(fb)
-        
-        # Extract patterns from jobs user liked (agreed with high scores)
-        liked_jobs = [fb for fb in agreed if fb['match_score_original'] >= 70]
-        
-        # Extract patterns from jobs user disliked (disagreed or too_high on low scores)
-        disliked_jobs = disagreed + too_high_scores
-        
-        # Analyze patterns
-        preferences = {
-            'has_feedback': True,
-            'total_feedback': len(feedback_history),
-            'agreement_rate': len(agreed) / len(feedback_history) * 100 if feedback_history else 0,
-            'liked_job_examples': self._extract_job_examples(liked_jobs, limit=3),
-            'disliked_job_examples': self._extract_job_examples(disliked_jobs, limit=3),
-            'key_preferences': self._extract_key_preferences(liked_jobs, disliked_jobs),
-            'scoring_calibration': self._analyze_score_calibration(feedback_history)
-        }
-        
-        return preferences
-    
-    def _extract_job_examples(self, feedback_list: List[Dict], limit: int = 3) -> List[Dict]:
-        """Extract job examples from feedback"""
-        examples = []
-        
-        for fb in feedback_list[:limit]:
-            examples.append({
-                'title': fb.get('job_title', 'Unknown'),
-                'company': fb.get('job_company', 'Unknown'),
-                'location': fb.get('job_location', 'Unknown'),
-                'score': fb.get('match_score_original', 0),
-                'alignments': fb.get('key_alignments', []),
-                'gaps': fb.get('potential_gaps', []),
-                'feedback_reason': fb.get('feedback_reason')
-            })
-        
-        return examples
-    
-    def _extract_key_preferences(self, liked: List[Dict], disliked: List[Dict]) -> Dict:
-        """Extract key preferences from liked/disliked jobs"""
-        preferences = {
-            'valued_aspects': [],
-            'dealbreakers': [],
-            'location_preferences': {},
-            'company_types': {}
-        }
-        
-        # Analyze liked jobs for valued aspects
-        if liked:
-            # Extract common keywords from alignments
-            all_alignments = []
-            for fb in liked:
-                if fb.get('key_alignments'):
-                    all_alignments.append(fb['key_alignments'])
-            
-            if all_alignments:
-                preferences['valued_aspects'] = self._find_common_themes(all_alignments)
-        
-        # Analyze disliked jobs for dealbreakers
-        if disliked:
-            all_gaps = []
-            for fb in disliked:
-                if fb.get('potential_gaps'):
-                    all_gaps.append(fb['potential_gaps'])
-                if fb.get('feedback_reason'):
-                    all_gaps.append(fb['feedback_reason'])
-            
-            if all_gaps:
-                preferences['dealbreakers'] = self._find_common_themes(all_gaps)
-        
-        return preferences
-    
-    def _find_common_themes(self, text_list: List[str]) -> List[str]:
-        """Find common themes in a list of text descriptions"""
-        # Simple keyword extraction (could be enhanced with NLP)
-        common_keywords = [
-            'leadership', 'management', 'technical', 'strategy', 'team',
-            'machine learning', 'AI', 'data science', 'python', 'remote',
-            'senior', 'head', 'director', 'automotive', 'startup',
-            'enterprise', 'research', 'production', 'deployment'
-        ]
-        
-        found_themes = []
-        combined_text = ' '.join(text_list).lower()
-        
-        for keyword in common_keywords:
-            if keyword.lower() in combined_text:
-                found_themes.append(keyword)
-        
-        return found_themes[:5]  # Top 5 themes
-    
-    def _analyze_score_calibration(self, feedback_history: List[Dict]) -> Dict:
-        """Analyze if Claude's scores are calibrated with user's expectations"""
-        calibration = {
-            'avg_original_score': 0,
-            'avg_user_score': 0,
-            'score_bias': 0,  # Positive = Claude scores too high, Negative = too low
-            'needs_calibration': False
-        }
-        
-        scores_with_user_input = [
-            fb for fb in feedback_history 
-            if fb.get('match_score_user') is not None
-        ]
-        
-        if not scores_with_user_input:
-            return calibration
-        
-        original_scores = [fb['match_score_original'] for fb in scores_with_user_input]
-        user_scores = [fb['match_score_user'] for fb in scores_with_user_input]
-        
-        calibration['avg_original_score'] = sum(original_scores) / len(original_scores)
-        calibration['avg_user_score'] = sum(user_scores) / len(user_scores)
-        calibration['score_bias'] = calibration['avg_original_score'] - calibration['avg_user_score']
-        
-        # If bias is > 10 points, calibration is needed
-        calibration['needs_calibration'] = abs(calibration['score_bias']) > 10
-        
-        return calibration
+        return self._derived(user_email, 'preferences', preferences_from_profile)
     
     def generate_learning_context(self, user_email: str) -> str:
         """
@@ -184,7 +88,10 @@ class FeedbackLearner:
         Returns:
             Formatted string to include in analysis prompts
         """
-        prefs = self.analyze_user_preferences(user_email)
+        return self._derived(user_email, 'learning_context', self._build_learning_context)
+
+    def _build_learning_context(self, profile: Dict) -> str:
+        prefs = preferences_from_profile(profile)
         
         if not prefs['has_feedback']:
             return ""
@@ -256,7 +163,10 @@ class FeedbackLearner:
         Returns:
             Formatted summary string
         """
-        prefs = self.analyze_user_preferences(user_email)
+        return self._derived(user_email, 'preference_summary', self._build_preference_summary)
+
+    def _build_preference_summary(self, profile: Dict) -> str:
+        prefs = preferences_from_profile(profile)
         
         if not prefs['has_feedback']:
             return "No feedback collected yet. Start rating job matches to help the system learn your preferences!"
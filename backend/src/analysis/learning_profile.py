@@ -0,0 +1,189 @@
+"""
+Materialized per-user learning profile
+
+FeedbackLearner used to re-read the last 100 feedback rows (a three-way
+join) and re-extract themes on every ClaudeJobAnalyzer construction and
+every /dashboard and /learning-insights view. The aggregates it needs are
+now folded into one profile per user, updated incrementally when feedback
+is written:
+
+    profile = apply_feedback(profile, feedback_row)    # in add_feedback
+    profile = build_profile(history)                   # seed / rebuild
+
+PostgreSQL keeps the profile in user_learning_profiles (profile JSONB plus a
+version bumped on every change), updated in the same transaction as the
+job_feedback insert. Readers cache {'version', 'profile'} in-process in
+learning_cache; add_feedback drops the entry in the writing process and
+other processes pick up the new version after LEARNING_PROFILE_TTL.
+Strings derived from a profile (prompt context, summary) are memoized on
+the cache entry, so they are built once per version.
+
+Environment variables:
+    LEARNING_PROFILE_TTL   seconds a cached profile is trusted (default: 60)
+"""
+
+import os
+from typing import Any, Dict, Iterable, List
+
+from src.utils.stats_cache import TTLCache
+
+# Bump when the profile layout changes; stored profiles of another format are rebuilt
+PROFILE_FORMAT = 1
+
+# Feedback rows read when (re)building a profile from history
+REBUILD_LIMIT = 1000
+
+# Liked / disliked job examples kept (newest first)
+EXAMPLES_KEPT = 3
+
+# Themes reported as valued aspects / dealbreakers
+THEMES_REPORTED = 5
+
+# Simple keyword extraction (could be enhanced with NLP)
+THEME_KEYWORDS = [
+    'leadership', 'management', 'technical', 'strategy', 'team',
+    'machine learning', 'AI', 'data science', 'python', 'remote',
+    'senior', 'head', 'director', 'automotive', 'startup',
+    'enterprise', 'research', 'production', 'deployment'
+]
+
+FEEDBACK_TYPES = ('agree', 'disagree', 'too_high', 'too_low')
+
+learning_cache = TTLCache(ttl=float(os.getenv('LEARNING_PROFILE_TTL', '60')))
+
+
+def cache_key(user_email: str) -> tuple:
+    return ('learning_profile', user_email)
+
+
+def empty_profile() -> Dict[str, Any]:
+    return {
+        'format': PROFILE_FORMAT,
+        'total_feedback': 0,
+        'counts': {feedback_type: 0 for feedback_type in FEEDBACK_TYPES},
+        'liked_examples': [],
+        'disliked_examples': [],
+        'valued_themes': {},
+        'dealbreaker_themes': {},
+        'scored_feedback': 0,
+        'sum_original_score': 0,
+        'sum_user_score': 0,
+    }
+
+
+def _as_text(value: Any) -> str:
+    """key_alignments / potential_gaps arrive as JSON text or lists"""
+    if not value:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return str(value)
+
+
+def _themes(text: str) -> List[str]:
+    text = text.lower()
+    return [keyword for keyword in THEME_KEYWORDS if keyword.lower() in text]
+
+
+def _example(feedback: Dict) -> Dict:
+    return {
+        'title': feedback.get('title') or feedback.get('job_title') or 'Unknown',
+        'company': feedback.get('company') or feedback.get('job_company') or 'Unknown',
+        'location': feedback.get('location') or feedback.get('job_location') or 'Unknown',
+        'score': feedback.get('match_score_original') or 0,
+        'alignments': feedback.get('key_alignments') or [],
+        'gaps': feedback.get('potential_gaps') or [],
+        'feedback_reason': feedback.get('feedback_reason')
+    }
+
+
+def apply_feedback(profile: Dict[str, Any], feedback: Dict) -> Dict[str, Any]:
+    """
+    Fold one feedback row (job_feedback joined with the job and match) into a profile
+
+    Args:
+        profile: Profile to update in place (from empty_profile / build_profile)
+        feedback: Row with feedback_type, match_score_original, match_score_user,
+            feedback_reason, title, company, location, key_alignments, potential_gaps
+
+    Returns:
+        The updated profile
+    """
+    feedback_type = feedback.get('feedback_type')
+    original_score = feedback.get('match_score_original') or 0
+
+    profile['total_feedback'] += 1
+    if feedback_type in profile['counts']:
+        profile['counts'][feedback_type] += 1
+
+    # Liked: agreed with a high score. Disliked: disagreed or scored too high.
+    if feedback_type == 'agree' and original_score >= 70:
+        profile['liked_examples'] = ([_example(feedback)] + profile['liked_examples'])[:EXAMPLES_KEPT]
+        for theme in _themes(_as_text(feedback.get('key_alignments'))):
+            profile['valued_themes'][theme] = profile['valued_themes'].get(theme, 0) + 1
+    elif feedback_type in ('disagree', 'too_high'):
+        profile['disliked_examples'] = ([_example(feedback)] + profile['disliked_examples'])[:EXAMPLES_KEPT]
+        text = f"{_as_text(feedback.get('potential_gaps'))} {feedback.get('feedback_reason') or ''}"
+        for theme in _themes(text):
+            profile['dealbreaker_themes'][theme] = profile['dealbreaker_themes'].get(theme, 0) + 1
+
+    if feedback.get('match_score_user') is not None:
+        profile['scored_feedback'] += 1
+        profile['sum_original_score'] += original_score
+        profile['sum_user_score'] += feedback['match_score_user']
+
+    return profile
+
+
+def build_profile(history: Iterable[Dict]) -> Dict[str, Any]:
+    """Profile from a feedback history ordered newest first (as get_user_feedback returns it)"""
+    profile = empty_profile()
+    for feedback in reversed(list(history)):
+        apply_feedback(profile, feedback)
+    return profile
+
+
+def _top_themes(counts: Dict[str, int]) -> List[str]:
+    ranked = sorted(counts, key=lambda theme: (-counts[theme], THEME_KEYWORDS.index(theme)
+                                               if theme in THEME_KEYWORDS else len(THEME_KEYWORDS)))
+    return ranked[:THEMES_REPORTED]
+
+
+def preferences_from_profile(profile: Dict[str, Any]) -> Dict:
+    """The FeedbackLearner.analyze_user_preferences dict for a profile"""
+    total = profile['total_feedback']
+    if not total:
+        return {
+            'has_feedback': False,
+            'total_feedback': 0,
+            'preferences_summary': 'No feedback yet'
+        }
+
+    calibration = {
+        'avg_original_score': 0,
+        'avg_user_score': 0,
+        'score_bias': 0,  # Positive = Claude scores too high, Negative = too low
+        'needs_calibration': False
+    }
+    scored = profile['scored_feedback']
+    if scored:
+        calibration['avg_original_score'] = profile['sum_original_score'] / scored
+        calibration['avg_user_score'] = profile['sum_user_score'] / scored
+        calibration['score_bias'] = calibration['avg_original_score'] - calibration['avg_user_score']
+        # If bias is > 10 points, calibration is needed
+        calibration['needs_calibration'] = abs(calibration['score_bias']) > 10
+
+    return {
+        'has_feedback': True,
+        'total_feedback': total,
+        'agreement_rate': profile['counts'].get('agree', 0) / total * 100,
+        'liked_job_examples': profile['liked_examples'],
+        'disliked_job_examples': profile['disliked_examples'],
+        'key_preferences': {
+            'valued_aspects': _top_themes(profile['valued_themes']),
+            'dealbreakers': _top_themes(profile['dealbreaker_themes']),
+            'location_preferences': {},
+            'company_types': {}
+        },
+        'scoring_calibration': calibration
+    }
@@ -3,7 +3,8 @@ Project Formatter
 Converts casual project descriptions into professional structured bullet points
 """
 
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
+from src.utils.llm_telemetry import gemini_generate
 from typing import Dict, Optional
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
@@ -24,7 +25,7 @@ class ProjectFormatter:
             gemini_api_key: Google Gemini API key (primary, optional)
         """
         # Claude client (fallback)
-        self.client = Anthropic(api_key=anthropic_api_key)
+        self.client = get_llm_client(anthropic_api_key)
         self.model = "claude-3-5-haiku-20241022"
 
         # Gemini client (primary)
@@ -66,6 +67,8 @@ class ProjectFormatter:
                 response = self.client.messages.create(
                     model=self.model,
                     max_tokens=500,
+                    cache=False,  # Re-formatting should offer a new variant
+                    operation='project_format',
                     messages=[{
                         "role": "user",
                         "content": prompt
@@ -105,8 +108,10 @@ class ProjectFormatter:
         # gemini-2.5-flash thinking tokens count against max_output_tokens.
         # Thinking alone typically uses 1000-1500 tokens, so the budget must
         # be high enough to cover both thinking and visible output.
-        response = self.gemini_model.generate_content(
+        response = gemini_generate(
+            self.gemini_model,
             prompt,
+            operation='project_format',
             generation_config=genai.GenerationConfig(
                 max_output_tokens=8192,
                 temperature=0.7,
@@ -4,7 +4,7 @@ Uses Claude AI to suggest relevant job search parameters based on user's CV
 """
 
 import json
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
 from typing import Dict, List
 
 
@@ -19,7 +19,7 @@ class SearchSuggester:
             api_key: Anthropic API key
             model: Claude model to use
         """
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_llm_client(api_key)
         self.model = model
     
     def suggest_search_parameters(self, cv_profile: Dict) -> Dict[str, List[str]]:
@@ -80,6 +80,7 @@ Return your response as a JSON object with this structure:
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=2000,
+                operation='search_suggestions',
                 messages=[{
                     "role": "user",
                     "content": prompt
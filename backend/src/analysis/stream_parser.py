@@ -0,0 +1,99 @@
+"""
+Incremental parser for batched "job_N" JSON responses
+
+Batch prompts ask Claude for one JSON object keyed job_1..job_N. Parsing the
+whole text with json.loads meant nothing was usable until the last token
+arrived, and one malformed entry or a truncated tail discarded every job in
+the batch.
+
+JobObjectStreamParser scans text as it streams in and emits each top-level
+entry as soon as its closing brace arrives. Malformed entries are skipped
+individually, and whatever closed before a truncation is kept.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JobObjectStreamParser:
+    """
+    Emits (key, value) for each completed top-level object in a JSON stream
+
+    Leading text such as a ```json fence is ignored until the first '{'.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+        self.skipped: List[str] = []
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk of response text
+
+        Returns:
+            List of (key, value) entries completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+        buf = self._buffer
+
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._last_key = buf[self._string_start + 1:self._pos]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in '{[':
+                if self._depth == 1 and self._last_key is not None:
+                    self._value_start = self._pos
+                self._depth += 1
+            elif ch in '}]':
+                self._depth = max(0, self._depth - 1)
+                if self._depth == 1 and self._value_start is not None:
+                    entry = self._emit(buf[self._value_start:self._pos + 1])
+                    if entry:
+                        completed.append(entry)
+                    self._last_key = None
+                    self._value_start = None
+
+            self._pos += 1
+
+        return completed
+
+    def _emit(self, text: str):
+        key = self._last_key
+        try:
+            value = json.loads(text)
+        except ValueError as e:
+            logger.warning(f"Skipping malformed entry {key}: {e}")
+            self.skipped.append(key)
+            return None
+        self.entries[key] = value
+        return key, value
+
+
+def parse_job_entries(text: str) -> Dict[str, Any]:
+    """Salvage every well-formed top-level entry from a complete or truncated response"""
+    parser = JobObjectStreamParser()
+    parser.feed(text)
+    return parser.entries
@@ -9,6 +9,7 @@ import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from .source_filter import SourceFilter
+from src.utils.raw_archive import archive_raw_payloads
 
 
 class ActiveJobsCollector:
@@ -126,6 +127,7 @@ class ActiveJobsCollector:
                     print(f"  No more results on page {page_num + 1}")
                     break
                 
+                archive_raw_payloads('activejobs', jobs_data)
                 for job in jobs_data:
                     all_jobs.append(self._parse_job(job))
                 
@@ -316,6 +318,7 @@ class ActiveJobsCollector:
                 if jobs_remaining:
                     print(f"Active Jobs DB: {jobs_remaining} jobs remaining this month")
                 
+                archive_raw_payloads('activejobs', jobs_data)
                 for job in jobs_data:
                     all_jobs.append(self._parse_job(job))
                 
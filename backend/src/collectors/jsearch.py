@@ -9,6 +9,7 @@ import logging
 from typing import List, Dict, Optional
 from datetime import datetime
 from .source_filter import SourceFilter
+from src.utils.raw_archive import archive_raw_payloads
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +106,7 @@ class JSearchCollector:
             
             jobs = []
             if data.get("status") == "OK" and data.get("data"):
+                archive_raw_payloads('jsearch', data["data"])
                 for job in data["data"]:
                     parsed_job = self._parse_job(job)
 
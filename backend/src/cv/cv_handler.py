@@ -5,12 +5,13 @@ CV Handler - Orchestrates complete CV upload and management workflow
 import os
 import shutil
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import re
 
 from src.database.cv_operations import CVManager
 from src.parsers.cv_parser import CVParser
 from src.analysis.cv_analyzer import CVAnalyzer
+from src.matching.cv_embeddings import refresh_cv_embedding
 
 
 class CVHandler:
@@ -36,7 +37,10 @@ class CVHandler:
     def upload_cv(self, user_email: str, file_path: str,
                   set_as_primary: bool = True) -> Dict[str, Any]:
         """
-        Complete CV upload workflow
+        Complete CV upload workflow (store, then process in this thread)
+
+        The web app stores the file with store_cv() and runs process_cv()
+        in the background through src.cv.ingestion instead.
 
         Args:
             user_email: User's email
@@ -53,6 +57,25 @@ class CVHandler:
                 'parsing_cost': float
             }
         """
+        stored = self.store_cv(user_email, file_path)
+        if not stored['success']:
+            return stored
+
+        return self.process_cv(stored['cv_id'], set_as_primary=set_as_primary,
+                               background_embedding=True)
+
+    def store_cv(self, user_email: str, file_path: str) -> Dict[str, Any]:
+        """
+        Validate a CV file, copy it into storage and add its row (status 'processing')
+
+        Args:
+            user_email: User's email
+            file_path: Path to CV file to upload
+
+        Returns:
+            {'success': True, 'cv_id': int, 'user_id': int, 'message': str}
+            or {'success': False, 'message': str, ...}
+        """
         try:
             # Step 1: Validate file
             is_valid, error_msg = self.parser.validate_cv_file(file_path)
@@ -103,39 +126,7 @@ class CVHandler:
             # Calculate relative path for database
             rel_path = os.path.relpath(dest_path)
 
-            # Step 6: Extract text
-            print(f"Extracting text from {file_info['file_name']}...")
-            text, extraction_status = self.parser.extract_text(dest_path)
-
-            if extraction_status == 'failed':
-                # Mark CV but don't fail upload
-                cv_id = self.cv_manager.add_cv(
-                    user_id=user_id,
-                    file_name=new_filename,
-                    file_path=rel_path,
-                    file_type=file_info['file_type'],
-                    file_size=file_info['file_size'],
-                    file_hash=file_hash,
-                    version=version
-                )
-                self.cv_manager.update_cv_status(cv_id, 'failed_parsing')
-
-                return {
-                    'success': False,
-                    'cv_id': cv_id,
-                    'message': 'CV uploaded but text extraction failed'
-                }
-
-            # Save extracted text
-            text_filename = f"{base_name}_{date_str}_v{version}_extracted.txt"
-            text_path = os.path.join(user_dir, text_filename)
-            self.parser.save_extracted_text(text, text_path)
-
-            # Step 7: Parse with Claude
-            print(f"Analyzing CV with Claude AI...")
-            profile_data = self.analyzer.analyze_cv(text, user_email)
-
-            # Step 8: Store in database
+            # Step 6: Store in database; the CV stays hidden until processing finishes
             cv_id = self.cv_manager.add_cv(
                 user_id=user_id,
                 file_name=new_filename,
@@ -143,28 +134,116 @@ class CVHandler:
                 file_type=file_info['file_type'],
                 file_size=file_info['file_size'],
                 file_hash=file_hash,
-                version=version
+                version=version,
+                status='processing'
             )
 
             if not cv_id:
+                os.remove(dest_path)
                 return {
                     'success': False,
                     'message': 'Failed to store CV in database'
                 }
 
+            return {
+                'success': True,
+                'cv_id': cv_id,
+                'user_id': user_id,
+                'message': 'CV stored'
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error during upload: {str(e)}'
+            }
+
+    def process_cv(self, cv_id: int, set_as_primary: bool = True,
+                   on_stage: Optional[Callable[[str], None]] = None,
+                   background_embedding: bool = False) -> Dict[str, Any]:
+        """
+        Ingestion stages for a stored CV: text extraction, Claude parsing,
+        embedding and search query generation
+
+        An identical file parsed before (by any user) reuses that parse and
+        skips extraction and Claude.
+
+        Args:
+            cv_id: CV ID returned by store_cv()
+            set_as_primary: Whether to set as primary CV
+            on_stage: Called with each stage name as it starts
+            background_embedding: Compute the CV embedding in a daemon thread
+
+        Returns:
+            Same result dictionary as upload_cv()
+        """
+        def stage(name):
+            if on_stage:
+                on_stage(name)
+
+        try:
+            cv = self.cv_manager.get_cv(cv_id)
+            if not cv:
+                return {'success': False, 'cv_id': cv_id, 'message': 'CV not found'}
+
+            user = self.cv_manager.get_user_by_id(cv['user_id'])
+            if not user:
+                return {'success': False, 'cv_id': cv_id, 'message': 'User not found'}
+
+            # Step 1: Extract text (or reuse the parse of an identical file)
+            stage('extracting')
+            profile_data = None
+            if cv.get('file_hash') and hasattr(self.cv_manager, 'get_cached_parse'):
+                profile_data = self.cv_manager.get_cached_parse(cv['file_hash'], exclude_cv_id=cv_id)
+
+            if profile_data:
+                print(f"Reusing stored parse of identical CV file {cv['file_hash'][:12]}...")
+                profile_data['parsing_cost'] = 0.0
+                extraction_status = 'cached'
+            else:
+                print(f"Extracting text from {cv['file_name']}...")
+                text, extraction_status = self.parser.extract_text(cv['file_path'])
+
+                if extraction_status == 'failed':
+                    # Mark CV but don't fail upload
+                    self.cv_manager.update_cv_status(cv_id, 'failed_parsing')
+                    return {
+                        'success': False,
+                        'cv_id': cv_id,
+                        'message': 'CV uploaded but text extraction failed'
+                    }
+
+                # Save extracted text next to the file
+                text_path = f"{os.path.splitext(cv['file_path'])[0]}_extracted.txt"
+                self.parser.save_extracted_text(text, text_path)
+
+                # Step 2: Parse with Claude
+                stage('parsing')
+                print(f"Analyzing CV with Claude AI...")
+                profile_data = self.analyzer.analyze_cv(text, user['email'])
+
             # Store profile
             profile_id = self.cv_manager.add_cv_profile(
                 cv_id=cv_id,
-                user_id=user_id,
+                user_id=user['id'],
                 profile_data=profile_data
             )
+            if not profile_id:
+                self.cv_manager.update_cv_status(cv_id, 'failed_parsing')
+                return {'success': False, 'cv_id': cv_id, 'message': 'Failed to store CV profile'}
 
-            # Step 9: Set as primary if requested
+            # Step 3: Precompute the CV embedding used by job matching
+            stage('embedding')
+            refresh_cv_embedding(self.cv_manager, cv_id, background=background_embedding)
+
+            # The CV is complete: make it visible, then primary if requested
+            self.cv_manager.update_cv_status(cv_id, 'active')
             if set_as_primary:
-                self.cv_manager.set_primary_cv(user_id, cv_id)
+                self.cv_manager.set_primary_cv(user['id'], cv_id)
 
-            # Step 10: Auto-generate search preferences if user has none
-            self._auto_generate_search_preferences(user_id, profile_data, user_email)
+            # Step 4: Auto-generate search preferences if user has none
+            stage('search_queries')
+            self._auto_generate_search_preferences(user['id'], profile_data, user['email'])
 
             return {
                 'success': True,
@@ -177,8 +256,10 @@ class CVHandler:
             }
 
         except Exception as e:
+            self.cv_manager.update_cv_status(cv_id, 'failed_parsing')
             return {
                 'success': False,
+                'cv_id': cv_id,
                 'message': f'Error during upload: {str(e)}'
             }
 
@@ -341,6 +422,7 @@ class CVHandler:
 
             # Update profile
             self.cv_manager.update_cv_profile(cv_id, profile_data)
+            refresh_cv_embedding(self.cv_manager, cv_id)
 
             # Update CV status to active
             self.cv_manager.update_cv_status(cv_id, 'active')
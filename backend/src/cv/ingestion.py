@@ -0,0 +1,180 @@
+"""
+Asynchronous CV ingestion
+
+/upload used to extract text, parse with Claude, embed and generate search
+queries inside the request. Now the request only stores the file and its
+cvs row (status 'processing') and hands the CV to this pipeline:
+
+    stored = handler.store_cv(email, temp_path)
+    cv_ingestion.submit(stored['cv_id'], stored['user_id'], set_as_primary=True)
+
+The stages of CVHandler.process_cv (extracting -> parsing -> embedding ->
+search_queries) run on a small thread pool. Each stage is recorded on the
+cvs row (processing_stage / processing_error, added by
+scripts/migrations/add_cv_processing.py) when the manager supports it,
+kept in memory for the status endpoint, and published as a 'cv_ingestion'
+event on the user's progress channel. Identical files reuse a stored parse,
+so re-uploads skip Claude entirely.
+
+CVs left in 'processing' by a restart are picked up by resume_pending(), which
+start_resume_loop() runs at startup and then periodically, so a CV interrupted
+seconds before a deploy is resumed once its last stage update goes stale.
+
+Environment variables:
+    CV_INGEST_WORKERS          concurrent ingestions per process (default: 2)
+    CV_INGEST_RESUME_SECONDS   seconds between resume passes (default: 300)
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from src.utils.llm_telemetry import set_llm_user
+from src.utils.progress_bus import ProgressBus, progress_bus
+from src.utils.profiler import background_profile
+
+logger = logging.getLogger(__name__)
+
+# Statuses reported once processing has finished
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CVIngestionPipeline:
+    """Runs CVHandler.process_cv in the background and tracks its stages"""
+
+    def __init__(self, handler, max_workers: Optional[int] = None, bus: ProgressBus = progress_bus,
+                 on_complete: Optional[Callable[[int, int, Dict], None]] = None):
+        """
+        Args:
+            handler: CVHandler (store_cv / process_cv)
+            max_workers: Concurrent ingestions (default: CV_INGEST_WORKERS)
+            bus: Progress bus for 'cv_ingestion' events
+            on_complete: Called with (user_id, cv_id, result) after each CV
+        """
+        self.handler = handler
+        self.bus = bus
+        self.on_complete = on_complete
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('CV_INGEST_WORKERS', '2')),
+            thread_name_prefix='cv-ingest'
+        )
+        self._status: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._resume_thread: Optional[threading.Thread] = None
+
+    def submit(self, cv_id: int, user_id: int, set_as_primary: bool = True) -> Future:
+        """Queue a stored CV for processing"""
+        self._record(cv_id, user_id, 'queued')
+        return self._executor.submit(self._run, cv_id, user_id, set_as_primary)
+
+    def status(self, cv_id: int) -> Optional[Dict]:
+        """
+        Processing status of a CV
+
+        Returns:
+            {'cv_id', 'user_id', 'stage', 'error', 'updated'} (stage 'done' / 'failed' when
+            finished), or None for unknown CVs
+        """
+        with self._lock:
+            status = self._status.get(cv_id)
+            if status:
+                return dict(status)
+
+        # Not processed by this worker: fall back to the cvs row
+        cv = self.handler.cv_manager.get_cv(cv_id)
+        if not cv:
+            return None
+        if cv.get('status') == 'processing':
+            stage = cv.get('processing_stage') or 'queued'
+        else:
+            stage = FAILED if cv.get('status') == 'failed_parsing' else DONE
+        return {'cv_id': cv_id, 'user_id': cv['user_id'], 'stage': stage,
+                'error': cv.get('processing_error'), 'updated': None}
+
+    def resume_pending(self, stale_minutes: int = 15) -> int:
+        """Resubmit CVs left in 'processing' by a restart; returns how many"""
+        cv_manager = self.handler.cv_manager
+        if not hasattr(cv_manager, 'claim_stale_ingestions'):
+            return 0
+
+        pending = cv_manager.claim_stale_ingestions(stale_minutes)
+        for cv in pending:
+            # The upload's primary choice isn't stored: resumed CVs become primary only for users without one
+            set_as_primary = cv_manager.get_primary_cv(cv['user_id']) is None
+            self.submit(cv['id'], cv['user_id'], set_as_primary=set_as_primary)
+        if pending:
+            logger.info(f"Resumed {len(pending)} interrupted CV ingestions")
+        return len(pending)
+
+    def start_resume_loop(self, interval: Optional[float] = None) -> None:
+        """Run resume_pending now and then every interval seconds (default: CV_INGEST_RESUME_SECONDS)"""
+        if self._resume_thread is not None:
+            return
+        interval = interval or float(os.getenv('CV_INGEST_RESUME_SECONDS', '300'))
+
+        def run():
+            while True:
+                try:
+                    self.resume_pending()
+                except Exception as e:
+                    logger.warning(f"Resuming interrupted CV ingestions failed: {e}")
+                if self._stopped.wait(interval):
+                    return
+
+        self._resume_thread = threading.Thread(target=run, daemon=True, name='cv-ingest-resume')
+        self._resume_thread.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stopped.set()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, cv_id: int, user_id: int, set_as_primary: bool) -> Dict:
+        # Attribute this thread's Claude calls to the user in llm_calls
+        set_llm_user(user_id)
+        # PROFILE_BACKGROUND=cv_ingestion saves a profile of each CV (src.utils.profiler)
+        with background_profile('cv_ingestion', cv_id=cv_id, user_id=user_id):
+            return self._ingest(cv_id, user_id, set_as_primary)
+
+    def _ingest(self, cv_id: int, user_id: int, set_as_primary: bool) -> Dict:
+        start = time.time()
+        try:
+            result = self.handler.process_cv(
+                cv_id,
+                set_as_primary=set_as_primary,
+                on_stage=lambda stage: self._record(cv_id, user_id, stage)
+            )
+        except Exception as e:
+            result = {'success': False, 'cv_id': cv_id, 'message': f'Error during upload: {str(e)}'}
+
+        if result.get('success'):
+            self._record(cv_id, user_id, DONE, result=result)
+            logger.info(f"CV {cv_id} ingested in {time.time() - start:.1f}s")
+        else:
+            self._record(cv_id, user_id, FAILED, error=result.get('message'))
+            logger.warning(f"CV {cv_id} ingestion failed: {result.get('message')}")
+
+        if self.on_complete:
+            try:
+                self.on_complete(user_id, cv_id, result)
+            except Exception as e:
+                logger.warning(f"CV ingestion completion hook failed for CV {cv_id}: {e}")
+        return result
+
+    def _record(self, cv_id: int, user_id: int, stage: str, error: Optional[str] = None,
+                result: Optional[Dict] = None) -> None:
+        event = {'cv_id': cv_id, 'stage': stage, 'error': error, 'updated': time.time()}
+        if result:
+            event['parsing_cost'] = result.get('parsing_cost', 0.0)
+            event['is_primary'] = result.get('is_primary', False)
+        with self._lock:
+            self._status[cv_id] = {**event, 'user_id': user_id}
+
+        cv_manager = self.handler.cv_manager
+        if hasattr(cv_manager, 'update_cv_processing'):
+            cv_manager.update_cv_processing(cv_id, stage, error)
+        self.bus.publish(user_id, 'cv_ingestion', **event)
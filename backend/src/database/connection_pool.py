@@ -0,0 +1,246 @@
+"""
+Thread-safe PostgreSQL connection pool
+
+PostgresDatabase used psycopg2's SimpleConnectionPool, which is not
+thread-safe, and shared it with PostgresCVManager, PostgresResumeOperations,
+Flask request threads, the background matching thread and fetch workers.
+When all connections were out, getconn() raised PoolError immediately and
+the request failed with a 500.
+
+ConnectionPool wraps ThreadedConnectionPool with:
+  - bounded, blocking checkout with a timeout (PoolTimeout after waiting)
+  - a context-manager API:  with pool.connection() as conn: ...
+  - validation of connections that sat idle (dropped server connections)
+  - per-checkout wait/hold timing (pool.stats())
+  - leak detection: connections held longer than leak_threshold are logged
+    with the stack that checked them out
+
+getconn()/putconn()/closeall() keep psycopg2's pool interface, so existing
+callers work unchanged.
+
+Configuration (environment, read by PostgresDatabase):
+    DB_POOL_MAX            max connections (default: 10)
+    DB_POOL_TIMEOUT        seconds to wait for a free connection (default: 30)
+    DB_POOL_LEAK_SECONDS   hold time reported as a leak (default: 300)
+"""
+
+import time
+import logging
+import threading
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import psycopg2
+from psycopg2 import pool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(pool.PoolError):
+    """No connection became available within the checkout timeout"""
+    pass
+
+
+class ConnectionPool:
+    """Blocking, instrumented wrapper around psycopg2's ThreadedConnectionPool"""
+
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10,
+                 checkout_timeout: float = 30.0, validate_after: float = 60.0,
+                 leak_threshold: float = 300.0, track_stacks: bool = True):
+        """
+        Args:
+            dsn: PostgreSQL connection string
+            minconn: Connections opened up front
+            maxconn: Upper bound on open connections
+            checkout_timeout: Seconds getconn() waits before raising PoolTimeout
+            validate_after: Idle seconds after which a connection is pinged before reuse
+            leak_threshold: Hold time (seconds) after which a checkout is reported as leaked
+            track_stacks: Record the checkout stack for leak reports
+        """
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.validate_after = validate_after
+        self.leak_threshold = leak_threshold
+        self.track_stacks = track_stacks
+
+        self._pool = pool.ThreadedConnectionPool(minconn, maxconn, dsn=dsn)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._checked_out: Dict[int, Dict[str, Any]] = {}
+        self._last_returned: Dict[int, float] = {}
+        self._reported_leaks = set()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._invalidated = 0
+        self._wait_times = deque(maxlen=1000)
+        self._hold_times = deque(maxlen=1000)
+
+    def getconn(self, key=None, timeout: Optional[float] = None):
+        """
+        Check out a connection, waiting up to timeout seconds for a free one
+
+        Raises:
+            PoolTimeout: If every connection stays checked out for the whole timeout
+        """
+        start = time.monotonic()
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._timeouts += 1
+            self.check_leaks(threshold=0)
+            raise PoolTimeout(
+                f"No database connection available after {timeout:.0f}s "
+                f"({self.maxconn} in use)"
+            )
+
+        try:
+            conn = self._validated(self._pool.getconn())
+        except Exception:
+            self._slots.release()
+            raise
+
+        now = time.monotonic()
+        with self._lock:
+            self._checkouts += 1
+            self._wait_times.append(now - start)
+            self._checked_out[id(conn)] = {
+                'since': now,
+                'thread': threading.current_thread().name,
+                'stack': ''.join(traceback.format_stack(limit=8)[:-1]) if self.track_stacks else None
+            }
+            check = self._checkouts % 100 == 0
+        if check:
+            self.check_leaks()
+        return conn
+
+    def putconn(self, conn, key=None, close: bool = False):
+        """Return a connection (rolled back if a transaction was left open)"""
+        with self._lock:
+            info = self._checked_out.pop(id(conn), None)
+            if info is not None:
+                self._hold_times.append(time.monotonic() - info['since'])
+                self._last_returned[id(conn)] = time.monotonic()
+                self._reported_leaks.discard(id(conn))
+
+        if info is None:
+            logger.warning("Returning a connection that was not checked out from this pool")
+            self._pool.putconn(conn, close=close or conn.closed)
+            return
+
+        try:
+            self._pool.putconn(conn, close=close or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Check out a connection for the duration of a with block
+
+        An exception inside the block rolls back the open transaction before
+        the connection goes back to the pool.
+        """
+        conn = self.getconn(timeout=timeout)
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    def _validated(self, conn):
+        """Ping a connection that has been idle for a while; replace it if dead"""
+        idle_since = self._last_returned.get(id(conn))
+        stale = conn.closed or (
+            idle_since is not None and time.monotonic() - idle_since > self.validate_after
+        )
+        if not stale:
+            return conn
+
+        if not conn.closed:
+            try:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                finally:
+                    cursor.close()
+                conn.rollback()
+                return conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                logger.warning(f"Discarding dead pooled connection: {e}")
+
+        with self._lock:
+            self._invalidated += 1
+            self._last_returned.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+        return self._pool.getconn()
+
+    def check_leaks(self, threshold: Optional[float] = None) -> list:
+        """
+        Log connections held longer than threshold seconds (default: leak_threshold)
+
+        Returns:
+            List of dicts with held_seconds, thread and stack for each suspect
+        """
+        threshold = self.leak_threshold if threshold is None else threshold
+        now = time.monotonic()
+        suspects = []
+        with self._lock:
+            for conn_id, info in self._checked_out.items():
+                held = now - info['since']
+                if held >= threshold:
+                    suspects.append({'conn_id': conn_id, 'held_seconds': round(held, 1),
+                                     'thread': info['thread'], 'stack': info['stack']})
+
+        for suspect in suspects:
+            # Report each long-held connection once (timeouts always report)
+            if threshold and suspect['conn_id'] in self._reported_leaks:
+                continue
+            self._reported_leaks.add(suspect['conn_id'])
+            logger.warning(
+                f"Connection held for {suspect['held_seconds']}s by thread {suspect['thread']}"
+                + (f"\nChecked out at:\n{suspect['stack']}" if suspect['stack'] else '')
+            )
+        return suspects
+
+    def stats(self) -> Dict[str, Any]:
+        """Checkout metrics for monitoring (wait/hold times in milliseconds)"""
+        def percentile(values, pct):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 1)
+
+        with self._lock:
+            waits = list(self._wait_times)
+            holds = list(self._hold_times)
+            return {
+                'max_connections': self.maxconn,
+                'in_use': len(self._checked_out),
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'invalidated': self._invalidated,
+                'wait_p50_ms': percentile(waits, 0.5),
+                'wait_p95_ms': percentile(waits, 0.95),
+                'hold_p50_ms': percentile(holds, 0.5),
+                'hold_p95_ms': percentile(holds, 0.95),
+                'longest_held_s': round(max(
+                    (time.monotonic() - info['since'] for info in self._checked_out.values()),
+                    default=0.0
+                ), 1)
+            }
+
+    def closeall(self):
+        self._pool.closeall()
+
+    @property
+    def closed(self) -> bool:
+        return self._pool.closed
@@ -542,7 +542,7 @@ class CVManager:
 
     def add_cv(self, user_id: int, file_name: str, file_path: str,
                file_type: str, file_size: int, file_hash: str,
-               version: int = 1) -> Optional[int]:
+               version: int = 1, status: str = 'active') -> Optional[int]:
         """
         Add a new CV to the database
 
@@ -554,6 +554,7 @@ class CVManager:
             file_size: Size in bytes
             file_hash: SHA-256 hash
             version: CV version number
+            status: Initial status ('processing' while src.cv.ingestion runs)
 
         Returns:
             CV ID if successful
@@ -567,10 +568,10 @@ class CVManager:
                 INSERT INTO cvs (
                     user_id, file_name, file_path, file_type, file_size,
                     file_hash, uploaded_date, version, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active')
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 user_id, file_name, file_path, file_type, file_size,
-                file_hash, now, version
+                file_hash, now, version, status
             ))
 
             conn.commit()
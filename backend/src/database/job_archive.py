@@ -0,0 +1,314 @@
+"""
+Retention for the jobs table
+
+The jobs table only grew, and every match run, semantic search and stats
+refresh paid for postings that expired months ago. Stale jobs are now moved
+to jobs_archive, which is range-partitioned by month on discovered_date:
+
+    archiver = JobArchiver(db, retention_days=90)
+    archiver.archive_stale()            # move stale jobs, batch by batch
+    archiver.drop_partitions(24)        # forget archive months older than 2 years
+
+jobs itself stays a plain table: user_job_matches, applications, job_feedback
+and user_generated_resumes reference jobs(id), and add_job relies on global
+UNIQUE job_id/external_id, neither of which a partitioned jobs table could keep.
+So jobs is the active set and every existing query reads only it; archived
+rows are opt-in (PostgresDatabase.get_job_by_id(..., include_archived=True)).
+
+A job is kept regardless of age while it is shortlisted/applied to, has an
+application, feedback or a generated resume. user_job_matches has no foreign
+key to jobs, so the move deletes the job's remaining (unprotected) match
+rows in the same statement.
+
+Archived external ids stay known: add_job won't re-insert a posting that is
+in jobs_archive, and get_known_job_ids/job_exists report it, so collectors
+don't bring archived (or user-deleted) postings back as new jobs.
+
+jobs_archive and the jobs(discovered_date) index are created by
+scripts/migrations/add_jobs_archive.py, not on startup; until then
+archive_exists() is False and the lookups above only read jobs.
+
+Environment variables:
+    JOB_RETENTION_DAYS         days after discovery before a job is archived (default: 90)
+    JOB_ARCHIVE_KEEP_MONTHS    archive months kept by drop_partitions (default: keep all)
+"""
+
+import os
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS jobs_archive (
+        LIKE jobs,
+        archived_date TIMESTAMP NOT NULL DEFAULT NOW()
+    ) PARTITION BY RANGE (discovered_date)
+"""
+
+ARCHIVE_INDEX_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_jobs_archive_id ON jobs_archive(id)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_archive_external_id ON jobs_archive(external_id)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_archive_job_id ON jobs_archive(job_id)",
+]
+
+# Retention cutoff lookups; built without blocking writes to jobs
+DISCOVERED_DATE_INDEX_SQL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_discovered_date
+    ON jobs(discovered_date)
+"""
+
+# Tables whose rows keep a job active: (table, extra condition)
+PROTECTING_REFERENCES = [
+    ('user_job_matches', "r.status IN ('shortlisted', 'applying', 'applied')"),
+    ('applications', None),
+    ('job_feedback', None),
+    ('user_generated_resumes', None),
+]
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"jobs_archive_{month.year}_{month.month:02d}"
+
+
+# Set once jobs_archive is found; until then every call checks, so the
+# migration takes effect without a restart
+_archive_found = False
+
+
+def archive_exists(cursor) -> bool:
+    """Whether jobs_archive has been created (plain or RealDictCursor)"""
+    global _archive_found
+    if not _archive_found:
+        cursor.execute("SELECT to_regclass('jobs_archive') IS NOT NULL AS found")
+        row = cursor.fetchone()
+        _archive_found = bool(row['found'] if isinstance(row, dict) else row[0])
+    return _archive_found
+
+
+class JobArchiver:
+    """Moves stale jobs into monthly jobs_archive partitions"""
+
+    def __init__(self, db, retention_days: Optional[int] = None, batch_size: int = 1000):
+        """
+        Args:
+            db: PostgresDatabase
+            retention_days: Days after discovery before a job is archived
+            batch_size: Jobs moved per transaction
+        """
+        self.db = db
+        self.retention_days = retention_days or int(os.getenv('JOB_RETENTION_DAYS', '90'))
+        self.batch_size = batch_size
+
+    def ensure_schema(self):
+        """Create jobs_archive and its indexes (run by scripts/migrations/add_jobs_archive.py)"""
+        with self.db._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(ARCHIVE_SCHEMA_SQL)
+            for sql in ARCHIVE_INDEX_SQL:
+                cursor.execute(sql)
+            conn.commit()
+
+        with self.db._connection() as conn:
+            conn.autocommit = True  # CREATE INDEX CONCURRENTLY cannot run in a transaction
+            try:
+                with conn.cursor() as cursor:
+                    # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+                    cursor.execute("""
+                        SELECT NOT indisvalid FROM pg_index
+                        WHERE indexrelid = to_regclass('idx_jobs_discovered_date')
+                    """)
+                    row = cursor.fetchone()
+                    if row and row[0]:
+                        cursor.execute("DROP INDEX CONCURRENTLY idx_jobs_discovered_date")
+                    cursor.execute(DISCOVERED_DATE_INDEX_SQL)
+            finally:
+                conn.autocommit = False
+
+    def has_schema(self) -> bool:
+        """Whether ensure_schema has run in this database"""
+        with self.db._connection() as conn, conn.cursor() as cursor:
+            return archive_exists(cursor)
+
+    def cutoff(self) -> datetime:
+        return datetime.now() - timedelta(days=self.retention_days)
+
+    def archive_stale(self, dry_run: bool = False, max_batches: Optional[int] = None) -> Dict:
+        """
+        Move jobs discovered before the retention cutoff into jobs_archive
+
+        Each batch is one DELETE ... RETURNING / INSERT statement, so a job is
+        either in jobs or in jobs_archive, never both or neither.
+
+        Args:
+            dry_run: Only count the jobs that would be archived
+            max_batches: Stop after this many batches (default: until none are left)
+
+        Returns:
+            Dict with archived/batches counts, the partitions written to and
+            orphaned_matches (match rows without a job, deleted)
+        """
+        cutoff = self.cutoff()
+        stats = {'cutoff': cutoff.isoformat(), 'archived': 0, 'batches': 0, 'partitions': []}
+
+        with self.db._connection() as conn, conn.cursor() as cursor:
+            keep = self._protected_predicate(cursor)
+            clear_matches = self._clear_matches_cte(cursor)
+            if dry_run:
+                cursor.execute(f"""
+                    SELECT COUNT(*) FROM jobs j
+                    WHERE j.discovered_date < %s AND {keep}
+                """, (cutoff,))
+                stats['archived'] = cursor.fetchone()[0]
+                return stats
+
+            stats['partitions'] = self.ensure_partitions(cursor, cutoff)
+            columns = self.sync_columns(cursor)
+            conn.commit()
+
+            column_list = ', '.join(columns)
+            while max_batches is None or stats['batches'] < max_batches:
+                cursor.execute(f"""
+                    WITH stale AS (
+                        SELECT j.id FROM jobs j
+                        WHERE j.discovered_date < %(cutoff)s AND {keep}
+                        ORDER BY j.discovered_date
+                        LIMIT %(n)s
+                        FOR UPDATE SKIP LOCKED
+                    ){clear_matches}, moved AS (
+                        DELETE FROM jobs j USING stale
+                        WHERE j.id = stale.id
+                        RETURNING j.*
+                    )
+                    INSERT INTO jobs_archive ({column_list})
+                    SELECT {column_list} FROM moved
+                """, {'cutoff': cutoff, 'n': self.batch_size})
+                moved = cursor.rowcount
+                conn.commit()
+                if moved <= 0:
+                    break
+                stats['archived'] += moved
+                stats['batches'] += 1
+                logger.info(f"Archived {stats['archived']} jobs discovered before {cutoff:%Y-%m-%d}")
+
+            if clear_matches:
+                # Match rows orphaned by moves that didn't clear them yet
+                cursor.execute("""
+                    DELETE FROM user_job_matches m
+                    WHERE NOT EXISTS (SELECT 1 FROM jobs j WHERE j.id = m.job_id)
+                """)
+                stats['orphaned_matches'] = cursor.rowcount
+                conn.commit()
+
+        return stats
+
+    def ensure_partitions(self, cursor, cutoff: datetime) -> List[str]:
+        """Create the archive partitions for every month with stale jobs"""
+        cursor.execute("""
+            SELECT DISTINCT date_trunc('month', discovered_date)::date
+            FROM jobs WHERE discovered_date < %s
+        """, (cutoff,))
+        months = sorted(row[0] for row in cursor.fetchall())
+
+        for month in months:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {partition_name(month)}
+                PARTITION OF jobs_archive
+                FOR VALUES FROM (%s) TO (%s)
+            """, (month, _next_month(month)))
+        return [partition_name(month) for month in months]
+
+    def sync_columns(self, cursor) -> List[str]:
+        """
+        Add columns that jobs gained since jobs_archive was created
+
+        Returns:
+            jobs column names, in table order
+        """
+        cursor.execute("""
+            SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+            FROM pg_attribute a
+            WHERE a.attrelid = 'jobs'::regclass AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attnum
+        """)
+        job_columns = cursor.fetchall()
+        cursor.execute("""
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = 'jobs_archive'::regclass AND attnum > 0 AND NOT attisdropped
+        """)
+        archived = {row[0] for row in cursor.fetchall()}
+
+        for name, sql_type in job_columns:
+            if name not in archived:
+                cursor.execute(f'ALTER TABLE jobs_archive ADD COLUMN IF NOT EXISTS "{name}" {sql_type}')
+        return [f'"{name}"' for name, _ in job_columns]
+
+    def drop_partitions(self, keep_months: Optional[int] = None) -> List[str]:
+        """
+        Drop archive partitions whose whole month is older than keep_months
+
+        Returns:
+            Names of the dropped partitions
+        """
+        if keep_months is None:
+            keep_months = os.getenv('JOB_ARCHIVE_KEEP_MONTHS')
+            if not keep_months:
+                return []
+            keep_months = int(keep_months)
+
+        oldest_kept = _month_start(date.today())
+        for _ in range(keep_months):
+            oldest_kept = _month_start(oldest_kept - timedelta(days=1))
+
+        dropped = []
+        with self.db._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'jobs_archive'::regclass
+            """)
+            for (name,) in cursor.fetchall():
+                try:
+                    year, month = name.rsplit('_', 2)[-2:]
+                    start = date(int(year), int(month), 1)
+                except ValueError:
+                    continue
+                if _next_month(start) <= oldest_kept:
+                    cursor.execute(f"DROP TABLE IF EXISTS {name}")
+                    dropped.append(name)
+            conn.commit()
+
+        if dropped:
+            logger.info(f"Dropped archive partitions: {', '.join(dropped)}")
+        return dropped
+
+    @staticmethod
+    def _clear_matches_cte(cursor) -> str:
+        """CTE deleting the stale jobs' user_job_matches rows (none are protected by then)"""
+        cursor.execute("SELECT to_regclass(%s)", ('user_job_matches',))
+        if cursor.fetchone()[0] is None:
+            return ""
+        return """, cleared AS (
+                        DELETE FROM user_job_matches m USING stale
+                        WHERE m.job_id = stale.id
+                    )"""
+
+    @staticmethod
+    def _protected_predicate(cursor) -> str:
+        """NOT EXISTS clauses for every protecting table present in this database"""
+        clauses = []
+        for table, condition in PROTECTING_REFERENCES:
+            cursor.execute("SELECT to_regclass(%s)", (table,))
+            if cursor.fetchone()[0] is None:
+                continue
+            extra = f" AND {condition}" if condition else ""
+            clauses.append(f"NOT EXISTS (SELECT 1 FROM {table} r WHERE r.job_id = j.id{extra})")
+        return ' AND '.join(clauses) or 'TRUE'
@@ -0,0 +1,187 @@
+"""
+Keyword and filter search over jobs
+
+search_jobs_with_filters/search_jobs_with_or_filters used to run one ILIKE
+query per filter group and merge the results in Python. Every group is now
+a clause of a single query:
+
+    WHERE status = 'new' AND ((group 1) OR (group 2) ...)
+    ORDER BY ts_rank(search_vector, keywords) DESC, match_score DESC, discovered_date DESC
+
+Keywords match jobs.search_vector, a tsvector over title (weight A), key
+skills (B) and description (C), each parsed with both the German and the
+English configuration so "Entwickler" and "developers" both stem. A
+trigger keeps it current; a GIN index serves @@. The substring filters
+(location, ai_* fields) keep their ILIKE semantics and are served by
+pg_trgm GIN indexes.
+
+The schema is created by scripts/migrations/add_job_search_index.py; until
+then keyword search falls back to an unindexed to_tsvector() over title and
+description. search_vector is only for matching: queries list the jobs
+columns without it (select_columns) instead of SELECT *, so result rows
+don't carry a multi-KB tsvector.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configurations every document and query is parsed with
+TEXT_SEARCH_CONFIGS = ('german', 'english')
+
+# Columns used only inside queries, never returned with a job
+SEARCH_ONLY_COLUMNS = frozenset({'search_vector'})
+
+# Descriptions beyond this many characters are not indexed (tsvector size limit)
+MAX_DESCRIPTION_CHARS = 20000
+
+SEARCH_VECTOR_SCHEMA_SQL = f"""
+    ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+    CREATE OR REPLACE FUNCTION jobs_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('german', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('german', coalesce(NEW.ai_key_skills::text, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.ai_key_skills::text, '')), 'B') ||
+            setweight(to_tsvector('german', left(coalesce(NEW.description, ''), {MAX_DESCRIPTION_CHARS})), 'C') ||
+            setweight(to_tsvector('english', left(coalesce(NEW.description, ''), {MAX_DESCRIPTION_CHARS})), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS jobs_search_vector_trigger ON jobs;
+    CREATE TRIGGER jobs_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, ai_key_skills ON jobs
+    FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update();
+"""
+
+# Recomputes search_vector through the trigger, one id range at a time
+BACKFILL_SQL = """
+    UPDATE jobs SET title = title
+    WHERE id >= %s AND id < %s AND search_vector IS NULL
+"""
+
+# Same, for every row (after the trigger function changed)
+REBUILD_SQL = """
+    UPDATE jobs SET title = title
+    WHERE id >= %s AND id < %s
+"""
+
+SEARCH_VECTOR_INDEX_SQL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_search_vector
+    ON jobs USING GIN (search_vector)
+"""
+
+# Columns filtered with ILIKE '%x%' (trigram indexes are only built for text columns)
+SUBSTRING_FILTER_COLUMNS = {
+    'location': 'location',
+    'work_arrangement': 'ai_work_arrangement',
+    'employment_type': 'ai_employment_type',
+    'seniority': 'ai_seniority',
+    'industry': 'ai_industry',
+}
+
+# Used when search_vector has not been migrated yet
+FALLBACK_DOCUMENT = (
+    "to_tsvector('german', coalesce(title, '') || ' ' || coalesce(description, '')) || "
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
+
+def select_columns(columns, alias: Optional[str] = None) -> str:
+    """SELECT list for a jobs row: every column except SEARCH_ONLY_COLUMNS"""
+    prefix = f"{alias}." if alias else ""
+    return ', '.join(f'{prefix}"{column}"' for column in columns if column not in SEARCH_ONLY_COLUMNS)
+
+
+def keyword_query_sql(count: int = 1) -> str:
+    """tsquery SQL for count keyword parameters, each parsed in every configuration"""
+    parts = [f"websearch_to_tsquery('{config}', %s)"
+             for _ in range(count) for config in TEXT_SEARCH_CONFIGS]
+    return '(' + ' || '.join(parts) + ')'
+
+
+def build_filter_group(filters: Dict[str, Any], document: str) -> Tuple[str, List[Any]]:
+    """
+    WHERE clause for one filter group
+
+    Args:
+        filters: location, work_arrangement, employment_type, seniority,
+                 industry, min_score, keyword, exclude_location
+        document: tsvector SQL to match keywords against
+
+    Returns:
+        (clause, params); clause is 'TRUE' for an empty group
+    """
+    conditions = []
+    params: List[Any] = []
+
+    location = filters.get('location')
+    if location:
+        if filters.get('exclude_location'):
+            conditions.append("(location NOT ILIKE %s OR location IS NULL)")
+        else:
+            conditions.append("location ILIKE %s")
+        params.append(f'%{location}%')
+
+    for key, column in SUBSTRING_FILTER_COLUMNS.items():
+        if key != 'location' and filters.get(key):
+            conditions.append(f"{column} ILIKE %s")
+            params.append(f'%{filters[key]}%')
+
+    if filters.get('min_score') is not None:
+        conditions.append("match_score >= %s")
+        params.append(filters['min_score'])
+
+    keyword = filters.get('keyword')
+    if keyword:
+        conditions.append(f"{document} @@ {keyword_query_sql()}")
+        params.extend([keyword] * len(TEXT_SEARCH_CONFIGS))
+
+    return (' AND '.join(conditions) or 'TRUE'), params
+
+
+def build_search_query(filter_groups: List[Dict[str, Any]], status: Optional[str],
+                       limit: int, document: str = 'search_vector',
+                       columns: str = '*') -> Tuple[str, List[Any]]:
+    """
+    One query returning jobs that match any filter group
+
+    Results are ranked by ts_rank against all groups' keywords (when any),
+    then by match_score and discovery date.
+
+    Args:
+        columns: SELECT list for the job rows (see select_columns)
+
+    Returns:
+        (sql, params)
+    """
+    where = []
+    params: List[Any] = []
+
+    if status:
+        where.append("status = %s")
+        params.append(status)
+
+    groups = [build_filter_group(filters, document) for filters in filter_groups] or [('TRUE', [])]
+    where.append('(' + ' OR '.join(f'({clause})' for clause, _ in groups) + ')')
+    for _, group_params in groups:
+        params.extend(group_params)
+
+    keywords = [filters['keyword'] for filters in filter_groups if filters.get('keyword')]
+    order = []
+    select_rank = ''
+    rank_params: List[Any] = []
+    if keywords:
+        select_rank = f", ts_rank({document}, {keyword_query_sql(len(keywords))}) AS search_rank"
+        rank_params = [keyword for keyword in keywords for _ in TEXT_SEARCH_CONFIGS]
+        order.append("search_rank DESC")
+    order.extend(["match_score DESC", "discovered_date DESC"])
+
+    sql = f"""
+        SELECT {columns}{select_rank} FROM jobs
+        WHERE {' AND '.join(where)}
+        ORDER BY {', '.join(order)}
+        LIMIT %s
+    """
+    return sql, rank_params + params + [limit]
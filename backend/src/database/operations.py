@@ -6,7 +6,7 @@ Handles SQLite database operations
 import sqlite3
 import json
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
 import os
 
 
@@ -200,6 +200,31 @@ class JobDatabase:
         conn.close()
         return result
     
+    def get_known_job_ids(self, job_ids: Iterable[str]) -> Tuple[set, set]:
+        """
+        Check many job ids at once
+
+        Returns:
+            (existing_ids, deleted_ids); deleted jobs are also in existing_ids
+        """
+        ids = list({job_id for job_id in job_ids if job_id})
+        existing, deleted = set(), set()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT job_id, status FROM jobs WHERE job_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for row in cursor.fetchall():
+                existing.add(row[0])
+                if row[1] == 'deleted':
+                    deleted.add(row[0])
+        conn.close()
+        return existing, deleted
+    
     def get_jobs_by_date(self, date: str, status: str = None) -> List[Dict]:
         """Get all jobs discovered on a specific date"""
         query = "SELECT * FROM jobs WHERE DATE(discovered_date) = ?"
@@ -331,6 +356,14 @@ class JobDatabase:
         conn.close()
         return deleted_ids
     
+    def find_deleted_job_ids(self, job_ids: Iterable[str]) -> set:
+        """
+        Which of these job_ids have been deleted/hidden
+        
+        Looks up only the candidates instead of loading every deleted id
+        """
+        return self.get_known_job_ids(job_ids)[1]
+    
     def get_deleted_jobs(self, limit: int = 50) -> List[Dict]:
         """
         Get all deleted/hidden jobs
@@ -464,6 +497,9 @@ class JobDatabase:
             
             conn.commit()
             conn.close()
+            # No stored learning profile here: drop the cached one so it is rebuilt
+            from src.analysis.learning_profile import cache_key, learning_cache
+            learning_cache.invalidate(cache_key(user_email))
             return True
             
         except Exception as e:
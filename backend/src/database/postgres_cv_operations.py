@@ -10,8 +10,19 @@ import json
 import bcrypt
 import logging
 
+from src.utils.stats_cache import stats_cache
+from src.database.job_archive import archive_exists
+
 logger = logging.getLogger(__name__)
 
+# cv_profiles columns holding the persisted CV embedding (src.matching.cv_embeddings);
+# kept out of profile dicts, which are passed to templates and JSON responses
+CV_EMBEDDING_COLUMNS = ('cv_embedding', 'cv_embedding_model', 'cv_embedding_hash')
+
+# A 'processing' CV whose stage hasn't changed for this long has no live ingestion:
+# it is resumed by src.cv.ingestion and may be replaced by a re-upload
+STALE_INGESTION_MINUTES = 15
+
 
 class PostgresCVManager:
     """PostgreSQL-based CV and User operations"""
@@ -34,9 +45,26 @@ class PostgresCVManager:
         """Return connection to pool"""
         self.connection_pool.putconn(conn)
     
+    def _connection(self):
+        """Context manager: pooled connection, rolled back on error and always returned"""
+        return self.connection_pool.connection()
+    
     def _ensure_tables(self):
         """Ensure user/CV tables exist (already created by PostgresDatabase)"""
         pass
+
+    def _invalidate_match_maps(self, cursor, user_id: int):
+        """
+        Clear materialized competency/skill match maps after a CV change
+
+        Runs inside the caller's transaction. The maps are rebuilt by
+        materialize_match_maps() or lazily on the next job detail view.
+        """
+        cursor.execute("""
+            UPDATE user_job_matches
+            SET competency_match_map = NULL, skill_match_map = NULL, match_maps_date = NULL
+            WHERE user_id = %s AND competency_match_map IS NOT NULL
+        """, (user_id,))
     
     def register_user(self, email: str, password: str, name: str = None) -> Optional[int]:
         """Register a new user"""
@@ -44,61 +72,40 @@ class PostgresCVManager:
             # Hash password
             password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
             
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            cursor.execute("""
-                INSERT INTO users (email, password_hash, name, created_date, last_updated, is_active)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (email, password_hash, name, now, now, 1))
-            
-            user_id = cursor.fetchone()[0]
-            conn.commit()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    INSERT INTO users (email, password_hash, name, created_date, last_updated, is_active)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (email, password_hash, name, now, now, 1))
+                
+                user_id = cursor.fetchone()[0]
+                conn.commit()
             
             logger.info(f"User registered: {email} (ID: {user_id})")
             return user_id
             
         except psycopg2.IntegrityError:
-            conn.rollback()
-            cursor.close()
-            self._return_connection(conn)
             logger.warning(f"User already exists: {email}")
             return None
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error registering user: {e}")
             return None
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user dict (compatible with SQLite CVManager)"""
-        conn = None
-        cursor = None
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("SELECT id, password_hash FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
-            user = cursor.fetchone()
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT id, password_hash FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
+                user = cursor.fetchone()
             
             if not user:
-                cursor.close()
-                self._return_connection(conn)
                 return None
             
             # Check password
             password_match = bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8'))
             
-            cursor.close()
-            self._return_connection(conn)
-            
             if password_match:
                 # Return full user dict like SQLite version does
                 return self.get_user_by_id(user['id'])
@@ -106,16 +113,6 @@ class PostgresCVManager:
             return None
             
         except Exception as e:
-            if cursor:
-                try:
-                    cursor.close()
-                except:
-                    pass
-            if conn:
-                try:
-                    self._return_connection(conn)
-                except:
-                    pass
             logger.error(f"Error authenticating user: {e}")
             return None
     
@@ -132,17 +129,12 @@ class PostgresCVManager:
         Returns:
             User dict with is_new_user flag, or None on error
         """
-        conn = None
-        cursor = None
         try:
             # Check if user already exists
             existing_user = self.get_user_by_email(email)
             
             if existing_user:
                 # Update provider and avatar if not set
-                conn = self._get_connection()
-                cursor = conn.cursor(cursor_factory=RealDictCursor)
-                
                 # Get preferences (already parsed as dict by get_user_by_email)
                 preferences = existing_user.get('preferences') or {}
                 needs_update = False
@@ -175,16 +167,13 @@ class PostgresCVManager:
                     
                     params.append(existing_user['id'])
                     
-                    cursor.execute(f"""
-                        UPDATE users 
-                        SET {', '.join(update_parts)}
-                        WHERE id = %s
-                    """, params)
-                    
-                    conn.commit()
-                
-                cursor.close()
-                self._return_connection(conn)
+                    with self._connection() as conn, conn.cursor() as cursor:
+                        cursor.execute(f"""
+                            UPDATE users 
+                            SET {', '.join(update_parts)}
+                            WHERE id = %s
+                        """, params)
+                        conn.commit()
                 
                 # Reload user
                 user = self.get_user_by_email(email)
@@ -194,9 +183,6 @@ class PostgresCVManager:
                 return user
             
             # Create new user with OAuth
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
             now = datetime.now()  # Use datetime object, not ISO string for PostgreSQL
             
             # Store OAuth info in preferences
@@ -205,19 +191,16 @@ class PostgresCVManager:
                 'avatar_url': avatar_url
             }
             
-            cursor.execute("""
-                INSERT INTO users (
-                    email, password_hash, name, created_date, last_updated, preferences
-                ) VALUES (%s, NULL, %s, %s, %s, %s)
-                RETURNING id
-            """, (email.lower(), name, now, now, json.dumps(preferences)))
-            
-            result = cursor.fetchone()
-            user_id = result['id']
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    INSERT INTO users (
+                        email, password_hash, name, created_date, last_updated, preferences
+                    ) VALUES (%s, NULL, %s, %s, %s, %s)
+                    RETURNING id
+                """, (email.lower(), name, now, now, json.dumps(preferences)))
+                
+                user_id = cursor.fetchone()['id']
+                conn.commit()
             
             # Return new user with flag
             user = self.get_user_by_id(user_id)
@@ -230,50 +213,30 @@ class PostgresCVManager:
             import traceback
             logger.error(f"Error creating OAuth user: {e}")
             logger.error(traceback.format_exc())
-            if cursor:
-                try:
-                    cursor.close()
-                except:
-                    pass
-            if conn:
-                try:
-                    conn.rollback()
-                    self._return_connection(conn)
-                except:
-                    pass
             return None
     
+    @staticmethod
+    def _parse_user(user) -> Optional[Dict]:
+        """users row as a dict with preferences decoded from JSON"""
+        if not user:
+            return None
+        user_dict = dict(user)
+        if user_dict.get('preferences'):
+            try:
+                user_dict['preferences'] = json.loads(user_dict['preferences'])
+            except:
+                user_dict['preferences'] = {}
+        else:
+            user_dict['preferences'] = {}
+        return user_dict
+    
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """Get user by ID"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-            user = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            if user:
-                # Parse JSON preferences if present
-                user_dict = dict(user)
-                if user_dict.get('preferences'):
-                    try:
-                        user_dict['preferences'] = json.loads(user_dict['preferences'])
-                    except:
-                        user_dict['preferences'] = {}
-                else:
-                    user_dict['preferences'] = {}
-                return user_dict
-            
-            return None
-            
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+                return self._parse_user(cursor.fetchone())
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting user: {e}")
             return None
     
@@ -284,65 +247,32 @@ class PostgresCVManager:
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         """Get user by email (case-insensitive)"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("SELECT * FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
-            user = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            if user:
-                # Parse JSON preferences if present
-                user_dict = dict(user)
-                if user_dict.get('preferences'):
-                    try:
-                        user_dict['preferences'] = json.loads(user_dict['preferences'])
-                    except:
-                        user_dict['preferences'] = {}
-                else:
-                    user_dict['preferences'] = {}
-                return user_dict
-            
-            return None
-            
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM users WHERE LOWER(email) = LOWER(%s)", (email,))
+                return self._parse_user(cursor.fetchone())
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting user by email: {e}")
             return None
     
     def update_user_preferences(self, user_id: int, preferences: Dict) -> bool:
         """Update user preferences"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
             # Convert preferences dict to JSON string
             preferences_json = json.dumps(preferences)
             now = datetime.now()
             
-            cursor.execute("""
-                UPDATE users 
-                SET preferences = %s, preferences_updated = %s, last_updated = %s
-                WHERE id = %s
-            """, (preferences_json, now, now, user_id))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE users 
+                    SET preferences = %s, preferences_updated = %s, last_updated = %s
+                    WHERE id = %s
+                """, (preferences_json, now, now, user_id))
+                conn.commit()
             
             logger.info(f"Updated preferences for user {user_id}")
             return True
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating preferences: {e}")
             return False
     
@@ -354,42 +284,32 @@ class PostgresCVManager:
             (should_refilter, reason)
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT last_filter_run, preferences_updated
-                FROM users WHERE id = %s
-            """, (user_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                cursor.close()
-                self._return_connection(conn)
-                return (True, "User not found")
-            
-            last_filter = row['last_filter_run']
-            prefs_updated = row['preferences_updated']
-            
-            if not last_filter:
-                cursor.close()
-                self._return_connection(conn)
-                return (True, "Never filtered")
-            
-            if prefs_updated and prefs_updated > last_filter:
-                cursor.close()
-                self._return_connection(conn)
-                return (True, "Preferences changed since last filter")
-            
-            # Check if there are new jobs since last filter run
-            cursor.execute("""
-                SELECT COUNT(*) as new_jobs
-                FROM jobs
-                WHERE created_at > %s
-            """, (last_filter,))
-            new_jobs_count = cursor.fetchone()['new_jobs']
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT last_filter_run, preferences_updated
+                    FROM users WHERE id = %s
+                """, (user_id,))
+                row = cursor.fetchone()
+                
+                if not row:
+                    return (True, "User not found")
+                
+                last_filter = row['last_filter_run']
+                prefs_updated = row['preferences_updated']
+                
+                if not last_filter:
+                    return (True, "Never filtered")
+                
+                if prefs_updated and prefs_updated > last_filter:
+                    return (True, "Preferences changed since last filter")
+                
+                # Check if there are new jobs since last filter run
+                cursor.execute("""
+                    SELECT COUNT(*) as new_jobs
+                    FROM jobs
+                    WHERE created_at > %s
+                """, (last_filter,))
+                new_jobs_count = cursor.fetchone()['new_jobs']
             
             if new_jobs_count > 0:
                 return (True, f"{new_jobs_count} new jobs since last run")
@@ -404,106 +324,87 @@ class PostgresCVManager:
                 file_size: int = None, file_hash: str = None) -> Optional[int]:
         """Save CV file information"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            cursor.execute("""
-                INSERT INTO cvs (
-                    user_id, file_name, file_path, file_type, file_size, file_hash,
-                    uploaded_date, is_primary, version, status
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (user_id, file_name, file_path, file_type, file_size, file_hash,
-                  now, 1, 1, 'active'))
-            
-            cv_id = cursor.fetchone()[0]
-            conn.commit()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    INSERT INTO cvs (
+                        user_id, file_name, file_path, file_type, file_size, file_hash,
+                        uploaded_date, is_primary, version, status
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (user_id, file_name, file_path, file_type, file_size, file_hash,
+                      now, 1, 1, 'active'))
+                
+                cv_id = cursor.fetchone()[0]
+                conn.commit()
+            stats_cache.invalidate(('user_stats', user_id))
             
             logger.info(f"Saved CV for user {user_id}: {file_name} (CV ID: {cv_id})")
             return cv_id
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error saving CV: {e}")
             return None
     
     def save_cv_profile(self, cv_id: int, user_id: int, profile_data: Dict) -> Optional[int]:
         """Save CV profile analysis"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            cursor.execute("""
-                INSERT INTO cv_profiles (
-                    cv_id, user_id, technical_skills, soft_skills, competencies, languages,
-                    education, work_history, achievements, expertise_summary,
-                    career_level, preferred_roles, industries, raw_analysis,
-                    created_date, last_updated
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                cv_id, user_id,
-                json.dumps(profile_data.get('technical_skills', [])),
-                json.dumps(profile_data.get('soft_skills', [])),
-                json.dumps(profile_data.get('competencies', [])),
-                json.dumps(profile_data.get('languages', [])),
-                json.dumps(profile_data.get('education', [])),
-                json.dumps(profile_data.get('work_history', []) or profile_data.get('work_experience', [])),
-                json.dumps(profile_data.get('achievements', []) or profile_data.get('career_highlights', [])),
-                profile_data.get('expertise_summary', ''),
-                profile_data.get('career_level', ''),
-                json.dumps(profile_data.get('preferred_roles', [])),
-                json.dumps(profile_data.get('industries', [])),
-                json.dumps(profile_data.get('raw_analysis', {})),
-                now, now
-            ))
-            
-            profile_id = cursor.fetchone()[0]
-            conn.commit()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    INSERT INTO cv_profiles (
+                        cv_id, user_id, technical_skills, soft_skills, competencies, languages,
+                        education, work_history, achievements, expertise_summary,
+                        career_level, preferred_roles, industries, raw_analysis,
+                        created_date, last_updated
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
+                    cv_id, user_id,
+                    json.dumps(profile_data.get('technical_skills', [])),
+                    json.dumps(profile_data.get('soft_skills', [])),
+                    json.dumps(profile_data.get('competencies', [])),
+                    json.dumps(profile_data.get('languages', [])),
+                    json.dumps(profile_data.get('education', [])),
+                    json.dumps(profile_data.get('work_history', []) or profile_data.get('work_experience', [])),
+                    json.dumps(profile_data.get('achievements', []) or profile_data.get('career_highlights', [])),
+                    profile_data.get('expertise_summary', ''),
+                    profile_data.get('career_level', ''),
+                    json.dumps(profile_data.get('preferred_roles', [])),
+                    json.dumps(profile_data.get('industries', [])),
+                    json.dumps(profile_data.get('raw_analysis', {})),
+                    now, now
+                ))
+                
+                profile_id = cursor.fetchone()[0]
+                conn.commit()
+            stats_cache.invalidate(('user_stats', user_id))
             
             logger.info(f"Saved CV profile for user {user_id}, CV {cv_id} (Profile ID: {profile_id})")
             return profile_id
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error saving CV profile: {e}")
             return None
     
     def get_user_cv_profile(self, user_id: int) -> Optional[Dict]:
         """Get latest CV profile for user"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM cv_profiles 
-                WHERE user_id = %s 
-                ORDER BY created_date DESC 
-                LIMIT 1
-            """, (user_id,))
-            
-            profile = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM cv_profiles 
+                    WHERE user_id = %s 
+                    ORDER BY created_date DESC 
+                    LIMIT 1
+                """, (user_id,))
+                
+                profile = cursor.fetchone()
             
             if profile:
                 # Parse JSON fields
                 profile_dict = dict(profile)
+                for column in CV_EMBEDDING_COLUMNS:
+                    profile_dict.pop(column, None)
                 json_fields = ['technical_skills', 'soft_skills', 'languages', 'education',
                               'work_history', 'achievements', 'preferred_roles', 'industries', 'raw_analysis']
                 for field in json_fields:
@@ -524,10 +425,6 @@ class PostgresCVManager:
             return None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting CV profile: {e}")
             return None
     
@@ -539,48 +436,38 @@ class PostgresCVManager:
         
         # Create user without password (for CV uploads without registration)
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            now = datetime.now()
-            cursor.execute("""
-                INSERT INTO users (email, name, created_date, last_updated, is_active)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (email, name, now, now, 1))
-            
-            user_id = cursor.fetchone()['id']
-            conn.commit()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    INSERT INTO users (email, name, created_date, last_updated, is_active)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (email, name, now, now, 1))
+                
+                user_id = cursor.fetchone()['id']
+                conn.commit()
             
             return self.get_user_by_id(user_id)
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error creating user: {e}")
             return None
     
     def get_user_statistics(self, user_id: int) -> Dict:
-        """Get user statistics"""
+        """Get user statistics (cached in-process, dropped when the user's CVs change)"""
+        return stats_cache.get_or_compute(('user_stats', user_id),
+                                          lambda: self._compute_user_statistics(user_id))
+    
+    def _compute_user_statistics(self, user_id: int) -> Dict:
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Count CVs
-            cursor.execute("SELECT COUNT(*) FROM cvs WHERE user_id = %s", (user_id,))
-            cv_count = cursor.fetchone()[0]
-            
-            # Count profiles
-            cursor.execute("SELECT COUNT(*) FROM cv_profiles WHERE user_id = %s", (user_id,))
-            profile_count = cursor.fetchone()[0]
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                # Count CVs
+                cursor.execute("SELECT COUNT(*) FROM cvs WHERE user_id = %s", (user_id,))
+                cv_count = cursor.fetchone()[0]
+                
+                # Count profiles
+                cursor.execute("SELECT COUNT(*) FROM cv_profiles WHERE user_id = %s", (user_id,))
+                profile_count = cursor.fetchone()[0]
             
             return {
                 'cv_count': cv_count,
@@ -588,65 +475,40 @@ class PostgresCVManager:
             }
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting user statistics: {e}")
             return {'cv_count': 0, 'profile_count': 0}
     
     def get_user_cvs(self, user_id: int, status: str = 'active') -> list:
         """Get all CVs for user"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM cvs 
-                WHERE user_id = %s AND status = %s
-                ORDER BY uploaded_date DESC
-            """, (user_id, status))
-            
-            cvs = [dict(row) for row in cursor.fetchall()]
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            return cvs
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM cvs 
+                    WHERE user_id = %s AND status = %s
+                    ORDER BY uploaded_date DESC
+                """, (user_id, status))
+                
+                return [dict(row) for row in cursor.fetchall()]
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting user CVs: {e}")
             return []
     
     def get_primary_cv(self, user_id: int) -> Optional[Dict]:
         """Get primary CV for user"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM cvs 
-                WHERE user_id = %s AND is_primary = 1 AND status = 'active'
-                ORDER BY uploaded_date DESC
-                LIMIT 1
-            """, (user_id,))
-            
-            cv = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            return dict(cv) if cv else None
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM cvs 
+                    WHERE user_id = %s AND is_primary = 1 AND status = 'active'
+                    ORDER BY uploaded_date DESC
+                    LIMIT 1
+                """, (user_id,))
+                
+                cv = cursor.fetchone()
+                return dict(cv) if cv else None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting primary CV: {e}")
             return None
 
@@ -656,73 +518,224 @@ class PostgresCVManager:
         This effectively acts as the 'Primary Profile'.
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT p.* 
-                FROM cv_profiles p
-                JOIN cvs c ON p.cv_id = c.id
-                WHERE c.user_id = %s AND c.is_primary = 1
-                ORDER BY p.created_date DESC
-                LIMIT 1
-            """, (user_id,))
-            
-            profile = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT p.* 
+                    FROM cv_profiles p
+                    JOIN cvs c ON p.cv_id = c.id
+                    WHERE c.user_id = %s AND c.is_primary = 1
+                    ORDER BY p.created_date DESC
+                    LIMIT 1
+                """, (user_id,))
+                
+                profile = cursor.fetchone()
             
             if profile:
-                # Reuse parsing logic via get_cv_profile if possible, but for now duplicate parsing:
-                profile_dict = dict(profile)
-                json_fields = ['technical_skills', 'soft_skills', 'competencies', 'languages', 'education',
-                              'work_history', 'achievements', 'preferred_roles', 'industries', 'raw_analysis', 'projects']
-                for field in json_fields:
-                    if profile_dict.get(field):
-                        try:
-                            profile_dict[field] = json.loads(profile_dict[field])
-                        except:
-                            profile_dict[field] = []
-                
-                # Use raw_analysis competencies as fallback if column is empty (legacy support)
-                if not profile_dict.get('competencies'):
-                    raw = profile_dict.get('raw_analysis', {})
-                    if isinstance(raw, dict):
-                         profile_dict['competencies'] = raw.get('competencies', [])
-
-                return profile_dict
+                return self._parse_primary_profile(dict(profile))
             
             return None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting primary profile: {e}")
             return None
     
+    @staticmethod
+    def _parse_primary_profile(profile_dict: Dict) -> Dict:
+        """Decode the JSON columns of a cv_profiles row"""
+        for column in CV_EMBEDDING_COLUMNS:
+            profile_dict.pop(column, None)
+        json_fields = ['technical_skills', 'soft_skills', 'competencies', 'languages', 'education',
+                      'work_history', 'achievements', 'preferred_roles', 'industries', 'raw_analysis', 'projects']
+        for field in json_fields:
+            if profile_dict.get(field):
+                try:
+                    profile_dict[field] = json.loads(profile_dict[field])
+                except:
+                    profile_dict[field] = []
+        
+        # Use raw_analysis competencies as fallback if column is empty (legacy support)
+        if not profile_dict.get('competencies'):
+            raw = profile_dict.get('raw_analysis', {})
+            if isinstance(raw, dict):
+                 profile_dict['competencies'] = raw.get('competencies', [])
+
+        return profile_dict
+
+    def get_active_user_profiles(self) -> List[Dict]:
+        """
+        Primary profile and preferences of every active user, in one query
+
+        Users without a primary CV profile are left out.
+
+        Returns:
+            List of dicts: {'user_id', 'preferences', 'profile', 'stored_embedding'}
+        """
+        try:
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT DISTINCT ON (u.id)
+                           u.id AS user_id, u.preferences AS user_preferences, p.*
+                    FROM users u
+                    JOIN cvs c ON c.user_id = u.id AND c.is_primary = 1
+                    JOIN cv_profiles p ON p.cv_id = c.id
+                    WHERE u.is_active = TRUE
+                    ORDER BY u.id, p.created_date DESC
+                """)
+                rows = [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting active user profiles: {e}")
+            return []
+
+        users = []
+        for row in rows:
+            preferences = row.pop('user_preferences', None) or {}
+            if isinstance(preferences, str):
+                try:
+                    preferences = json.loads(preferences)
+                except:
+                    preferences = {}
+            users.append({
+                'user_id': row['user_id'],
+                'preferences': preferences,
+                'stored_embedding': {column: row.get(column) for column in CV_EMBEDDING_COLUMNS},
+                'profile': self._parse_primary_profile(row),
+            })
+        return users
+
+    def get_cv_embedding(self, cv_id: int, text_hash: Optional[str] = None,
+                         model_name: Optional[str] = None):
+        """
+        Stored embedding of a CV's latest profile
+
+        Args:
+            cv_id: CV ID
+            text_hash: Only return it if it was computed from CV text with this hash
+            model_name: Only return it if computed with this model (default: CV_EMBEDDING_MODEL)
+
+        Returns:
+            numpy float32 vector, or None if missing or stale
+        """
+        from src.matching.cv_embeddings import CV_EMBEDDING_MODEL, stored_embedding
+
+        try:
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT cv_embedding, cv_embedding_model, cv_embedding_hash
+                    FROM cv_profiles
+                    WHERE cv_id = %s
+                    ORDER BY created_date DESC
+                    LIMIT 1
+                """, (cv_id,))
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error getting CV embedding: {e}")
+            return None
+
+        return stored_embedding(dict(row) if row else None, text_hash, model_name or CV_EMBEDDING_MODEL)
+
+    def save_cv_embedding(self, cv_id: int, embedding: bytes, model_name: str, text_hash: str) -> bool:
+        """Store the embedding and its fingerprint on a CV's latest profile"""
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE cv_profiles
+                    SET cv_embedding = %s, cv_embedding_model = %s, cv_embedding_hash = %s
+                    WHERE id = (
+                        SELECT id FROM cv_profiles WHERE cv_id = %s
+                        ORDER BY created_date DESC LIMIT 1
+                    )
+                """, (psycopg2.Binary(embedding), model_name, text_hash, cv_id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error saving CV embedding: {e}")
+            return False
+
+    def get_cached_parse(self, file_hash: str, exclude_cv_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Claude parse of an identical CV file uploaded before (by any user)
+
+        Returns:
+            The stored raw_analysis dict, or None
+        """
+        try:
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT p.raw_analysis
+                    FROM cv_profiles p
+                    JOIN cvs c ON c.id = p.cv_id
+                    WHERE c.file_hash = %s AND c.id <> %s AND p.raw_analysis IS NOT NULL
+                    ORDER BY p.last_updated DESC
+                    LIMIT 1
+                """, (file_hash, exclude_cv_id or 0))
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error getting cached CV parse: {e}")
+            return None
+
+        raw = row['raw_analysis'] if row else None
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                return None
+        return raw if isinstance(raw, dict) and raw else None
+
+    def update_cv_processing(self, cv_id: int, stage: str, error: Optional[str] = None) -> bool:
+        """Record the current ingestion stage of a CV"""
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE cvs
+                    SET processing_stage = %s, processing_error = %s, processing_updated = NOW()
+                    WHERE id = %s
+                """, (stage, error, cv_id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error updating CV processing stage: {e}")
+            return False
+
+    def claim_stale_ingestions(self, stale_minutes: int = STALE_INGESTION_MINUTES) -> List[Dict]:
+        """
+        CVs left in 'processing' (e.g. by a restart) whose last stage update is old
+
+        Claimed rows get a fresh processing_updated, so only one worker resumes each.
+        """
+        try:
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    UPDATE cvs
+                    SET processing_updated = NOW()
+                    WHERE status = 'processing'
+                      AND (processing_updated IS NULL
+                           OR processing_updated < NOW() - make_interval(mins => %s))
+                    RETURNING id, user_id
+                """, (stale_minutes,))
+                rows = [dict(row) for row in cursor.fetchall()]
+                conn.commit()
+                return rows
+        except Exception as e:
+            logger.error(f"Error claiming stale CV ingestions: {e}")
+            return []
+
     def get_cv_profile(self, cv_id: int, include_full_text: bool = False) -> Optional[Dict]:
         """Get CV profile by CV ID"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM cv_profiles 
-                WHERE cv_id = %s
-                ORDER BY created_date DESC
-                LIMIT 1
-            """, (cv_id,))
-            
-            profile = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM cv_profiles 
+                    WHERE cv_id = %s
+                    ORDER BY created_date DESC
+                    LIMIT 1
+                """, (cv_id,))
+                
+                profile = cursor.fetchone()
             
             if profile:
                 profile_dict = dict(profile)
+                for column in CV_EMBEDDING_COLUMNS:
+                    profile_dict.pop(column, None)
                 json_fields = ['technical_skills', 'soft_skills', 'competencies', 'languages', 'education',
                               'work_history', 'achievements', 'preferred_roles', 'industries', 'raw_analysis', 'projects']
                 for field in json_fields:
@@ -752,81 +765,55 @@ class PostgresCVManager:
             return None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting CV profile: {e}")
             return None
     
     def get_cv(self, cv_id: int) -> Optional[Dict]:
         """Get CV by ID"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("SELECT * FROM cvs WHERE id = %s", (cv_id,))
-            cv = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            return dict(cv) if cv else None
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM cvs WHERE id = %s", (cv_id,))
+                cv = cursor.fetchone()
+                return dict(cv) if cv else None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting CV: {e}")
             return None
     
     def delete_cv(self, cv_id: int):
         """Delete CV"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("UPDATE cvs SET status = 'deleted' WHERE id = %s", (cv_id,))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("UPDATE cvs SET status = 'deleted' WHERE id = %s", (cv_id,))
+                conn.commit()
+            stats_cache.invalidate_prefix('user_stats')
             
             logger.info(f"CV {cv_id} deleted")
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error deleting CV: {e}")
     
     def set_primary_cv(self, user_id: int, cv_id: int):
         """Set primary CV for user"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Unset all primary flags for user
-            cursor.execute("UPDATE cvs SET is_primary = 0 WHERE user_id = %s", (user_id,))
-            
-            # Set new primary
-            cursor.execute("UPDATE cvs SET is_primary = 1 WHERE id = %s", (cv_id,))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                # Unset all primary flags for user
+                cursor.execute("UPDATE cvs SET is_primary = 0 WHERE user_id = %s", (user_id,))
+                
+                # Set new primary
+                cursor.execute("UPDATE cvs SET is_primary = 1 WHERE id = %s", (cv_id,))
+
+                # Match maps were computed against the previous primary profile
+                self._invalidate_match_maps(cursor, user_id)
+                
+                conn.commit()
             
             logger.info(f"Set CV {cv_id} as primary for user {user_id}")
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error setting primary CV: {e}")
     
+    
     def get_profile_by_user(self, user_id: int) -> Optional[Dict]:
         """Get latest CV profile for user (alias for get_user_cv_profile)"""
         return self.get_user_cv_profile(user_id)
@@ -915,32 +902,26 @@ class PostgresCVManager:
             return False
 
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                UPDATE users
-                SET location = %s,
-                    last_updated = NOW()
-                WHERE id = %s
-            """, (location, user_id))
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE users
+                    SET location = %s,
+                        last_updated = NOW()
+                    WHERE id = %s
+                """, (location, user_id))
 
-            conn.commit()
-            self._return_connection(conn)
+                conn.commit()
 
             logger.info(f"Updated location for user {user_id} to: {location}")
             return True
 
         except Exception as e:
             logger.error(f"Error updating user location: {e}")
-            if conn:
-                conn.rollback()
-                self._return_connection(conn)
             return False
 
     def add_cv(self, user_id: int, file_name: str, file_path: str,
                file_type: str, file_size: int, file_hash: str,
-               version: int = 1) -> Optional[int]:
+               version: int = 1, status: str = 'active') -> Optional[int]:
         """
         Add a new CV to the database
 
@@ -952,6 +933,7 @@ class PostgresCVManager:
             file_size: Size in bytes
             file_hash: SHA-256 hash
             version: CV version number
+            status: Initial status ('processing' while src.cv.ingestion runs)
 
         Returns:
             CV ID if successful, None if duplicate or error
@@ -970,55 +952,58 @@ class PostgresCVManager:
             return None
         
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Check for duplicate by file_hash (only active CVs)
-            if file_hash:
-                cursor.execute("""
-                    SELECT id, status FROM cvs 
-                    WHERE user_id = %s AND file_hash = %s
-                """, (user_id, file_hash))
-                existing = cursor.fetchone()
-                if existing:
-                    existing_id, existing_status = existing
-                    logger.info(f"Found existing CV {existing_id} with status '{existing_status}' for user {user_id}")
-                    
-                    # Only block if it's an active CV
-                    if existing_status not in ('archived', 'deleted'):
-                        cursor.close()
-                        self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                # Check for duplicate by file_hash (only active CVs)
+                if file_hash:
+                    cursor.execute("""
+                        SELECT id, status FROM cvs 
+                        WHERE user_id = %s AND file_hash = %s
+                    """, (user_id, file_hash))
+                    for existing_id, existing_status in cursor.fetchall():
+                        logger.info(f"Found existing CV {existing_id} with status '{existing_status}' for user {user_id}")
+                        
+                        if existing_status in ('archived', 'deleted', 'failed_parsing'):
+                            logger.info(f"Existing CV is {existing_status}, allowing re-upload")
+                            continue
+                        
+                        # A stale 'processing' row was left by a dead ingestion: the re-upload replaces it
+                        if existing_status == 'processing':
+                            cursor.execute("""
+                                UPDATE cvs
+                                SET status = 'failed_parsing', processing_error = 'Replaced by a re-upload',
+                                    processing_updated = NOW()
+                                WHERE id = %s AND status = 'processing'
+                                  AND (processing_updated IS NULL
+                                       OR processing_updated < NOW() - make_interval(mins => %s))
+                            """, (existing_id, STALE_INGESTION_MINUTES))
+                            if cursor.rowcount:
+                                logger.info(f"Existing CV {existing_id} was stuck in processing, replacing it")
+                                continue
+                        
+                        # Only block if it's an active (or still processing) CV
                         logger.warning(f"Duplicate active CV detected for user {user_id} with hash {file_hash}")
                         return None
-                    else:
-                        logger.info(f"Existing CV is {existing_status}, allowing re-upload")
-            
-            now = datetime.now()
+                
+                now = datetime.now()
 
-            cursor.execute("""
-                INSERT INTO cvs (
+                cursor.execute("""
+                    INSERT INTO cvs (
+                        user_id, file_name, file_path, file_type, file_size,
+                        file_hash, uploaded_date, version, status
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
                     user_id, file_name, file_path, file_type, file_size,
-                    file_hash, uploaded_date, version, status
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'active')
-                RETURNING id
-            """, (
-                user_id, file_name, file_path, file_type, file_size,
-                file_hash, now, version
-            ))
-
-            cv_id = cursor.fetchone()[0]
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                    file_hash, now, version, status
+                ))
+
+                cv_id = cursor.fetchone()[0]
+                conn.commit()
+            stats_cache.invalidate(('user_stats', user_id))
             return cv_id
 
         except Exception as e:
             logger.error(f"Error adding CV: {e}")
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                conn.rollback()
-                self._return_connection(conn)
             return None
 
     def add_cv_profile(self, cv_id: int, user_id: int, profile_data: Dict) -> int:
@@ -1034,79 +1019,63 @@ class PostgresCVManager:
             Profile ID
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            now = datetime.now()
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
 
-            cursor.execute("""
-                INSERT INTO cv_profiles (
-                    cv_id, user_id, technical_skills, soft_skills, languages,
-                    education, work_history, achievements, total_years_experience,
-                    expertise_summary, career_level, preferred_roles, industries,
-                    raw_analysis, projects, created_date, last_updated
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                cv_id,
-                user_id,
-                json.dumps(profile_data.get('technical_skills', [])),
-                json.dumps(profile_data.get('soft_skills', [])),
-                json.dumps(profile_data.get('languages', [])),
-                json.dumps(profile_data.get('education', [])),
-                json.dumps(profile_data.get('work_experience', profile_data.get('work_history', []))),
-                json.dumps(profile_data.get('career_highlights', profile_data.get('achievements', []))),
-                profile_data.get('total_years_experience', 0),
-                profile_data.get('expertise_summary'),
-                profile_data.get('career_level'),
-                json.dumps(profile_data.get('preferred_roles', [])),
-                json.dumps(profile_data.get('industries', [])),
-                json.dumps({k: v for k, v in profile_data.items() if k != 'full_text'}),
-                json.dumps(profile_data.get('projects', [])),
-                now,
-                now
-            ))
-
-            profile_id = cursor.fetchone()[0]
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                cursor.execute("""
+                    INSERT INTO cv_profiles (
+                        cv_id, user_id, technical_skills, soft_skills, languages,
+                        education, work_history, achievements, total_years_experience,
+                        expertise_summary, career_level, preferred_roles, industries,
+                        raw_analysis, projects, created_date, last_updated
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
+                    cv_id,
+                    user_id,
+                    json.dumps(profile_data.get('technical_skills', [])),
+                    json.dumps(profile_data.get('soft_skills', [])),
+                    json.dumps(profile_data.get('languages', [])),
+                    json.dumps(profile_data.get('education', [])),
+                    json.dumps(profile_data.get('work_experience', profile_data.get('work_history', []))),
+                    json.dumps(profile_data.get('career_highlights', profile_data.get('achievements', []))),
+                    profile_data.get('total_years_experience', 0),
+                    profile_data.get('expertise_summary'),
+                    profile_data.get('career_level'),
+                    json.dumps(profile_data.get('preferred_roles', [])),
+                    json.dumps(profile_data.get('industries', [])),
+                    json.dumps({k: v for k, v in profile_data.items() if k != 'full_text'}),
+                    json.dumps(profile_data.get('projects', [])),
+                    now,
+                    now
+                ))
+
+                profile_id = cursor.fetchone()[0]
+                conn.commit()
+            stats_cache.invalidate(('user_stats', user_id))
             return profile_id
 
         except Exception as e:
             logger.error(f"Error adding CV profile: {e}")
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                conn.rollback()
-                self._return_connection(conn)
             return None
     
     def check_duplicate_hash(self, user_id: int, file_hash: str) -> Optional[Dict]:
         """Check if CV with same hash already exists"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM cvs
-                WHERE user_id = %s AND file_hash = %s AND status = 'active'
-            """, (user_id, file_hash))
-            
-            row = cursor.fetchone()
-            
-            cursor.close()
-            self._return_connection(conn)
-            
-            return dict(row) if row else None
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM cvs
+                    WHERE user_id = %s AND file_hash = %s AND status = 'active'
+                """, (user_id, file_hash))
+                
+                row = cursor.fetchone()
+                return dict(row) if row else None
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error checking duplicate hash: {e}")
             return None
     
+    
     # Additional compatibility methods
     def add_user(self, email: str, password: str, name: str = None) -> Optional[int]:
         """Alias for register_user for compatibility"""
@@ -1114,129 +1083,88 @@ class PostgresCVManager:
     
     def update_user(self, user_id: int, **kwargs):
         """Update user fields"""
+        fields = []
+        values = []
+        for key, value in kwargs.items():
+            if key == 'preferences':
+                fields.append(f"{key} = %s")
+                values.append(json.dumps(value) if isinstance(value, dict) else value)
+            else:
+                fields.append(f"{key} = %s")
+                values.append(value)
+        
+        if not fields:
+            return
+        
+        fields.append("last_updated = %s")
+        values.append(datetime.now())
+        values.append(user_id)
+        
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            fields = []
-            values = []
-            for key, value in kwargs.items():
-                if key == 'preferences':
-                    fields.append(f"{key} = %s")
-                    values.append(json.dumps(value) if isinstance(value, dict) else value)
-                else:
-                    fields.append(f"{key} = %s")
-                    values.append(value)
-            
-            if not fields:
-                return
-            
-            fields.append("last_updated = %s")
-            values.append(datetime.now())
-            values.append(user_id)
-            
-            query = f"UPDATE users SET {', '.join(fields)} WHERE id = %s"
-            cursor.execute(query, values)
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                query = f"UPDATE users SET {', '.join(fields)} WHERE id = %s"
+                cursor.execute(query, values)
+                conn.commit()
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating user: {e}")
     
     def update_password(self, user_id: int, new_password: str) -> bool:
         """Update user password"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
             password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
             
-            cursor.execute("""
-                UPDATE users 
-                SET password_hash = %s, last_updated = %s
-                WHERE id = %s
-            """, (password_hash, datetime.now(), user_id))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE users 
+                    SET password_hash = %s, last_updated = %s
+                    WHERE id = %s
+                """, (password_hash, datetime.now(), user_id))
+                conn.commit()
             return True
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating password: {e}")
             return False
     
     def update_filter_run_time(self, user_id: int):
         """Update the last filter run timestamp, shifting current to previous"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            now = datetime.now()
-            cursor.execute("""
-                UPDATE users
-                SET previous_filter_run = last_filter_run,
-                    last_filter_run = %s,
-                    last_updated = %s
-                WHERE id = %s
-            """, (now, now, user_id))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    UPDATE users
+                    SET previous_filter_run = last_filter_run,
+                        last_filter_run = %s,
+                        last_updated = %s
+                    WHERE id = %s
+                """, (now, now, user_id))
+                conn.commit()
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating filter run time: {e}")
     
     def update_preferences_time(self, user_id: int):
         """Update the preferences_updated timestamp"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            cursor.execute("""
-                UPDATE users 
-                SET preferences_updated = %s, last_updated = %s
-                WHERE id = %s
-            """, (now, now, user_id))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    UPDATE users 
+                    SET preferences_updated = %s, last_updated = %s
+                    WHERE id = %s
+                """, (now, now, user_id))
+                conn.commit()
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating preferences time: {e}")
     
     def get_all_active_users(self) -> List[Dict]:
         """Get all active users"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            
-            cursor.execute("SELECT * FROM users WHERE is_active = TRUE")
-            users = [dict(row) for row in cursor.fetchall()]
-            
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM users WHERE is_active = TRUE")
+                users = [dict(row) for row in cursor.fetchall()]
             
             for user in users:
                 if user.get('preferences'):
@@ -1248,34 +1176,22 @@ class PostgresCVManager:
             return users
             
         except Exception as e:
-            if 'cursor' in locals():
-                cursor.close()
-            if 'conn' in locals():
-                self._return_connection(conn)
             logger.error(f"Error getting active users: {e}")
             return []
     
     def archive_cv(self, cv_id: int):
         """Archive a CV (soft delete by setting status='archived')"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE cvs 
-                SET status = 'archived'
-                WHERE id = %s
-            """, (cv_id,))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE cvs 
+                    SET status = 'archived'
+                    WHERE id = %s
+                """, (cv_id,))
+                conn.commit()
+            stats_cache.invalidate_prefix('user_stats')
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error archiving CV: {e}")
     
     def update_cv_status(self, cv_id: int, status: str) -> bool:
@@ -1285,73 +1201,63 @@ class PostgresCVManager:
             True if successful, False otherwise
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE cvs 
-                SET status = %s
-                WHERE id = %s
-            """, (status, cv_id))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE cvs 
+                    SET status = %s
+                    WHERE id = %s
+                """, (status, cv_id))
+                conn.commit()
+            stats_cache.invalidate_prefix('user_stats')
             return True
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating CV status: {e}")
             return False
     
     def update_cv_profile(self, cv_id: int, profile_data: Dict):
         """Update CV profile data"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            now = datetime.now()
-            cursor.execute("""
-                UPDATE cv_profiles
-                SET technical_skills = %s, soft_skills = %s, languages = %s,
-                    education = %s, work_history = %s, achievements = %s,
-                    total_years_experience = %s, expertise_summary = %s, career_level = %s,
-                    preferred_roles = %s, industries = %s, raw_analysis = %s, projects = %s, last_updated = %s
-                WHERE cv_id = %s
-            """, (
-                json.dumps(profile_data.get('technical_skills', [])),
-                json.dumps(profile_data.get('soft_skills', [])),
-                json.dumps(profile_data.get('languages', [])),
-                json.dumps(profile_data.get('education', [])),
-                json.dumps(profile_data.get('work_experience', profile_data.get('work_history', []))),
-                json.dumps(profile_data.get('career_highlights', profile_data.get('achievements', []))),
-                profile_data.get('total_years_experience', 0),
-                profile_data.get('expertise_summary'),
-                profile_data.get('career_level'),
-                json.dumps(profile_data.get('preferred_roles', [])),
-                json.dumps(profile_data.get('industries', [])),
-                json.dumps({k: v for k, v in profile_data.items()
-                           if k not in ('full_text', 'created_date', 'last_updated', 'cv_id', 'user_id', 'id', 'is_primary')}),
-                json.dumps(profile_data.get('projects', [])),
-                now,
-                cv_id
-            ))
-            
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                now = datetime.now()
+                cursor.execute("""
+                    UPDATE cv_profiles
+                    SET technical_skills = %s, soft_skills = %s, languages = %s,
+                        education = %s, work_history = %s, achievements = %s,
+                        total_years_experience = %s, expertise_summary = %s, career_level = %s,
+                        preferred_roles = %s, industries = %s, raw_analysis = %s, projects = %s, last_updated = %s
+                    WHERE cv_id = %s
+                """, (
+                    json.dumps(profile_data.get('technical_skills', [])),
+                    json.dumps(profile_data.get('soft_skills', [])),
+                    json.dumps(profile_data.get('languages', [])),
+                    json.dumps(profile_data.get('education', [])),
+                    json.dumps(profile_data.get('work_experience', profile_data.get('work_history', []))),
+                    json.dumps(profile_data.get('career_highlights', profile_data.get('achievements', []))),
+                    profile_data.get('total_years_experience', 0),
+                    profile_data.get('expertise_summary'),
+                    profile_data.get('career_level'),
+                    json.dumps(profile_data.get('preferred_roles', [])),
+                    json.dumps(profile_data.get('industries', [])),
+                    json.dumps({k: v for k, v in profile_data.items()
+                               if k not in ('full_text', 'created_date', 'last_updated', 'cv_id', 'user_id', 'id', 'is_primary')}),
+                    json.dumps(profile_data.get('projects', [])),
+                    now,
+                    cv_id
+                ))
+
+                cursor.execute("SELECT user_id FROM cvs WHERE id = %s", (cv_id,))
+                cv_row = cursor.fetchone()
+                if cv_row:
+                    self._invalidate_match_maps(cursor, cv_row[0])
+                
+                conn.commit()
             
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating CV profile: {e}")
             print(f"CRITICAL SQL ERROR in update_cv_profile: {e}")
     
+    
     def get_cv_statistics(self, user_id: int) -> Dict:
         """Get CV statistics for a user - alias for get_user_statistics"""
         return self.get_user_statistics(user_id)
@@ -1390,58 +1296,50 @@ class PostgresCVManager:
         Returns:
             Number of rows inserted
         """
-        try:
-            # Ensure we have at least one title or location
-            if not title_keywords and not locations:
-                logger.warning("No title_keywords or locations provided")
-                return 0
-
-            # Default to [None] if not provided
-            titles = title_keywords or [None]
-            locs = locations or [None]
+        # Ensure we have at least one title or location
+        if not title_keywords and not locations:
+            logger.warning("No title_keywords or locations provided")
+            return 0
 
-            conn = self._get_connection()
-            cursor = conn.cursor()
+        # Default to [None] if not provided
+        titles = title_keywords or [None]
+        locs = locations or [None]
 
-            inserted_count = 0
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                inserted_count = 0
 
-            # Create all combinations of title × location
-            for title in titles:
-                for location in locs:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO user_search_queries (
-                                user_id, query_name, title_keyword, location,
+                # Create all combinations of title × location
+                for title in titles:
+                    for location in locs:
+                        try:
+                            cursor.execute("""
+                                INSERT INTO user_search_queries (
+                                    user_id, query_name, title_keyword, location,
+                                    ai_work_arrangement, ai_employment_type, ai_seniority, ai_industry,
+                                    priority
+                                )
+                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                                ON CONFLICT DO NOTHING
+                            """, (
+                                user_id, query_name, title, location,
                                 ai_work_arrangement, ai_employment_type, ai_seniority, ai_industry,
                                 priority
-                            )
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT DO NOTHING
-                        """, (
-                            user_id, query_name, title, location,
-                            ai_work_arrangement, ai_employment_type, ai_seniority, ai_industry,
-                            priority
-                        ))
-
-                        if cursor.rowcount > 0:
-                            inserted_count += 1
-
-                    except Exception as e:
-                        logger.warning(f"Could not insert query row (title={title}, loc={location}): {e}")
-                        continue
-
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                            ))
+
+                            if cursor.rowcount > 0:
+                                inserted_count += 1
+
+                        except Exception as e:
+                            logger.warning(f"Could not insert query row (title={title}, loc={location}): {e}")
+                            continue
+
+                conn.commit()
 
             logger.info(f"Added {inserted_count} search query rows for user {user_id} (query: {query_name})")
             return inserted_count
 
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error adding user search queries: {e}")
             return 0
 
@@ -1457,32 +1355,23 @@ class PostgresCVManager:
             List of query dictionaries
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            if active_only:
-                cursor.execute("""
-                    SELECT * FROM user_search_queries
-                    WHERE user_id = %s AND is_active = TRUE
-                    ORDER BY priority DESC, id ASC
-                """, (user_id,))
-            else:
-                cursor.execute("""
-                    SELECT * FROM user_search_queries
-                    WHERE user_id = %s
-                    ORDER BY priority DESC, id ASC
-                """, (user_id,))
-
-            queries = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                if active_only:
+                    cursor.execute("""
+                        SELECT * FROM user_search_queries
+                        WHERE user_id = %s AND is_active = TRUE
+                        ORDER BY priority DESC, id ASC
+                    """, (user_id,))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM user_search_queries
+                        WHERE user_id = %s
+                        ORDER BY priority DESC, id ASC
+                    """, (user_id,))
 
-            return [dict(q) for q in queries]
+                return [dict(q) for q in cursor.fetchall()]
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting user search queries: {e}")
             return []
 
@@ -1497,27 +1386,20 @@ class PostgresCVManager:
             True if successful, False otherwise
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                UPDATE user_search_queries
-                SET is_active = FALSE
-                WHERE user_id = %s
-            """, (user_id,))
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE user_search_queries
+                    SET is_active = FALSE
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            rows_affected = cursor.rowcount
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                rows_affected = cursor.rowcount
+                conn.commit()
 
             logger.info(f"Deactivated {rows_affected} search queries for user {user_id}")
             return True
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error deactivating queries for user {user_id}: {e}")
             return False
 
@@ -1536,49 +1418,41 @@ class PostgresCVManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Build update query dynamically
-            allowed_fields = [
-                'query_name', 'title_keywords', 'locations',
-                'ai_work_arrangement', 'ai_employment_type', 'ai_seniority', 'ai_industry',
-                'is_active', 'priority', 'max_results'
-            ]
-
-            updates = []
-            values = []
-
-            for field, value in kwargs.items():
-                if field in allowed_fields:
-                    updates.append(f"{field} = %s")
-                    values.append(value)
-
-            if not updates:
-                return False
-
-            values.append(query_id)
+        # Build update query dynamically
+        allowed_fields = [
+            'query_name', 'title_keywords', 'locations',
+            'ai_work_arrangement', 'ai_employment_type', 'ai_seniority', 'ai_industry',
+            'is_active', 'priority', 'max_results'
+        ]
+
+        updates = []
+        values = []
+
+        for field, value in kwargs.items():
+            if field in allowed_fields:
+                updates.append(f"{field} = %s")
+                values.append(value)
+
+        if not updates:
+            return False
 
-            conn = self._get_connection()
-            cursor = conn.cursor()
+        values.append(query_id)
 
-            query = f"""
-                UPDATE user_search_queries
-                SET {', '.join(updates)}
-                WHERE id = %s
-            """
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                query = f"""
+                    UPDATE user_search_queries
+                    SET {', '.join(updates)}
+                    WHERE id = %s
+                """
 
-            cursor.execute(query, values)
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                cursor.execute(query, values)
+                conn.commit()
 
             logger.info(f"Updated search query {query_id}")
             return True
 
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating search query: {e}")
             return False
 
@@ -1593,23 +1467,14 @@ class PostgresCVManager:
             True if successful, False otherwise
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM user_search_queries WHERE id = %s", (query_id,))
-
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM user_search_queries WHERE id = %s", (query_id,))
+                conn.commit()
 
             logger.info(f"Deleted search query {query_id}")
             return True
 
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error deleting search query: {e}")
             return False
 
@@ -1630,37 +1495,30 @@ class PostgresCVManager:
             List of unique query combination dictionaries
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            # Get distinct combinations - this is where deduplication happens!
-            cursor.execute("""
-                SELECT DISTINCT
-                    title_keyword,
-                    location,
-                    ai_work_arrangement,
-                    ai_employment_type,
-                    ai_seniority,
-                    ai_industry,
-                    MAX(priority) as max_priority
-                FROM user_search_queries
-                WHERE is_active = TRUE
-                GROUP BY title_keyword, location, ai_work_arrangement,
-                         ai_employment_type, ai_seniority, ai_industry
-                ORDER BY max_priority DESC
-            """)
-
-            combinations = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Get distinct combinations - this is where deduplication happens!
+                cursor.execute("""
+                    SELECT DISTINCT
+                        title_keyword,
+                        location,
+                        ai_work_arrangement,
+                        ai_employment_type,
+                        ai_seniority,
+                        ai_industry,
+                        MAX(priority) as max_priority
+                    FROM user_search_queries
+                    WHERE is_active = TRUE
+                    GROUP BY title_keyword, location, ai_work_arrangement,
+                             ai_employment_type, ai_seniority, ai_industry
+                    ORDER BY max_priority DESC
+                """)
+
+                combinations = cursor.fetchall()
 
             logger.info(f"Found {len(combinations)} unique query combinations across all users")
             return [dict(c) for c in combinations]
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting unique query combinations: {e}")
             return []
 
@@ -1674,30 +1532,21 @@ class PostgresCVManager:
             List of all query rows with user info
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            cursor.execute("""
-                SELECT
-                    q.*,
-                    u.email as user_email,
-                    u.name as user_name
-                FROM user_search_queries q
-                JOIN users u ON q.user_id = u.id
-                WHERE q.is_active = TRUE
-                ORDER BY q.priority DESC, q.user_id ASC, q.id ASC
-            """)
-
-            queries = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
-
-            return [dict(q) for q in queries]
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT
+                        q.*,
+                        u.email as user_email,
+                        u.name as user_name
+                    FROM user_search_queries q
+                    JOIN users u ON q.user_id = u.id
+                    WHERE q.is_active = TRUE
+                    ORDER BY q.priority DESC, q.user_id ASC, q.id ASC
+                """)
+
+                return [dict(q) for q in cursor.fetchall()]
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting all active queries: {e}")
             return []
 
@@ -1713,27 +1562,18 @@ class PostgresCVManager:
             True if successful, False otherwise
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                UPDATE user_search_queries
-                SET last_run_date = NOW(),
-                    last_job_count = %s
-                WHERE id = %s
-            """, (job_count, query_id))
-
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE user_search_queries
+                    SET last_run_date = NOW(),
+                        last_job_count = %s
+                    WHERE id = %s
+                """, (job_count, query_id))
+                conn.commit()
 
             return True
 
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error updating query stats: {e}")
             return False
 
@@ -1750,43 +1590,36 @@ class PostgresCVManager:
             List of combinations needing backfill
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            # Get user's unique combinations that are NOT in backfill_tracking
-            cursor.execute("""
-                SELECT DISTINCT
-                    usq.title_keyword,
-                    usq.location,
-                    usq.ai_work_arrangement,
-                    usq.ai_employment_type,
-                    usq.ai_seniority,
-                    usq.ai_industry
-                FROM user_search_queries usq
-                LEFT JOIN backfill_tracking bt ON (
-                    (usq.title_keyword = bt.title_keyword OR (usq.title_keyword IS NULL AND bt.title_keyword IS NULL))
-                    AND (usq.location = bt.location OR (usq.location IS NULL AND bt.location IS NULL))
-                    AND (usq.ai_work_arrangement = bt.ai_work_arrangement OR (usq.ai_work_arrangement IS NULL AND bt.ai_work_arrangement IS NULL))
-                    AND (usq.ai_employment_type = bt.ai_employment_type OR (usq.ai_employment_type IS NULL AND bt.ai_employment_type IS NULL))
-                    AND (usq.ai_seniority = bt.ai_seniority OR (usq.ai_seniority IS NULL AND bt.ai_seniority IS NULL))
-                    AND (usq.ai_industry = bt.ai_industry OR (usq.ai_industry IS NULL AND bt.ai_industry IS NULL))
-                )
-                WHERE usq.user_id = %s
-                  AND usq.is_active = TRUE
-                  AND bt.id IS NULL
-            """, (user_id,))
-
-            combinations = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Get user's unique combinations that are NOT in backfill_tracking
+                cursor.execute("""
+                    SELECT DISTINCT
+                        usq.title_keyword,
+                        usq.location,
+                        usq.ai_work_arrangement,
+                        usq.ai_employment_type,
+                        usq.ai_seniority,
+                        usq.ai_industry
+                    FROM user_search_queries usq
+                    LEFT JOIN backfill_tracking bt ON (
+                        (usq.title_keyword = bt.title_keyword OR (usq.title_keyword IS NULL AND bt.title_keyword IS NULL))
+                        AND (usq.location = bt.location OR (usq.location IS NULL AND bt.location IS NULL))
+                        AND (usq.ai_work_arrangement = bt.ai_work_arrangement OR (usq.ai_work_arrangement IS NULL AND bt.ai_work_arrangement IS NULL))
+                        AND (usq.ai_employment_type = bt.ai_employment_type OR (usq.ai_employment_type IS NULL AND bt.ai_employment_type IS NULL))
+                        AND (usq.ai_seniority = bt.ai_seniority OR (usq.ai_seniority IS NULL AND bt.ai_seniority IS NULL))
+                        AND (usq.ai_industry = bt.ai_industry OR (usq.ai_industry IS NULL AND bt.ai_industry IS NULL))
+                    )
+                    WHERE usq.user_id = %s
+                      AND usq.is_active = TRUE
+                      AND bt.id IS NULL
+                """, (user_id,))
+
+                combinations = cursor.fetchall()
 
             logger.info(f"Found {len(combinations)} unbacked combinations for user {user_id}")
             return [dict(c) for c in combinations]
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting unbacked combinations: {e}")
             return []
 
@@ -1816,38 +1649,74 @@ class PostgresCVManager:
             True if successful
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO backfill_tracking (
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO backfill_tracking (
+                        title_keyword, location, ai_work_arrangement,
+                        ai_employment_type, ai_seniority, ai_industry,
+                        jobs_found
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                """, (
                     title_keyword, location, ai_work_arrangement,
                     ai_employment_type, ai_seniority, ai_industry,
                     jobs_found
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT DO NOTHING
-            """, (
-                title_keyword, location, ai_work_arrangement,
-                ai_employment_type, ai_seniority, ai_industry,
-                jobs_found
-            ))
-
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                ))
+                conn.commit()
 
             logger.info(f"Marked as backfilled: {title_keyword} in {location}")
             return True
 
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error marking combination as backfilled: {e}")
             return False
 
+    def mark_combinations_backfilled(self, combinations: List[Dict], jobs_found: int = 0) -> int:
+        """
+        Mark many combinations as backfilled in one statement
+
+        Args:
+            combinations: Rows from get_unbacked_combinations_for_user()
+            jobs_found: Number of jobs found (recorded on every row)
+
+        Returns:
+            Number of combinations newly marked
+        """
+        if not combinations:
+            return 0
+
+        from psycopg2.extras import execute_values
+
+        values = [
+            (
+                c.get('title_keyword'), c.get('location'), c.get('ai_work_arrangement'),
+                c.get('ai_employment_type'), c.get('ai_seniority'), c.get('ai_industry'),
+                jobs_found
+            )
+            for c in combinations
+        ]
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO backfill_tracking (
+                        title_keyword, location, ai_work_arrangement,
+                        ai_employment_type, ai_seniority, ai_industry,
+                        jobs_found
+                    )
+                    VALUES %s
+                    ON CONFLICT DO NOTHING
+                """, values, page_size=len(values))
+                marked = cursor.rowcount
+                conn.commit()
+
+            logger.info(f"Marked {marked} of {len(values)} combinations as backfilled")
+            return marked
+
+        except Exception as e:
+            logger.error(f"Error marking combinations as backfilled: {e}")
+            return 0
+
     def is_combination_backfilled(
         self,
         title_keyword: str = None,
@@ -1868,34 +1737,25 @@ class PostgresCVManager:
             True if already backfilled
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT EXISTS(
-                    SELECT 1 FROM backfill_tracking
-                    WHERE (title_keyword = %s OR (title_keyword IS NULL AND %s IS NULL))
-                      AND (location = %s OR (location IS NULL AND %s IS NULL))
-                      AND (ai_work_arrangement = %s OR (ai_work_arrangement IS NULL AND %s IS NULL))
-                      AND (ai_seniority = %s OR (ai_seniority IS NULL AND %s IS NULL))
-                )
-            """, (
-                title_keyword, title_keyword,
-                location, location,
-                ai_work_arrangement, ai_work_arrangement,
-                ai_seniority, ai_seniority
-            ))
-
-            exists = cursor.fetchone()[0]
-            cursor.close()
-            self._return_connection(conn)
-
-            return exists
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT EXISTS(
+                        SELECT 1 FROM backfill_tracking
+                        WHERE (title_keyword = %s OR (title_keyword IS NULL AND %s IS NULL))
+                          AND (location = %s OR (location IS NULL AND %s IS NULL))
+                          AND (ai_work_arrangement = %s OR (ai_work_arrangement IS NULL AND %s IS NULL))
+                          AND (ai_seniority = %s OR (ai_seniority IS NULL AND %s IS NULL))
+                    )
+                """, (
+                    title_keyword, title_keyword,
+                    location, location,
+                    ai_work_arrangement, ai_work_arrangement,
+                    ai_seniority, ai_seniority
+                ))
+
+                return cursor.fetchone()[0]
 
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error checking if combination is backfilled: {e}")
             return False
 
@@ -1909,21 +1769,48 @@ class PostgresCVManager:
         Returns:
             Set of job_id strings for deleted jobs
         """
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT job_id FROM jobs WHERE status = 'deleted'")
-            deleted_ids = {row[0] for row in cursor.fetchall()}
-            cursor.close()
-            self._return_connection(conn)
-            return deleted_ids
+            with self._connection() as conn, conn.cursor() as cursor:
+                archived = ("UNION SELECT job_id FROM jobs_archive WHERE status = 'deleted'"
+                            if archive_exists(cursor) else "")
+                cursor.execute(f"""
+                    SELECT job_id FROM jobs WHERE status = 'deleted'
+                    {archived}
+                """)
+                return {row[0] for row in cursor.fetchall()}
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting deleted job IDs: {e}")
             return set()
 
+    def find_deleted_job_ids(self, job_ids: List[str]) -> set:
+        """
+        Which of these job_ids have been deleted/hidden
+
+        Checks only the candidates (one = ANY query on the unique job_id
+        index) instead of loading every deleted id like get_deleted_job_ids().
+
+        Returns:
+            Subset of job_ids whose jobs (active or archived) have status 'deleted'
+        """
+        ids = list({job_id for job_id in job_ids if job_id})
+        if not ids:
+            return set()
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                if archive_exists(cursor):
+                    cursor.execute("""
+                        SELECT job_id FROM jobs WHERE job_id = ANY(%s) AND status = 'deleted'
+                        UNION
+                        SELECT job_id FROM jobs_archive WHERE job_id = ANY(%s) AND status = 'deleted'
+                    """, (ids, ids))
+                else:
+                    cursor.execute("SELECT job_id FROM jobs WHERE job_id = ANY(%s) AND status = 'deleted'",
+                                   (ids,))
+                return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error checking deleted job IDs: {e}")
+            return set()
+
     def add_job(self, job_data: Dict) -> Optional[int]:
         """
         Add a new job to the database
@@ -1934,70 +1821,67 @@ class PostgresCVManager:
         Returns:
             Job ID if successful, None if job already exists or error occurred
         """
-        try:
-            from datetime import datetime
-            import json
-            import psycopg2
+        now = datetime.now()
 
-            now = datetime.now()
-            conn = self._get_connection()
-            cursor = conn.cursor()
+        # Parse posted_date if it's a string
+        posted_date = job_data.get('posted_date')
+        if isinstance(posted_date, str):
+            try:
+                posted_date = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
+            except:
+                posted_date = None
 
-            # Parse posted_date if it's a string
-            posted_date = job_data.get('posted_date')
-            if isinstance(posted_date, str):
-                try:
-                    posted_date = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
-                except:
-                    posted_date = None
-
-            cursor.execute("""
-                INSERT INTO jobs (
-                    job_id, source, title, company, location, description,
-                    url, posted_date, salary, discovered_date, last_updated,
-                    match_score, match_reasoning, key_alignments, potential_gaps,
-                    priority, status,
-                    ai_employment_type, ai_work_arrangement, ai_seniority, ai_industry
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                job_data.get('job_id') or job_data.get('external_id'),
-                job_data.get('source'),
-                job_data.get('title'),
-                job_data.get('company'),
-                job_data.get('location'),
-                job_data.get('description'),
-                job_data.get('url'),
-                posted_date,
-                job_data.get('salary'),
-                now,
-                now,
-                job_data.get('match_score'),
-                job_data.get('match_reasoning') or job_data.get('reasoning'),
-                json.dumps(job_data.get('key_alignments', [])),
-                json.dumps(job_data.get('potential_gaps', [])),
-                job_data.get('priority', 'medium'),
-                'new',
-                job_data.get('ai_employment_type'),
-                job_data.get('ai_work_arrangement'),
-                job_data.get('ai_seniority'),
-                job_data.get('ai_industry')
-            ))
-
-            job_id = cursor.fetchone()[0]
-            conn.commit()
-            return job_id
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                # Archived postings stay out (src.database.job_archive)
+                if archive_exists(cursor):
+                    cursor.execute("SELECT 1 FROM jobs_archive WHERE job_id = %s",
+                                   (job_data.get('job_id') or job_data.get('external_id'),))
+                    if cursor.fetchone():
+                        return None
+
+                cursor.execute("""
+                    INSERT INTO jobs (
+                        job_id, source, title, company, location, description,
+                        url, posted_date, salary, discovered_date, last_updated,
+                        match_score, match_reasoning, key_alignments, potential_gaps,
+                        priority, status,
+                        ai_employment_type, ai_work_arrangement, ai_seniority, ai_industry
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
+                    job_data.get('job_id') or job_data.get('external_id'),
+                    job_data.get('source'),
+                    job_data.get('title'),
+                    job_data.get('company'),
+                    job_data.get('location'),
+                    job_data.get('description'),
+                    job_data.get('url'),
+                    posted_date,
+                    job_data.get('salary'),
+                    now,
+                    now,
+                    job_data.get('match_score'),
+                    job_data.get('match_reasoning') or job_data.get('reasoning'),
+                    json.dumps(job_data.get('key_alignments', [])),
+                    json.dumps(job_data.get('potential_gaps', [])),
+                    job_data.get('priority', 'medium'),
+                    'new',
+                    job_data.get('ai_employment_type'),
+                    job_data.get('ai_work_arrangement'),
+                    job_data.get('ai_seniority'),
+                    job_data.get('ai_industry')
+                ))
+
+                job_id = cursor.fetchone()[0]
+                conn.commit()
+                return job_id
 
         except psycopg2.IntegrityError:
-            conn.rollback()
             return None  # Job already exists
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error adding job: {e}")
             return None
-        finally:
-            cursor.close()
-            self._return_connection(conn)
 
     def close(self):
         """Close method for compatibility - connection pool managed by PostgresDatabase"""
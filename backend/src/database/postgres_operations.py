@@ -5,19 +5,104 @@ Compatible interface with SQLite operations
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2 import pool
 import json
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
 import os
+import re
+import time
 import logging
+import threading
+
+from src.utils.stats_cache import stats_cache
+from src.analysis.learning_profile import (
+    PROFILE_FORMAT, REBUILD_LIMIT, apply_feedback, build_profile, cache_key as learning_cache_key, learning_cache
+)
+from .connection_pool import ConnectionPool
+from .work_queue import SCHEMA_SQL as ENRICHMENT_QUEUE_SCHEMA, INDEX_SQL as ENRICHMENT_QUEUE_INDEX
+from .job_archive import archive_exists
+from .job_search import build_search_query, select_columns, FALLBACK_DOCUMENT
 
 logger = logging.getLogger(__name__)
 
+# (table -> {column: SQL type}) used to type VALUES lists in bulk updates
+_column_types_cache: Dict[str, Dict[str, str]] = {}
+
+# Dashboard counters as (dimension, value, count) rows. Refreshed after job
+# ingestion (refresh_statistics) and in the background once older than
+# STATS_REFRESH_SECONDS, so page loads never aggregate the jobs table.
+# (dimension, value) is unique, which REFRESH ... CONCURRENTLY requires, so
+# nullable columns are grouped by the same COALESCE they emit.
+STATS_ROLLUP_SELECT = """
+    SELECT 'source' AS dimension, COALESCE(source, '') AS value, COUNT(*) AS count
+    FROM jobs GROUP BY COALESCE(source, '')
+    UNION ALL
+    SELECT 'work_arrangement', ai_work_arrangement, COUNT(*)
+    FROM jobs WHERE ai_work_arrangement IS NOT NULL GROUP BY ai_work_arrangement
+    UNION ALL
+    SELECT 'experience_level', ai_experience_level, COUNT(*)
+    FROM jobs WHERE ai_experience_level IS NOT NULL GROUP BY ai_experience_level
+    UNION ALL
+    SELECT 'priority', priority, COUNT(*)
+    FROM jobs WHERE priority IS NOT NULL GROUP BY priority
+    UNION ALL
+    SELECT 'discovered_on', DATE(discovered_date)::text, COUNT(*)
+    FROM jobs WHERE discovered_date >= CURRENT_DATE - 30 GROUP BY DATE(discovered_date)
+    UNION ALL
+    SELECT 'jobs', 'last_24h', COUNT(*)
+    FROM jobs WHERE discovered_date >= NOW() - INTERVAL '24 hours'
+    UNION ALL
+    (SELECT 'company', COALESCE(company, ''), COUNT(*) FROM jobs
+     GROUP BY COALESCE(company, '') ORDER BY 3 DESC LIMIT 10)
+    UNION ALL
+    (SELECT 'location', location, COUNT(*) FROM jobs
+     WHERE location IS NOT NULL AND location != ''
+     GROUP BY location ORDER BY 3 DESC LIMIT 10)
+    UNION ALL
+    SELECT 'match_range',
+           CASE WHEN semantic_score >= 85 THEN '85-100%'
+                WHEN semantic_score >= 70 THEN '70-84%'
+                WHEN semantic_score >= 50 THEN '50-69%'
+                ELSE '30-49%' END,
+           COUNT(*)
+    FROM user_job_matches WHERE semantic_score IS NOT NULL GROUP BY 2
+    UNION ALL
+    SELECT 'matches', 'total', COUNT(*) FROM user_job_matches
+    UNION ALL
+    SELECT 'matches', 'today', COUNT(*) FROM user_job_matches WHERE matched_date >= CURRENT_DATE
+    UNION ALL
+    SELECT 'claude', 'total', COUNT(*) FROM user_job_matches WHERE claude_score IS NOT NULL
+    UNION ALL
+    SELECT 'claude', 'today', COUNT(*) FROM user_job_matches
+    WHERE claude_score IS NOT NULL AND matched_date >= CURRENT_DATE
+    UNION ALL
+    SELECT 'users', 'total', COUNT(*) FROM users
+    UNION ALL
+    SELECT 'cvs', 'total', COUNT(*) FROM cvs
+    UNION ALL
+    SELECT 'meta', 'refreshed_at', EXTRACT(EPOCH FROM NOW())::bigint
+"""
+
+STATS_ROLLUP_SQL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS stats_rollup AS
+    {STATS_ROLLUP_SELECT}
+    WITH NO DATA
+"""
+
+STATS_ROLLUP_INDEX = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_stats_rollup_key
+    ON stats_rollup(dimension, value)
+"""
+
+STATS_REFRESH_SECONDS = int(os.getenv('STATS_REFRESH_SECONDS', '900'))
+
 
 class PostgresDatabase:
     """PostgreSQL database operations - compatible with JobDatabase interface"""
     
+    # One stats_rollup refresh at a time per process
+    _refresh_lock = threading.Lock()
+    
     def __init__(self, database_url: str):
         """
         Initialize PostgreSQL connection pool
@@ -27,12 +112,15 @@ class PostgresDatabase:
         """
         self.database_url = database_url
         
-        # Create connection pool for better performance
+        # Thread-safe pool shared with PostgresCVManager/PostgresResumeOperations,
+        # request threads, background matching and fetch workers
         try:
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
+            self.connection_pool = ConnectionPool(
+                database_url,
                 minconn=1,
-                maxconn=10,
-                dsn=database_url
+                maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+                checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                leak_threshold=float(os.getenv('DB_POOL_LEAK_SECONDS', '300'))
             )
             logger.info("PostgreSQL connection pool created successfully")
         except Exception as e:
@@ -42,19 +130,21 @@ class PostgresDatabase:
         self._create_tables()
     
     def _get_connection(self):
-        """Get a connection from the pool"""
+        """Get a connection from the pool (blocks up to the pool's checkout timeout)"""
         return self.connection_pool.getconn()
     
     def _return_connection(self, conn):
         """Return connection to pool"""
         self.connection_pool.putconn(conn)
     
+    def _connection(self):
+        """Context manager: pooled connection, rolled back on error and always returned"""
+        return self.connection_pool.connection()
+    
     def _create_tables(self):
         """Create database tables if they don't exist"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            
+        with self._connection() as conn, conn.cursor() as cursor:
+        
             # Jobs table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -79,7 +169,7 @@ class PostgresDatabase:
                     notes TEXT
                 )
             """)
-            
+        
             # Search history table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS search_history (
@@ -92,7 +182,7 @@ class PostgresDatabase:
                     execution_time REAL
                 )
             """)
-            
+        
             # Application tracking table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS applications (
@@ -107,7 +197,7 @@ class PostgresDatabase:
                     FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE
                 )
             """)
-            
+        
             # Job feedback table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS job_feedback (
@@ -122,7 +212,7 @@ class PostgresDatabase:
                     FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE
                 )
             """)
-            
+        
             # Users table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -140,7 +230,7 @@ class PostgresDatabase:
                     preferences_updated TIMESTAMP
                 )
             """)
-            
+        
             # CVs table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS cvs (
@@ -158,7 +248,7 @@ class PostgresDatabase:
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
                 )
             """)
-            
+        
             # CV Profiles table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS cv_profiles (
@@ -183,7 +273,7 @@ class PostgresDatabase:
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
                 )
             """)
-            
+        
             # User-Job matches table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS user_job_matches (
@@ -205,43 +295,78 @@ class PostgresDatabase:
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
                 )
             """)
-            
+        
+            # Materialized feedback learning profiles (src.analysis.learning_profile)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_learning_profiles (
+                    user_email TEXT PRIMARY KEY,
+                    profile JSONB NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    updated_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+        
+            # Enrichment work-queue claims (src.database.work_queue)
+            cursor.execute(ENRICHMENT_QUEUE_SCHEMA)
+            cursor.execute(ENRICHMENT_QUEUE_INDEX)
+        
+            # LLM call telemetry (written by src.utils.llm_telemetry)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id SERIAL PRIMARY KEY,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    user_id INTEGER,
+                    provider TEXT NOT NULL,
+                    model TEXT,
+                    operation TEXT,
+                    input_tokens INTEGER DEFAULT 0,
+                    output_tokens INTEGER DEFAULT 0,
+                    latency_ms INTEGER,
+                    batch_size INTEGER,
+                    cache_hit BOOLEAN DEFAULT FALSE,
+                    cost_usd NUMERIC(12, 6) DEFAULT 0,
+                    error TEXT
+                )
+            """)
+        
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_llm_calls_user_date
+                ON llm_calls(user_id, created_at)
+            """)
+        
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_llm_calls_date
+                ON llm_calls(created_at)
+            """)
+        
             # Indexes
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_user_job_matches_user 
                 ON user_job_matches(user_id)
             """)
-            
+        
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_user_job_matches_job 
                 ON user_job_matches(job_id)
             """)
-            
+        
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_user_job_matches_scores 
                 ON user_job_matches(user_id, semantic_score, claude_score)
             """)
-            
+        
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_jobs_external_id
                 ON jobs(external_id)
             """)
-            
+        
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_jobs_source 
                 ON jobs(source)
             """)
-            
+        
             conn.commit()
             logger.info("PostgreSQL tables created successfully")
-            
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error creating PostgreSQL tables: {e}")
-            raise
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def add_job(self, job_data: Dict[str, Any]) -> Optional[int]:
         """
@@ -255,81 +380,185 @@ class PostgresDatabase:
         """
         try:
             now = datetime.now()
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            # Parse posted_date if it's a string
-            posted_date = job_data.get('posted_date')
-            if isinstance(posted_date, str):
-                try:
-                    posted_date = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
-                except:
-                    posted_date = None
-
-            # Helper to safely get lists
-            def get_list(key, default=None):
-                val = job_data.get(key, default)
-                return val if isinstance(val, list) else default
+            with self._connection() as conn, conn.cursor() as cursor:
+
+                # Archived postings stay out (src.database.job_archive)
+                if archive_exists(cursor):
+                    cursor.execute("SELECT 1 FROM jobs_archive WHERE external_id = %s",
+                                   (job_data.get('external_id'),))
+                    if cursor.fetchone():
+                        return None
+
+                # Parse posted_date if it's a string
+                posted_date = job_data.get('posted_date')
+                if isinstance(posted_date, str):
+                    try:
+                        posted_date = datetime.fromisoformat(posted_date.replace('Z', '+00:00'))
+                    except:
+                        posted_date = None
 
-            cursor.execute("""
-                INSERT INTO jobs (
-                    external_id, title, company, location, description, url, source,
-                    source_domain, source_type,
-                    posted_date, salary, employment_type, remote,
-                    organization_url, organization_logo,
-                    locations_derived, cities_derived,
-                    ai_employment_type, ai_work_arrangement, ai_experience_level,
-                    ai_key_skills, ai_keywords, ai_taxonomies_a,
-                    ai_core_responsibilities, ai_requirements_summary,
-                    discovered_date, last_updated
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (external_id) DO UPDATE SET
-                    last_updated = EXCLUDED.last_updated
-                RETURNING id
-            """, (
-                job_data.get('external_id'),
-                job_data.get('title'),
-                job_data.get('company'),
-                job_data.get('location'),
-                job_data.get('description'),
-                job_data.get('url'),
-                job_data.get('source'),
-                job_data.get('source_domain'),
-                job_data.get('source_type'),
-                posted_date,
-                job_data.get('salary'),
-                job_data.get('employment_type'),
-                job_data.get('remote', False),
-                job_data.get('organization_url'),
-                job_data.get('organization_logo'),
-                get_list('locations_derived', []),
-                get_list('cities_derived', []),
-                get_list('ai_employment_type', []),
-                job_data.get('ai_work_arrangement'),
-                job_data.get('ai_seniority') or job_data.get('ai_experience_level'),  # Handle both names
-                get_list('ai_key_skills', []),
-                get_list('ai_keywords', []),
-                get_list('ai_industry', []) if isinstance(job_data.get('ai_industry'), list) else get_list('ai_taxonomies_a', []),
-                job_data.get('ai_core_responsibilities'),
-                job_data.get('ai_requirements_summary'),
-                now,
-                now
-            ))
-
-            job_id = cursor.fetchone()[0]
-            conn.commit()
-            return job_id
+                # Helper to safely get lists
+                def get_list(key, default=None):
+                    val = job_data.get(key, default)
+                    return val if isinstance(val, list) else default
+
+                cursor.execute("""
+                    INSERT INTO jobs (
+                        external_id, title, company, location, description, url, source,
+                        source_domain, source_type,
+                        posted_date, salary, employment_type, remote,
+                        organization_url, organization_logo,
+                        locations_derived, cities_derived,
+                        ai_employment_type, ai_work_arrangement, ai_experience_level,
+                        ai_key_skills, ai_keywords, ai_taxonomies_a,
+                        ai_core_responsibilities, ai_requirements_summary,
+                        discovered_date, last_updated
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (external_id) DO UPDATE SET
+                        last_updated = EXCLUDED.last_updated
+                    RETURNING id
+                """, (
+                    job_data.get('external_id'),
+                    job_data.get('title'),
+                    job_data.get('company'),
+                    job_data.get('location'),
+                    job_data.get('description'),
+                    job_data.get('url'),
+                    job_data.get('source'),
+                    job_data.get('source_domain'),
+                    job_data.get('source_type'),
+                    posted_date,
+                    job_data.get('salary'),
+                    job_data.get('employment_type'),
+                    job_data.get('remote', False),
+                    job_data.get('organization_url'),
+                    job_data.get('organization_logo'),
+                    get_list('locations_derived', []),
+                    get_list('cities_derived', []),
+                    get_list('ai_employment_type', []),
+                    job_data.get('ai_work_arrangement'),
+                    job_data.get('ai_seniority') or job_data.get('ai_experience_level'),  # Handle both names
+                    get_list('ai_key_skills', []),
+                    get_list('ai_keywords', []),
+                    get_list('ai_industry', []) if isinstance(job_data.get('ai_industry'), list) else get_list('ai_taxonomies_a', []),
+                    job_data.get('ai_core_responsibilities'),
+                    job_data.get('ai_requirements_summary'),
+                    now,
+                    now
+                ))
 
+                job_id = cursor.fetchone()[0]
+                conn.commit()
+                return job_id
         except psycopg2.IntegrityError:
-            conn.rollback()
             return None
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error adding job: {e}")
             return None
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+
+    @staticmethod
+    def _get_column_types(cursor, table: str, columns: Iterable[str] = ()) -> Dict[str, str]:
+        """{column: SQL type} for table, cached; reloaded if any of columns is unknown"""
+        types = _column_types_cache.get(table)
+        if types is None or any(c not in types for c in columns):
+            cursor.execute("""
+                SELECT attname, format_type(atttypid, atttypmod)
+                FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+            """, (table,))
+            # Plain or RealDictCursor rows
+            types = dict(tuple(row.values()) if isinstance(row, dict) else row
+                         for row in cursor.fetchall())
+            _column_types_cache[table] = types
+        return types
+    
+    @classmethod
+    def _job_columns(cls, cursor, alias: str = None, table: str = 'jobs') -> str:
+        """SELECT list for job rows, without search-only columns (see job_search.select_columns)"""
+        return select_columns(cls._get_column_types(cursor, table), alias)
+    
+    @staticmethod
+    def execute_bulk_update(cursor, table: str, key_columns, rows: List[Dict[str, Any]],
+                            extra_set: str = None, page_size: int = 1000) -> int:
+        """
+        Apply many keyed row updates with one UPDATE ... FROM (VALUES ...) per page
+
+        Runs on the caller's cursor and does not commit, so it also works on
+        raw psycopg2 connections used by scripts.
+
+        Args:
+            cursor: psycopg2 cursor
+            table: Table to update
+            key_columns: Column name (or list) identifying each row
+            rows: Dicts with the key column(s) and the columns to set; every
+                row must have the same keys
+            extra_set: Additional SET clause applied to every row
+                (e.g. "last_updated = NOW()")
+            page_size: Rows per statement
+
+        Returns:
+            Number of rows updated
+        """
+        from psycopg2.extras import execute_values
+
+        if not rows:
+            return 0
+        keys = [key_columns] if isinstance(key_columns, str) else list(key_columns)
+        columns = list(rows[0].keys())
+        set_columns = [c for c in columns if c not in keys]
+        for name in [table] + columns:
+            if not re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', name):
+                raise ValueError(f"Invalid identifier for bulk update: {name}")
+        if not set_columns or any(k not in columns for k in keys):
+            raise ValueError("Bulk update rows need the key column(s) and at least one column to set")
+
+        # VALUES lists infer types from their first row; cast every column to
+        # the table's type so NULLs, empty arrays and jsonb text behave
+        types = PostgresDatabase._get_column_types(cursor, table, columns)
+        missing = [c for c in columns if c not in types]
+        if missing:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(missing)}")
+
+        assignments = [f"{c} = v.{c}" for c in set_columns]
+        if extra_set:
+            assignments.append(extra_set)
+        query = f"""
+            UPDATE {table} AS t
+            SET {', '.join(assignments)}
+            FROM (VALUES %s) AS v({', '.join(columns)})
+            WHERE {' AND '.join(f't.{k} = v.{k}' for k in keys)}
+        """
+        template = '(' + ', '.join(f'%s::{types[c]}' for c in columns) + ')'
+
+        updated = 0
+        for start in range(0, len(rows), page_size):
+            page = rows[start:start + page_size]
+            execute_values(cursor, query, [tuple(row[c] for c in columns) for row in page],
+                           template=template, page_size=len(page))
+            updated += cursor.rowcount
+        return updated
+
+    def bulk_update(self, table: str, key_columns, rows: List[Dict[str, Any]],
+                    extra_set: str = None, page_size: int = 1000) -> int:
+        """
+        Apply many keyed row updates in one transaction (see execute_bulk_update)
+
+        Returns:
+            Number of rows updated (0 on error, which is logged and rolled back)
+        """
+        if not rows:
+            return 0
+
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
+                updated = self.execute_bulk_update(cursor, table, key_columns, rows,
+                                                   extra_set=extra_set, page_size=page_size)
+                conn.commit()
+                return updated
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Bulk update of {len(rows)} {table} rows failed: {e}")
+                return 0
 
     def update_jobs_competencies_batch(self, jobs_data: list) -> int:
         """
@@ -342,93 +571,126 @@ class PostgresDatabase:
         Returns:
             Number of jobs updated
         """
-        if not jobs_data:
-            return 0
+        rows = [
+            {
+                'id': job_data['job_id'],
+                'ai_competencies': job_data.get('ai_competencies') or [],
+                'ai_key_skills': job_data.get('ai_key_skills') or []
+            }
+            for job_data in jobs_data
+        ]
+        return self.bulk_update('jobs', 'id', rows, extra_set='last_updated = NOW()')
 
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            updated_count = 0
+    def update_job_embeddings_batch(self, embeddings: List[Dict]) -> int:
+        """
+        Store JobBERT title embeddings for many jobs at once
 
-            for job_data in jobs_data:
-                try:
-                    cursor.execute("""
-                        UPDATE jobs
-                        SET
-                            ai_competencies = %s,
-                            ai_key_skills = %s,
-                            last_updated = %s
-                        WHERE id = %s
-                    """, (
-                        job_data.get('ai_competencies', []),
-                        job_data.get('ai_key_skills', []),
-                        datetime.now(),
-                        job_data['job_id']
-                    ))
-                    updated_count += cursor.rowcount
-                except Exception as e:
-                    logger.error(f"Failed to update job {job_data.get('job_id')}: {e}")
-                    continue
+        Args:
+            embeddings: List of dicts with job_id and embedding (numpy array or list)
 
-            conn.commit()
-            return updated_count
+        Returns:
+            Number of jobs updated
+        """
+        rows = [
+            {
+                'id': e['job_id'],
+                'embedding_jobbert_title': json.dumps(
+                    e['embedding'].tolist() if hasattr(e['embedding'], 'tolist') else list(e['embedding'])
+                )
+            }
+            for e in embeddings
+        ]
+        return self.bulk_update('jobs', 'id', rows, extra_set='embedding_date = NOW()')
 
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Batch competency update failed: {e}")
-            return 0
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+    def update_job_description_embeddings_batch(self, embeddings: List[Dict]) -> int:
+        """
+        Store pooled description embeddings (src.matching.description_embeddings)
+
+        Args:
+            embeddings: List of dicts with job_id and embedding (numpy array or list)
+
+        Returns:
+            Number of jobs updated
+        """
+        rows = [
+            {
+                'id': e['job_id'],
+                'embedding_jobbert_description': json.dumps(
+                    e['embedding'].tolist() if hasattr(e['embedding'], 'tolist') else list(e['embedding'])
+                )
+            }
+            for e in embeddings
+        ]
+        return self.bulk_update('jobs', 'id', rows, extra_set='embedding_description_date = NOW()')
 
     def job_exists(self, job_id: str) -> bool:
-        """Check if a job already exists in database by external_id"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM jobs WHERE external_id = %s", (job_id,))
+        """Check if a job already exists in database (active or archived) by external_id"""
+        with self._connection() as conn, conn.cursor() as cursor:
+            if not archive_exists(cursor):
+                cursor.execute("SELECT 1 FROM jobs WHERE external_id = %s", (job_id,))
+                return cursor.fetchone() is not None
+            cursor.execute("""
+                SELECT 1 FROM jobs WHERE external_id = %s
+                UNION ALL
+                SELECT 1 FROM jobs_archive WHERE external_id = %s
+                LIMIT 1
+            """, (job_id, job_id))
             result = cursor.fetchone() is not None
             return result
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
+    def get_known_job_ids(self, job_ids: Iterable[str]) -> Tuple[set, set]:
+        """
+        Check many external ids in one round trip
+
+        Args:
+            job_ids: External job ids from a collector/search result
+
+        Returns:
+            (existing_ids, deleted_ids). Archived jobs count as existing.
+            Deletion is per user in user_job_matches, so deleted_ids is
+            always empty here (see get_deleted_job_ids)
+        """
+        ids = list({job_id for job_id in job_ids if job_id})
+        if not ids:
+            return set(), set()
+
+        with self._connection() as conn, conn.cursor() as cursor:
+            if not archive_exists(cursor):
+                cursor.execute("SELECT external_id FROM jobs WHERE external_id = ANY(%s)", (ids,))
+                return {row[0] for row in cursor.fetchall()}, set()
+            cursor.execute("""
+                SELECT external_id FROM jobs WHERE external_id = ANY(%s)
+                UNION
+                SELECT external_id FROM jobs_archive WHERE external_id = ANY(%s)
+            """, (ids, ids))
+            return {row[0] for row in cursor.fetchall()}, set()
+
     def get_job(self, job_id: int) -> Optional[Dict]:
         """Get a single job by its database ID"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"SELECT {self._job_columns(cursor)} FROM jobs WHERE id = %s", (job_id,))
             job = cursor.fetchone()
             return dict(job) if job else None
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_jobs_by_date(self, date: str, status: str = None) -> List[Dict]:
         """Get jobs discovered on a specific date"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
             
             if status:
-                cursor.execute("""
-                    SELECT * FROM jobs 
+                cursor.execute(f"""
+                    SELECT {self._job_columns(cursor)} FROM jobs 
                     WHERE DATE(discovered_date) = %s AND status = %s
                     ORDER BY discovered_date DESC
                 """, (date, status))
             else:
-                cursor.execute("""
-                    SELECT * FROM jobs 
+                cursor.execute(f"""
+                    SELECT {self._job_columns(cursor)} FROM jobs 
                     WHERE DATE(discovered_date) = %s
                     ORDER BY discovered_date DESC
                 """, (date,))
             
             jobs = cursor.fetchall()
             return [dict(job) for job in jobs]
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_jobs_by_score(self, min_score: int, max_results: int = 20, user_id: int = None) -> List[Dict]:
         """
@@ -438,14 +700,12 @@ class PostgresDatabase:
         If user_id is provided, joins with user_job_matches to get scores.
         Otherwise returns all jobs (ignoring min_score parameter).
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
             if user_id:
                 # Join with user_job_matches to get scores
-                cursor.execute("""
-                    SELECT j.*,
+                cursor.execute(f"""
+                    SELECT {self._job_columns(cursor, 'j')},
                            COALESCE(ujm.claude_score, ujm.semantic_score) as match_score
                     FROM jobs j
                     LEFT JOIN user_job_matches ujm ON j.id = ujm.job_id AND ujm.user_id = %s
@@ -455,34 +715,26 @@ class PostgresDatabase:
                 """, (user_id, min_score, max_results))
             else:
                 # No user_id provided, just return all jobs (legacy behavior)
-                cursor.execute("""
-                    SELECT * FROM jobs
+                cursor.execute(f"""
+                    SELECT {self._job_columns(cursor)} FROM jobs
                     ORDER BY discovered_date DESC
                     LIMIT %s
                 """, (max_results,))
 
             jobs = cursor.fetchall()
             return [dict(job) for job in jobs]
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_jobs_by_priority(self, priority: str) -> List[Dict]:
         """Get jobs by priority level"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT * FROM jobs
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {self._job_columns(cursor)} FROM jobs
                 WHERE priority = %s
                 ORDER BY discovered_date DESC
             """, (priority,))
 
             jobs = cursor.fetchall()
             return [dict(job) for job in jobs]
-        finally:
-            cursor.close()
-            self._return_connection(conn)
 
     def search_jobs_with_filters(
         self,
@@ -494,7 +746,8 @@ class PostgresDatabase:
         min_score: Optional[int] = None,
         status: Optional[str] = 'new',
         exclude_location: bool = False,
-        limit: int = 100
+        limit: int = 100,
+        keyword: Optional[str] = None
     ) -> List[Dict]:
         """
         Search jobs with AI field filters and support for complex queries
@@ -509,6 +762,8 @@ class PostgresDatabase:
             status: Job status filter (default: 'new')
             exclude_location: If True with work_arrangement, excludes jobs matching location
             limit: Maximum results to return
+            keyword: Full-text query over title, skills and description (German and
+                     English stemming, websearch syntax); results are ranked by ts_rank
 
         Returns:
             List of job dictionaries matching the filters
@@ -523,69 +778,16 @@ class PostgresDatabase:
             )
             all_jobs = berlin_jobs + hybrid_not_berlin
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            # Build dynamic WHERE clause
-            where_conditions = []
-            params = []
-
-            # Status filter
-            if status:
-                where_conditions.append("status = %s")
-                params.append(status)
-
-            # Location filter
-            if location:
-                if exclude_location:
-                    # Exclude this location (for complex queries)
-                    where_conditions.append("(location NOT ILIKE %s OR location IS NULL)")
-                    params.append(f'%{location}%')
-                else:
-                    # Include this location
-                    where_conditions.append("location ILIKE %s")
-                    params.append(f'%{location}%')
-
-            # AI field filters
-            if work_arrangement:
-                where_conditions.append("ai_work_arrangement ILIKE %s")
-                params.append(f'%{work_arrangement}%')
-
-            if employment_type:
-                where_conditions.append("ai_employment_type ILIKE %s")
-                params.append(f'%{employment_type}%')
-
-            if seniority:
-                where_conditions.append("ai_seniority ILIKE %s")
-                params.append(f'%{seniority}%')
-
-            if industry:
-                where_conditions.append("ai_industry ILIKE %s")
-                params.append(f'%{industry}%')
-
-            # Score filter
-            if min_score is not None:
-                where_conditions.append("match_score >= %s")
-                params.append(min_score)
-
-            # Build final query
-            where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
-            query = f"""
-                SELECT * FROM jobs
-                WHERE {where_clause}
-                ORDER BY match_score DESC, discovered_date DESC
-                LIMIT %s
-            """
-            params.append(limit)
-
-            cursor.execute(query, params)
-            jobs = cursor.fetchall()
-            return [dict(job) for job in jobs]
-
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+        return self.search_jobs_with_or_filters([{
+            'location': location,
+            'work_arrangement': work_arrangement,
+            'employment_type': employment_type,
+            'seniority': seniority,
+            'industry': industry,
+            'min_score': min_score,
+            'exclude_location': exclude_location,
+            'keyword': keyword
+        }], status=status, limit=limit)
 
     def search_jobs_with_or_filters(
         self,
@@ -596,14 +798,18 @@ class PostgresDatabase:
         """
         Search jobs with OR logic between filter groups
 
+        All groups are evaluated in one query (see src.database.job_search).
+
         Args:
             filter_groups: List of filter dictionaries, each representing a condition group
-                          Results matching ANY group will be returned
+                          Results matching ANY group will be returned. Keys are the
+                          search_jobs_with_filters arguments (including keyword).
+                          An empty list matches no jobs
             status: Job status filter (default: 'new')
             limit: Maximum results to return
 
         Returns:
-            List of unique job dictionaries matching any filter group
+            List of unique job dictionaries matching any filter group, best ranked first
 
         Example usage:
             # Jobs in Berlin OR (Hybrid AND NOT in Berlin)
@@ -613,59 +819,47 @@ class PostgresDatabase:
             ]
             jobs = db.search_jobs_with_or_filters(filter_groups)
         """
-        all_jobs = []
-        seen_job_ids = set()
-
-        for filters in filter_groups:
-            # Extract exclude_location flag if present
-            exclude_location = filters.pop('exclude_location', False)
-
-            # Call search_jobs_with_filters for each group
-            jobs = self.search_jobs_with_filters(
-                location=filters.get('location'),
-                work_arrangement=filters.get('work_arrangement'),
-                employment_type=filters.get('employment_type'),
-                seniority=filters.get('seniority'),
-                industry=filters.get('industry'),
-                min_score=filters.get('min_score'),
-                status=status,
-                exclude_location=exclude_location,
-                limit=limit
+        if not filter_groups:
+            return []
+        
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            # Asking for search_vector reloads the cached types while it is missing,
+            # so a running process picks up the migration
+            column_types = self._get_column_types(cursor, 'jobs', ['search_vector'])
+            has_vector = 'search_vector' in column_types
+            query, params = build_search_query(
+                filter_groups, status, limit,
+                document='search_vector' if has_vector else FALLBACK_DOCUMENT,
+                columns=select_columns(column_types)
             )
+            cursor.execute(query, params)
+            return [dict(job) for job in cursor.fetchall()]
 
-            # Add unique jobs only
-            for job in jobs:
-                if job['id'] not in seen_job_ids:
-                    seen_job_ids.add(job['id'])
-                    all_jobs.append(job)
-
-        # Sort by match score and date
-        all_jobs.sort(key=lambda x: (x.get('match_score', 0), x.get('discovered_date', '')), reverse=True)
-
-        return all_jobs[:limit]
-
-    def get_job_by_id(self, job_id: int) -> Optional[Dict]:
+    def get_job_by_id(self, job_id: int, include_archived: bool = False) -> Optional[Dict]:
         """
         Get a single job by its database ID
         
         Args:
             job_id: Database ID (primary key) of the job
+            include_archived: Also look in jobs_archive (the result then has archived=True)
             
         Returns:
             Job dictionary if found, None otherwise
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"SELECT {self._job_columns(cursor)} FROM jobs WHERE id = %s", (job_id,))
             
             job = cursor.fetchone()
             if job:
                 return dict(job)
+            
+            if include_archived and archive_exists(cursor):
+                cursor.execute(f"SELECT {self._job_columns(cursor, table='jobs_archive')} "
+                               "FROM jobs_archive WHERE id = %s", (job_id,))
+                job = cursor.fetchone()
+                if job:
+                    return {**dict(job), 'archived': True}
             return None
-        finally:
-            cursor.close()
-            self._return_connection(conn)
 
     def get_job_with_user_data(self, job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -682,12 +876,10 @@ class PostgresDatabase:
             Job dictionary with merged user-specific fields (priority, match_reasoning, etc.)
             or None if job not found
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
                 SELECT
-                    j.*,
+                    {self._job_columns(cursor, 'j')},
                     ujm.claude_score,
                     ujm.semantic_score,
                     ujm.priority as user_priority,
@@ -696,6 +888,8 @@ class PostgresDatabase:
                     ujm.potential_gaps as user_potential_gaps,
                     ujm.competency_mappings,
                     ujm.skill_mappings,
+                    ujm.competency_match_map,
+                    ujm.skill_match_map,
                     ujm.status as user_status
                 FROM jobs j
                 LEFT JOIN user_job_matches ujm
@@ -767,9 +961,116 @@ class PostgresDatabase:
 
             return job
 
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+
+    def get_matches_for_match_maps(self, user_id: int, job_ids: Optional[List[int]] = None,
+                                   only_missing: bool = False) -> List[Dict]:
+        """
+        Get the inputs needed to materialize competency/skill match maps
+
+        Args:
+            user_id: User ID
+            job_ids: Restrict to these jobs (default: all Claude-scored matches)
+            only_missing: Only return matches without stored maps
+
+        Returns:
+            List of dicts with job_id, ai_competencies, ai_key_skills,
+            competency_mappings, skill_mappings and key_alignments
+        """
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+
+            query = """
+                SELECT
+                    ujm.job_id,
+                    ujm.competency_mappings,
+                    ujm.skill_mappings,
+                    ujm.key_alignments,
+                    j.ai_competencies,
+                    j.ai_key_skills
+                FROM user_job_matches ujm
+                JOIN jobs j ON ujm.job_id = j.id
+                WHERE ujm.user_id = %s
+                AND ujm.status != 'deleted'
+            """
+            params = [user_id]
+
+            if job_ids is not None:
+                query += " AND ujm.job_id = ANY(%s)"
+                params.append(list(job_ids))
+            else:
+                query += " AND ujm.claude_score IS NOT NULL"
+
+            if only_missing:
+                query += " AND ujm.competency_match_map IS NULL"
+
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def save_rerank_scores_batch(self, user_id: int, scores: Dict[int, float]) -> int:
+        """
+        Store cross-encoder scores on user_job_matches
+
+        Args:
+            user_id: User the matches belong to
+            scores: {job_id: probability 0-1}
+
+        Returns:
+            Number of matches updated
+        """
+        rows = [
+            {'user_id': user_id, 'job_id': job_id, 'rerank_score': int(round(score * 100))}
+            for job_id, score in scores.items()
+        ]
+        return self.bulk_update('user_job_matches', ('user_id', 'job_id'), rows,
+                                extra_set='rerank_date = NOW()')
+
+    def save_match_maps_batch(self, updates: List[Dict]) -> int:
+        """
+        Store materialized match maps on user_job_matches
+
+        Args:
+            updates: List of dicts with user_id, job_id, competency_match_map, skill_match_map
+
+        Returns:
+            Number of matches updated
+        """
+        if not updates:
+            return 0
+
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
+                from psycopg2.extras import execute_values
+
+                values = [
+                    (
+                        u['user_id'],
+                        u['job_id'],
+                        json.dumps(u.get('competency_match_map') or {}),
+                        json.dumps(u.get('skill_match_map') or {})
+                    )
+                    for u in updates
+                ]
+
+                execute_values(
+                    cursor,
+                    """
+                    UPDATE user_job_matches AS ujm
+                    SET competency_match_map = v.competency_match_map::jsonb,
+                        skill_match_map = v.skill_match_map::jsonb,
+                        match_maps_date = NOW()
+                    FROM (VALUES %s) AS v(user_id, job_id, competency_match_map, skill_match_map)
+                    WHERE ujm.user_id = v.user_id AND ujm.job_id = v.job_id
+                    """,
+                    values,
+                    page_size=len(values)
+                )
+                updated = cursor.rowcount
+                conn.commit()
+                return updated
+
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error saving match maps: {e}")
+                return 0
 
     def get_deleted_job_ids(self) -> set:
         """
@@ -784,39 +1085,39 @@ class PostgresDatabase:
         # Return empty set - user-specific deletion handled in user_job_matches
         return set()
     
+    def find_deleted_job_ids(self, job_ids: Iterable[str]) -> set:
+        """
+        Which of these external ids have been deleted (always none, see get_deleted_job_ids)
+        """
+        return set()
+    
     def update_job_status(self, job_id: str, status: str, notes: str = None):
         """Update job status and optionally add notes"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
             
-            if notes:
-                cursor.execute("""
-                    UPDATE jobs 
-                    SET status = %s, notes = %s, last_updated = %s
-                    WHERE job_id = %s
-                """, (status, notes, datetime.now(), job_id))
-            else:
-                cursor.execute("""
-                    UPDATE jobs 
-                    SET status = %s, last_updated = %s
-                    WHERE job_id = %s
-                """, (status, datetime.now(), job_id))
+                if notes:
+                    cursor.execute("""
+                        UPDATE jobs 
+                        SET status = %s, notes = %s, last_updated = %s
+                        WHERE job_id = %s
+                    """, (status, notes, datetime.now(), job_id))
+                else:
+                    cursor.execute("""
+                        UPDATE jobs 
+                        SET status = %s, last_updated = %s
+                        WHERE job_id = %s
+                    """, (status, datetime.now(), job_id))
             
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error updating job status: {e}")
-            raise
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error updating job status: {e}")
+                raise
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get database statistics"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """Get database statistics with live aggregates (fallback when the rollup is unavailable)"""
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
             
             # Total jobs (global)
             cursor.execute("SELECT COUNT(*) as total FROM jobs")
@@ -866,9 +1167,264 @@ class PostgresDatabase:
                 'by_experience_level': experience_counts,
                 'discovered_today': today_count
             }
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics (from the stats rollup, cached in-process)"""
+        return stats_cache.get_or_compute('job_stats', self._job_statistics)
+    
+    def _job_statistics(self) -> Dict[str, Any]:
+        rollup = self.get_stats_rollup()
+        if not rollup:
+            return self._compute_statistics()
+        
+        by_source = rollup.get('source', {})
+        return {
+            'total_jobs': sum(by_source.values()),
+            'by_source': by_source,
+            'by_work_arrangement': rollup.get('work_arrangement', {}),
+            'by_experience_level': rollup.get('experience_level', {}),
+            'by_priority': rollup.get('priority', {}),
+            'discovered_today': rollup.get('jobs', {}).get('last_24h', 0)
+        }
+    
+    def get_dashboard_statistics(self) -> Dict[str, Any]:
+        """
+        Job, match and usage counters for /api/stats (from the stats rollup)
+        
+        Returns:
+            Dict with the same keys /api/stats used to query one by one
+        """
+        rollup = self.get_stats_rollup()
+        
+        def ranked(dimension, label):
+            counts = rollup.get(dimension, {})
+            return [{label: value, 'count': count}
+                    for value, count in sorted(counts.items(), key=lambda item: -item[1])]
+        
+        discovered = rollup.get('discovered_on', {})
+        matches = rollup.get('matches', {})
+        claude = rollup.get('claude', {})
+        return {
+            'jobs_by_source': ranked('source', 'source'),
+            'jobs_by_date': [{'date': date, 'count': discovered[date]}
+                             for date in sorted(discovered, reverse=True)],
+            'total_jobs': sum(rollup.get('source', {}).values()),
+            'jobs_today': discovered.get(datetime.now().date().isoformat(), 0),
+            'total_users': rollup.get('users', {}).get('total', 0),
+            'total_cvs': rollup.get('cvs', {}).get('total', 0),
+            'total_matches': matches.get('total', 0),
+            'matches_today': matches.get('today', 0),
+            'match_distribution': [{'range': value, 'count': count}
+                                   for value, count in sorted(rollup.get('match_range', {}).items(),
+                                                              reverse=True)],
+            'claude_analyses_total': claude.get('total', 0),
+            'claude_analyses_today': claude.get('today', 0),
+            'top_companies': ranked('company', 'company'),
+            'top_locations': ranked('location', 'location'),
+            'refreshed_at': rollup.get('meta', {}).get('refreshed_at')
+        }
+    
+    def get_stats_rollup(self) -> Dict[str, Dict[str, int]]:
+        """
+        Rows of the stats_rollup view as {dimension: {value: count}}
+        
+        Cached in-process for STATS_CACHE_TTL. The first call populates the
+        view; once it is older than STATS_REFRESH_SECONDS a background
+        refresh is started and the current numbers are served meanwhile.
+        While the view can't be read (not populated yet, or another thread
+        is populating it) the same rows are aggregated live instead.
+        
+        Returns:
+            Rollup dict, or {} if neither the view nor the live query works
+        """
+        try:
+            return stats_cache.get_or_compute('stats_rollup', self._load_stats_rollup)
+        except Exception as e:
+            logger.warning(f"Stats rollup unavailable, aggregating live: {e}")
+        
+        try:
+            rollup = self._compute_stats_rollup()
+        except Exception as e:
+            logger.error(f"Error computing stats rollup: {e}")
+            return {}
+        stats_cache.set('stats_rollup', rollup)
+        return rollup
+    
+    def _load_stats_rollup(self) -> Dict[str, Dict[str, int]]:
+        """Read the view (raises if it isn't populated, so nothing is cached)"""
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT relispopulated FROM pg_class WHERE relname = 'stats_rollup'")
+            row = cursor.fetchone()
+            populated = bool(row and row[0])
+        
+        if not populated and not self.refresh_statistics():
+            raise RuntimeError("stats_rollup is not populated yet")
+        
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT dimension, value, count FROM stats_rollup")
+            rollup = self._rollup_rows(cursor.fetchall())
+        
+        refreshed_at = rollup.get('meta', {}).get('refreshed_at', 0)
+        if time.time() - refreshed_at > STATS_REFRESH_SECONDS:
+            self.refresh_statistics_async()
+        return rollup
+    
+    def _compute_stats_rollup(self) -> Dict[str, Dict[str, int]]:
+        """The view's rows aggregated live (fallback when the view can't be read)"""
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(STATS_ROLLUP_SELECT)
+            return self._rollup_rows(cursor.fetchall())
+    
+    @staticmethod
+    def _rollup_rows(rows) -> Dict[str, Dict[str, int]]:
+        rollup: Dict[str, Dict[str, int]] = {}
+        for dimension, value, count in rows:
+            rollup.setdefault(dimension, {})[value] = count
+        return rollup
+    
+    def refresh_statistics(self) -> bool:
+        """
+        Recompute the stats rollup and drop cached statistics
+        
+        Called after job ingestion; concurrent calls in one process are
+        collapsed into one refresh.
+        
+        Returns:
+            True if the view was refreshed
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute(STATS_ROLLUP_SQL)
+                cursor.execute(STATS_ROLLUP_INDEX)
+                cursor.execute("SELECT relispopulated FROM pg_class WHERE relname = 'stats_rollup'")
+                populated = cursor.fetchone()[0]
+                # CONCURRENTLY keeps the view readable, but needs a first plain refresh
+                cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY stats_rollup" if populated
+                               else "REFRESH MATERIALIZED VIEW stats_rollup")
+                conn.commit()
+            stats_cache.invalidate('stats_rollup', 'job_stats')
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing stats rollup: {e}")
+            return False
         finally:
-            cursor.close()
-            self._return_connection(conn)
+            self._refresh_lock.release()
+    
+    def refresh_statistics_async(self):
+        """refresh_statistics() on a daemon thread"""
+        threading.Thread(target=self.refresh_statistics, daemon=True).start()
+    
+    def insert_llm_calls(self, rows: List[Dict]) -> int:
+        """
+        Insert buffered LLM telemetry rows (called by the telemetry writer thread)
+        
+        Args:
+            rows: Dicts with created_at, user_id, provider, model, operation, input_tokens,
+                  output_tokens, latency_ms, batch_size, cache_hit, cost_usd, error
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        from psycopg2.extras import execute_values
+        
+        columns = ['created_at', 'user_id', 'provider', 'model', 'operation', 'input_tokens',
+                   'output_tokens', 'latency_ms', 'batch_size', 'cache_hit', 'cost_usd', 'error']
+        values = [tuple(row.get(col) for col in columns) for row in rows]
+        
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
+                execute_values(
+                    cursor,
+                    f"INSERT INTO llm_calls ({', '.join(columns)}) VALUES %s",
+                    values,
+                    page_size=len(values)
+                )
+                conn.commit()
+                return len(values)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error inserting LLM telemetry: {e}")
+                raise
+    
+    def get_llm_usage_summary(self, user_id: Optional[int] = None, days: int = 30) -> Dict[str, Any]:
+        """
+        Aggregate LLM usage for the cost dashboard
+        
+        Args:
+            user_id: Restrict to one user (None = all users)
+            days: Look-back window
+        
+        Returns:
+            Dict with totals (cost this month / window, calls, cache hit rate),
+            by_operation (calls, p50/p95 latency, tokens per job) and
+            daily (cost and tokens per user per day)
+        """
+        user_filter = "AND user_id = %s" if user_id is not None else ""
+        params = [days] + ([user_id] if user_id is not None else [])
+        
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            
+            cursor.execute(f"""
+                SELECT
+                    COUNT(*) as calls,
+                    COALESCE(SUM(cost_usd), 0) as total_cost,
+                    COALESCE(SUM(input_tokens + output_tokens), 0) as total_tokens,
+                    COALESCE(AVG(CASE WHEN cache_hit THEN 1.0 ELSE 0.0 END), 0) as cache_hit_rate,
+                    COUNT(*) FILTER (WHERE error IS NOT NULL) as errors
+                FROM llm_calls
+                WHERE created_at >= NOW() - make_interval(days => %s) {user_filter}
+            """, params)
+            totals = dict(cursor.fetchone())
+            
+            # Month-to-date can reach back further than the window
+            cursor.execute(f"""
+                SELECT COALESCE(SUM(cost_usd), 0) as month_cost
+                FROM llm_calls
+                WHERE created_at >= date_trunc('month', CURRENT_DATE) {user_filter}
+            """, params[1:])
+            totals['month_cost'] = cursor.fetchone()['month_cost']
+            
+            cursor.execute(f"""
+                SELECT
+                    COALESCE(operation, 'other') as operation,
+                    model,
+                    COUNT(*) as calls,
+                    COUNT(*) FILTER (WHERE cache_hit) as cache_hits,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY latency_ms)
+                        FILTER (WHERE NOT cache_hit) as p50_latency_ms,
+                    percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms)
+                        FILTER (WHERE NOT cache_hit) as p95_latency_ms,
+                    SUM(input_tokens + output_tokens)::float
+                        / NULLIF(SUM(COALESCE(batch_size, 1)) FILTER (WHERE NOT cache_hit), 0) as tokens_per_job,
+                    AVG(batch_size) as avg_batch_size,
+                    COALESCE(SUM(cost_usd), 0) as cost
+                FROM llm_calls
+                WHERE created_at >= NOW() - make_interval(days => %s) {user_filter}
+                GROUP BY COALESCE(operation, 'other'), model
+                ORDER BY cost DESC
+            """, params)
+            by_operation = [dict(row) for row in cursor.fetchall()]
+            
+            cursor.execute(f"""
+                SELECT
+                    created_at::date as day,
+                    user_id,
+                    COUNT(*) as calls,
+                    SUM(input_tokens + output_tokens) as tokens,
+                    COALESCE(SUM(cost_usd), 0) as cost
+                FROM llm_calls
+                WHERE created_at >= NOW() - make_interval(days => %s) {user_filter}
+                GROUP BY created_at::date, user_id
+                ORDER BY day DESC, cost DESC
+            """, params)
+            daily = [dict(row) for row in cursor.fetchall()]
+            
+            return {'totals': totals, 'by_operation': by_operation, 'daily': daily}
     
     def add_user_job_match(self, user_id: int, job_id: int, semantic_score: int = None,
                           claude_score: int = None, match_reasoning: str = None,
@@ -876,62 +1432,58 @@ class PostgresDatabase:
                           priority: str = 'medium', competency_mappings: list = None,
                           skill_mappings: list = None) -> bool:
         """Add or update a user-job match"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            now = datetime.now()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
+                now = datetime.now()
             
-            # Convert lists to comma-separated strings
-            key_alignments_str = ', '.join(key_alignments) if key_alignments else ''
-            potential_gaps_str = ', '.join(potential_gaps) if potential_gaps else ''
+                # Convert lists to comma-separated strings
+                key_alignments_str = ', '.join(key_alignments) if key_alignments else ''
+                potential_gaps_str = ', '.join(potential_gaps) if potential_gaps else ''
             
-            # Convert mappings to JSON strings
-            import json
-            competency_mappings_json = json.dumps(competency_mappings) if competency_mappings else None
-            skill_mappings_json = json.dumps(skill_mappings) if skill_mappings else None
+                # Convert mappings to JSON strings
+                import json
+                competency_mappings_json = json.dumps(competency_mappings) if competency_mappings else None
+                skill_mappings_json = json.dumps(skill_mappings) if skill_mappings else None
             
-            # PostgreSQL upsert
-            cursor.execute("""
-                INSERT INTO user_job_matches (
-                    user_id, job_id, semantic_score, semantic_date,
-                    claude_score, claude_date, priority, match_reasoning,
-                    key_alignments, potential_gaps, competency_mappings, skill_mappings,
-                    created_date, last_updated
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (user_id, job_id) 
-                DO UPDATE SET
-                    semantic_score = COALESCE(EXCLUDED.semantic_score, user_job_matches.semantic_score),
-                    semantic_date = CASE WHEN EXCLUDED.semantic_score IS NOT NULL 
-                                       THEN EXCLUDED.semantic_date 
-                                       ELSE user_job_matches.semantic_date END,
-                    claude_score = COALESCE(EXCLUDED.claude_score, user_job_matches.claude_score),
-                    claude_date = CASE WHEN EXCLUDED.claude_score IS NOT NULL 
-                                     THEN EXCLUDED.claude_date 
-                                     ELSE user_job_matches.claude_date END,
-                    priority = EXCLUDED.priority,
-                    match_reasoning = COALESCE(EXCLUDED.match_reasoning, user_job_matches.match_reasoning),
-                    key_alignments = COALESCE(EXCLUDED.key_alignments, user_job_matches.key_alignments),
-                    potential_gaps = COALESCE(EXCLUDED.potential_gaps, user_job_matches.potential_gaps),
-                    competency_mappings = COALESCE(EXCLUDED.competency_mappings, user_job_matches.competency_mappings),
-                    skill_mappings = COALESCE(EXCLUDED.skill_mappings, user_job_matches.skill_mappings),
-                    last_updated = EXCLUDED.last_updated
-            """, (
-                user_id, job_id, semantic_score, now if semantic_score else None,
-                claude_score, now if claude_score else None, priority, match_reasoning,
-                key_alignments_str, potential_gaps_str, competency_mappings_json, skill_mappings_json,
-                now, now
-            ))
+                # PostgreSQL upsert
+                cursor.execute("""
+                    INSERT INTO user_job_matches (
+                        user_id, job_id, semantic_score, semantic_date,
+                        claude_score, claude_date, priority, match_reasoning,
+                        key_alignments, potential_gaps, competency_mappings, skill_mappings,
+                        created_date, last_updated
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (user_id, job_id) 
+                    DO UPDATE SET
+                        semantic_score = COALESCE(EXCLUDED.semantic_score, user_job_matches.semantic_score),
+                        semantic_date = CASE WHEN EXCLUDED.semantic_score IS NOT NULL 
+                                           THEN EXCLUDED.semantic_date 
+                                           ELSE user_job_matches.semantic_date END,
+                        claude_score = COALESCE(EXCLUDED.claude_score, user_job_matches.claude_score),
+                        claude_date = CASE WHEN EXCLUDED.claude_score IS NOT NULL 
+                                         THEN EXCLUDED.claude_date 
+                                         ELSE user_job_matches.claude_date END,
+                        priority = EXCLUDED.priority,
+                        match_reasoning = COALESCE(EXCLUDED.match_reasoning, user_job_matches.match_reasoning),
+                        key_alignments = COALESCE(EXCLUDED.key_alignments, user_job_matches.key_alignments),
+                        potential_gaps = COALESCE(EXCLUDED.potential_gaps, user_job_matches.potential_gaps),
+                        competency_mappings = COALESCE(EXCLUDED.competency_mappings, user_job_matches.competency_mappings),
+                        skill_mappings = COALESCE(EXCLUDED.skill_mappings, user_job_matches.skill_mappings),
+                        last_updated = EXCLUDED.last_updated
+                """, (
+                    user_id, job_id, semantic_score, now if semantic_score else None,
+                    claude_score, now if claude_score else None, priority, match_reasoning,
+                    key_alignments_str, potential_gaps_str, competency_mappings_json, skill_mappings_json,
+                    now, now
+                ))
             
-            conn.commit()
-            return True
+                conn.commit()
+                return True
             
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error adding user job match: {e}")
-            return False
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error adding user job match: {e}")
+                return False
     
     def add_user_job_matches_batch(self, matches: List[Dict]) -> int:
         """
@@ -947,85 +1499,81 @@ class PostgresDatabase:
         if not matches:
             return 0
         
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            now = datetime.now()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
+                now = datetime.now()
             
-            # Prepare batch data
-            values = []
-            for match in matches:
-                # Convert lists to comma-separated strings
-                key_alignments = match.get('key_alignments', [])
-                potential_gaps = match.get('potential_gaps', [])
-                key_alignments_str = ', '.join(key_alignments) if key_alignments else ''
-                potential_gaps_str = ', '.join(potential_gaps) if potential_gaps else ''
-
-                # Get competency and skill mappings (keep as list/dict for JSONB)
-                competency_mappings = match.get('competency_mappings', [])
-                skill_mappings = match.get('skill_mappings', [])
-
-                # Convert to JSON string for psycopg2 (it will handle JSONB conversion)
-                import json
-                competency_mappings_json = json.dumps(competency_mappings) if competency_mappings else None
-                skill_mappings_json = json.dumps(skill_mappings) if skill_mappings else None
-
-                values.append((
-                    match['user_id'],
-                    match['job_id'],
-                    match.get('semantic_score'),
-                    now if match.get('semantic_score') else None,
-                    match.get('claude_score'),
-                    now if match.get('claude_score') else None,
-                    match.get('priority', 'medium'),
-                    match.get('match_reasoning'),
-                    key_alignments_str,
-                    potential_gaps_str,
-                    competency_mappings_json,
-                    skill_mappings_json,
-                    now,
-                    now
-                ))
+                # Prepare batch data
+                values = []
+                for match in matches:
+                    # Convert lists to comma-separated strings
+                    key_alignments = match.get('key_alignments', [])
+                    potential_gaps = match.get('potential_gaps', [])
+                    key_alignments_str = ', '.join(key_alignments) if key_alignments else ''
+                    potential_gaps_str = ', '.join(potential_gaps) if potential_gaps else ''
+
+                    # Get competency and skill mappings (keep as list/dict for JSONB)
+                    competency_mappings = match.get('competency_mappings', [])
+                    skill_mappings = match.get('skill_mappings', [])
+
+                    # Convert to JSON string for psycopg2 (it will handle JSONB conversion)
+                    import json
+                    competency_mappings_json = json.dumps(competency_mappings) if competency_mappings else None
+                    skill_mappings_json = json.dumps(skill_mappings) if skill_mappings else None
+
+                    values.append((
+                        match['user_id'],
+                        match['job_id'],
+                        match.get('semantic_score'),
+                        now if match.get('semantic_score') else None,
+                        match.get('claude_score'),
+                        now if match.get('claude_score') else None,
+                        match.get('priority', 'medium'),
+                        match.get('match_reasoning'),
+                        key_alignments_str,
+                        potential_gaps_str,
+                        competency_mappings_json,
+                        skill_mappings_json,
+                        now,
+                        now
+                    ))
             
-            # Use execute_values for efficient batch insert
-            from psycopg2.extras import execute_values
+                # Use execute_values for efficient batch insert
+                from psycopg2.extras import execute_values
             
-            execute_values(
-                cursor,
-                """
-                INSERT INTO user_job_matches (
-                    user_id, job_id, semantic_score, semantic_date,
-                    claude_score, claude_date, priority, match_reasoning,
-                    key_alignments, potential_gaps, competency_mappings, skill_mappings,
-                    created_date, last_updated
-                ) VALUES %s
-                ON CONFLICT (user_id, job_id)
-                DO UPDATE SET
-                    semantic_score = COALESCE(EXCLUDED.semantic_score, user_job_matches.semantic_score),
-                    semantic_date = COALESCE(EXCLUDED.semantic_date, user_job_matches.semantic_date),
-                    claude_score = COALESCE(EXCLUDED.claude_score, user_job_matches.claude_score),
-                    claude_date = COALESCE(EXCLUDED.claude_date, user_job_matches.claude_date),
-                    priority = EXCLUDED.priority,
-                    match_reasoning = COALESCE(EXCLUDED.match_reasoning, user_job_matches.match_reasoning),
-                    key_alignments = COALESCE(EXCLUDED.key_alignments, user_job_matches.key_alignments),
-                    potential_gaps = COALESCE(EXCLUDED.potential_gaps, user_job_matches.potential_gaps),
-                    competency_mappings = COALESCE(EXCLUDED.competency_mappings, user_job_matches.competency_mappings),
-                    skill_mappings = COALESCE(EXCLUDED.skill_mappings, user_job_matches.skill_mappings),
-                    last_updated = EXCLUDED.last_updated
-                """,
-                values
-            )
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO user_job_matches (
+                        user_id, job_id, semantic_score, semantic_date,
+                        claude_score, claude_date, priority, match_reasoning,
+                        key_alignments, potential_gaps, competency_mappings, skill_mappings,
+                        created_date, last_updated
+                    ) VALUES %s
+                    ON CONFLICT (user_id, job_id)
+                    DO UPDATE SET
+                        semantic_score = COALESCE(EXCLUDED.semantic_score, user_job_matches.semantic_score),
+                        semantic_date = COALESCE(EXCLUDED.semantic_date, user_job_matches.semantic_date),
+                        claude_score = COALESCE(EXCLUDED.claude_score, user_job_matches.claude_score),
+                        claude_date = COALESCE(EXCLUDED.claude_date, user_job_matches.claude_date),
+                        priority = EXCLUDED.priority,
+                        match_reasoning = COALESCE(EXCLUDED.match_reasoning, user_job_matches.match_reasoning),
+                        key_alignments = COALESCE(EXCLUDED.key_alignments, user_job_matches.key_alignments),
+                        potential_gaps = COALESCE(EXCLUDED.potential_gaps, user_job_matches.potential_gaps),
+                        competency_mappings = COALESCE(EXCLUDED.competency_mappings, user_job_matches.competency_mappings),
+                        skill_mappings = COALESCE(EXCLUDED.skill_mappings, user_job_matches.skill_mappings),
+                        last_updated = EXCLUDED.last_updated
+                    """,
+                    values
+                )
             
-            conn.commit()
-            return len(matches)
+                conn.commit()
+                return len(matches)
             
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error adding batch user job matches: {e}")
-            return 0
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error adding batch user job matches: {e}")
+                return 0
     
     def get_user_job_matches(self, user_id: int, min_semantic_score: int = None,
                             min_claude_score: int = None, limit: int = 200,
@@ -1041,9 +1589,7 @@ class PostgresDatabase:
             status: Filter by specific status (e.g., 'new', 'viewed', 'shortlisted', 'deleted')
             exclude_deleted: If True (default), excludes jobs with status='deleted'
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
             query = """
                 SELECT
@@ -1090,42 +1636,29 @@ class PostgresDatabase:
             matches = cursor.fetchall()
             return [dict(match) for match in matches]
             
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_jobs_discovered_today(self) -> List[Dict]:
         """Get jobs discovered today"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT * FROM jobs
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {self._job_columns(cursor)} FROM jobs
                 WHERE DATE(discovered_date) = CURRENT_DATE
                 ORDER BY discovered_date DESC
             """)
             results = [dict(row) for row in cursor.fetchall()]
             return results
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_jobs_discovered_before_today(self, limit: int = 50) -> List[Dict]:
         """Get jobs discovered before today"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT * FROM jobs
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {self._job_columns(cursor)} FROM jobs
                 WHERE DATE(discovered_date) < CURRENT_DATE
                 ORDER BY discovered_date DESC
                 LIMIT %s
             """, (limit,))
             results = [dict(row) for row in cursor.fetchall()]
             return results
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_deleted_jobs(self, user_id: int = None, limit: int = 50) -> List[Dict]:
         """
@@ -1152,106 +1685,165 @@ class PostgresDatabase:
     def permanently_delete_job(self, job_id: int) -> bool:
         """Permanently remove a job from the database"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM jobs WHERE id = %s', (job_id,))
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
-            return True
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute('DELETE FROM jobs WHERE id = %s', (job_id,))
+                conn.commit()
+                return True
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error permanently deleting job: {e}")
             return False
     
     def add_search_record(self, source: str, search_term: str, location: str, 
                          results_count: int, execution_time: float):
         """Log a search operation"""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO search_history (
-                    search_date, source, search_term, location, results_count, execution_time
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                datetime.now(),
-                source,
-                search_term,
-                location,
-                results_count,
-                execution_time
-            ))
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO search_history (
+                        search_date, source, search_term, location, results_count, execution_time
+                    ) VALUES (%s, %s, %s, %s, %s, %s)
+                """, (
+                    datetime.now(),
+                    source,
+                    search_term,
+                    location,
+                    results_count,
+                    execution_time
+                ))
+                conn.commit()
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error adding search record: {e}")
     
     def add_feedback(self, job_id: int, user_email: str, feedback_type: str, 
                      match_score_original: int, match_score_user: Optional[int] = None,
                      feedback_reason: Optional[str] = None) -> bool:
-        """Add user feedback on a job match score"""
+        """
+        Add user feedback on a job match score
+
+        The user's learning profile is updated in the same transaction: the
+        new row is folded into the stored profile (version + 1), or the
+        profile is built from the full history if none is stored yet.
+        """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
             
-            cursor.execute("""
-                INSERT INTO job_feedback (
+                cursor.execute("""
+                    INSERT INTO job_feedback (
+                        job_id, user_email, feedback_type, match_score_original,
+                        match_score_user, feedback_reason, created_date
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
                     job_id, user_email, feedback_type, match_score_original,
-                    match_score_user, feedback_reason, created_date
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                job_id, user_email, feedback_type, match_score_original,
-                match_score_user, feedback_reason, datetime.now()
-            ))
+                    match_score_user, feedback_reason, datetime.now()
+                ))
+                feedback_id = cursor.fetchone()['id']
+
+                # Serialize profile updates per user (the first one inserts the row)
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (user_email,))
+                cursor.execute("""
+                    SELECT profile FROM user_learning_profiles
+                    WHERE user_email = %s
+                """, (user_email,))
+                stored = cursor.fetchone()
+                if stored and stored['profile'].get('format') == PROFILE_FORMAT:
+                    profile = stored['profile']
+                    for row in self._fetch_user_feedback(cursor, user_email, feedback_id=feedback_id):
+                        apply_feedback(profile, row)
+                else:
+                    profile = build_profile(self._fetch_user_feedback(cursor, user_email, limit=REBUILD_LIMIT))
+
+                cursor.execute("""
+                    INSERT INTO user_learning_profiles (user_email, profile, version, updated_at)
+                    VALUES (%s, %s, 1, NOW())
+                    ON CONFLICT (user_email) DO UPDATE SET
+                        profile = EXCLUDED.profile,
+                        version = user_learning_profiles.version + 1,
+                        updated_at = NOW()
+                """, (user_email, json.dumps(profile, default=str)))
             
-            conn.commit()
-            cursor.close()
-            self._return_connection(conn)
+                conn.commit()
+            learning_cache.invalidate(learning_cache_key(user_email))
             return True
-            
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error adding feedback: {e}")
             return False
+
+    def _fetch_user_feedback(self, cursor, user_email: str, limit: int = 50,
+                             feedback_id: Optional[int] = None) -> List[Dict]:
+        """Feedback rows with job details, newest first (or the single row feedback_id)"""
+        where, params = "f.user_email = %s", [user_email]
+        if feedback_id is not None:
+            where += " AND f.id = %s"
+            params.append(feedback_id)
+
+        cursor.execute(f"""
+            SELECT
+                f.id, f.job_id, f.feedback_type, f.match_score_original,
+                f.match_score_user, f.feedback_reason, f.created_date,
+                j.title, j.company, j.location, j.description,
+                ujm.key_alignments, ujm.potential_gaps
+            FROM job_feedback f
+            JOIN jobs j ON f.job_id = j.id
+            JOIN users u ON f.user_email = u.email
+            LEFT JOIN user_job_matches ujm ON j.id = ujm.job_id AND u.id = ujm.user_id
+            WHERE {where}
+            ORDER BY f.created_date DESC
+            LIMIT %s
+        """, (*params, limit))
+
+        return [dict(row) for row in cursor.fetchall()]
     
     def get_user_feedback(self, user_email: str, limit: int = 50) -> List[Dict]:
         """Get user's feedback history"""
-        conn = self._get_connection()
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            return self._fetch_user_feedback(cursor, user_email, limit)
+
+    def get_learning_profile(self, user_email: str) -> Optional[Dict]:
+        """Stored learning profile: {'profile', 'version'}, or None"""
         try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT profile, version FROM user_learning_profiles
+                    WHERE user_email = %s
+                """, (user_email,))
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error loading learning profile: {e}")
+            return None
 
-            cursor.execute("""
-                SELECT
-                    f.id, f.job_id, f.feedback_type, f.match_score_original,
-                    f.match_score_user, f.feedback_reason, f.created_date,
-                    j.title, j.company, j.location, j.description,
-                    ujm.key_alignments, ujm.potential_gaps
-                FROM job_feedback f
-                JOIN jobs j ON f.job_id = j.id
-                JOIN users u ON f.user_email = u.email
-                LEFT JOIN user_job_matches ujm ON j.id = ujm.job_id AND u.id = ujm.user_id
-                WHERE f.user_email = %s
-                ORDER BY f.created_date DESC
-                LIMIT %s
-            """, (user_email, limit))
+    def save_learning_profile(self, user_email: str, profile: Dict) -> Optional[Dict]:
+        """
+        Store a profile rebuilt from history
 
-            results = [dict(row) for row in cursor.fetchall()]
-            return results
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+        Replaces a stored profile only if it has another format: a current one
+        was written by add_feedback and is at least as new as the rebuild.
+
+        Returns:
+            The stored {'profile', 'version'}
+        """
+        try:
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    INSERT INTO user_learning_profiles (user_email, profile, version, updated_at)
+                    VALUES (%s, %s, 1, NOW())
+                    ON CONFLICT (user_email) DO UPDATE SET
+                        profile = EXCLUDED.profile,
+                        version = user_learning_profiles.version + 1,
+                        updated_at = NOW()
+                    WHERE (user_learning_profiles.profile->>'format')::int IS DISTINCT FROM %s
+                """, (user_email, json.dumps(profile, default=str), PROFILE_FORMAT))
+                cursor.execute("""
+                    SELECT profile, version FROM user_learning_profiles
+                    WHERE user_email = %s
+                """, (user_email,))
+                row = cursor.fetchone()
+                conn.commit()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error saving learning profile: {e}")
+            return None
     
     def update_user_job_status(self, user_id: int, job_id: int, status: str):
         """
@@ -1262,47 +1854,41 @@ class PostgresDatabase:
             job_id: Job ID (database primary key)
             status: New status ('shortlisted', 'deleted', 'viewed', 'applying', 'applied')
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-
-            # Check if user_job_match exists
-            cursor.execute("""
-                SELECT id FROM user_job_matches
-                WHERE user_id = %s AND job_id = %s
-            """, (user_id, job_id))
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            match_row = cursor.fetchone()
-
-            if match_row:
-                # Update existing record
+                # Check if user_job_match exists
                 cursor.execute("""
-                    UPDATE user_job_matches
-                    SET status = %s, last_updated = NOW()
+                    SELECT id FROM user_job_matches
                     WHERE user_id = %s AND job_id = %s
-                """, (status, user_id, job_id))
-            else:
-                # Create new record
-                cursor.execute("""
-                    INSERT INTO user_job_matches
-                    (user_id, job_id, status, created_date, last_updated)
-                    VALUES (%s, %s, %s, NOW(), NOW())
-                """, (user_id, job_id, status))
+                """, (user_id, job_id))
 
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error updating user job status: {e}")
-            raise
-        finally:
-            cursor.close()
-            self._return_connection(conn)
+                match_row = cursor.fetchone()
+
+                if match_row:
+                    # Update existing record
+                    cursor.execute("""
+                        UPDATE user_job_matches
+                        SET status = %s, last_updated = NOW()
+                        WHERE user_id = %s AND job_id = %s
+                    """, (status, user_id, job_id))
+                else:
+                    # Create new record
+                    cursor.execute("""
+                        INSERT INTO user_job_matches
+                        (user_id, job_id, status, created_date, last_updated)
+                        VALUES (%s, %s, %s, NOW(), NOW())
+                    """, (user_id, job_id, status))
+
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Error updating user job status: {e}")
+                raise
 
     def get_shortlisted_jobs(self, user_email: str = 'default@localhost') -> List[Dict]:
         """Get jobs marked as shortlisted by specific user"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
             # Get user_id from email
             cursor.execute("SELECT id FROM users WHERE email = %s", (user_email,))
@@ -1312,8 +1898,8 @@ class PostgresDatabase:
             user_id = user_row['id']
 
             # Query jobs with user-specific status
-            cursor.execute("""
-                SELECT j.*,
+            cursor.execute(f"""
+                SELECT {self._job_columns(cursor, 'j')},
                        ujm.status as user_status,
                        ujm.claude_score,
                        ujm.semantic_score,
@@ -1331,9 +1917,6 @@ class PostgresDatabase:
 
             results = [dict(row) for row in cursor.fetchall()]
             return results
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
     def get_unfiltered_jobs_for_user(self, user_id: int, user_cities: List[str] = None) -> List[Dict]:
         """
@@ -1347,9 +1930,7 @@ class PostgresDatabase:
         Returns:
             List of unfiltered jobs matching location/work criteria
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
             # Get user's last filter run to only fetch new jobs
             cursor.execute("SELECT last_filter_run FROM users WHERE id = %s", (user_id,))
@@ -1357,8 +1938,8 @@ class PostgresDatabase:
             last_filter_run = user_row['last_filter_run'] if user_row else None
 
             # Base query - jobs not yet matched for this user
-            query = """
-                SELECT j.* FROM jobs j
+            query = f"""
+                SELECT {self._job_columns(cursor, 'j')} FROM jobs j
                 LEFT JOIN user_job_matches ujm ON j.id = ujm.job_id AND ujm.user_id = %s
                 WHERE ujm.id IS NULL
             """
@@ -1399,24 +1980,65 @@ class PostgresDatabase:
             cursor.execute(query, params)
             results = [dict(row) for row in cursor.fetchall()]
             return results
-        finally:
-            cursor.close()
-            self._return_connection(conn)
     
+    def get_unanalyzed_matches_for_user(self, user_id: int, min_score: int = 0,
+                                        limit: int = 500) -> List[Dict]:
+        """
+        Jobs this user has a match for that was never reranked or analyzed
+
+        Fleet matching (src.matching.fleet_matcher) saves semantic-only
+        matches, and get_unfiltered_jobs_for_user skips every matched job,
+        so the user's matching run picks these up here instead.
+
+        Args:
+            user_id: User ID
+            min_score: Minimum semantic score
+            limit: Maximum jobs returned, best scores first
+
+        Returns:
+            Job dicts with the match's semantic_score
+        """
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"""
+                SELECT {self._job_columns(cursor, 'j')}, ujm.semantic_score
+                FROM user_job_matches ujm
+                JOIN jobs j ON j.id = ujm.job_id
+                WHERE ujm.user_id = %s
+                  AND ujm.claude_score IS NULL
+                  AND ujm.rerank_score IS NULL
+                  AND ujm.semantic_score >= %s
+                  AND COALESCE(ujm.status, 'new') <> 'deleted'
+                ORDER BY ujm.semantic_score DESC
+                LIMIT %s
+            """, (user_id, min_score, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_encoded_jobs_since(self, since: datetime) -> List[Dict]:
+        """
+        Jobs discovered at or after `since` that have a title embedding
+
+        Only the columns fleet matching needs (location filter, keyword
+        boosts, embedding) are selected.
+        """
+        with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT id, title, description, ai_work_arrangement,
+                       cities_derived, locations_derived, embedding_jobbert_title
+                FROM jobs
+                WHERE discovered_date >= %s AND embedding_jobbert_title IS NOT NULL
+                ORDER BY id
+            """, (since,))
+            return [dict(row) for row in cursor.fetchall()]
+
     def count_new_jobs_since(self, user_id: int, since_date: str) -> int:
         """Count new jobs discovered since a specific date"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
             cursor.execute("""
                 SELECT COUNT(*) FROM jobs
                 WHERE discovered_date >= %s
             """, (since_date,))
             count = cursor.fetchone()[0]
             return count
-        finally:
-            cursor.close()
-            self._return_connection(conn)
 
     def get_unique_query_combinations(self) -> List[Dict]:
         """
@@ -1435,37 +2057,30 @@ class PostgresDatabase:
             List of unique query combination dictionaries
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            # Get distinct combinations - this is where deduplication happens!
-            cursor.execute("""
-                SELECT DISTINCT
-                    title_keyword,
-                    location,
-                    ai_work_arrangement,
-                    ai_employment_type,
-                    ai_seniority,
-                    ai_industry,
-                    MAX(priority) as max_priority
-                FROM user_search_queries
-                WHERE is_active = TRUE
-                GROUP BY title_keyword, location, ai_work_arrangement,
-                         ai_employment_type, ai_seniority, ai_industry
-                ORDER BY max_priority DESC
-            """)
-
-            combinations = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
-
-            logger.info(f"Found {len(combinations)} unique query combinations across all users")
-            return [dict(c) for c in combinations]
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
+                # Get distinct combinations - this is where deduplication happens!
+                cursor.execute("""
+                    SELECT DISTINCT
+                        title_keyword,
+                        location,
+                        ai_work_arrangement,
+                        ai_employment_type,
+                        ai_seniority,
+                        ai_industry,
+                        MAX(priority) as max_priority
+                    FROM user_search_queries
+                    WHERE is_active = TRUE
+                    GROUP BY title_keyword, location, ai_work_arrangement,
+                             ai_employment_type, ai_seniority, ai_industry
+                    ORDER BY max_priority DESC
+                """)
+
+                combinations = cursor.fetchall()
+
+                logger.info(f"Found {len(combinations)} unique query combinations across all users")
+                return [dict(c) for c in combinations]
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting unique query combinations: {e}")
             return []
 
@@ -1479,30 +2094,23 @@ class PostgresDatabase:
             List of all query rows with user info
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            cursor.execute("""
-                SELECT
-                    q.*,
-                    u.email as user_email,
-                    u.name as user_name
-                FROM user_search_queries q
-                JOIN users u ON q.user_id = u.id
-                WHERE q.is_active = TRUE
-                ORDER BY q.priority DESC, q.user_id ASC, q.id ASC
-            """)
-
-            queries = cursor.fetchall()
-            cursor.close()
-            self._return_connection(conn)
-
-            return [dict(q) for q in queries]
+            with self._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
 
+                cursor.execute("""
+                    SELECT
+                        q.*,
+                        u.email as user_email,
+                        u.name as user_name
+                    FROM user_search_queries q
+                    JOIN users u ON q.user_id = u.id
+                    WHERE q.is_active = TRUE
+                    ORDER BY q.priority DESC, q.user_id ASC, q.id ASC
+                """)
+
+                queries = cursor.fetchall()
+
+                return [dict(q) for q in queries]
         except Exception as e:
-            if 'conn' in locals():
-                cursor.close()
-                self._return_connection(conn)
             logger.error(f"Error getting all active queries: {e}")
             return []
 
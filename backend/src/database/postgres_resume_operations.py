@@ -23,6 +23,10 @@ class PostgresResumeOperations:
         """
         self.pool = connection_pool
 
+    def _connection(self):
+        """Context manager: pooled connection, rolled back on error and always returned"""
+        return self.pool.connection()
+
     def save_user_claimed_competency(self, user_id: int, competency_name: str,
                                      work_exp_ids: List[int], evidence: str) -> bool:
         """
@@ -37,48 +41,44 @@ class PostgresResumeOperations:
         Returns:
             bool: True if successful
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            # Get current claimed competencies
-            cursor.execute("""
-                SELECT user_claimed_competencies
-                FROM cv_profiles
-                WHERE user_id = %s
-            """, (user_id,))
+                # Get current claimed competencies
+                cursor.execute("""
+                    SELECT user_claimed_competencies
+                    FROM cv_profiles
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError(f"No CV profile found for user {user_id}")
+                row = cursor.fetchone()
+                if not row:
+                    raise ValueError(f"No CV profile found for user {user_id}")
 
-            claimed_competencies = row[0] or {}
+                claimed_competencies = row[0] or {}
 
-            # Add/update the competency
-            claimed_competencies[competency_name] = {
-                'work_experience_ids': work_exp_ids,
-                'evidence': evidence,
-                'added_at': datetime.now().isoformat()
-            }
+                # Add/update the competency
+                claimed_competencies[competency_name] = {
+                    'work_experience_ids': work_exp_ids,
+                    'evidence': evidence,
+                    'added_at': datetime.now().isoformat()
+                }
 
-            # Update database
-            cursor.execute("""
-                UPDATE cv_profiles
-                SET user_claimed_competencies = %s,
-                    last_updated = NOW()
-                WHERE user_id = %s
-            """, (json.dumps(claimed_competencies), user_id))
+                # Update database
+                cursor.execute("""
+                    UPDATE cv_profiles
+                    SET user_claimed_competencies = %s,
+                        last_updated = NOW()
+                    WHERE user_id = %s
+                """, (json.dumps(claimed_competencies), user_id))
 
-            conn.commit()
-            return True
+                conn.commit()
+                return True
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error saving claimed competency: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error saving claimed competency: {e}")
+                raise
 
     def save_user_claimed_skill(self, user_id: int, skill_name: str,
                                 work_exp_ids: List[int], evidence: str) -> bool:
@@ -94,48 +94,44 @@ class PostgresResumeOperations:
         Returns:
             bool: True if successful
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            # Get current claimed skills
-            cursor.execute("""
-                SELECT user_claimed_skills
-                FROM cv_profiles
-                WHERE user_id = %s
-            """, (user_id,))
+                # Get current claimed skills
+                cursor.execute("""
+                    SELECT user_claimed_skills
+                    FROM cv_profiles
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError(f"No CV profile found for user {user_id}")
+                row = cursor.fetchone()
+                if not row:
+                    raise ValueError(f"No CV profile found for user {user_id}")
 
-            claimed_skills = row[0] or {}
+                claimed_skills = row[0] or {}
 
-            # Add/update the skill
-            claimed_skills[skill_name] = {
-                'work_experience_ids': work_exp_ids,
-                'evidence': evidence,
-                'added_at': datetime.now().isoformat()
-            }
+                # Add/update the skill
+                claimed_skills[skill_name] = {
+                    'work_experience_ids': work_exp_ids,
+                    'evidence': evidence,
+                    'added_at': datetime.now().isoformat()
+                }
 
-            # Update database
-            cursor.execute("""
-                UPDATE cv_profiles
-                SET user_claimed_skills = %s,
-                    last_updated = NOW()
-                WHERE user_id = %s
-            """, (json.dumps(claimed_skills), user_id))
+                # Update database
+                cursor.execute("""
+                    UPDATE cv_profiles
+                    SET user_claimed_skills = %s,
+                        last_updated = NOW()
+                    WHERE user_id = %s
+                """, (json.dumps(claimed_skills), user_id))
 
-            conn.commit()
-            return True
+                conn.commit()
+                return True
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error saving claimed skill: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error saving claimed skill: {e}")
+                raise
 
     def save_multiple_claims(self, user_id: int, selections: List[Dict[str, Any]]) -> bool:
         """
@@ -148,56 +144,52 @@ class PostgresResumeOperations:
         Returns:
             bool: True if successful
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            # Get current claimed data
-            cursor.execute("""
-                SELECT user_claimed_competencies, user_claimed_skills
-                FROM cv_profiles
-                WHERE user_id = %s
-            """, (user_id,))
+                # Get current claimed data
+                cursor.execute("""
+                    SELECT user_claimed_competencies, user_claimed_skills
+                    FROM cv_profiles
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError(f"No CV profile found for user {user_id}")
+                row = cursor.fetchone()
+                if not row:
+                    raise ValueError(f"No CV profile found for user {user_id}")
 
-            claimed_competencies = row[0] or {}
-            claimed_skills = row[1] or {}
+                claimed_competencies = row[0] or {}
+                claimed_skills = row[1] or {}
 
-            # Process each selection
-            for selection in selections:
-                item_data = {
-                    'work_experience_ids': selection['work_experience_ids'],
-                    'evidence': selection['evidence'],
-                    'added_at': datetime.now().isoformat()
-                }
+                # Process each selection
+                for selection in selections:
+                    item_data = {
+                        'work_experience_ids': selection['work_experience_ids'],
+                        'evidence': selection['evidence'],
+                        'added_at': datetime.now().isoformat()
+                    }
 
-                if selection['type'] == 'competency':
-                    claimed_competencies[selection['name']] = item_data
-                else:  # skill
-                    claimed_skills[selection['name']] = item_data
+                    if selection['type'] == 'competency':
+                        claimed_competencies[selection['name']] = item_data
+                    else:  # skill
+                        claimed_skills[selection['name']] = item_data
 
-            # Update database with both in one transaction
-            cursor.execute("""
-                UPDATE cv_profiles
-                SET user_claimed_competencies = %s,
-                    user_claimed_skills = %s,
-                    last_updated = NOW()
-                WHERE user_id = %s
-            """, (json.dumps(claimed_competencies), json.dumps(claimed_skills), user_id))
+                # Update database with both in one transaction
+                cursor.execute("""
+                    UPDATE cv_profiles
+                    SET user_claimed_competencies = %s,
+                        user_claimed_skills = %s,
+                        last_updated = NOW()
+                    WHERE user_id = %s
+                """, (json.dumps(claimed_competencies), json.dumps(claimed_skills), user_id))
 
-            conn.commit()
-            return True
+                conn.commit()
+                return True
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error saving multiple claims: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error saving multiple claims: {e}")
+                raise
 
     def get_user_claimed_data(self, user_id: int) -> Dict[str, Dict]:
         """
@@ -209,9 +201,7 @@ class PostgresResumeOperations:
         Returns:
             Dict with 'competencies' and 'skills' keys containing claimed data
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
 
             cursor.execute("""
                 SELECT user_claimed_competencies, user_claimed_skills
@@ -228,9 +218,6 @@ class PostgresResumeOperations:
                 'skills': row[1] or {}
             }
 
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
 
     def remove_claimed_competency(self, user_id: int, competency_name: str) -> bool:
         """
@@ -243,43 +230,39 @@ class PostgresResumeOperations:
         Returns:
             bool: True if successful
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            cursor.execute("""
-                SELECT user_claimed_competencies
-                FROM cv_profiles
-                WHERE user_id = %s
-            """, (user_id,))
+                cursor.execute("""
+                    SELECT user_claimed_competencies
+                    FROM cv_profiles
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError(f"No CV profile found for user {user_id}")
+                row = cursor.fetchone()
+                if not row:
+                    raise ValueError(f"No CV profile found for user {user_id}")
 
-            claimed_competencies = row[0] or {}
+                claimed_competencies = row[0] or {}
 
-            if competency_name in claimed_competencies:
-                del claimed_competencies[competency_name]
+                if competency_name in claimed_competencies:
+                    del claimed_competencies[competency_name]
 
-                cursor.execute("""
-                    UPDATE cv_profiles
-                    SET user_claimed_competencies = %s,
-                        last_updated = NOW()
-                    WHERE user_id = %s
-                """, (json.dumps(claimed_competencies), user_id))
+                    cursor.execute("""
+                        UPDATE cv_profiles
+                        SET user_claimed_competencies = %s,
+                            last_updated = NOW()
+                        WHERE user_id = %s
+                    """, (json.dumps(claimed_competencies), user_id))
 
-                conn.commit()
+                    conn.commit()
 
-            return True
+                return True
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error removing claimed competency: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error removing claimed competency: {e}")
+                raise
 
     def remove_claimed_skill(self, user_id: int, skill_name: str) -> bool:
         """
@@ -292,43 +275,39 @@ class PostgresResumeOperations:
         Returns:
             bool: True if successful
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            cursor.execute("""
-                SELECT user_claimed_skills
-                FROM cv_profiles
-                WHERE user_id = %s
-            """, (user_id,))
+                cursor.execute("""
+                    SELECT user_claimed_skills
+                    FROM cv_profiles
+                    WHERE user_id = %s
+                """, (user_id,))
 
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError(f"No CV profile found for user {user_id}")
+                row = cursor.fetchone()
+                if not row:
+                    raise ValueError(f"No CV profile found for user {user_id}")
 
-            claimed_skills = row[0] or {}
+                claimed_skills = row[0] or {}
 
-            if skill_name in claimed_skills:
-                del claimed_skills[skill_name]
+                if skill_name in claimed_skills:
+                    del claimed_skills[skill_name]
 
-                cursor.execute("""
-                    UPDATE cv_profiles
-                    SET user_claimed_skills = %s,
-                        last_updated = NOW()
-                    WHERE user_id = %s
-                """, (json.dumps(claimed_skills), user_id))
+                    cursor.execute("""
+                        UPDATE cv_profiles
+                        SET user_claimed_skills = %s,
+                            last_updated = NOW()
+                        WHERE user_id = %s
+                    """, (json.dumps(claimed_skills), user_id))
 
-                conn.commit()
+                    conn.commit()
 
-            return True
+                return True
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error removing claimed skill: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error removing claimed skill: {e}")
+                raise
 
     def save_generated_resume(self, user_id: int, job_id: int, resume_html: str,
                              resume_pdf_path: Optional[str],
@@ -349,52 +328,48 @@ class PostgresResumeOperations:
             int: Resume ID
         """
         import psycopg2
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            # Check if resume already exists for this user/job
-            cursor.execute("""
-                SELECT id FROM user_generated_resumes
-                WHERE user_id = %s AND job_id = %s
-            """, (user_id, job_id))
+                # Check if resume already exists for this user/job
+                cursor.execute("""
+                    SELECT id FROM user_generated_resumes
+                    WHERE user_id = %s AND job_id = %s
+                """, (user_id, job_id))
 
-            existing = cursor.fetchone()
+                existing = cursor.fetchone()
+
+                if existing:
+                    cursor.execute("""
+                        UPDATE user_generated_resumes
+                        SET resume_html = %s,
+                            resume_pdf_path = %s,
+                            resume_pdf_data = %s,
+                            selections_used = %s,
+                            updated_at = NOW()
+                        WHERE id = %s
+                        RETURNING id
+                    """, (resume_html, resume_pdf_path,
+                          psycopg2.Binary(pdf_data) if pdf_data else None,
+                          json.dumps(selections_used), existing[0]))
+                else:
+                    cursor.execute("""
+                        INSERT INTO user_generated_resumes
+                            (user_id, job_id, resume_html, resume_pdf_path, resume_pdf_data, selections_used)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                    """, (user_id, job_id, resume_html, resume_pdf_path,
+                          psycopg2.Binary(pdf_data) if pdf_data else None,
+                          json.dumps(selections_used)))
+
+                resume_id = cursor.fetchone()[0]
+                conn.commit()
+                return resume_id
 
-            if existing:
-                cursor.execute("""
-                    UPDATE user_generated_resumes
-                    SET resume_html = %s,
-                        resume_pdf_path = %s,
-                        resume_pdf_data = %s,
-                        selections_used = %s,
-                        updated_at = NOW()
-                    WHERE id = %s
-                    RETURNING id
-                """, (resume_html, resume_pdf_path,
-                      psycopg2.Binary(pdf_data) if pdf_data else None,
-                      json.dumps(selections_used), existing[0]))
-            else:
-                cursor.execute("""
-                    INSERT INTO user_generated_resumes
-                        (user_id, job_id, resume_html, resume_pdf_path, resume_pdf_data, selections_used)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (user_id, job_id, resume_html, resume_pdf_path,
-                      psycopg2.Binary(pdf_data) if pdf_data else None,
-                      json.dumps(selections_used)))
-
-            resume_id = cursor.fetchone()[0]
-            conn.commit()
-            return resume_id
-
-        except Exception as e:
-            conn.rollback()
-            print(f"Error saving generated resume: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error saving generated resume: {e}")
+                raise
 
     def get_user_resumes(self, user_id: int, job_id: Optional[int] = None) -> List[Dict]:
         """
@@ -407,9 +382,7 @@ class PostgresResumeOperations:
         Returns:
             List of resume dicts
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
 
             if job_id:
                 cursor.execute("""
@@ -446,9 +419,6 @@ class PostgresResumeOperations:
 
             return resumes
 
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
 
     def get_resume_by_id(self, resume_id: int, user_id: int) -> Optional[Dict]:
         """
@@ -461,9 +431,7 @@ class PostgresResumeOperations:
         Returns:
             Resume dict or None if not found/not owned by user
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
 
             cursor.execute("""
                 SELECT id, user_id, job_id, resume_html, resume_pdf_path,
@@ -488,9 +456,6 @@ class PostgresResumeOperations:
                 'resume_pdf_data': bytes(row[8]) if row[8] else None,
             }
 
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
 
     def delete_resume(self, resume_id: int, user_id: int) -> bool:
         """
@@ -503,28 +468,24 @@ class PostgresResumeOperations:
         Returns:
             bool: True if deleted
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
+            try:
 
-            cursor.execute("""
-                DELETE FROM user_generated_resumes
-                WHERE id = %s AND user_id = %s
-                RETURNING id
-            """, (resume_id, user_id))
+                cursor.execute("""
+                    DELETE FROM user_generated_resumes
+                    WHERE id = %s AND user_id = %s
+                    RETURNING id
+                """, (resume_id, user_id))
 
-            deleted = cursor.fetchone()
-            conn.commit()
+                deleted = cursor.fetchone()
+                conn.commit()
 
-            return deleted is not None
+                return deleted is not None
 
-        except Exception as e:
-            conn.rollback()
-            print(f"Error deleting resume: {e}")
-            raise
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error deleting resume: {e}")
+                raise
 
     def get_resume_count_for_user(self, user_id: int) -> int:
         """
@@ -536,9 +497,7 @@ class PostgresResumeOperations:
         Returns:
             int: Number of resumes
         """
-        conn = self.pool.getconn()
-        try:
-            cursor = conn.cursor()
+        with self._connection() as conn, conn.cursor() as cursor:
 
             cursor.execute("""
                 SELECT COUNT(*) FROM user_generated_resumes
@@ -547,6 +506,3 @@ class PostgresResumeOperations:
 
             return cursor.fetchone()[0]
 
-        finally:
-            cursor.close()
-            self.pool.putconn(conn)
@@ -0,0 +1,249 @@
+"""
+Claim-based work queue over the jobs table
+
+Enrichment workers used to SELECT "jobs that still need X ... LIMIT n"
+independently, so parallel workers picked the same rows and paid Claude twice
+for them. Workers now claim rows first:
+
+    queue = EnrichmentQueue(conn, 'full_enrichment', worker_id='host:1234:0')
+    jobs = queue.claim_batch(50)        # FOR UPDATE SKIP LOCKED, leased
+    ...
+    queue.complete(done_ids)
+    queue.fail(failed_ids, error)
+
+Claims live in job_enrichment_claims, one row per (job, task), so tasks
+never see each other's claims, attempts or failures: a job parked by one
+task stays claimable for every other task.
+
+A claim is a lease (lease_expires): if a worker dies, its rows become
+claimable again once the lease runs out. A failed row is retried after
+retry_delay; after max_attempts failures it is parked as 'failed' for that
+task.
+
+Whether a job still needs a task is decided by the task's predicate
+(TASKS below), so finishing the work itself takes a row out of the queue;
+claim rows only track work in progress and failures and are deleted on
+complete.
+
+conn may be a psycopg2 connection or a PostgresDatabase (a pooled
+connection is then checked out per call, so nothing is held between
+claiming and completing).
+"""
+
+import os
+import socket
+import logging
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Optional
+
+from psycopg2.extras import RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+# Task name -> SQL predicate for jobs that still need the task
+TASKS = {
+    'lightweight_enrichment': "(source_type IS NULL OR source_type = '') AND description IS NOT NULL",
+    'full_enrichment': "(source_type IS NULL OR source_type = '')",
+    'competency_backfill': "ai_competencies IS NULL AND description IS NOT NULL",
+    'encoding': "embedding_jobbert_title IS NULL",
+    'description_encoding': "embedding_jobbert_description IS NULL AND description IS NOT NULL",
+}
+
+DEFAULT_COLUMNS = ('id', 'title', 'company', 'location', 'description')
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS job_enrichment_claims (
+        job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+        task TEXT NOT NULL,
+        state TEXT NOT NULL,
+        claimed_by TEXT,
+        lease_expires TIMESTAMP,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        PRIMARY KEY (job_id, task)
+    )
+"""
+
+INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_job_enrichment_claims_state
+    ON job_enrichment_claims(task, state, lease_expires)
+"""
+
+# A claim row that keeps its job from being claimed again for the same task
+# (an unexpired claim or retry delay, or a parked failure)
+_BLOCKING_CLAIM = """
+    SELECT 1 FROM job_enrichment_claims c
+    WHERE c.job_id = jobs.id AND c.task = %(task)s
+      AND NOT (c.state IN ('claimed', 'retry') AND c.lease_expires < NOW())
+"""
+
+
+def default_worker_id(suffix: Any = None) -> str:
+    """host:pid[:suffix], unique per worker process"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{worker_id}:{suffix}" if suffix is not None else worker_id
+
+
+class EnrichmentQueue:
+    """Lease-based claims on jobs for one enrichment task"""
+
+    def __init__(self, conn, task: str, worker_id: Optional[str] = None,
+                 lease_seconds: int = 900, max_attempts: int = 3, retry_delay: int = 600):
+        """
+        Args:
+            conn: psycopg2 connection or PostgresDatabase
+            task: Key of TASKS
+            worker_id: Identifies this worker's claims (default: host:pid)
+            lease_seconds: How long a claim is held before others may take it
+            max_attempts: Failures after which a job is parked for this task
+            retry_delay: Seconds before a failed job can be claimed again
+        """
+        if task not in TASKS:
+            raise ValueError(f"Unknown enrichment task: {task}")
+        self.conn = conn
+        self.task = task
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    @contextmanager
+    def _cursor(self):
+        """Cursor on a pooled (PostgresDatabase) or caller-owned connection; commits on success"""
+        if hasattr(self.conn, '_connection'):
+            with self.conn._connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                yield cursor
+                conn.commit()
+        else:
+            try:
+                with self.conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    yield cursor
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def ensure_schema(self):
+        """Create job_enrichment_claims (PostgresDatabase does this on startup)"""
+        with self._cursor() as cursor:
+            cursor.execute(SCHEMA_SQL)
+            cursor.execute(INDEX_SQL)
+
+    def claim_batch(self, n: int, columns: Iterable[str] = DEFAULT_COLUMNS,
+                    job_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Claim up to n jobs that still need this task
+
+        Rows locked by another transaction are skipped, not waited on, and
+        jobs under an unexpired lease, a retry delay or a parked failure for
+        this task are not eligible. Other tasks' claims don't matter.
+
+        Args:
+            n: Maximum jobs to claim
+            columns: Job columns to return (trusted identifiers)
+            job_ids: Only consider these jobs (e.g. a matching run's top matches)
+
+        Returns:
+            Claimed jobs, newest first
+        """
+        if n <= 0:
+            return []
+        restrict = "AND id = ANY(%(job_ids)s)" if job_ids is not None else ""
+        returning = ', '.join(f"j.{c}" for c in columns)
+
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                WITH picked AS (
+                    SELECT id FROM jobs
+                    WHERE {TASKS[self.task]}
+                      {restrict}
+                      AND NOT EXISTS ({_BLOCKING_CLAIM})
+                    ORDER BY discovered_date DESC
+                    LIMIT %(n)s
+                    FOR UPDATE SKIP LOCKED
+                ), claimed AS (
+                    INSERT INTO job_enrichment_claims (job_id, task, state, claimed_by, lease_expires, attempts)
+                    SELECT id, %(task)s, 'claimed', %(worker)s,
+                           NOW() + %(lease)s * INTERVAL '1 second', 1
+                    FROM picked
+                    ON CONFLICT (job_id, task) DO UPDATE
+                    SET state = 'claimed',
+                        claimed_by = EXCLUDED.claimed_by,
+                        lease_expires = EXCLUDED.lease_expires,
+                        attempts = job_enrichment_claims.attempts + 1
+                    -- Re-checked on the current row: another worker may have
+                    -- claimed the job since `picked` looked
+                    WHERE job_enrichment_claims.state IN ('claimed', 'retry')
+                      AND job_enrichment_claims.lease_expires < NOW()
+                    RETURNING job_id
+                )
+                SELECT {returning}
+                FROM jobs j JOIN claimed ON claimed.job_id = j.id
+                ORDER BY j.discovered_date DESC
+            """, {'task': self.task, 'n': n, 'worker': self.worker_id,
+                  'lease': self.lease_seconds, 'job_ids': job_ids})
+            jobs = [dict(row) for row in cursor.fetchall()]
+
+        if jobs:
+            logger.info(f"{self.worker_id} claimed {len(jobs)} jobs for {self.task}")
+        return jobs
+
+    def complete(self, job_ids: Iterable[int]) -> int:
+        """Release claims on finished jobs"""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        with self._cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM job_enrichment_claims
+                WHERE job_id = ANY(%(ids)s) AND task = %(task)s
+                  AND state = 'claimed' AND claimed_by = %(worker)s
+            """, {'ids': ids, 'task': self.task, 'worker': self.worker_id})
+            return cursor.rowcount
+
+    def release(self, job_ids: Iterable[int]) -> int:
+        """Give claims back without counting an attempt (e.g. on shutdown)"""
+        return self._update_claimed(job_ids, """
+            state = 'retry',
+            claimed_by = NULL,
+            lease_expires = NOW(),
+            attempts = GREATEST(attempts - 1, 0)
+        """)
+
+    def fail(self, job_ids: Iterable[int], error: Optional[str] = None) -> int:
+        """
+        Record a failed attempt
+
+        The job becomes claimable again after retry_delay seconds; after
+        max_attempts failures it is parked as 'failed' for this task.
+        """
+        return self._update_claimed(job_ids, """
+            state = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'retry' END,
+            claimed_by = NULL,
+            lease_expires = NOW() + %(delay)s * INTERVAL '1 second',
+            error = %(error)s
+        """, {'max_attempts': self.max_attempts, 'delay': self.retry_delay,
+              'error': error[:500] if error else None})
+
+    def extend_lease(self, job_ids: Iterable[int]) -> int:
+        """Keep long-running claims from expiring"""
+        return self._update_claimed(job_ids, """
+            lease_expires = NOW() + %(lease)s * INTERVAL '1 second'
+        """, {'lease': self.lease_seconds})
+
+    def _update_claimed(self, job_ids: Iterable[int], assignments: str,
+                        params: Optional[Dict[str, Any]] = None) -> int:
+        """Apply assignments to this task's claims that this worker still holds"""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE job_enrichment_claims
+                SET {assignments}
+                WHERE job_id = ANY(%(ids)s)
+                  AND task = %(task)s
+                  AND state = 'claimed'
+                  AND claimed_by = %(worker)s
+            """, {**(params or {}), 'ids': ids, 'task': self.task, 'worker': self.worker_id})
+            return cursor.rowcount
@@ -15,6 +15,8 @@ from datetime import datetime
 
 from src.collectors.jsearch import JSearchCollector
 from src.collectors.activejobs_backfill import ActiveJobsBackfillCollector
+from src.utils.progress_bus import progress_bus
+from src.utils.profiler import background_profile
 
 
 class UserBackfillService:
@@ -32,6 +34,7 @@ class UserBackfillService:
         self.jsearch_collector = JSearchCollector(jsearch_key) if jsearch_key else None
         self.activejobs_collector = ActiveJobsBackfillCollector(activejobs_key) if activejobs_key else None
         self.db = db
+        self.user_id = None
 
         self.stats = {
             'user_email': None,
@@ -71,6 +74,7 @@ class UserBackfillService:
         print("=" * 70)
 
         self.stats['user_email'] = user_email
+        self.user_id = user_id
 
         # Get ONLY combinations that haven't been backfilled yet
         unbacked_combinations = self.db.get_unbacked_combinations_for_user(user_id)
@@ -78,6 +82,7 @@ class UserBackfillService:
         if not unbacked_combinations:
             print(f"\n✅ All combinations for user {user_email} already backfilled!")
             print("No new backfill needed - user can access existing jobs")
+            self._publish('done', already_backfilled=True, new_jobs_added=0)
             return {
                 'user_email': user_email,
                 'already_backfilled': True,
@@ -93,8 +98,7 @@ class UserBackfillService:
         if len(unbacked_combinations) > 5:
             print(f"    ... and {len(unbacked_combinations) - 5} more")
 
-        # Get deleted job IDs to skip
-        deleted_ids = self.db.get_deleted_job_ids()
+        self._publish('started', combinations=len(unbacked_combinations))
 
         all_jobs = []
         seen_job_ids = set()
@@ -106,13 +110,14 @@ class UserBackfillService:
             print(f"{'='*70}")
 
             jsearch_jobs = self._backfill_jsearch(unbacked_combinations)
-            jsearch_unique = self._deduplicate_jobs(jsearch_jobs, seen_job_ids, deleted_ids)
+            jsearch_unique = self._deduplicate_jobs(jsearch_jobs, seen_job_ids)
             all_jobs.extend(jsearch_unique)
 
             self.stats['jsearch_jobs'] = len(jsearch_unique)
             self.stats['quota_used']['jsearch'] = len(jsearch_jobs)
 
             print(f"\n✓ JSearch: {len(jsearch_jobs)} fetched, {len(jsearch_unique)} unique")
+            self._publish('fetched', source='jsearch', fetched=len(jsearch_jobs), unique=len(jsearch_unique))
 
         # Fetch from Active Jobs DB (if enabled)
         if use_activejobs and self.activejobs_collector:
@@ -121,26 +126,22 @@ class UserBackfillService:
             print(f"{'='*70}")
 
             activejobs_jobs = self._backfill_activejobs(unbacked_combinations)
-            activejobs_unique = self._deduplicate_jobs(activejobs_jobs, seen_job_ids, deleted_ids)
+            activejobs_unique = self._deduplicate_jobs(activejobs_jobs, seen_job_ids)
             all_jobs.extend(activejobs_unique)
 
             self.stats['activejobs_jobs'] = len(activejobs_unique)
             self.stats['quota_used']['activejobs'] = len(activejobs_jobs)
 
             print(f"\n✓ Active Jobs DB: {len(activejobs_jobs)} fetched, {len(activejobs_unique)} unique")
+            self._publish('fetched', source='activejobs', fetched=len(activejobs_jobs),
+                          unique=len(activejobs_unique))
 
         # Mark all combinations as backfilled
         print(f"\n📝 Marking {len(unbacked_combinations)} combinations as backfilled...")
-        for combo in unbacked_combinations:
-            self.db.mark_combination_backfilled(
-                title_keyword=combo.get('title_keyword'),
-                location=combo.get('location'),
-                ai_work_arrangement=combo.get('ai_work_arrangement'),
-                ai_employment_type=combo.get('ai_employment_type'),
-                ai_seniority=combo.get('ai_seniority'),
-                ai_industry=combo.get('ai_industry'),
-                jobs_found=len(all_jobs)  # Approximate
-            )
+        self.db.mark_combinations_backfilled(
+            unbacked_combinations,
+            jobs_found=len(all_jobs)  # Approximate
+        )
 
         # Store jobs
         print(f"\n{'='*70}")
@@ -153,6 +154,7 @@ class UserBackfillService:
 
         # Print summary
         self._print_summary()
+        self._publish('done', total_fetched=len(all_jobs), new_jobs_added=stored_count)
 
         return self.stats
 
@@ -360,8 +362,7 @@ class UserBackfillService:
     def _deduplicate_jobs(
         self,
         jobs: List[Dict],
-        seen_job_ids: set,
-        deleted_ids: set
+        seen_job_ids: set
     ) -> List[Dict]:
         """
         Remove duplicate and deleted jobs using both ID and content-based deduplication
@@ -375,7 +376,6 @@ class UserBackfillService:
         Args:
             jobs: List of job dictionaries to deduplicate
             seen_job_ids: Set of external_ids/URLs already seen
-            deleted_ids: Set of job_ids that have been deleted/hidden
 
         Returns:
             List of unique jobs
@@ -383,9 +383,17 @@ class UserBackfillService:
         unique_jobs = []
         seen_signatures = set()  # Track content-based signatures
 
+        def primary_key(job):
+            return job.get('external_id') or job.get('url', '') or job.get('job_id', '')
+
+        # Deleted/hidden jobs among this batch only (one indexed lookup)
+        deleted_ids = self.db.find_deleted_job_ids(
+            [primary_key(job) for job in jobs if primary_key(job) not in seen_job_ids]
+        )
+
         for job in jobs:
             # Primary deduplication key: external_id or URL
-            job_id = job.get('external_id') or job.get('url', '') or job.get('job_id', '')
+            job_id = primary_key(job)
 
             # Secondary deduplication: content-based signature
             signature = (
@@ -432,6 +440,7 @@ class UserBackfillService:
                     stored_count += 1
                     if stored_count % 50 == 0:
                         print(f"  Stored {stored_count}/{len(jobs)} jobs...")
+                        self._publish('storing', stored=stored_count, total=len(jobs))
 
             except Exception as e:
                 print(f"  Warning: Could not store job {i}: {e}")
@@ -440,6 +449,11 @@ class UserBackfillService:
         print(f"  ✓ Successfully stored {stored_count}/{len(jobs)} jobs")
         return stored_count
 
+    def _publish(self, stage: str, **data):
+        """Report backfill progress on the user's progress channel"""
+        if self.user_id is not None:
+            progress_bus.publish(self.user_id, 'backfill', stage=stage, **data)
+
     def _print_summary(self):
         """Print backfill summary"""
         print(f"\n{'='*70}")
@@ -500,12 +514,14 @@ def backfill_user_on_signup(user_id: int, user_email: str, db) -> Dict:
         db=db
     )
 
-    return service.backfill_user(
-        user_id=user_id,
-        user_email=user_email,
-        use_jsearch=bool(jsearch_key),
-        use_activejobs=bool(activejobs_key)
-    )
+    # PROFILE_BACKGROUND=backfill saves a profile of the run (src.utils.profiler)
+    with background_profile('backfill', user_id=user_id):
+        return service.backfill_user(
+            user_id=user_id,
+            user_email=user_email,
+            use_jsearch=bool(jsearch_key),
+            use_activejobs=bool(activejobs_key)
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""
+Persisted CV embeddings
+
+Every matching run used to rebuild the CV text and run it through JobBERT.
+The embedding is now stored on cv_profiles as float32 bytes together with a
+fingerprint of what produced it:
+
+    cv_embedding        BYTEA   embedding of build_cv_text(profile)
+    cv_embedding_model  TEXT    model name (CV_EMBEDDING_MODEL)
+    cv_embedding_hash   TEXT    SHA-256 of the CV text
+
+A stored embedding is used only while both fingerprints match, so a changed
+profile or a model switch triggers exactly one re-encode:
+
+    embedding = ensure_cv_embedding(cv_manager, profile, model)   # matchers
+    refresh_cv_embedding(cv_manager, cv_id)                       # after upload/reparse
+    cv_manager.get_cv_embedding(cv_id)                            # stored only, or None
+
+The columns are added by scripts/migrations/add_cv_embeddings.py. Managers
+without them (SQLite) simply encode every time.
+"""
+
+import hashlib
+import logging
+import threading
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model CV and job title embeddings are computed with
+CV_EMBEDDING_MODEL = 'TechWolf/JobBERT-v3'
+
+_filter_module = None
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_filter_module():
+    """scripts/filter_jobs.py (build_cv_text and friends), loaded once"""
+    global _filter_module
+    if _filter_module is None:
+        filter_jobs_path = Path(__file__).parent.parent.parent / 'scripts' / 'filter_jobs.py'
+        spec = importlib.util.spec_from_file_location("filter_module", filter_jobs_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _filter_module = module
+    return _filter_module
+
+
+def get_cv_model():
+    """Process-wide CV_EMBEDDING_MODEL, loaded on first use"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(CV_EMBEDDING_MODEL, device='cpu', trust_remote_code=True)
+        return _model
+
+
+def cv_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def embedding_to_bytes(embedding) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def embedding_from_bytes(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+
+def stored_embedding(stored: Optional[Dict], text_hash: Optional[str] = None,
+                     model_name: str = CV_EMBEDDING_MODEL) -> Optional[np.ndarray]:
+    """
+    Decode a stored embedding if its fingerprint is current
+
+    Args:
+        stored: Dict with cv_embedding, cv_embedding_model, cv_embedding_hash
+        text_hash: Hash of the current CV text (None skips the text check)
+        model_name: Model the caller scores with
+    """
+    if not stored or not stored.get('cv_embedding'):
+        return None
+    if stored.get('cv_embedding_model') != model_name:
+        return None
+    if text_hash is not None and stored.get('cv_embedding_hash') != text_hash:
+        return None
+    return embedding_from_bytes(stored['cv_embedding'])
+
+
+def ensure_cv_embeddings(cv_manager, users: List[Dict], model=None) -> np.ndarray:
+    """
+    Embeddings for many profiles, encoding only those without a current one
+
+    Args:
+        cv_manager: PostgresCVManager (or any manager; persistence is skipped without save_cv_embedding)
+        users: Dicts with 'profile' and optionally 'stored_embedding' (get_active_user_profiles)
+        model: SentenceTransformer for CV_EMBEDDING_MODEL (loaded if needed)
+
+    Returns:
+        Matrix with one row per user, in the order given
+    """
+    filter_module = load_filter_module()
+    texts = [filter_module.build_cv_text(user['profile']) for user in users]
+    hashes = [cv_text_hash(text) for text in texts]
+
+    rows: List[Optional[np.ndarray]] = [stored_embedding(user.get('stored_embedding'), text_hash)
+                                        for user, text_hash in zip(users, hashes)]
+    stale = [i for i, row in enumerate(rows) if row is None]
+    if stale:
+        model = model or get_cv_model()
+        encoded = model.encode([texts[i] for i in stale], show_progress_bar=False, convert_to_numpy=True)
+        for i, embedding in zip(stale, encoded):
+            rows[i] = np.asarray(embedding, dtype=np.float32)
+            if hasattr(cv_manager, 'save_cv_embedding'):
+                cv_manager.save_cv_embedding(users[i]['profile']['cv_id'], embedding_to_bytes(embedding),
+                                             CV_EMBEDDING_MODEL, hashes[i])
+        logger.info(f"Encoded {len(stale)} of {len(users)} CV profiles")
+
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.vstack(rows)
+
+
+def ensure_cv_embedding(cv_manager, profile: Dict, model=None) -> np.ndarray:
+    """Embedding for one profile: the stored one if current, else encoded and stored"""
+    filter_module = load_filter_module()
+    text_hash = cv_text_hash(filter_module.build_cv_text(profile))
+
+    if hasattr(cv_manager, 'get_cv_embedding') and profile.get('cv_id'):
+        embedding = cv_manager.get_cv_embedding(profile['cv_id'], text_hash=text_hash)
+        if embedding is not None:
+            return embedding
+
+    return ensure_cv_embeddings(cv_manager, [{'profile': profile}], model)[0]
+
+
+def refresh_cv_embedding(cv_manager, cv_id: int, background: bool = True):
+    """
+    Recompute a CV's embedding after its profile was written
+
+    No-op for managers that cannot persist embeddings. Runs in a daemon
+    thread by default so uploads do not wait for the model.
+    """
+    if not hasattr(cv_manager, 'save_cv_embedding'):
+        return
+
+    def refresh():
+        try:
+            profile = cv_manager.get_cv_profile(cv_id)
+            if profile:
+                ensure_cv_embedding(cv_manager, profile)
+        except Exception as e:
+            logger.warning(f"CV embedding refresh failed for CV {cv_id}: {e}")
+
+    if background:
+        threading.Thread(target=refresh, daemon=True).start()
+    else:
+        refresh()
@@ -0,0 +1,161 @@
+"""
+Chunked description embeddings
+
+Full-text semantic search used to encode title + company + location +
+description[:3000] for every job in the result set on each request. The
+description vector is now precomputed by a background stage, next to
+embedding_jobbert_title:
+
+    1. clean the description (HTML, entities, whitespace)
+    2. split it into overlapping word windows; the first chunk carries a
+       "title / company / location" header
+    3. encode the chunks of a whole claimed batch in one model.encode call
+    4. pool each job's unit-normalised chunk vectors (mean or max) into
+       jobs.embedding_jobbert_description (added by
+       scripts/migrations/add_description_embeddings.py)
+
+Jobs are claimed through EnrichmentQueue('description_encoding'), so the
+stage is resumable and safe to run from several workers: a job leaves the
+queue when its vector is stored, and an interrupted batch becomes claimable
+again when its lease expires.
+
+    encode_job_descriptions(db, model, limit=500)
+"""
+
+import re
+import html
+import time
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words per chunk and words shared by consecutive chunks (JobBERT reads ~512 tokens)
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+
+# Chunks encoded per job; later text is usually benefits/boilerplate
+MAX_CHUNKS = 8
+
+# Jobs claimed per round and chunks per model.encode batch
+DESCRIPTION_BATCH_SIZE = 64
+ENCODE_BATCH_SIZE = 32
+
+POOLING_MODES = ('mean', 'max')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def clean_description(text: Optional[str]) -> str:
+    """Plain text of a (possibly HTML) job description"""
+    if not text:
+        return ''
+    text = _TAG_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', html.unescape(text)).strip()
+
+
+def chunk_text(text: str, chunk_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP,
+               max_chunks: int = MAX_CHUNKS) -> List[str]:
+    """Split text into overlapping windows of chunk_words words"""
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(' '.join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words) or len(chunks) >= max_chunks:
+            break
+    return chunks
+
+
+def job_chunks(job: Dict) -> List[str]:
+    """Chunks to encode for a job; the first one is prefixed with its header"""
+    header = ' / '.join(part for part in (job.get('title'), job.get('company'), job.get('location')) if part)
+    chunks = chunk_text(clean_description(job.get('description')))
+    if not chunks:
+        return [header] if header else []
+    if header:
+        chunks[0] = f"{header}. {chunks[0]}"
+    return chunks
+
+
+def pool_chunks(embeddings: np.ndarray, mode: str = 'mean') -> np.ndarray:
+    """Pool a job's chunk embeddings (chunks x dim) into one unit vector"""
+    if mode not in POOLING_MODES:
+        raise ValueError(f"Unknown pooling mode: {mode}")
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embeddings = embeddings / norms
+    pooled = embeddings.mean(axis=0) if mode == 'mean' else embeddings.max(axis=0)
+    norm = np.linalg.norm(pooled)
+    return pooled / norm if norm else pooled
+
+
+def encode_jobs(model, jobs: List[Dict], pooling: str = 'mean') -> Dict[int, np.ndarray]:
+    """Encode all chunks of jobs in one batched call and pool them per job"""
+    chunks, owners = [], []
+    for job in jobs:
+        for chunk in job_chunks(job):
+            chunks.append(chunk)
+            owners.append(job['id'])
+    if not chunks:
+        return {}
+
+    embeddings = model.encode(chunks, batch_size=ENCODE_BATCH_SIZE,
+                              show_progress_bar=False, convert_to_numpy=True)
+    owners = np.array(owners)
+    return {job['id']: pool_chunks(embeddings[owners == job['id']], pooling)
+            for job in jobs if (owners == job['id']).any()}
+
+
+def encode_job_descriptions(db, model, limit: Optional[int] = None,
+                            batch_size: int = DESCRIPTION_BATCH_SIZE, pooling: str = 'mean') -> int:
+    """
+    Claim jobs without a description embedding, encode and store them
+
+    Args:
+        db: PostgresDatabase
+        model: SentenceTransformer (TechWolf/JobBERT-v3, as for titles)
+        limit: Maximum jobs to encode (None = until the queue is empty)
+        batch_size: Jobs claimed per round
+        pooling: 'mean' or 'max'
+
+    Returns:
+        Number of jobs encoded
+    """
+    from src.database.work_queue import EnrichmentQueue
+
+    queue = EnrichmentQueue(db, 'description_encoding')
+    encoded = 0
+    start_time = time.time()
+
+    while limit is None or encoded < limit:
+        n = batch_size if limit is None else min(batch_size, limit - encoded)
+        jobs = queue.claim_batch(n, columns=('id', 'title', 'company', 'location', 'description'))
+        if not jobs:
+            break
+
+        job_ids = [job['id'] for job in jobs]
+        try:
+            vectors = encode_jobs(model, jobs, pooling)
+            db.update_job_description_embeddings_batch([
+                {'job_id': job_id, 'embedding': vector} for job_id, vector in vectors.items()
+            ])
+        except Exception as e:
+            queue.fail(job_ids, str(e))
+            raise
+
+        # Nothing to encode (empty after cleaning): park instead of reclaiming forever
+        queue.fail([job_id for job_id in job_ids if job_id not in vectors], 'no description text')
+        queue.complete(list(vectors))
+        encoded += len(vectors)
+
+    if encoded:
+        elapsed = time.time() - start_time
+        logger.info(f"Encoded {encoded} job descriptions in {elapsed:.1f}s")
+    return encoded
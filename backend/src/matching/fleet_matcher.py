@@ -0,0 +1,271 @@
+"""
+Fleet-wide incremental matching
+
+run_background_matching scores one user against every job that user has not
+seen yet. When the daily cron ingests new jobs, fleet matching scores every
+active user against just those jobs in one pass:
+
+    scores = U @ J.T        # users x new jobs cosine similarities
+
+U holds the unit-normalised CV embeddings of all active users, cached in
+process per profile version and read from cv_profiles.cv_embedding (encoded
+only when the stored one is stale, see cv_embeddings); J holds
+the new jobs' pre-computed JobBERT title embeddings. Location preferences
+become a users x jobs mask with the semantics of get_unfiltered_jobs_for_user
+(remote, or a preferred city inside cities_derived/locations_derived), and the
+keyword boosts of apply_keyword_boosts are computed as a matrix too. Pairs
+that clear the threshold are bulk-inserted into user_job_matches with their
+semantic score, and each user with new matches gets a 'matches' progress
+event. The user's next matching run reranks and analyzes them with Claude
+(get_unanalyzed_matches_for_user).
+
+    run_fleet_matching(db, cv_manager, since=run_started, model=model)
+"""
+
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.matching.cv_embeddings import ensure_cv_embeddings
+from src.utils.progress_bus import progress_bus
+
+logger = logging.getLogger(__name__)
+
+# Same cut-off as run_background_matching
+SEMANTIC_THRESHOLD = 0.30
+
+# Jobs scored per matrix product (bounds the users x jobs score matrix)
+JOB_CHUNK_SIZE = 2000
+
+# Matches per add_user_job_matches_batch call
+INSERT_BATCH_SIZE = 1000
+
+# Best new matches sent with each user's 'matches' progress event
+PARTIAL_RESULTS_SIZE = 10
+
+# Boosts of scripts/filter_jobs.py apply_keyword_boosts
+TITLE_KEYWORD_BOOST = 0.15
+TEXT_KEYWORD_BOOST = 0.05
+LEADERSHIP_BOOST = 0.10
+MAX_KEYWORD_BOOST = 0.3
+LEADERSHIP_TERMS = ('lead', 'principal', 'senior', 'head of', 'manager', 'director', 'leiter')
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _parse_embedding(value) -> Optional[np.ndarray]:
+    try:
+        data = json.loads(value) if isinstance(value, str) else value
+        return np.asarray(data, dtype=np.float32) if data is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def profile_version(profile: Dict) -> Tuple:
+    """Changes whenever the profile a CV embedding was built from changes"""
+    return (profile.get('id'), str(profile.get('last_updated') or profile.get('created_date')))
+
+
+class CVMatrixCache:
+    """Unit-normalised CV embeddings of active users, re-encoded only when a profile changes"""
+
+    def __init__(self):
+        self._vectors: Dict[int, Tuple[Tuple, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def matrix(self, users: List[Dict], encode: Callable[[List[Dict]], np.ndarray]) -> np.ndarray:
+        """
+        CV matrix with one row per user, in the order given
+
+        Args:
+            users: Dicts with 'user_id' and 'profile'
+            encode: Returns one embedding row per user dict passed to it
+        """
+        with self._lock:
+            stale = [user for user in users
+                     if self._vectors.get(user['user_id'], (None,))[0] != profile_version(user['profile'])]
+            if stale:
+                embeddings = _normalize_rows(np.asarray(encode(stale), dtype=np.float32))
+                for user, embedding in zip(stale, embeddings):
+                    self._vectors[user['user_id']] = (profile_version(user['profile']), embedding)
+                logger.info(f"Fleet matching: loaded {len(stale)} changed CV profiles")
+
+            active = {user['user_id'] for user in users}
+            for user_id in list(self._vectors):
+                if user_id not in active:
+                    del self._vectors[user_id]
+
+            if not users:
+                return np.empty((0, 0), dtype=np.float32)
+            return np.vstack([self._vectors[user['user_id']][1] for user in users])
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+
+
+cv_matrix_cache = CVMatrixCache()
+
+
+def location_mask(user_cities: List[List[str]], jobs: List[Dict]) -> np.ndarray:
+    """
+    users x jobs boolean mask of jobs each user's location preferences allow
+
+    Same rule as get_unfiltered_jobs_for_user: users without cities see every
+    job; otherwise remote jobs and jobs with a derived city/location containing
+    one of the user's cities (case-insensitive).
+    """
+    mask = np.ones((len(user_cities), len(jobs)), dtype=bool)
+    if not jobs:
+        return mask
+
+    remote = np.array(['remote' in (job.get('ai_work_arrangement') or '').lower() for job in jobs])
+    places = [[place.lower() for place in (job.get('cities_derived') or []) + (job.get('locations_derived') or [])
+               if place]
+              for job in jobs]
+
+    city_hits: Dict[str, np.ndarray] = {}
+    for row, cities in enumerate(user_cities):
+        cities = [city.lower() for city in cities if city]
+        if not cities:
+            continue
+        allowed = remote.copy()
+        for city in cities:
+            if city not in city_hits:
+                city_hits[city] = np.array([any(city in place for place in job_places)
+                                            for job_places in places])
+            allowed |= city_hits[city]
+        mask[row] = allowed
+    return mask
+
+
+def keyword_boosts(user_keywords: List[List[str]], jobs: List[Dict]) -> np.ndarray:
+    """users x jobs matrix of the boosts apply_keyword_boosts would add"""
+    titles = [(job.get('title') or '').lower() for job in jobs]
+    texts = [f"{job.get('title', '')} {job.get('description', '')}".lower() for job in jobs]
+    leadership = np.array([LEADERSHIP_BOOST if any(term in title for term in LEADERSHIP_TERMS) else 0.0
+                           for title in titles], dtype=np.float32)
+
+    keyword_columns: Dict[str, np.ndarray] = {}
+    boosts = np.tile(leadership, (len(user_keywords), 1))
+    for row, keywords in enumerate(user_keywords):
+        for keyword in keywords:
+            needle = keyword.lower()
+            if needle not in keyword_columns:
+                keyword_columns[needle] = np.array([
+                    TITLE_KEYWORD_BOOST if needle in title else TEXT_KEYWORD_BOOST if needle in text else 0.0
+                    for title, text in zip(titles, texts)
+                ], dtype=np.float32)
+            boosts[row] += keyword_columns[needle]
+    return np.minimum(boosts, MAX_KEYWORD_BOOST)
+
+
+def score_matches(users: List[Dict], cv_matrix: np.ndarray, jobs: List[Dict],
+                  job_matrix: np.ndarray, threshold: float = SEMANTIC_THRESHOLD) -> List[Dict]:
+    """
+    Match rows for every (user, job) pair above threshold
+
+    Args:
+        users: Dicts with 'user_id' and 'preferences', one per cv_matrix row
+        cv_matrix: Unit-normalised CV embeddings (users x dim)
+        jobs: Job dicts, one per job_matrix row
+        job_matrix: Unit-normalised title embeddings (jobs x dim)
+        threshold: Minimum boosted similarity
+
+    Returns:
+        Dicts for add_user_job_matches_batch
+    """
+    if not users or not jobs:
+        return []
+
+    user_cities = [user['preferences'].get('search_locations',
+                                           user['preferences'].get('preferred_locations', [])) or []
+                   for user in users]
+    user_keywords = [user['preferences'].get('search_keywords', []) or [] for user in users]
+
+    scores = np.minimum(cv_matrix @ job_matrix.T + keyword_boosts(user_keywords, jobs), 1.0)
+    scores[~location_mask(user_cities, jobs)] = -1.0
+
+    matches = []
+    for row, col in zip(*np.nonzero(scores >= threshold)):
+        job = jobs[col]
+        text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        matched_keywords = [keyword for keyword in user_keywords[row] if keyword.lower() in text]
+        matches.append({
+            'user_id': users[row]['user_id'],
+            'job_id': job['id'],
+            'title': job.get('title'),
+            'semantic_score': int(scores[row, col] * 100),
+            'match_reasoning': (f"Matched keywords: {', '.join(matched_keywords[:5])}"
+                                if matched_keywords else "Semantic similarity"),
+        })
+    return matches
+
+
+def publish_matches(matches: List[Dict]):
+    """One 'matches' progress event per user, with that user's best new matches"""
+    by_user: Dict[int, List[Dict]] = {}
+    for match in matches:
+        by_user.setdefault(match['user_id'], []).append(match)
+    for user_id, user_matches in by_user.items():
+        best = sorted(user_matches, key=lambda m: m['semantic_score'], reverse=True)[:PARTIAL_RESULTS_SIZE]
+        progress_bus.publish(user_id, 'matches', source='fleet', count=len(user_matches), top=[
+            {'job_id': m['job_id'], 'title': m.get('title'), 'semantic_score': m['semantic_score']}
+            for m in best
+        ])
+
+
+def run_fleet_matching(db, cv_manager, since: datetime, model=None,
+                       threshold: float = SEMANTIC_THRESHOLD) -> Dict:
+    """
+    Match all active users against the jobs discovered since `since`
+
+    Args:
+        db: PostgresDatabase
+        cv_manager: PostgresCVManager
+        since: Start of the ingestion run; only jobs discovered after it are scored
+        model: JobBERT SentenceTransformer for stale CV embeddings (loaded if needed)
+        threshold: Minimum boosted similarity for a match
+
+    Returns:
+        Dict with users, jobs, matches counts and elapsed seconds
+    """
+    start = time.time()
+    stats = {'users': 0, 'jobs': 0, 'matches': 0, 'seconds': 0.0}
+
+    jobs, job_rows = [], []
+    for job in db.get_encoded_jobs_since(since):
+        embedding = _parse_embedding(job.get('embedding_jobbert_title'))
+        if embedding is not None:
+            jobs.append(job)
+            job_rows.append(embedding)
+    users = cv_manager.get_active_user_profiles()
+    stats['users'], stats['jobs'] = len(users), len(jobs)
+    if not jobs or not users:
+        return stats
+
+    cv_matrix = cv_matrix_cache.matrix(users, lambda stale: ensure_cv_embeddings(cv_manager, stale, model))
+    job_matrix = _normalize_rows(np.vstack(job_rows))
+
+    matches = []
+    for offset in range(0, len(jobs), JOB_CHUNK_SIZE):
+        matches.extend(score_matches(users, cv_matrix, jobs[offset:offset + JOB_CHUNK_SIZE],
+                                     job_matrix[offset:offset + JOB_CHUNK_SIZE], threshold))
+
+    for offset in range(0, len(matches), INSERT_BATCH_SIZE):
+        stats['matches'] += db.add_user_job_matches_batch(matches[offset:offset + INSERT_BATCH_SIZE])
+    publish_matches(matches)
+
+    stats['seconds'] = round(time.time() - start, 2)
+    logger.info(f"Fleet matching: {stats['matches']} matches for {stats['users']} users "
+                f"x {stats['jobs']} jobs in {stats['seconds']}s")
+    return stats
@@ -0,0 +1,273 @@
+"""
+Competency/skill match maps for the job detail page
+
+The job detail page highlights which of a job's competencies and skills the
+user covers. Resolving that takes a three-tier cascade (Claude mappings ->
+keyword/word-overlap against the user's profile -> SemanticMatcher), which is
+far too slow to run on every page view. The maps are therefore materialized
+into user_job_matches when a match is scored or the CV changes, and the
+detail page only reads them.
+"""
+import json
+import logging
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_list(value) -> list:
+    """Parse a JSON list that may arrive as a list, a JSON string or None"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            return parsed if isinstance(parsed, list) else []
+        except:
+            return []
+    return []
+
+
+def _term_names(terms: list) -> List[str]:
+    """Extract display names from a list of strings or {'name': ...} dicts"""
+    names = []
+    for term in terms:
+        if isinstance(term, dict):
+            names.append(term.get('name', str(term)))
+        else:
+            names.append(str(term))
+    return names
+
+
+def _alignment_texts(key_alignments) -> List[str]:
+    """Lowercased alignment texts from Claude's reasoning"""
+    texts = []
+    for a in _parse_list(key_alignments):
+        if isinstance(a, str):
+            texts.append(a.lower())
+        elif isinstance(a, dict):
+            texts.append(str(a.get('text', '')).lower())
+    return texts
+
+
+def build_competency_match_map(job: Dict[str, Any], user_profile: Optional[Dict],
+                               use_semantic: bool = True) -> Dict[str, bool]:
+    """
+    Map each job competency to whether the user covers it
+
+    Args:
+        job: Job dict with (normalized) ai_competencies, competency_mappings, key_alignments
+        user_profile: Primary CV profile of the user (may be None)
+        use_semantic: Run the SemanticMatcher fallback for unmatched competencies
+
+    Returns:
+        Dict mapping competency name -> matched
+    """
+    competencies = job.get('ai_competencies') or []
+    if not competencies:
+        return {}
+
+    matches = {}
+
+    # Option 1: Claude's structured mappings (jobs scored with mappings)
+    claude_mappings = job.get('competency_mappings')
+    if claude_mappings and isinstance(claude_mappings, list):
+        mapped = set()
+        for mapping in claude_mappings:
+            if isinstance(mapping, dict):
+                job_req = mapping.get('job_requirement', '')
+                if job_req:
+                    matches[job_req] = True
+                    mapped.add(job_req.lower())
+
+        for comp in competencies:
+            if comp.lower() not in mapped:
+                matches[comp] = False
+        return matches
+
+    # Option 2: Keyword matching against the profile and Claude's alignments
+    profile = user_profile or {}
+    user_skills = set(str(s).lower().strip() for s in _term_names(_parse_list(profile.get('technical_skills'))))
+    user_competencies = set(str(c).lower().strip() for c in _term_names(_parse_list(profile.get('competencies'))))
+    all_user_terms = user_competencies.union(user_skills)
+    align_texts = _alignment_texts(job.get('key_alignments'))
+
+    for comp in competencies:
+        is_matched = False
+        comp_lower = comp.lower().strip()
+
+        # A. Direct profile match (strongest evidence)
+        if comp_lower in all_user_terms:
+            is_matched = True
+
+        # Fuzzy profile match
+        if not is_matched:
+            for term in all_user_terms:
+                if term and (comp_lower in term or term in comp_lower):
+                    if len(term) > 3 and len(comp_lower) > 3:
+                        is_matched = True
+                        break
+
+        # B. Key alignments (substring, then word overlap)
+        if not is_matched and align_texts:
+            if any(comp_lower in align for align in align_texts):
+                is_matched = True
+            else:
+                comp_words = set(w for w in comp_lower.split() if len(w) > 3)
+                if comp_words:
+                    for align in align_texts:
+                        align_words = set(w for w in align.split() if len(w) > 3)
+                        if len(comp_words & align_words) / len(comp_words) >= 0.5:
+                            is_matched = True
+                            break
+
+        matches[comp] = is_matched
+
+    # C. Semantic fallback for whatever is still unmatched
+    unmatched = [comp for comp, matched in matches.items() if not matched]
+    if use_semantic and unmatched and user_profile:
+        try:
+            from src.analysis.semantic_matcher import get_semantic_matcher
+            semantic_matches = get_semantic_matcher().match_competencies(
+                unmatched,
+                _term_names(_parse_list(profile.get('competencies'))),
+                _term_names(_parse_list(profile.get('technical_skills'))),
+                threshold=0.45
+            )
+            for comp, sem_matched in semantic_matches.items():
+                if sem_matched:
+                    matches[comp] = True
+        except Exception as e:
+            logger.warning(f"Semantic matching failed: {e}")
+
+    return matches
+
+
+def build_skill_match_map(job: Dict[str, Any], user_profile: Optional[Dict],
+                          use_semantic: bool = True) -> Dict[str, bool]:
+    """
+    Map each job key skill to whether the user covers it
+
+    Args:
+        job: Job dict with (normalized) ai_key_skills and skill_mappings
+        user_profile: Primary CV profile of the user (may be None)
+        use_semantic: Run the SemanticMatcher fallback for unmatched skills
+
+    Returns:
+        Dict mapping skill name -> matched
+    """
+    skills = job.get('ai_key_skills') or []
+    if not skills:
+        return {}
+
+    skill_matches = {}
+
+    # Option 1: Claude's structured mappings
+    claude_mappings = job.get('skill_mappings')
+    if claude_mappings and isinstance(claude_mappings, list):
+        mapped = set()
+        for mapping in claude_mappings:
+            if isinstance(mapping, dict):
+                job_skill = mapping.get('job_skill', '')
+                if job_skill:
+                    skill_matches[job_skill] = True
+                    mapped.add(job_skill.lower())
+
+        for skill in skills:
+            if skill.lower() not in mapped:
+                skill_matches[skill] = False
+        return skill_matches
+
+    # Option 2: Direct and fuzzy keyword matching
+    profile = user_profile or {}
+    user_skill_names = _term_names(_parse_list(profile.get('technical_skills')))
+    user_skills = set(s.lower().strip() for s in user_skill_names)
+
+    for skill in skills:
+        s_lower = str(skill).lower().strip()
+        is_matched = s_lower in user_skills
+        if not is_matched:
+            for us in user_skills:
+                if len(us) > 2 and len(s_lower) > 2 and (s_lower in us or us in s_lower):
+                    is_matched = True
+                    break
+        skill_matches[skill] = is_matched
+
+    # C. Semantic fallback
+    unmatched = [skill for skill, matched in skill_matches.items() if not matched]
+    if use_semantic and unmatched and user_profile:
+        try:
+            from src.analysis.semantic_matcher import get_semantic_matcher
+            semantic_matches = get_semantic_matcher().match_skills(
+                unmatched,
+                user_skill_names,
+                threshold=0.45
+            )
+            for skill, sem_matched in semantic_matches.items():
+                if sem_matched:
+                    skill_matches[skill] = True
+        except Exception as e:
+            logger.warning(f"Semantic skill matching failed: {e}")
+
+    return skill_matches
+
+
+def build_match_maps(job: Dict[str, Any], user_profile: Optional[Dict],
+                     use_semantic: bool = True) -> Dict[str, Dict[str, bool]]:
+    """
+    Build both match maps for a job
+
+    ai_competencies / ai_key_skills are normalized in place first so the map
+    keys line up with what the detail page displays.
+
+    Returns:
+        {'competency_match_map': {...}, 'skill_match_map': {...}}
+    """
+    from src.analysis.skill_normalizer import normalize_and_deduplicate
+
+    if job.get('ai_competencies'):
+        job['ai_competencies'] = normalize_and_deduplicate(job['ai_competencies'])
+    if job.get('ai_key_skills'):
+        job['ai_key_skills'] = normalize_and_deduplicate(job['ai_key_skills'])
+
+    return {
+        'competency_match_map': build_competency_match_map(job, user_profile, use_semantic),
+        'skill_match_map': build_skill_match_map(job, user_profile, use_semantic)
+    }
+
+
+def materialize_match_maps(job_db, user_id: int, user_profile: Optional[Dict],
+                           job_ids: Optional[List[int]] = None,
+                           only_missing: bool = False) -> int:
+    """
+    Compute and store match maps for a user's matches
+
+    Args:
+        job_db: PostgresDatabase instance
+        user_id: User ID
+        user_profile: Primary CV profile (fetched by caller)
+        job_ids: Restrict to these jobs (default: all Claude-scored matches)
+        only_missing: Skip matches that already have maps
+
+    Returns:
+        Number of matches updated
+    """
+    rows = job_db.get_matches_for_match_maps(user_id, job_ids=job_ids, only_missing=only_missing)
+    if not rows:
+        return 0
+
+    updates = []
+    for row in rows:
+        maps = build_match_maps(row, user_profile)
+        updates.append({
+            'user_id': user_id,
+            'job_id': row['job_id'],
+            'competency_match_map': maps['competency_match_map'],
+            'skill_match_map': maps['skill_match_map']
+        })
+
+    saved = job_db.save_match_maps_batch(updates)
+    logger.info(f"Materialized match maps for {saved} matches (user {user_id})")
+    return saved
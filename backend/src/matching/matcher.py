@@ -5,12 +5,51 @@ import os
 import time
 import importlib.util
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.database.postgres_operations import PostgresDatabase
 from src.database.postgres_cv_operations import PostgresCVManager
 from src.analysis.claude_analyzer import ClaudeJobAnalyzer
+from src.matching.match_maps import build_match_maps
+from src.matching.cv_embeddings import ensure_cv_embedding
+from src.matching.reranker import get_reranker
+from src.utils.llm_telemetry import set_llm_user
+from src.utils.progress_bus import progress_bus
+from src.utils.profiler import annotate, background_profile, span
+
+# Streamed Claude analyses are written in small groups so scores appear while batches run
+CLAUDE_FLUSH_SIZE = 5
+
+# Best semantic matches sent with the 'matches' progress event
+PARTIAL_RESULTS_SIZE = 10
+
+# Semantic score (%) a match needs to be reranked and analyzed by Claude
+ANALYSIS_THRESHOLD = 50
+
+
+def analysis_candidates(matches: List[Dict], pending: List[Dict],
+                        min_score: int = ANALYSIS_THRESHOLD) -> List[Dict]:
+    """
+    Matches that go on to reranking and Claude analysis
+
+    Args:
+        matches: This run's semantic matches ({'job', 'score', 'matched_keywords'})
+        pending: Jobs whose saved match was never reranked or analyzed, with its
+                 semantic_score (get_unanalyzed_matches_for_user; fleet matching
+                 saves those for new jobs)
+        min_score: Minimum semantic score
+
+    Returns:
+        Candidates in the shape of matches, this run's first
+    """
+    candidates = [match for match in matches if match['score'] >= min_score]
+    seen = {match['job']['id'] for match in matches}
+    for job in pending:
+        if job['id'] not in seen and (job.get('semantic_score') or 0) >= min_score:
+            candidates.append({'job': job, 'score': job['semantic_score'], 'matched_keywords': []})
+            seen.add(job['id'])
+    return candidates
 
 
 def run_background_matching(user_id: int, matching_status: Dict) -> None:
@@ -19,8 +58,19 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
     
     Args:
         user_id: User ID to match jobs for
-        matching_status: Shared dictionary to update with progress
+        matching_status: Shared status dictionary (a StatusBoard publishes each change)
+
+    Stages are recorded as profiling spans; PROFILE_BACKGROUND=matching saves a
+    profile of every run (src.utils.profiler).
     """
+    # Attribute this thread's Claude calls to the user in llm_calls
+    set_llm_user(user_id)
+    
+    with background_profile('matching', user_id=user_id):
+        _run_matching(user_id, matching_status)
+
+
+def _run_matching(user_id: int, matching_status: Dict) -> None:
     try:
         # Initialize status
         matching_status[user_id] = {
@@ -85,25 +135,22 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
         })
         
         print("📥 Loading sentence transformer model...")
-        t_model_start = time.time()
-        scripts_dir = Path(__file__).parent.parent.parent / 'scripts'
-        filter_jobs_path = scripts_dir / 'filter_jobs.py'
-        
-        spec = importlib.util.spec_from_file_location("filter_module", filter_jobs_path)
-        filter_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(filter_module)
-        
-        # Load semantic model
-        model = filter_module.load_sentence_transformer()
-        t_model = time.time() - t_model_start
-        print(f"✅ Model loaded ({t_model:.2f}s)")
+        with span('load_model') as stage:
+            scripts_dir = Path(__file__).parent.parent.parent / 'scripts'
+            filter_jobs_path = scripts_dir / 'filter_jobs.py'
+            
+            spec = importlib.util.spec_from_file_location("filter_module", filter_jobs_path)
+            filter_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(filter_module)
+            
+            # Load semantic model
+            model = filter_module.load_sentence_transformer()
+        print(f"✅ Model loaded ({stage.duration:.2f}s)")
         
-        # Build CV embedding
-        t_cv_start = time.time()
-        cv_text = filter_module.build_cv_text(profile)
-        cv_embedding = model.encode(cv_text, show_progress_bar=False)
-        t_cv = time.time() - t_cv_start
-        print(f"✅ CV embedding created ({t_cv:.2f}s)")
+        # CV embedding (stored on cv_profiles, encoded only if the profile or model changed)
+        with span('cv_embedding') as stage:
+            cv_embedding = ensure_cv_embedding(cv_manager_inst, profile, model)
+        print(f"✅ CV embedding ready ({stage.duration:.2f}s)")
         
         # Check if user has any existing matches
         existing_matches = job_db_inst.get_user_job_matches(user_id, min_semantic_score=0, limit=1)
@@ -279,9 +326,8 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
                     # Progressive fetching with concurrent workers
                     total_new = 0
                     completed = 0
-                    t_fetch_start = time.time()
                     
-                    with ThreadPoolExecutor(max_workers=4) as executor:
+                    with span('initial_fetch', searches=total_searches) as stage, ThreadPoolExecutor(max_workers=4) as executor:
                         # Submit all fetch tasks (both JSearch and Arbeitsagentur)
                         futures = {}
                         
@@ -312,7 +358,7 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
                                 'message': f'Fetching jobs: {completed}/{total_searches} searches done ({total_new} new jobs)...'
                             })
                     
-                    t_fetch = time.time() - t_fetch_start
+                    t_fetch = stage.duration
                     print(f"\n✓ All searches complete: {total_new} new jobs in {t_fetch:.1f}s ({t_fetch/60:.1f} min)")
                     print(f"  📊 Processed {len(keywords)} keywords across {total_searches} searches")
                     
@@ -338,19 +384,26 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
             'message': 'Fetching jobs with location filters...'
         })
 
-        t_query_start = time.time()
-        jobs_to_filter = job_db_inst.get_unfiltered_jobs_for_user(
-            user_id=user_id,
-            user_cities=preferred_locs if preferred_locs else None
-        )
-        t_query = time.time() - t_query_start
+        with span('fetch_jobs') as stage:
+            jobs_to_filter = job_db_inst.get_unfiltered_jobs_for_user(
+                user_id=user_id,
+                user_cities=preferred_locs if preferred_locs else None
+            )
+        t_query = stage.duration
 
         if preferred_locs:
             print(f"Found {len(jobs_to_filter)} jobs matching location filter: {preferred_locs} (query: {t_query:.2f}s)")
         else:
             print(f"Found {len(jobs_to_filter)} jobs (no location filter, query: {t_query:.2f}s)")
 
-        if not jobs_to_filter:
+        # Matches saved without analysis (fleet matching in the daily cron) are
+        # reranked and analyzed below together with this run's matches
+        with span('fetch_pending') as stage:
+            pending = job_db_inst.get_unanalyzed_matches_for_user(user_id, min_score=ANALYSIS_THRESHOLD)
+        if pending:
+            print(f"Found {len(pending)} saved matches awaiting analysis ({stage.duration:.2f}s)")
+
+        if not jobs_to_filter and not pending:
             print("✓ No new jobs to filter")
             matching_status[user_id] = {
                 'status': 'completed',
@@ -380,92 +433,69 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
 
         job_embeddings = {}
         jobs_needing_encoding = []
-        t_load_start = time.time()
-    
-        for job in jobs_to_filter:
-            if job.get('embedding_jobbert_title'):
-                try:
-                    # Parse JSON embedding
-                    embedding_json = job['embedding_jobbert_title']
-                    if isinstance(embedding_json, str):
-                        embedding_data = json.loads(embedding_json)
-                    else:
-                        embedding_data = embedding_json
-                    job_embeddings[job['id']] = np.array(embedding_data)
-                except Exception as e:
-                    print(f"  ⚠️  Failed to load embedding for job {job['id']}: {e}")
-                    jobs_needing_encoding.append(job)
-            else:
-                jobs_needing_encoding.append(job)
 
-        t_load = time.time() - t_load_start
-        print(f"  ✓ Loaded {len(job_embeddings)} pre-computed embeddings in {t_load:.2f}s")
+        with span('load_embeddings') as stage:
+            for job in jobs_to_filter:
+                if job.get('embedding_jobbert_title'):
+                    try:
+                        # Parse JSON embedding
+                        embedding_json = job['embedding_jobbert_title']
+                        if isinstance(embedding_json, str):
+                            embedding_data = json.loads(embedding_json)
+                        else:
+                            embedding_data = embedding_json
+                        job_embeddings[job['id']] = np.array(embedding_data)
+                    except Exception as e:
+                        print(f"  ⚠️  Failed to load embedding for job {job['id']}: {e}")
+                        jobs_needing_encoding.append(job)
+                else:
+                    jobs_needing_encoding.append(job)
+        print(f"  ✓ Loaded {len(job_embeddings)} pre-computed embeddings in {stage.duration:.2f}s")
 
         # Encode jobs that don't have embeddings (fallback)
-        t_encode_total = 0
         if jobs_needing_encoding:
             print(f"  ⚡ Encoding {len(jobs_needing_encoding)} jobs on-the-fly (missing embeddings)...")
-            for job in jobs_needing_encoding:
-                job_text = filter_module.build_job_text(job)
-                t_encode = time.time()
-                job_embedding = model.encode(job_text, show_progress_bar=False)
-                t_encode_total += time.time() - t_encode
-                job_embeddings[job['id']] = job_embedding
+            with span('encode_missing', jobs=len(jobs_needing_encoding)) as stage:
+                for job in jobs_needing_encoding:
+                    job_text = filter_module.build_job_text(job)
+                    job_embeddings[job['id']] = model.encode(job_text, show_progress_bar=False)
+            print(f"  ✓ Encoded in {stage.duration:.2f}s")
 
         matches = []
         max_score = 0
+        with span('score_jobs', jobs=len(jobs_to_filter)) as scoring:
+            for idx, job in enumerate(jobs_to_filter):
+                # Get embedding (pre-computed or freshly encoded)
+                job_embedding = job_embeddings.get(job['id'])
+                if job_embedding is None:
+                    print(f"  ⚠️  No embedding for job {job['id']}, skipping")
+                    continue
 
-        # Timing breakdown
-        t_semantic_start = time.time()
-        t_similarity_total = 0
-        t_keyword_total = 0
-
-        for idx, job in enumerate(jobs_to_filter):
-            # Get embedding (pre-computed or freshly encoded)
-            job_embedding = job_embeddings.get(job['id'])
-            if job_embedding is None:
-                print(f"  ⚠️  No embedding for job {job['id']}, skipping")
-                continue
-
-            t_sim = time.time()
-            similarity = filter_module.calculate_similarity(cv_embedding, job_embedding)
-            t_similarity_total += time.time() - t_sim
-            
-            t_kw = time.time()
-            boosted_score, matched_keywords = filter_module.apply_keyword_boosts(
-                similarity, job, config_keywords
-            )
-            t_keyword_total += time.time() - t_kw
+                similarity = filter_module.calculate_similarity(cv_embedding, job_embedding)
+                boosted_score, matched_keywords = filter_module.apply_keyword_boosts(
+                    similarity, job, config_keywords
+                )
             
-            # Track max score for debugging
-            if boosted_score > max_score:
-                max_score = boosted_score
+                # Track max score for debugging
+                if boosted_score > max_score:
+                    max_score = boosted_score
             
-            if boosted_score >= 0.30:  # 30% threshold (temporarily lowered for testing)
-                matches.append({
-                    'job': job,
-                    'score': int(boosted_score * 100),
-                    'matched_keywords': matched_keywords
-                })
+                if boosted_score >= 0.30:  # 30% threshold (temporarily lowered for testing)
+                    matches.append({
+                        'job': job,
+                        'score': int(boosted_score * 100),
+                        'matched_keywords': matched_keywords
+                    })
             
-            # Update progress during filtering
-            if (idx + 1) % 10 == 0 or idx == len(jobs_to_filter) - 1:
-                progress = 30 + int((idx + 1) / len(jobs_to_filter) * 20)  # 30-50%
-                matching_status[user_id].update({
-                    'progress': progress,
-                    'message': f'Filtered {idx + 1}/{len(jobs_to_filter)} jobs, {len(matches)} matches so far...'
-                })
+                # Update progress during filtering
+                if (idx + 1) % 10 == 0 or idx == len(jobs_to_filter) - 1:
+                    progress = 30 + int((idx + 1) / len(jobs_to_filter) * 20)  # 30-50%
+                    matching_status[user_id].update({
+                        'progress': progress,
+                        'message': f'Filtered {idx + 1}/{len(jobs_to_filter)} jobs, {len(matches)} matches so far...'
+                    })
         
-        t_semantic_total = time.time() - t_semantic_start
-        print(f"\n⏱️  SEMANTIC FILTERING PERFORMANCE:")
-        print(f"  Loading pre-computed embeddings: {t_load:.2f}s ({len(job_embeddings)-len(jobs_needing_encoding)} jobs)")
-        if jobs_needing_encoding:
-            print(f"  Encoding missing embeddings: {t_encode_total:.2f}s ({len(jobs_needing_encoding)} jobs, {t_encode_total/len(jobs_needing_encoding)*1000:.0f}ms/job)")
-        print(f"  Similarity calculation: {t_similarity_total:.2f}s")
-        print(f"  Keyword boost: {t_keyword_total:.2f}s")
-        print(f"  Total: {t_semantic_total:.2f}s ({t_semantic_total/60:.2f} min)")
-        print(f"✓ Found {len(matches)} matches above 30% threshold (max: {max_score:.3f})")
-        print(f"🚀 Speedup: ~{(t_encode_total if jobs_needing_encoding else 50)/t_load:.0f}x faster with pre-computed embeddings")
+        print(f"✓ Found {len(matches)} matches above 30% threshold (max: {max_score:.3f}) in {scoring.duration:.2f}s")
         
         # Save semantic matches to database (batch insert for performance)
         matching_status[user_id].update({
@@ -488,14 +518,35 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
             })
         
         # Batch insert all matches at once (much faster than individual inserts)
-        t_save_start = time.time()
-        saved_count = job_db_inst.add_user_job_matches_batch(batch_matches)
-        cv_manager_inst.update_filter_run_time(user_id)
-        t_save = time.time() - t_save_start
-        print(f"✓ Saved {saved_count} semantic matches in {t_save:.2f}s")
-
-        # Step 2: Claude analysis on high-scoring matches (>= 50%)
-        high_score_matches = [m for m in matches if m['score'] >= 50]
+        with span('save_matches', matches=len(batch_matches)) as stage:
+            saved_count = job_db_inst.add_user_job_matches_batch(batch_matches)
+            cv_manager_inst.update_filter_run_time(user_id)
+        print(f"✓ Saved {saved_count} semantic matches in {stage.duration:.2f}s")
+        progress_bus.publish(user_id, 'matches', count=len(matches), top=[
+            {'job_id': m['job']['id'], 'title': m['job'].get('title'), 'company': m['job'].get('company'),
+             'semantic_score': m['score']}
+            for m in sorted(matches, key=lambda m: m['score'], reverse=True)[:PARTIAL_RESULTS_SIZE]
+        ])
+
+        # Step 2: Claude analysis on high-scoring matches (>= 50%), including pending ones
+        high_score_matches = analysis_candidates(matches, pending)
+
+        # Cross-encoder rerank: only the best candidates go on to Claude
+        reranker = get_reranker() if high_score_matches else None
+        if reranker:
+            matching_status[user_id].update({
+                'stage': 'reranking',
+                'progress': 57,
+                'message': f'Reranking {len(high_score_matches)} candidates...'
+            })
+            try:
+                with span('rerank', candidates=len(high_score_matches)) as stage:
+                    kept, rerank_scores = reranker.rerank(profile, high_score_matches)
+                    job_db_inst.save_rerank_scores_batch(user_id, rerank_scores)
+                print(f"✓ Cross-encoder kept {len(kept)}/{len(high_score_matches)} candidates in {stage.duration:.2f}s")
+                high_score_matches = kept
+            except Exception as e:
+                print(f"⚠️  Reranking failed, analyzing all candidates: {e}")
         
         # Initialize Claude analyzer
         try:
@@ -522,72 +573,100 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
                 'message': f'Running AI analysis on {len(high_score_matches)} high-scoring matches...'
             })
 
-            # 🚀 BATCH SCORING: Analyze all jobs in one/few API calls
+            # 🚀 BATCH SCORING: Analyze all jobs in a few streamed API calls.
+            # Each job's analysis is saved as soon as it parses, so scores
+            # trickle into the UI instead of appearing after the last batch.
             jobs_to_analyze = [match['job'] for match in high_score_matches]
+            pending_updates = []
+            saved_analyses = 0
+            
+            def flush_claude_updates():
+                """Save buffered analyses and their match maps"""
+                nonlocal saved_analyses
+                if not pending_updates:
+                    return
+                updates = list(pending_updates)
+                pending_updates.clear()
+                with span('save_analyses', jobs=len(updates)):
+                    saved_analyses += job_db_inst.add_user_job_matches_batch(
+                        [u['update'] for u in updates]
+                    )
+                    # Materialize competency/skill match maps so the detail page only reads them
+                    map_updates = [
+                        {'user_id': user_id, 'job_id': u['job']['id'], **build_match_maps(u['job'], profile)}
+                        for u in updates
+                    ]
+                    job_db_inst.save_match_maps_batch(map_updates)
+                progress_bus.publish(user_id, 'analysis', jobs=[
+                    {'job_id': u['job']['id'], 'title': u['job'].get('title'),
+                     'claude_score': u['update']['claude_score'], 'priority': u['update']['priority']}
+                    for u in updates
+                ])
+            
+            def on_job_analyzed(job):
+                """Buffer one streamed analysis and report progress"""
+                nonlocal jobs_analyzed
+                # Convert lists to strings for database storage
+                key_alignments = job.get('key_alignments', [])
+                potential_gaps = job.get('potential_gaps', [])
+                
+                # Handle both list of strings and list of dicts
+                if key_alignments and isinstance(key_alignments[0], dict):
+                    key_alignments = [str(item) for item in key_alignments]
+                if potential_gaps and isinstance(potential_gaps[0], dict):
+                    potential_gaps = [str(item) for item in potential_gaps]
+                
+                # Add to batch (including competency and skill mappings)
+                pending_updates.append({'job': job, 'update': {
+                    'user_id': user_id,
+                    'job_id': job['id'],
+                    'claude_score': job['match_score'],
+                    'priority': job.get('priority', 'medium'),
+                    'match_reasoning': job.get('reasoning', ''),
+                    'key_alignments': key_alignments,
+                    'potential_gaps': potential_gaps,
+                    'competency_mappings': job.get('competency_mappings', []),
+                    'skill_mappings': job.get('skill_mappings', [])
+                }})
+                
+                print(f"  ✓ {job.get('title', 'Unknown')[:50]} - Claude: {job['match_score']}%")
+                jobs_analyzed += 1
+                
+                if len(pending_updates) >= CLAUDE_FLUSH_SIZE:
+                    flush_claude_updates()
+                
+                # Update progress
+                progress = 60 + int(jobs_analyzed / len(jobs_to_analyze) * 30)  # 60-90%
+                matching_status[user_id].update({
+                    'progress': progress,
+                    'message': f'AI analyzed {jobs_analyzed}/{len(jobs_to_analyze)} jobs...',
+                    'jobs_analyzed': jobs_analyzed
+                })
             
+            analyzed_jobs = []
             try:
-                t_batch_start = time.time()
                 print(f"   Starting batch analysis of {len(jobs_to_analyze)} jobs...")
-                print(f"   This may take 2-5 minutes for large batches")
                 
-                try:
-                    # Use default batch size from analyze_batch
-                    analyzed_jobs = analyzer.analyze_batch(jobs_to_analyze)
-                except Exception as batch_error:
-                    print(f"❌ Batch analysis failed: {batch_error}")
-                    import traceback
-                    traceback.print_exc()
-                    analyzed_jobs = []
-                
-                t_batch = time.time() - t_batch_start
+                with span('claude_analysis', jobs=len(jobs_to_analyze)) as stage:
+                    try:
+                        analyzed_jobs = analyzer.analyze_batch(jobs_to_analyze, on_result=on_job_analyzed)
+                    except Exception as batch_error:
+                        print(f"❌ Batch analysis failed: {batch_error}")
+                        import traceback
+                        traceback.print_exc()
+                    
+                    # Save whatever arrived, including results before a failure
+                    flush_claude_updates()
+                t_batch = stage.duration
                 
-                if analyzed_jobs:
-                    print(f"✓ Batch analysis complete: {len(analyzed_jobs)} jobs in {t_batch:.2f}s ({t_batch/len(analyzed_jobs):.2f}s/job avg)")
+                if jobs_analyzed:
+                    print(f"✓ Batch analysis complete: {jobs_analyzed} jobs in {t_batch:.2f}s ({t_batch/jobs_analyzed:.2f}s/job avg)")
+                    print(f"✓ Saved {saved_analyses} Claude analyses to database")
                 else:
                     print(f"⚠️  Batch analysis returned 0 results (took {t_batch:.2f}s)")
-
-                # Process batch results
-                claude_batch_updates = []
-                for idx, job in enumerate(analyzed_jobs):
-                    # Job now has analysis fields added by analyze_batch
-                    if 'match_score' in job:
-                        # Convert lists to strings for database storage
-                        key_alignments = job.get('key_alignments', [])
-                        potential_gaps = job.get('potential_gaps', [])
-                        
-                        # Handle both list of strings and list of dicts
-                        if key_alignments and isinstance(key_alignments[0], dict):
-                            key_alignments = [str(item) for item in key_alignments]
-                        if potential_gaps and isinstance(potential_gaps[0], dict):
-                            potential_gaps = [str(item) for item in potential_gaps]
-                        
-                        # Add to batch (including competency and skill mappings)
-                        claude_batch_updates.append({
-                            'user_id': user_id,
-                            'job_id': job['id'],
-                            'claude_score': job['match_score'],
-                            'priority': job.get('priority', 'medium'),
-                            'match_reasoning': job.get('reasoning', ''),
-                            'key_alignments': key_alignments,
-                            'potential_gaps': potential_gaps,
-                            'competency_mappings': job.get('competency_mappings', []),
-                            'skill_mappings': job.get('skill_mappings', [])
-                        })
-                        
-                        print(f"  ✓ {job.get('title', 'Unknown')[:50]} - Claude: {job['match_score']}%")
-                        jobs_analyzed += 1
-                        
-                        # Update progress
-                        progress = 60 + int((idx + 1) / len(analyzed_jobs) * 30)  # 60-90%
-                        matching_status[user_id].update({
-                            'progress': progress,
-                            'message': f'AI analyzed {idx + 1}/{len(analyzed_jobs)} jobs...',
-                            'jobs_analyzed': jobs_analyzed
-                        })
                 
             except Exception as e:
-                print(f"  ⚠️  Batch analysis failed: {e}")
-                claude_batch_updates = []  # Empty list if batch failed
+                print(f"  ⚠️  Saving batch analyses failed: {e}")
 
             # Save extracted competencies/skills back to jobs table (for caching/reuse)
             if analyzed_jobs:
@@ -605,15 +684,6 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
                     job_db_inst.update_jobs_competencies_batch(jobs_to_update_competencies)
                     print(f"✓ Competencies cached for future use")
 
-            # Batch update all Claude analyses at once (much faster than individual updates)
-            if claude_batch_updates:
-                matching_status[user_id].update({
-                    'progress': 92,
-                    'message': f'Saving {len(claude_batch_updates)} AI analyses to database...'
-                })
-                updated_count = job_db_inst.add_user_job_matches_batch(claude_batch_updates)
-                print(f"✓ Saved {updated_count} Claude analyses to database")
-            
             print(f"✓ Claude analysis complete")
         
         # Mark as completed
@@ -634,6 +704,7 @@ def run_background_matching(user_id: int, matching_status: Dict) -> None:
         
     except Exception as e:
         print(f"❌ Error in background matching: {e}")
+        annotate(error=f"{type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
         
@@ -0,0 +1,162 @@
+"""
+Cross-encoder reranking between semantic matching and Claude analysis
+
+The bi-encoder compares a CV vector with a title vector; everything at
+semantic score >= 50 used to go to Claude. A cross-encoder reads the CV
+summary and the job (title + requirements) together and is a much better
+judge of fit, while still running on CPU in milliseconds per pair:
+
+    reranker = get_reranker()
+    kept, scores = reranker.rerank(profile, candidates)   # candidates: [{'job': ..., 'score': ...}]
+
+Scores are probabilities (0-1). A candidate is kept when it reaches
+RERANK_MIN_SCORE, and at most RERANK_TOP_N candidates (best first) go on to
+Claude. The scores of all candidates are stored in
+user_job_matches.rerank_score (0-100), added by
+scripts/migrations/add_rerank_scores.py.
+
+Latency is measured by scripts/benchmark_reranker.py.
+
+Environment variables:
+    RERANK_ENABLED      'false' sends every candidate to Claude as before (default: true)
+    RERANK_MODEL        sentence-transformers CrossEncoder
+                        (default: cross-encoder/mmarco-mMiniLMv2-L12-H384-v1, multilingual)
+    RERANK_TOP_N        candidates kept for Claude (default: 40; 0 = no cap)
+    RERANK_MIN_SCORE    minimum probability to keep a candidate (default: 0.0)
+    RERANK_BATCH_SIZE   pairs per forward pass (default: 16)
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.matching.description_embeddings import clean_description
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = 'cross-encoder/mmarco-mMiniLMv2-L12-H384-v1'
+
+# Characters of CV summary / job passage given to the cross-encoder (~512 tokens together)
+MAX_QUERY_CHARS = 800
+MAX_PASSAGE_CHARS = 1500
+
+
+def _as_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item.get('name', item)) if isinstance(item, dict) else str(item)
+                         for item in value)
+    return str(value) if value else ''
+
+
+def cv_summary(profile: Dict) -> str:
+    """Short CV text for the query side: summary, roles and top skills"""
+    parts = [
+        _as_text(profile.get('expertise_summary')),
+        _as_text((profile.get('preferred_roles') or [])[:5]),
+        _as_text((profile.get('technical_skills') or [])[:25]),
+        _as_text((profile.get('competencies') or [])[:10]),
+    ]
+    return '. '.join(part for part in parts if part)[:MAX_QUERY_CHARS]
+
+
+def job_passage(job: Dict) -> str:
+    """Job text for the passage side: title, key skills, then the description"""
+    parts = [
+        job.get('title') or '',
+        _as_text(job.get('ai_key_skills')),
+        clean_description(job.get('description')),
+    ]
+    return '. '.join(part for part in parts if part)[:MAX_PASSAGE_CHARS]
+
+
+def select_candidates(scores: Sequence[float], top_n: int = 0, min_score: float = 0.0) -> List[int]:
+    """Indices of the candidates to keep, best first"""
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    kept = [i for i in order if scores[i] >= min_score]
+    return kept[:top_n] if top_n > 0 else kept
+
+
+class CrossEncoderReranker:
+    """Scores (CV, job) pairs with a CPU cross-encoder"""
+
+    def __init__(self, model_name: Optional[str] = None, top_n: Optional[int] = None,
+                 min_score: Optional[float] = None, batch_size: Optional[int] = None, model=None):
+        """
+        Args:
+            model_name: CrossEncoder name (default: RERANK_MODEL)
+            top_n: Candidates kept (default: RERANK_TOP_N; 0 = no cap)
+            min_score: Minimum probability kept (default: RERANK_MIN_SCORE)
+            batch_size: Pairs per forward pass (default: RERANK_BATCH_SIZE)
+            model: Preloaded model with predict(pairs, batch_size=...)
+        """
+        self.model_name = model_name or os.getenv('RERANK_MODEL', DEFAULT_RERANK_MODEL)
+        self.top_n = int(os.getenv('RERANK_TOP_N', '40')) if top_n is None else top_n
+        self.min_score = float(os.getenv('RERANK_MIN_SCORE', '0.0')) if min_score is None else min_score
+        self.batch_size = batch_size or int(os.getenv('RERANK_BATCH_SIZE', '16'))
+        self._model = model
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                logger.info(f"Loading cross-encoder {self.model_name}")
+                self._model = CrossEncoder(self.model_name, device='cpu', max_length=512)
+            return self._model
+
+    def score(self, query: str, passages: List[str]) -> np.ndarray:
+        """Probability that each passage fits the query"""
+        if not passages:
+            return np.empty(0, dtype=np.float32)
+        # Single-label CrossEncoders already apply a sigmoid in predict()
+        scores = np.asarray(self.model.predict([(query, passage) for passage in passages],
+                                               batch_size=self.batch_size, show_progress_bar=False),
+                            dtype=np.float32)
+        if scores.ndim == 2:
+            # [irrelevant, relevant] logits: probability of the last class
+            exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+            scores = exp[:, -1] / exp.sum(axis=1)
+        return scores
+
+    def rerank(self, profile: Dict, candidates: List[Dict]) -> Tuple[List[Dict], Dict[int, float]]:
+        """
+        Score candidates and keep the best ones
+
+        Args:
+            profile: CV profile
+            candidates: Dicts with a 'job' (id, title, description, ai_key_skills)
+
+        Returns:
+            (kept candidates best first, {job_id: probability} for all candidates)
+        """
+        if not candidates:
+            return [], {}
+        start = time.time()
+        scores = self.score(cv_summary(profile), [job_passage(c['job']) for c in candidates])
+        kept = [candidates[i] for i in select_candidates(scores, self.top_n, self.min_score)]
+        logger.info(f"Reranked {len(candidates)} candidates in {time.time() - start:.2f}s, kept {len(kept)}")
+        return kept, {c['job']['id']: float(s) for c, s in zip(candidates, scores)}
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Process-wide reranker, or None if disabled or sentence-transformers is missing"""
+    global _reranker
+    if os.getenv('RERANK_ENABLED', 'true').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    with _reranker_lock:
+        if _reranker is None:
+            try:
+                import sentence_transformers  # noqa: F401
+            except ImportError:
+                return None
+            _reranker = CrossEncoderReranker()
+        return _reranker
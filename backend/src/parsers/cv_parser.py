@@ -4,9 +4,11 @@ CV Parser - Extract text from PDF, DOCX, and TXT files
 
 import os
 import hashlib
-from typing import Tuple
+from typing import Callable, Tuple
 import chardet
 
+from src.parsers.pdf_extraction import extract_pdf_text, get_text_cache
+
 
 class CVParser:
     """Parser for extracting text from CV files"""
@@ -33,9 +35,9 @@ class CVParser:
 
         try:
             if ext == '.pdf':
-                text = CVParser.parse_pdf(file_path)
+                text = CVParser.cached_text(file_path, CVParser.parse_pdf)
             elif ext == '.docx':
-                text = CVParser.parse_docx(file_path)
+                text = CVParser.cached_text(file_path, CVParser.parse_docx)
             elif ext == '.txt':
                 text = CVParser.parse_txt(file_path)
             else:
@@ -52,34 +54,35 @@ class CVParser:
             return "", "failed"
 
     @staticmethod
-    def parse_pdf(file_path: str) -> str:
+    def cached_text(file_path: str, parse: Callable[[str], str]) -> str:
         """
-        Extract text from PDF using pdfplumber
+        Run a parser through the text cache keyed by calculate_hash()
 
         Args:
-            file_path: Path to PDF file
+            file_path: Path to CV file
+            parse: Parser used on a cache miss
 
         Returns:
             Extracted text
         """
-        try:
-            import pdfplumber
-        except ImportError:
-            raise ImportError("pdfplumber is required. Install with: pip install pdfplumber")
+        cache = get_text_cache()
+        if cache is None:
+            return parse(file_path)
+        return cache.get_or_extract(file_path, parse, file_hash=CVParser.calculate_hash(file_path))
 
-        text_parts = []
+    @staticmethod
+    def parse_pdf(file_path: str) -> str:
+        """
+        Extract text from PDF: pypdfium2 text layer, pdfplumber for hard
+        pages, large PDFs split across processes (see src.parsers.pdf_extraction)
+
+        Args:
+            file_path: Path to PDF file
 
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-                except Exception as e:
-                    print(f"Warning: Could not extract text from page {page_num}: {e}")
-                    continue
-
-        return "\n\n".join(text_parts)
+        Returns:
+            Extracted text
+        """
+        return extract_pdf_text(file_path)
 
     @staticmethod
     def parse_docx(file_path: str) -> str:
@@ -0,0 +1,256 @@
+"""
+PDF text extraction service
+
+CVParser.parse_pdf used to walk every page with pdfplumber, whose layout
+analysis (pdfminer) is slow on designed multi-page CVs. Extraction now:
+
+1. Reads the text layer with pypdfium2 (installed with pdfplumber), which is
+   more than an order of magnitude faster.
+2. Re-extracts only pages where the text layer looks broken (almost no text
+   or mostly replacement glyphs) with pdfplumber.
+3. When PARALLEL_MIN_PAGES or more pages need pdfplumber, splits them into
+   page ranges on a process pool. (The text layer itself is faster than
+   shipping a range to another process.)
+
+Extracted text is cached on disk keyed by CVParser.calculate_hash (plus
+EXTRACTOR_VERSION), so reparses after analyzer changes, reparse scripts and
+identical uploads read the cached text instead of the PDF:
+
+    text = get_text_cache().get_or_extract(file_path, extract_pdf_text)
+
+Throughput is measured by scripts/benchmark_pdf_extraction.py.
+
+Environment variables:
+    CV_TEXT_CACHE_DIR        cache directory (default: data/cv_text_cache; 'off' disables)
+    PDF_EXTRACT_WORKERS      processes for pdfplumber pages (default: min(4, CPUs); 1 = in-process)
+    PDF_PARALLEL_MIN_PAGES   pdfplumber pages from which they are split (default: 6)
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes, so cached text is re-extracted
+EXTRACTOR_VERSION = 1
+
+# A text-layer page with fewer characters than this is re-extracted with pdfplumber
+MIN_PAGE_CHARS = 40
+
+# ...as is one where more than this share of characters are replacement glyphs
+MAX_GARBLED_RATIO = 0.2
+
+PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '6'))
+
+
+def fast_page_texts(file_path: str, first: int, last: int) -> List[str]:
+    """Text layer of pages [first, last) via pypdfium2"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        texts = []
+        for index in range(first, last):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range().replace('\r\n', '\n'))
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+def plumber_page_texts(file_path: str, pages: List[int]) -> Dict[int, str]:
+    """Layout-aware text of the given pages via pdfplumber"""
+    try:
+        import pdfplumber
+    except ImportError:
+        raise ImportError("pdfplumber is required. Install with: pip install pdfplumber")
+
+    texts = {}
+    with pdfplumber.open(file_path, pages=[index + 1 for index in pages]) as pdf:
+        for index, page in zip(pages, pdf.pages):
+            try:
+                texts[index] = page.extract_text() or ''
+            except Exception as e:
+                print(f"Warning: Could not extract text from page {index + 1}: {e}")
+                texts[index] = ''
+    return texts
+
+
+def page_count(file_path: str) -> int:
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+
+
+def needs_fallback(text: str) -> bool:
+    """Whether a text-layer page looks unusable (image-like or broken font mapping)"""
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return True
+    # U+FFFD and private-use code points come from fonts without a Unicode map
+    garbled = sum(1 for c in stripped if c == '\ufffd' or '\ue000' <= c <= '\uf8ff')
+    return garbled / len(stripped) > MAX_GARBLED_RATIO
+
+
+def split_pages(pages: List[int], parts: int) -> List[List[int]]:
+    """Split page indices into at most `parts` contiguous chunks"""
+    parts = max(1, min(parts, len(pages)))
+    size, extra = divmod(len(pages), parts)
+    chunks, first = [], 0
+    for i in range(parts):
+        last = first + size + (1 if i < extra else 0)
+        chunks.append(pages[first:last])
+        first = last
+    return chunks
+
+
+class PDFExtractor:
+    """Text-layer PDF extraction with page-parallel pdfplumber fallback"""
+
+    def __init__(self, workers: Optional[int] = None, parallel_min_pages: int = PARALLEL_MIN_PAGES,
+                 use_fast: bool = True):
+        """
+        Args:
+            workers: Processes for pdfplumber pages (default: PDF_EXTRACT_WORKERS; 1 = in-process)
+            parallel_min_pages: pdfplumber page count from which pages are split across processes
+            use_fast: Try the pypdfium2 text layer before pdfplumber
+        """
+        self.workers = workers or int(os.getenv('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+        self.parallel_min_pages = parallel_min_pages
+        self.use_fast = use_fast
+        self._pool = None
+        self._lock = threading.Lock()
+        self.last_stats: Dict = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded web worker is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def extract(self, file_path: str) -> str:
+        """Text of all pages, separated by blank lines"""
+        pages = page_count(file_path)
+        texts = None
+        if self.use_fast:
+            try:
+                texts = fast_page_texts(file_path, 0, pages)
+            except ImportError:
+                pass
+            except Exception as e:
+                logger.warning(f"Text-layer extraction failed for {file_path}, using pdfplumber: {e}")
+
+        if texts is None:
+            texts = [''] * pages
+            retry = list(range(pages))
+        else:
+            retry = [index for index, text in enumerate(texts) if needs_fallback(text)]
+
+        chunks = []
+        if retry:
+            if self.workers > 1 and len(retry) >= self.parallel_min_pages:
+                chunks = split_pages(retry, self.workers)
+                futures = [self.pool.submit(plumber_page_texts, file_path, chunk) for chunk in chunks]
+                results = [future.result() for future in futures]
+            else:
+                chunks = [retry]
+                results = [plumber_page_texts(file_path, retry)]
+            for result in results:
+                for index, text in result.items():
+                    # Keep the text layer if pdfplumber does no better
+                    if len(text.strip()) > len(texts[index].strip()):
+                        texts[index] = text
+
+        self.last_stats = {'pages': pages, 'fallback_pages': len(retry), 'processes': len(chunks)}
+        return "\n\n".join(text for text in texts if text and text.strip())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+class TextCache:
+    """Extracted CV text on disk, keyed by file hash"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, file_hash[:2], f"{file_hash}.v{EXTRACTOR_VERSION}.txt")
+
+    def get(self, file_hash: str) -> Optional[str]:
+        try:
+            with open(self._path(file_hash), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, file_hash: str, text: str) -> None:
+        path = self._path(file_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def get_or_extract(self, file_path: str, extract: Callable[[str], str],
+                       file_hash: Optional[str] = None) -> str:
+        """Cached text of a file, extracting and storing it on a miss"""
+        from src.parsers.cv_parser import CVParser
+
+        file_hash = file_hash or CVParser.calculate_hash(file_path)
+        text = self.get(file_hash)
+        if text is None:
+            text = extract(file_path)
+            if text.strip():
+                try:
+                    self.put(file_hash, text)
+                except OSError as e:
+                    logger.warning(f"Could not cache extracted text for {file_path}: {e}")
+        return text
+
+
+_extractor: Optional[PDFExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_pdf_extractor() -> PDFExtractor:
+    """Process-wide extractor (its process pool starts on the first large PDF)"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PDFExtractor()
+        return _extractor
+
+
+def extract_pdf_text(file_path: str) -> str:
+    return get_pdf_extractor().extract(file_path)
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Text cache from CV_TEXT_CACHE_DIR, or None when disabled"""
+    cache_dir = os.getenv('CV_TEXT_CACHE_DIR', 'data/cv_text_cache')
+    if cache_dir.lower() in ('', 'off', 'none', 'false'):
+        return None
+    return TextCache(cache_dir)
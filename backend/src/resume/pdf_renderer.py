@@ -0,0 +1,346 @@
+"""
+PDF rendering service
+
+Resume and cover letter PDFs used to be rendered with a fresh WeasyPrint
+FontConfiguration inside the request thread, taking seconds of CPU per
+render and re-rendering identical HTML every time a resume was saved again
+or backfilled. Rendering now goes through one service:
+
+    pdf_data = get_pdf_renderer().render(html)
+
+- Renders run on a small spawn process pool. Each process imports WeasyPrint,
+  creates its FontConfiguration and renders a warm-up page once (fonts,
+  fontconfig and the user-agent stylesheet are loaded then), so a request
+  thread only waits for the layout itself and the GIL stays free.
+- PDFs are cached on disk keyed by a SHA-256 of the HTML (plus
+  RENDERER_VERSION), with size-bounded LRU eviction. Identical HTML renders
+  once, and concurrent requests for the same HTML share one render.
+- Render time, cache hits and failures are kept per process and exposed by
+  stats() (/api/stats -> system.pdf_render).
+
+Environment variables:
+    PDF_RENDER_WORKERS   render processes per web worker (default: 1; 0 = in-process)
+    PDF_RENDER_TIMEOUT   seconds to wait for one render (default: 60)
+    PDF_CACHE_DIR        rendered PDF cache (default: data/pdf_cache; 'off' disables)
+    PDF_CACHE_MAX_MB     cache size before LRU eviction kicks in (default: 100)
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from src.utils.profiler import span
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering output changes (fonts, base CSS), so cached PDFs are re-rendered
+RENDERER_VERSION = 1
+
+# Render times kept for the percentiles in stats()
+TIMING_WINDOW = 200
+
+WARMUP_HTML = '<html><body><p style="font-family: Georgia, serif">Warm-up</p></body></html>'
+
+# Per-process WeasyPrint font configuration (created once by _init_worker)
+_font_config = None
+
+
+def _init_worker() -> None:
+    """Pool initializer: load WeasyPrint, fonts and default CSS once per process"""
+    try:
+        render_html(WARMUP_HTML)
+    except ImportError:
+        # Reported by the first real render instead of breaking the pool
+        pass
+    except Exception as e:
+        logger.warning(f"PDF render worker warm-up failed: {e}")
+
+
+def render_html(html: str) -> bytes:
+    """Render HTML to PDF bytes with WeasyPrint in the current process"""
+    global _font_config
+    try:
+        from weasyprint import HTML
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:
+        raise ImportError(
+            "WeasyPrint is not installed. "
+            "Install it with: pip install weasyprint"
+        )
+
+    if _font_config is None:
+        _font_config = FontConfiguration()
+    return HTML(string=html).write_pdf(font_config=_font_config)
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def cache_key(html: str) -> str:
+    return hashlib.sha256(f"v{RENDERER_VERSION}\n{html}".encode('utf-8')).hexdigest()
+
+
+class PDFCache:
+    """
+    Rendered PDFs on disk, one file per HTML hash, sharded by key prefix
+
+    Reads refresh the file's mtime so eviction is least-recently-used.
+    """
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # lazily computed on first write
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path, None)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Unreadable PDF cache entry {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write PDF cache entry {key[:12]}: {e}")
+            return
+
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += len(data)
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith('.pdf'):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+                except OSError:
+                    continue
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries down to 90% of max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        self._size = total
+        if removed:
+            logger.info(f"PDF cache eviction: removed {removed} entries ({total / 1024 / 1024:.1f} MB left)")
+
+
+_FROM_ENV = object()
+
+
+class PDFRenderer:
+    """HTML -> PDF on a pre-warmed process pool, behind a content-hash cache"""
+
+    def __init__(self, workers: Optional[int] = None, cache=_FROM_ENV,
+                 render: Callable[[str], bytes] = render_html, timeout: Optional[float] = None):
+        """
+        Args:
+            workers: Render processes (default: PDF_RENDER_WORKERS; 0 = render in the calling thread)
+            cache: PDFCache, None to disable, or default to PDF_CACHE_DIR / PDF_CACHE_MAX_MB
+            render: Module-level function turning HTML into PDF bytes (picklable for the pool)
+            timeout: Seconds to wait for one render (default: PDF_RENDER_TIMEOUT)
+        """
+        self.workers = int(os.getenv('PDF_RENDER_WORKERS', '1')) if workers is None else workers
+        self.timeout = timeout or float(os.getenv('PDF_RENDER_TIMEOUT', '60'))
+        self.render_fn = render
+        if cache is _FROM_ENV:
+            cache_dir = os.getenv('PDF_CACHE_DIR', 'data/pdf_cache')
+            cache = None if cache_dir.lower() in ('', 'off', 'none', 'false') else PDFCache(
+                cache_dir, max_bytes=int(float(os.getenv('PDF_CACHE_MAX_MB', '100')) * 1024 * 1024)
+            )
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+        self._timings = deque(maxlen=TIMING_WINDOW)
+        self._counts = {'renders': 0, 'cache_hits': 0, 'shared': 0, 'errors': 0}
+        self._total_ms = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded web worker is unsafe
+                initializer = _init_worker if self.render_fn is render_html else None
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=initializer,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def warm(self) -> None:
+        """Start the render processes now rather than on the first download"""
+        # Spawned children re-import `python app.py` as __mp_main__: never warm a pool from one
+        if self.workers <= 0 or multiprocessing.parent_process() is not None:
+            return
+        try:
+            for future in [self.pool.submit(_warm) for _ in range(self.workers)]:
+                future.result(timeout=self.timeout)
+        except BrokenProcessPool as e:
+            self.shutdown(wait=False)
+            logger.warning(f"PDF render pool warm-up failed: {e}")
+        except Exception as e:
+            logger.warning(f"PDF render pool warm-up failed: {e}")
+
+    def warm_async(self) -> None:
+        threading.Thread(target=self.warm, daemon=True, name='pdf-render-warmup').start()
+
+    def render(self, html: str) -> bytes:
+        """
+        PDF bytes for an HTML document
+
+        Raises:
+            ImportError: If WeasyPrint is not installed
+            Exception: If rendering fails or times out
+        """
+        key = cache_key(html)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                self._count('cache_hits')
+                return data
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            # Same HTML already rendering in another thread
+            self._count('shared')
+            return future.result(timeout=self.timeout)
+
+        start = time.time()
+        try:
+            with span('pdf_render'):
+                data = self._render(html)
+        except BaseException as e:
+            with self._lock:
+                self._counts['errors'] += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        elapsed_ms = (time.time() - start) * 1000
+        logger.info(f"PDF rendered in {elapsed_ms:.0f} ms ({len(data):,} bytes)")
+        if self.cache is not None:
+            self.cache.put(key, data)
+
+        with self._lock:
+            self._counts['renders'] += 1
+            self._total_ms += elapsed_ms
+            self._timings.append(elapsed_ms)
+            self._inflight.pop(key, None)
+        future.set_result(data)
+        return data
+
+    def _render(self, html: str) -> bytes:
+        if self.workers <= 0:
+            return self.render_fn(html)
+        try:
+            return self.pool.submit(self.render_fn, html).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # A render process died (e.g. out of memory): start a fresh pool next time
+            self.shutdown(wait=False)
+            raise
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> Dict:
+        """Render counts and timings in this process"""
+        with self._lock:
+            timings = sorted(self._timings)
+            counts = dict(self._counts)
+            total_ms = self._total_ms
+
+        requests = counts['renders'] + counts['cache_hits'] + counts['shared']
+        stats = {
+            **counts,
+            'workers': self.workers,
+            'cache_hit_rate': round(counts['cache_hits'] / requests, 3) if requests else 0.0,
+            'avg_ms': round(total_ms / counts['renders'], 1) if counts['renders'] else 0.0,
+        }
+        if timings:
+            stats['p50_ms'] = round(timings[len(timings) // 2], 1)
+            stats['p95_ms'] = round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1)
+            stats['max_ms'] = round(timings[-1], 1)
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_renderer: Optional[PDFRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PDFRenderer:
+    """Process-wide renderer (its pool starts on the first render or warm())"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PDFRenderer()
+        return _renderer
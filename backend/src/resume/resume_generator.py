@@ -6,7 +6,8 @@ Generates tailored, ATS-optimized resumes based on:
 - Job requirements
 - User-claimed competencies/skills with evidence
 """
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
+from src.utils.llm_telemetry import gemini_generate, estimate_call_cost
 from typing import Dict, List, Any, Optional
 import json
 import re
@@ -29,7 +30,7 @@ class ResumeGenerator:
             gemini_api_key: Google Gemini API key (primary, optional)
         """
         # Claude client (fallback)
-        self.client = Anthropic(api_key=anthropic_api_key)
+        self.client = get_llm_client(anthropic_api_key)
         self.model = "claude-3-5-haiku-20241022"  # Use Haiku (faster and cheaper, still high quality)
 
         # Gemini client (primary)
@@ -78,7 +79,9 @@ class ResumeGenerator:
                     model=self.model,
                     max_tokens=8192,  # Increased for longer resumes
                     temperature=0.7,  # Slightly creative but professional
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    cache=False,  # Regenerating should produce a fresh resume
+                    operation='resume'
                 )
                 html_content = response.content[0].text
                 api_used = 'claude'
@@ -117,8 +120,10 @@ class ResumeGenerator:
         if not self.gemini_model:
             raise ValueError("Gemini not configured")
 
-        response = self.gemini_model.generate_content(
+        response = gemini_generate(
+            self.gemini_model,
             prompt,
+            operation='resume',
             generation_config=genai.GenerationConfig(
                 max_output_tokens=8192,  # Match Claude's limit
                 temperature=0.7,
@@ -690,6 +695,9 @@ Language Requirements:
         """
         Convert HTML to PDF using WeasyPrint
 
+        Rendering goes through the shared PDF renderer (pre-warmed process
+        pool and content-hash cache, see src/resume/pdf_renderer.py).
+
         Args:
             html_content: HTML string
             output_path: Path where PDF should be saved
@@ -698,25 +706,15 @@ Language Requirements:
             ImportError: If WeasyPrint is not installed
             Exception: If PDF generation fails
         """
-        try:
-            from weasyprint import HTML, CSS
-            from weasyprint.text.fonts import FontConfiguration
-        except ImportError:
-            raise ImportError(
-                "WeasyPrint is not installed. "
-                "Install it with: pip install weasyprint"
-            )
+        from src.resume.pdf_renderer import get_pdf_renderer
 
         try:
-            # Create font configuration for better rendering
-            font_config = FontConfiguration()
-
-            # Generate PDF
-            HTML(string=html_content).write_pdf(
-                output_path,
-                font_config=font_config
-            )
+            pdf_data = get_pdf_renderer().render(html_content)
+            with open(output_path, 'wb') as f:
+                f.write(pdf_data)
 
+        except ImportError:
+            raise
         except Exception as e:
             print(f"Error generating PDF: {e}")
             raise
@@ -741,11 +739,9 @@ Language Requirements:
         input_tokens = len(prompt) / 4
         output_tokens = 2000  # Estimated output size
 
-        # Claude 3.5 Sonnet pricing (as of Jan 2026)
-        # Input: $3 per million tokens
-        # Output: $15 per million tokens
-        input_cost = (input_tokens / 1_000_000) * 3
-        output_cost = (output_tokens / 1_000_000) * 15
+        # Priced for the Claude model (the Gemini path is cheaper when configured)
+        input_cost = estimate_call_cost(self.model, input_tokens, 0)
+        output_cost = estimate_call_cost(self.model, 0, output_tokens)
         total_cost = input_cost + output_cost
 
         return {
@@ -69,18 +69,17 @@ def filter_new_jobs(jobs: List[Dict[str, Any]], db) -> List[Dict[str, Any]]:
     Returns:
         List of new jobs only (excluding previously deleted jobs)
     """
-    new_jobs = []
-    
-    # Get list of deleted job_ids to exclude
-    deleted_job_ids = db.get_deleted_job_ids()
+    # One batched lookup instead of a job_exists() query per job
+    existing_ids, deleted_job_ids = db.get_known_job_ids(job.get('job_id') for job in jobs)
     
+    new_jobs = []
     for job in jobs:
         job_id = job.get('job_id')
         # Skip if job already exists OR was previously deleted
-        if not db.job_exists(job_id) and job_id not in deleted_job_ids:
-            new_jobs.append(job)
-        elif job_id in deleted_job_ids:
+        if job_id in deleted_job_ids:
             print(f"  Skipping previously deleted job: {job.get('title')} at {job.get('company')}")
+        elif job_id not in existing_ids:
+            new_jobs.append(job)
     
     return new_jobs
 
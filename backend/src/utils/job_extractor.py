@@ -7,7 +7,7 @@ import os
 import re
 import requests
 from bs4 import BeautifulSoup
-from anthropic import Anthropic
+from src.utils.llm_gateway import get_llm_client
 from typing import Optional, Tuple, Dict
 import json
 
@@ -103,7 +103,7 @@ def extract_job_data(text: str, api_key: Optional[str] = None) -> Dict[str, Opti
         if not api_key:
             raise ValueError("No Anthropic API key provided")
 
-    client = Anthropic(api_key=api_key)
+    client = get_llm_client(api_key)
 
     # Truncate text if too long (max ~8000 chars for context window)
     if len(text) > 8000:
@@ -128,6 +128,7 @@ Return the JSON now:"""
             model="claude-3-5-haiku-20241022",
             max_tokens=2000,
             temperature=0.3,
+            operation='job_extraction',
             messages=[{
                 "role": "user",
                 "content": prompt
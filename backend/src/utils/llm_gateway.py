@@ -0,0 +1,453 @@
+"""
+LLM Gateway
+
+Shared entry point for Claude calls. Every analyzer/generator used to create
+its own Anthropic client and call messages.create with no memoization, so
+re-parsing the same CV or re-scoring the same job/profile pair paid full
+latency and cost every time.
+
+The gateway:
+  - shares one Anthropic client per API key (connection reuse)
+  - caches responses on disk, keyed by a hash of model + messages + params,
+    with a TTL and size-bounded LRU eviction
+  - supports record/replay so benchmarks and tests can run offline
+  - records every call (tokens, latency, cache hit) via src.utils.llm_telemetry
+
+Configuration (environment):
+    LLM_MODE           live (default) | record | replay
+                       record: always call the API and write to the cassette dir
+                       replay: answer only from the cassette dir, never call the API
+    LLM_CACHE          on (default) | off
+    LLM_CACHE_DIR      response cache directory (default: data/llm_cache)
+    LLM_CACHE_TTL      seconds before a cached response expires (default: 7 days)
+    LLM_CACHE_MAX_MB   cache size before LRU eviction kicks in (default: 200)
+    LLM_CASSETTE_DIR   record/replay directory (default: data/llm_cassettes)
+
+Usage:
+    from src.utils.llm_gateway import get_llm_client
+
+    client = get_llm_client(api_key)
+    response = client.messages.create(model=..., max_tokens=..., messages=[...])
+    text = response.content[0].text
+
+    # Non-deterministic generations (cover letters, resumes) opt out of memoization
+    response = client.messages.create(..., cache=False)
+
+    # Telemetry labels (not sent to the API)
+    response = client.messages.create(..., operation='batch_scoring', batch_size=len(jobs))
+
+    # Streaming: text chunks as they arrive, full response afterwards
+    stream = client.messages.stream_text(model=..., max_tokens=..., messages=[...])
+    for chunk in stream:
+        ...
+    stream.response.stop_reason
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+
+from src.utils.llm_telemetry import record_llm_call
+from src.utils.profiler import span
+
+logger = logging.getLogger(__name__)
+
+
+class LLMReplayMiss(Exception):
+    """Raised in replay mode when no recorded response exists for a request"""
+    pass
+
+
+class _TextBlock:
+    """Minimal stand-in for an Anthropic text content block"""
+
+    def __init__(self, text: str):
+        self.type = 'text'
+        self.text = text
+
+
+class _Usage:
+    """Minimal stand-in for Anthropic usage metadata"""
+
+    def __init__(self, input_tokens: int = 0, output_tokens: int = 0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+class LLMResponse:
+    """
+    Response returned by the gateway
+
+    Mirrors the attributes call sites use from anthropic's Message
+    (content[0].text, usage, stop_reason, model) so cached, replayed and
+    live responses are interchangeable.
+    """
+
+    def __init__(self, text: str, model: str = '', stop_reason: Optional[str] = None,
+                 input_tokens: int = 0, output_tokens: int = 0, cached: bool = False):
+        self.content = [_TextBlock(text)]
+        self.model = model
+        self.stop_reason = stop_reason
+        self.usage = _Usage(input_tokens, output_tokens)
+        self.cached = cached
+
+    @property
+    def text(self) -> str:
+        return self.content[0].text if self.content else ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'text': self.text,
+            'model': self.model,
+            'stop_reason': self.stop_reason,
+            'input_tokens': self.usage.input_tokens,
+            'output_tokens': self.usage.output_tokens
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], cached: bool = False) -> 'LLMResponse':
+        return cls(
+            text=data.get('text', ''),
+            model=data.get('model', ''),
+            stop_reason=data.get('stop_reason'),
+            input_tokens=data.get('input_tokens', 0),
+            output_tokens=data.get('output_tokens', 0),
+            cached=cached
+        )
+
+    @classmethod
+    def from_anthropic(cls, message) -> 'LLMResponse':
+        text = ''.join(getattr(block, 'text', '') for block in (message.content or []))
+        usage = getattr(message, 'usage', None)
+        return cls(
+            text=text,
+            model=getattr(message, 'model', ''),
+            stop_reason=getattr(message, 'stop_reason', None),
+            input_tokens=getattr(usage, 'input_tokens', 0) if usage else 0,
+            output_tokens=getattr(usage, 'output_tokens', 0) if usage else 0
+        )
+
+
+def make_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Content-addressed key for a request
+
+    Hashes the canonical JSON of every request parameter (model, messages,
+    system, max_tokens, temperature, ...). Dict key order does not matter.
+    """
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk response store: one JSON file per key, sharded by key prefix
+
+    Reads refresh the file's mtime so eviction is least-recently-used.
+    A ttl/max_bytes of None disables expiry/eviction (used for cassettes).
+    """
+
+    def __init__(self, root: str, ttl: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # lazily computed on first write
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path, None)
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable LLM cache entry {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, data: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write LLM cache entry {key[:12]}: {e}")
+            return
+
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += os.path.getsize(path)
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+                except OSError:
+                    continue
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Drop expired entries, then least-recently-used ones down to 90% of max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        now = time.time()
+        removed = 0
+
+        for mtime, size, path in entries:
+            expired = self.ttl is not None and now - mtime > self.ttl
+            if not expired and total <= target:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+
+        self._size = total
+        if removed:
+            logger.info(f"LLM cache eviction: removed {removed} entries ({total / 1024 / 1024:.1f} MB left)")
+
+
+_FROM_ENV = object()
+
+
+class LLMGateway:
+    """Shared, caching wrapper around the Anthropic Messages API"""
+
+    def __init__(self, api_key: Optional[str] = None, client=None,
+                 mode: Optional[str] = None, cache=_FROM_ENV, cassettes=_FROM_ENV):
+        """
+        Initialize gateway
+
+        Args:
+            api_key: Anthropic API key (not needed in replay mode)
+            client: Pre-built Anthropic-compatible client (for tests)
+            mode: live | record | replay (default: LLM_MODE env var)
+            cache: ResponseCache, or None to disable (default: from LLM_CACHE_* env vars)
+            cassettes: Record/replay ResponseCache (default: LLM_CASSETTE_DIR)
+        """
+        self.api_key = api_key
+        self._client = client
+        self.mode = (mode or os.getenv('LLM_MODE', 'live')).lower()
+        if self.mode not in ('live', 'record', 'replay'):
+            logger.warning(f"Unknown LLM_MODE '{self.mode}', using 'live'")
+            self.mode = 'live'
+
+        if cache is _FROM_ENV:
+            cache = None
+            if os.getenv('LLM_CACHE', 'on').lower() != 'off':
+                cache = ResponseCache(
+                    os.getenv('LLM_CACHE_DIR', 'data/llm_cache'),
+                    ttl=int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600))),
+                    max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '200')) * 1024 * 1024)
+                )
+        self.cache = cache
+
+        if cassettes is _FROM_ENV:
+            cassettes = ResponseCache(os.getenv('LLM_CASSETTE_DIR', 'data/llm_cassettes'))
+        self.cassettes = cassettes
+
+        self.messages = _MessagesAPI(self)
+
+    @property
+    def client(self):
+        """Underlying Anthropic client (created on first live call)"""
+        if self._client is None:
+            from anthropic import Anthropic
+            self._client = Anthropic(api_key=self.api_key)
+        return self._client
+
+    def create_message(self, cache: bool = True, operation: Optional[str] = None,
+                       batch_size: Optional[int] = None, **params) -> LLMResponse:
+        """
+        Create a message, answering from cache/cassettes where possible
+
+        Args:
+            cache: Memoize this request (disable for creative generations)
+            operation: Telemetry label (e.g. 'batch_scoring', 'cv_parsing')
+            batch_size: Jobs covered by this call, for telemetry
+            **params: Anthropic messages.create parameters
+
+        Returns:
+            LLMResponse (response.cached is True when no API call was made)
+        """
+        start = time.time()
+        key = make_cache_key(params)
+        stored = self._lookup(key, params, cache)
+        if stored is not None:
+            self._record(stored, start, operation, batch_size)
+            return stored
+
+        try:
+            with span('llm', operation=operation, model=params.get('model')):
+                response = LLMResponse.from_anthropic(self.client.messages.create(**params))
+        except Exception as e:
+            self._record_error(params, start, operation, batch_size, e)
+            raise
+        self._store(key, response, cache)
+        self._record(response, start, operation, batch_size)
+        return response
+
+    def stream_message(self, cache: bool = True, operation: Optional[str] = None,
+                       batch_size: Optional[int] = None, **params) -> 'LLMStream':
+        """
+        Stream a message as text chunks
+
+        Cached and replayed responses arrive as a single chunk. Iterate the
+        returned LLMStream for text; its .response is set once the stream ends.
+        """
+        return LLMStream(self, cache, params, operation, batch_size)
+
+    def _record(self, response: LLMResponse, start: float, operation: Optional[str],
+                batch_size: Optional[int]):
+        record_llm_call(
+            'anthropic', response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            latency_ms=(time.time() - start) * 1000,
+            batch_size=batch_size,
+            cache_hit=response.cached,
+            operation=operation
+        )
+
+    def _record_error(self, params: Dict[str, Any], start: float, operation: Optional[str],
+                      batch_size: Optional[int], error: Exception):
+        record_llm_call(
+            'anthropic', params.get('model', ''),
+            latency_ms=(time.time() - start) * 1000,
+            batch_size=batch_size,
+            operation=operation,
+            error=str(error)
+        )
+
+    def _lookup(self, key: str, params: Dict[str, Any], cache: bool) -> Optional[LLMResponse]:
+        """Answer from cassettes (replay) or the response cache, if possible"""
+        if self.mode == 'replay':
+            recorded = self.cassettes.get(key)
+            if recorded is None:
+                raise LLMReplayMiss(f"No recorded response for {params.get('model')} request {key[:12]}")
+            return LLMResponse.from_dict(recorded, cached=True)
+
+        if cache and self.cache is not None and self.mode == 'live':
+            hit = self.cache.get(key)
+            if hit is not None:
+                logger.debug(f"LLM cache hit {key[:12]} ({params.get('model')})")
+                return LLMResponse.from_dict(hit, cached=True)
+        return None
+
+    def _store(self, key: str, response: LLMResponse, cache: bool):
+        """Write a live response to cassettes (record mode) and the response cache"""
+        if self.mode == 'record':
+            self.cassettes.put(key, response.to_dict())
+        # Truncated completions are not worth replaying from cache
+        if cache and self.cache is not None and response.stop_reason != 'max_tokens':
+            self.cache.put(key, response.to_dict())
+
+
+class LLMStream:
+    """Iterable of text chunks for one streamed request"""
+
+    def __init__(self, gateway: LLMGateway, cache: bool, params: Dict[str, Any],
+                 operation: Optional[str] = None, batch_size: Optional[int] = None):
+        self._gateway = gateway
+        self._cache = cache
+        self._params = params
+        self._operation = operation
+        self._batch_size = batch_size
+        self.response: Optional[LLMResponse] = None
+
+    def __iter__(self):
+        start = time.time()
+        key = make_cache_key(self._params)
+        stored = self._gateway._lookup(key, self._params, self._cache)
+        if stored is not None:
+            self.response = stored
+            self._gateway._record(stored, start, self._operation, self._batch_size)
+            yield stored.text
+            return
+
+        try:
+            with self._gateway.client.messages.stream(**self._params) as stream:
+                for text in stream.text_stream:
+                    yield text
+                final = stream.get_final_message()
+        except Exception as e:
+            self._gateway._record_error(self._params, start, self._operation, self._batch_size, e)
+            raise
+
+        self.response = LLMResponse.from_anthropic(final)
+        self._gateway._store(key, self.response, self._cache)
+        self._gateway._record(self.response, start, self._operation, self._batch_size)
+
+
+class _MessagesAPI:
+    """client.messages facade so call sites keep the Anthropic calling convention"""
+
+    def __init__(self, gateway: LLMGateway):
+        self._gateway = gateway
+
+    def create(self, **params) -> LLMResponse:
+        return self._gateway.create_message(**params)
+
+    def stream_text(self, **params) -> LLMStream:
+        return self._gateway.stream_message(**params)
+
+
+_gateways: Dict[Optional[str], LLMGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_llm_client(api_key: Optional[str] = None) -> LLMGateway:
+    """
+    Get the shared gateway for an API key
+
+    Args:
+        api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY)
+
+    Returns:
+        LLMGateway instance (one per API key per process)
+    """
+    api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
+    with _gateways_lock:
+        if api_key not in _gateways:
+            _gateways[api_key] = LLMGateway(api_key=api_key)
+        return _gateways[api_key]
@@ -0,0 +1,218 @@
+"""
+LLM call telemetry
+
+Records one row per Anthropic/Gemini call (model, tokens, latency, batch size,
+cache hit, user) into the llm_calls table. Calls are buffered in memory and
+written by a background thread so the request/matching path never waits on
+the database.
+
+Setup (once per process, e.g. in app.py):
+    from src.utils.llm_telemetry import configure_telemetry
+    configure_telemetry(job_db)
+
+Attributing calls to a user (contextvar, per thread/request):
+    with llm_user(user_id):
+        analyzer.analyze_batch(jobs)
+
+Without configure_telemetry() records are dropped, so scripts and tests
+need no database.
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, output)
+MODEL_PRICING = {
+    'claude-3-5-haiku-20241022': (0.80, 4.00),
+    'claude-3-haiku-20240307': (0.25, 1.25),
+    'claude-3-5-sonnet-20241022': (3.00, 15.00),
+    'claude-sonnet-4-20250514': (3.00, 15.00),
+    'gemini-2.5-flash': (0.30, 2.50),
+}
+DEFAULT_PRICING = (3.00, 15.00)
+
+_current_user: contextvars.ContextVar = contextvars.ContextVar('llm_user_id', default=None)
+
+
+def estimate_call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Cost in USD for a call, from MODEL_PRICING"""
+    input_price, output_price = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    return (input_tokens or 0) / 1_000_000 * input_price + (output_tokens or 0) / 1_000_000 * output_price
+
+
+def set_llm_user(user_id: Optional[int]):
+    """Attribute subsequent calls in this context to a user; returns a reset token"""
+    return _current_user.set(user_id)
+
+
+def reset_llm_user(token):
+    _current_user.reset(token)
+
+
+@contextmanager
+def llm_user(user_id: Optional[int]):
+    """Attribute LLM calls made inside the block to user_id"""
+    token = _current_user.set(user_id)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+class TelemetryWriter:
+    """
+    Buffered, asynchronous writer for llm_calls rows
+
+    Rows are flushed by a daemon thread every flush_interval seconds or as
+    soon as batch_size rows are queued. A failed flush is logged and dropped;
+    telemetry must never break an LLM call.
+    """
+
+    def __init__(self, sink, batch_size: int = 50, flush_interval: float = 5.0,
+                 max_queue: int = 10000):
+        """
+        Args:
+            sink: Callable taking a list of row dicts (e.g. PostgresDatabase.insert_llm_calls)
+            batch_size: Rows per write
+            flush_interval: Seconds between flushes
+            max_queue: Rows kept in memory before new ones are dropped
+        """
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='llm-telemetry', daemon=True)
+        self._thread.start()
+
+    def record(self, row: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("LLM telemetry queue full, dropping record")
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self):
+        """Write everything queued so far (called by the worker and at exit)"""
+        while True:
+            rows = self._drain()
+            if not rows:
+                return
+            try:
+                self.sink(rows)
+            except Exception as e:
+                logger.warning(f"Could not write {len(rows)} LLM telemetry rows: {e}")
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+_writer: Optional[TelemetryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def configure_telemetry(db, **writer_options) -> Optional[TelemetryWriter]:
+    """
+    Start writing telemetry to a database that implements insert_llm_calls(rows)
+
+    Returns:
+        The process-wide TelemetryWriter (None if the database has no llm_calls support)
+    """
+    global _writer
+    if not hasattr(db, 'insert_llm_calls'):
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = TelemetryWriter(db.insert_llm_calls, **writer_options)
+            atexit.register(_writer.close)
+    return _writer
+
+
+def record_llm_call(provider: str, model: str, input_tokens: int = 0, output_tokens: int = 0,
+                    latency_ms: float = 0.0, batch_size: Optional[int] = None,
+                    cache_hit: bool = False, operation: Optional[str] = None,
+                    user_id: Optional[int] = None, error: Optional[str] = None):
+    """
+    Queue one llm_calls row (no-op until configure_telemetry() has been called)
+
+    Cache hits are recorded with zero cost so hit rates show up alongside spend.
+    """
+    if _writer is None:
+        return
+    _writer.record({
+        'created_at': datetime.now(),
+        'user_id': user_id if user_id is not None else _current_user.get(),
+        'provider': provider,
+        'model': model,
+        'operation': operation,
+        'input_tokens': int(input_tokens or 0),
+        'output_tokens': int(output_tokens or 0),
+        'latency_ms': int(latency_ms),
+        'batch_size': batch_size,
+        'cache_hit': cache_hit,
+        'cost_usd': 0.0 if cache_hit else estimate_call_cost(model, input_tokens, output_tokens),
+        'error': error[:500] if error else None
+    })
+
+
+def gemini_generate(gemini_model, prompt: str, operation: Optional[str] = None, **kwargs):
+    """
+    Call a google.generativeai GenerativeModel and record the call
+
+    Args:
+        gemini_model: GenerativeModel instance
+        prompt: Prompt text
+        operation: Telemetry label (e.g. 'cover_letter')
+        **kwargs: Passed to generate_content (generation_config, ...)
+
+    Returns:
+        Gemini response
+    """
+    model_name = getattr(gemini_model, 'model_name', 'gemini').replace('models/', '')
+    start = time.time()
+    try:
+        response = gemini_model.generate_content(prompt, **kwargs)
+    except Exception as e:
+        record_llm_call('gemini', model_name, latency_ms=(time.time() - start) * 1000,
+                        operation=operation, error=str(e))
+        raise
+
+    usage = getattr(response, 'usage_metadata', None)
+    record_llm_call(
+        'gemini', model_name,
+        input_tokens=getattr(usage, 'prompt_token_count', 0) if usage else 0,
+        output_tokens=getattr(usage, 'candidates_token_count', 0) if usage else 0,
+        latency_ms=(time.time() - start) * 1000,
+        operation=operation
+    )
+    return response
@@ -0,0 +1,390 @@
+"""
+Built-in profiling for requests and background runs
+
+Performance work used to mean adding print() timings, re-running scripts
+and saving text dumps. A profiling run instead captures, for one request or
+one background job:
+
+- a function profile: cProfile (exact call counts, downloadable as .prof for
+  pstats / snakeviz) or a stack sampler (low overhead for long runs,
+  downloadable as folded stacks for flame graphs)
+- a span tree of named stages: `with span('semantic_filtering', jobs=n):`
+  anywhere in the code. Spans cost two clock reads when no run is active.
+
+Runs are written to a rotating on-disk store (ProfileStore) that the admin
+page (/admin/profiles) lists and downloads from.
+
+    # Background job, enabled by PROFILE_BACKGROUND=matching
+    with background_profile('matching', user_id=user_id):
+        ...
+
+    # Explicit run (scripts, benchmarks)
+    with profile_run('script', 'reparse_cv', mode='sample') as run:
+        ...
+    print(run.entry['id'])
+
+Requests are profiled by app.py for admins sending `X-Profile: cprofile|sample`
+or `?_profile=cprofile|sample`.
+
+The cProfile mode profiles the starting thread only; threads it starts
+(collector pools) show up in spans only if they open their own spans.
+
+Environment variables:
+    PROFILE_DIR          profile store directory (default: data/profiles)
+    PROFILE_KEEP         runs kept before the oldest are deleted (default: 50)
+    PROFILE_MODE         default mode: cprofile | sample (default: cprofile)
+    PROFILE_BACKGROUND   background jobs to profile: comma list or 'all' (default: none)
+    PROFILE_SAMPLE_MS    stack sampling interval in ms (default: 5)
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import pstats
+import logging
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sample')
+
+# Spans recorded per run (the rest are counted, not stored)
+MAX_SPANS = 2000
+
+# Functions listed in a run's summary
+TOP_FUNCTIONS = 40
+
+# Stack frames kept per sample
+MAX_STACK_DEPTH = 60
+
+_ENTRY_ID = re.compile(r'^[\w-]+$')
+
+
+class Span:
+    """One timed stage; children are the spans opened inside it"""
+
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children')
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List['Span'] = []
+
+    def to_dict(self, origin: float) -> Dict:
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.start
+        return {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 2),
+            'duration_ms': round(duration * 1000, 2),
+            'attrs': self.attrs,
+            'children': [child.to_dict(origin) for child in self.children],
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('profile_span', default=None)
+_current_run: ContextVar[Optional['ProfileRun']] = ContextVar('profile_run', default=None)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """
+    Time a stage; recorded in the active run's span tree, if any
+
+    The yielded Span's duration (seconds) is set on exit either way, so
+    callers can log it without their own clock reads.
+    """
+    parent = _current_span.get()
+    run = _current_run.get()
+    node = Span(name, attrs)
+    token = None
+    if parent is not None and run is not None and run.record_span():
+        parent.children.append(node)
+        token = _current_span.set(node)
+    try:
+        yield node
+    finally:
+        node.duration = time.perf_counter() - node.start
+        if token is not None:
+            _current_span.reset(token)
+
+
+def annotate(**attrs) -> None:
+    """Add attributes to the innermost open span (no-op without a run)"""
+    node = _current_span.get()
+    if node is not None:
+        node.attrs.update(attrs)
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='profile-sampler')
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks ('root;...;leaf count' lines) for flame graph tools"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+        """Functions by samples on top of the stack (self) and anywhere in it (total)"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += count
+            for function in set(frames):
+                total_counts[function] += count
+        total = max(self.samples, 1)
+        return [
+            {'function': function, 'self_pct': round(self_counts[function] / total * 100, 1),
+             'total_pct': round(count / total * 100, 1), 'samples': count}
+            for function, count in total_counts.most_common(limit)
+        ]
+
+
+def _cprofile_top(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {'function': f"{name} ({os.path.basename(filename)}:{line})", 'calls': calls,
+         'tottime_ms': round(tottime * 1000, 2), 'cumtime_ms': round(cumtime * 1000, 2)}
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+class ProfileStore:
+    """Profiling runs on disk: <id>.json plus <id>.prof or <id>.folded, newest PROFILE_KEEP kept"""
+
+    def __init__(self, root: Optional[str] = None, keep: Optional[int] = None):
+        self.root = root or os.getenv('PROFILE_DIR', 'data/profiles')
+        self.keep = keep or int(os.getenv('PROFILE_KEEP', '50'))
+        self._lock = threading.Lock()
+
+    def path(self, entry_id: str, suffix: str) -> Optional[str]:
+        """File of a stored run, or None (also for ids that are not store ids)"""
+        if not _ENTRY_ID.match(entry_id) or suffix not in ('json', 'prof', 'folded'):
+            return None
+        path = os.path.join(self.root, f"{entry_id}.{suffix}")
+        return path if os.path.exists(path) else None
+
+    def save(self, entry: Dict, profiler: Optional[cProfile.Profile] = None,
+             folded: Optional[str] = None) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        base = os.path.join(self.root, entry['id'])
+        if profiler is not None:
+            profiler.dump_stats(f"{base}.prof")
+        if folded is not None:
+            with open(f"{base}.folded", 'w', encoding='utf-8') as f:
+                f.write(folded)
+        # Metadata last: list() only shows runs whose files are complete
+        tmp_path = f"{base}.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, f"{base}.json")
+        self._rotate()
+
+    def _ids(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        # Ids start with a UTC timestamp, so name order is age order
+        return sorted((name[:-5] for name in os.listdir(self.root) if name.endswith('.json')), reverse=True)
+
+    def _rotate(self) -> None:
+        with self._lock:
+            for entry_id in self._ids()[self.keep:]:
+                self.delete(entry_id)
+
+    def delete(self, entry_id: str) -> None:
+        for suffix in ('json', 'prof', 'folded'):
+            path = self.path(entry_id, suffix)
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        path = self.path(entry_id, 'json')
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable profile {entry_id}: {e}")
+            return None
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        """Stored runs, newest first"""
+        entries = []
+        for entry_id in self._ids()[:limit]:
+            entry = self.get(entry_id)
+            if entry:
+                entries.append(entry)
+        return entries
+
+
+class ProfileRun:
+    """One profiled request or job: function profile + span tree, saved on finish()"""
+
+    def __init__(self, kind: str, name: str, mode: Optional[str] = None,
+                 store: Optional[ProfileStore] = None, **meta):
+        """
+        Args:
+            kind: 'request', 'background', 'script', ...
+            name: Route or job name
+            mode: 'cprofile' or 'sample' (default: PROFILE_MODE)
+            store: Where to save the run (default: ProfileStore())
+            **meta: Extra JSON-serializable details (user_id, path, ...)
+        """
+        mode = (mode or os.getenv('PROFILE_MODE', 'cprofile')).lower()
+        self.mode = mode if mode in MODES else 'cprofile'
+        self.kind = kind
+        self.name = name
+        self.store = store
+        self.meta = meta
+        self.entry: Dict = {}
+        self.spans_dropped = 0
+        self._span_count = 0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._tokens = None
+
+    def record_span(self) -> bool:
+        """Whether another span fits in this run"""
+        self._span_count += 1
+        if self._span_count > MAX_SPANS:
+            self.spans_dropped += 1
+            return False
+        return True
+
+    def start(self) -> 'ProfileRun':
+        self.started = time.time()
+        self.root = Span(self.name, {})
+        self._tokens = (_current_run.set(self), _current_span.set(self.root))
+
+        if self.mode == 'cprofile':
+            try:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            except ValueError:
+                # Another profiler is active in this thread (e.g. a nested run): sample instead
+                self._profiler = None
+                self.mode = 'sample'
+        if self.mode == 'sample':
+            interval = float(os.getenv('PROFILE_SAMPLE_MS', '5')) / 1000
+            self._sampler = StackSampler(threading.get_ident(), interval)
+            self._sampler.start()
+        return self
+
+    def finish(self, error: Optional[str] = None, **meta) -> Dict:
+        """Stop profiling and save the run; returns its metadata"""
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.root.duration = time.perf_counter() - self.root.start
+        if self._tokens:
+            try:
+                _current_run.reset(self._tokens[0])
+                _current_span.reset(self._tokens[1])
+            except ValueError:
+                # Finished from another context (e.g. teardown): just detach
+                _current_run.set(None)
+                _current_span.set(None)
+            self._tokens = None
+
+        self.entry = {
+            'id': (f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(self.started))}"
+                   f"{int(self.started * 1e6) % 1000000:06d}-{self.kind}-{uuid.uuid4().hex[:6]}"),
+            'kind': self.kind,
+            'name': self.name,
+            'mode': self.mode,
+            'started': self.started,
+            'duration_ms': round(self.root.duration * 1000, 1),
+            'error': error,
+            'meta': {**self.meta, **meta},
+            'spans': self.root.to_dict(self.root.start),
+            'spans_dropped': self.spans_dropped,
+        }
+        if self._profiler is not None:
+            self.entry['top'] = _cprofile_top(self._profiler)
+            self.entry['download'] = 'prof'
+        else:
+            self.entry['top'] = self._sampler.top()
+            self.entry['samples'] = self._sampler.samples
+            self.entry['download'] = 'folded'
+
+        try:
+            (self.store or ProfileStore()).save(
+                self.entry, profiler=self._profiler,
+                folded=self._sampler.folded() if self._sampler is not None else None
+            )
+            logger.info(f"Profile {self.entry['id']} saved ({self.entry['duration_ms']:.0f} ms, {self.mode})")
+        except OSError as e:
+            logger.warning(f"Could not save profile of {self.kind} {self.name}: {e}")
+        return self.entry
+
+
+@contextmanager
+def profile_run(kind: str, name: str, mode: Optional[str] = None,
+                store: Optional[ProfileStore] = None, **meta) -> Iterator[ProfileRun]:
+    """Profile the enclosed block and save it, also when it raises"""
+    run = ProfileRun(kind, name, mode=mode, store=store, **meta).start()
+    try:
+        yield run
+    except BaseException as e:
+        run.finish(error=f"{type(e).__name__}: {e}")
+        raise
+    run.finish()
+
+
+def background_profiling_enabled(job: str) -> bool:
+    """Whether PROFILE_BACKGROUND selects this job ('all' or a comma list of names)"""
+    setting = os.getenv('PROFILE_BACKGROUND', '').strip().lower()
+    if setting in ('', '0', 'off', 'false', 'none'):
+        return False
+    return setting in ('all', '1', 'true') or job.lower() in {name.strip() for name in setting.split(',')}
+
+
+def background_profile(job: str, **meta):
+    """profile_run for a background job when PROFILE_BACKGROUND enables it, else a no-op"""
+    if background_profiling_enabled(job) and _current_run.get() is None:
+        return profile_run('background', job, **meta)
+    return nullcontext()
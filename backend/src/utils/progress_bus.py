@@ -0,0 +1,236 @@
+"""
+Per-user progress event bus with Server-Sent Events streaming
+
+Background work (matching, backfill, search) publishes structured events to
+the user's channel instead of overwriting a status dict that the browser
+polls:
+
+    progress_bus.publish(user_id, 'matches', count=120, top=[...])
+
+    # Flask route
+    return Response(progress_bus.stream(user_id, last_event_id), mimetype='text/event-stream')
+
+Every event gets an id that increases across the whole bus. A channel keeps
+its last CHANNEL_HISTORY events, so a reconnecting EventSource that sends
+Last-Event-ID receives exactly what it missed. A new connection (no id)
+starts from a snapshot: the latest event of each type.
+
+StatusBoard keeps the old `matching_status[user_id] = {...}` /
+`matching_status[user_id].update(...)` interface and publishes every change
+as a 'status' event, so the /matching-status polling endpoint keeps working.
+
+The bus lives in process memory, like the status dict it replaces: with
+several gunicorn workers a stream only sees events of runs started in the
+same worker. An open stream holds a worker thread, so pages should only
+open one while a run is active; streams end after a terminal status or
+MAX_STREAM_SECONDS, and open_stream() hands out at most MAX_STREAMS per
+process (the route answers 503 beyond that and pages fall back to polling).
+
+Environment variables:
+    PROGRESS_MAX_STREAMS   open streams per process (default: 2, half the Dockerfile's threads)
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+# Events kept per user for Last-Event-ID resume
+CHANNEL_HISTORY = 500
+
+# Seconds between SSE keepalive comments
+KEEPALIVE_SECONDS = 15
+
+# Streams close after this long; EventSource reconnects with Last-Event-ID
+MAX_STREAM_SECONDS = 60
+
+# Streams open at once per process, so they can't take every request thread
+MAX_STREAMS = int(os.getenv('PROGRESS_MAX_STREAMS', '2'))
+
+# Statuses that end a run (the stream closes after sending them)
+TERMINAL_STATUSES = ('completed', 'error')
+
+
+class ProgressBus:
+    """Per-user ring buffers of progress events"""
+
+    def __init__(self, history: int = CHANNEL_HISTORY, max_streams: int = MAX_STREAMS):
+        self.history = history
+        self.max_streams = max_streams
+        self._channels: Dict[int, deque] = {}
+        self._last_id = 0
+        self._streams = 0
+        self._cond = threading.Condition()
+
+    def publish(self, user_id: int, event: str, **data) -> int:
+        """
+        Append an event to the user's channel and wake waiting streams
+
+        Args:
+            user_id: Channel owner
+            event: Event type ('status', 'matches', 'analysis', 'backfill', ...)
+            **data: JSON-serializable payload
+
+        Returns:
+            Event id
+        """
+        with self._cond:
+            self._last_id += 1
+            channel = self._channels.get(user_id)
+            if channel is None:
+                channel = self._channels[user_id] = deque(maxlen=self.history)
+            channel.append({'id': self._last_id, 'event': event, 'time': time.time(), 'data': data})
+            self._cond.notify_all()
+            return self._last_id
+
+    def events_since(self, user_id: int, last_id: int = 0) -> List[Dict]:
+        """Events newer than last_id (all retained events if it is older than the buffer)"""
+        with self._cond:
+            return [e for e in self._channels.get(user_id, ()) if e['id'] > last_id]
+
+    def snapshot(self, user_id: int) -> List[Dict]:
+        """Latest event of each type, oldest first"""
+        with self._cond:
+            latest = {e['event']: e for e in self._channels.get(user_id, ())}
+        return sorted(latest.values(), key=lambda e: e['id'])
+
+    def latest(self, user_id: int, event: str) -> Optional[Dict]:
+        """Payload of the most recent event of a type"""
+        with self._cond:
+            for e in reversed(self._channels.get(user_id, ())):
+                if e['event'] == event:
+                    return e['data']
+        return None
+
+    def wait(self, user_id: int, last_id: int, timeout: float) -> List[Dict]:
+        """Block until the user has events newer than last_id, or timeout"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                channel = self._channels.get(user_id)
+                if channel and channel[-1]['id'] > last_id:
+                    return [e for e in channel if e['id'] > last_id]
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+
+    def clear(self, user_id: int) -> None:
+        with self._cond:
+            self._channels.pop(user_id, None)
+
+    def open_stream(self, user_id: int, last_event_id: Optional[int] = None, **options) -> Optional['StreamSlot']:
+        """
+        stream() holding one of max_streams slots until it is closed
+
+        Returns:
+            Iterable of SSE frames (the WSGI server's close() frees the slot),
+            or None when max_streams streams are already open
+        """
+        with self._cond:
+            if self._streams >= self.max_streams:
+                return None
+            self._streams += 1
+        return StreamSlot(self, self.stream(user_id, last_event_id, **options))
+
+    def _release_stream(self) -> None:
+        with self._cond:
+            self._streams -= 1
+
+    def stream(self, user_id: int, last_event_id: Optional[int] = None,
+               keepalive: float = KEEPALIVE_SECONDS, max_seconds: float = MAX_STREAM_SECONDS) -> Iterator[str]:
+        """
+        Generate SSE frames for a user's channel
+
+        Args:
+            user_id: Channel owner
+            last_event_id: Last id the client saw (None = start from a snapshot)
+            keepalive: Seconds between keepalive comments
+            max_seconds: Close the stream after this long
+
+        Yields:
+            'id: ...\\nevent: ...\\ndata: ...\\n\\n' frames and keepalive comments
+        """
+        yield "retry: 3000\n\n"
+        last_id = last_event_id or 0
+        events = self.snapshot(user_id) if last_event_id is None else self.events_since(user_id, last_id)
+
+        deadline = time.time() + max_seconds
+        while True:
+            for e in events:
+                last_id = max(last_id, e['id'])
+                yield format_sse(e)
+            if (events and _is_terminal(events[-1])) or time.time() >= deadline:
+                return
+            events = self.wait(user_id, last_id, min(keepalive, max(deadline - time.time(), 0)))
+            if not events:
+                yield ": keepalive\n\n"
+
+
+class StreamSlot:
+    """SSE frames of one stream; close() ends it and frees its slot"""
+
+    def __init__(self, bus: ProgressBus, frames: Iterator[str]):
+        self._bus = bus
+        self._frames = frames
+        self._closed = False
+
+    def __iter__(self) -> Iterator[str]:
+        return self._frames
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._frames.close()
+        self._bus._release_stream()
+
+
+def _is_terminal(event: Dict) -> bool:
+    return event['event'] == 'status' and event['data'].get('status') in TERMINAL_STATUSES
+
+
+def format_sse(event: Dict) -> str:
+    """One event as an SSE frame"""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+class StatusEntry(dict):
+    """One user's status; every change is published as a 'status' event"""
+
+    def __init__(self, bus: ProgressBus, user_id: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._bus = bus
+        self._user_id = user_id
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._bus.publish(self._user_id, 'status', **self)
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._bus.publish(self._user_id, 'status', **self)
+
+
+class StatusBoard(dict):
+    """
+    Drop-in for the `matching_status` dict that publishes to a ProgressBus
+
+    `board[user_id] = {...}` replaces the status; `board[user_id].update(...)`
+    changes it. Both publish the full status as a 'status' event.
+    """
+
+    def __init__(self, bus: ProgressBus):
+        super().__init__()
+        self._bus = bus
+
+    def __setitem__(self, user_id: int, status: Dict) -> None:
+        entry = StatusEntry(self._bus, user_id, status)
+        super().__setitem__(user_id, entry)
+        self._bus.publish(user_id, 'status', **entry)
+
+
+# Process-wide bus
+progress_bus = ProgressBus()
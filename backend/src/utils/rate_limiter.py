@@ -0,0 +1,45 @@
+"""
+Thread-safe request rate limiter
+
+Token bucket shared by worker threads that call a rate-limited API:
+
+    limiter = RateLimiter(requests_per_minute=50)
+    with ThreadPoolExecutor(4) as pool:
+        ...  # each worker calls limiter.acquire() before its request
+"""
+
+import time
+import threading
+
+
+class RateLimiter:
+    """Allows up to `burst` requests at once, refilled at requests_per_minute"""
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.interval = 60.0 / requests_per_minute
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) * self.interval
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,245 @@
+"""
+Append-only Parquet archive of raw collector payloads
+
+Collectors hand every raw API job to a buffered writer, which writes
+compressed Parquet files partitioned by source and fetch date:
+
+    RAW_ARCHIVE_DIR/source=activejobs/date=2025-01-31/part-143015-1a2b3c4d.parquet
+
+Offline analysis reads the files instead of querying the production
+database:
+
+    reader = RawArchiveReader()
+    reader.query("SELECT source, COUNT(*) FROM raw_jobs GROUP BY source")   # DuckDB
+    table = reader.scan(source='activejobs', since='2025-01-01')           # pyarrow Table
+
+raw_payloads holds every fetched payload; raw_jobs keeps the latest payload
+per (source, external_id). The full payload is stored as JSON text
+(json_extract_string(payload, '$.field') in DuckDB) next to a few common
+columns.
+
+Both pyarrow (writing, scan) and duckdb (query) are optional. Without
+pyarrow the archive is disabled and collectors behave as before.
+
+Environment variables:
+    RAW_ARCHIVE_DIR         archive root; unset disables archiving from collectors
+    RAW_ARCHIVE_FLUSH_ROWS  buffered payloads before a flush (default: 5000)
+"""
+
+import os
+import json
+import uuid
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+
+    # Columns of every file; source/date come from the directory names
+    RAW_SCHEMA = pa.schema([
+        ('external_id', pa.string()),
+        ('title', pa.string()),
+        ('company', pa.string()),
+        ('fetched_at', pa.timestamp('us')),
+        ('payload', pa.string()),
+    ])
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Payload keys tried, in order, for the common columns
+ID_KEYS = ('id', 'job_id', 'external_id')
+TITLE_KEYS = ('title', 'job_title')
+COMPANY_KEYS = ('organization', 'employer_name', 'company')
+
+
+def _first(payload: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = payload.get(key)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def _source_slug(source: str) -> str:
+    return ''.join(c if c.isalnum() else '_' for c in source.lower()).strip('_') or 'unknown'
+
+
+class RawArchiveWriter:
+    """Buffers raw payloads and writes them as date/source-partitioned Parquet"""
+
+    def __init__(self, root: str, flush_rows: int = 5000, compression: str = 'zstd'):
+        if not PARQUET_AVAILABLE:
+            raise ImportError("pyarrow is required for the raw archive (pip install pyarrow)")
+        self.root = root
+        self.flush_rows = flush_rows
+        self.compression = compression
+        self._buffer: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.files_written = 0
+
+    def append(self, source: str, payloads: Iterable[Dict[str, Any]],
+               fetched_at: Optional[datetime] = None):
+        """Buffer raw API payloads from one source, flushing once flush_rows are held"""
+        fetched_at = fetched_at or datetime.now()
+        partition = (_source_slug(source), fetched_at.date().isoformat())
+        rows = [{
+            'external_id': _first(payload, ID_KEYS),
+            'title': _first(payload, TITLE_KEYS),
+            'company': _first(payload, COMPANY_KEYS),
+            'fetched_at': fetched_at,
+            'payload': json.dumps(payload, ensure_ascii=False, default=str),
+        } for payload in payloads]
+        if not rows:
+            return
+
+        with self._lock:
+            self._buffer.setdefault(partition, []).extend(rows)
+            self._buffered += len(rows)
+            if self._buffered >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self) -> int:
+        """Write all buffered payloads; returns the number of rows written"""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        written = 0
+        # A partition leaves the buffer once its file is in place, so if a
+        # later one fails, the next flush doesn't write the earlier ones again
+        for (source, day), rows in list(self._buffer.items()):
+            directory = os.path.join(self.root, f"source={source}", f"date={day}")
+            os.makedirs(directory, exist_ok=True)
+            name = f"part-{datetime.now():%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+            path = os.path.join(directory, name)
+
+            table = pa.Table.from_pylist(rows, schema=RAW_SCHEMA)
+            # Write to a hidden temp file then rename, so readers never see a partial file
+            tmp_path = os.path.join(directory, f".{name}.tmp")
+            pq.write_table(table, tmp_path, compression=self.compression)
+            os.replace(tmp_path, path)
+
+            del self._buffer[(source, day)]
+            self._buffered -= len(rows)
+            self.rows_written += len(rows)
+            self.files_written += 1
+            written += len(rows)
+        if written:
+            logger.info(f"Raw archive: wrote {written} payloads to {self.root}")
+        return written
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RawArchiveReader:
+    """Vectorised reads over the raw archive"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv('RAW_ARCHIVE_DIR', 'data/raw_archive')
+
+    def has_data(self) -> bool:
+        for _, _, files in os.walk(self.root):
+            if any(name.endswith('.parquet') for name in files):
+                return True
+        return False
+
+    def scan(self, source: Optional[str] = None, since: Optional[str] = None,
+             columns: Optional[List[str]] = None):
+        """
+        Read the archive into a pyarrow Table, pruning partitions by source/date
+
+        Args:
+            source: Only this source (e.g. 'activejobs')
+            since: Only payloads fetched on or after this date (YYYY-MM-DD)
+            columns: Columns to read (default: all)
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError("pyarrow is required to read the raw archive (pip install pyarrow)")
+        dataset = ds.dataset(self.root, format='parquet', partitioning='hive',
+                             exclude_invalid_files=True)
+        condition = None
+        if source:
+            condition = ds.field('source') == _source_slug(source)
+        if since:
+            since_filter = ds.field('date') >= since
+            condition = since_filter if condition is None else condition & since_filter
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def query(self, sql: str, params: Optional[list] = None) -> List[tuple]:
+        """
+        Run SQL over the views raw_payloads (every fetch) and raw_jobs (latest per job)
+
+        Requires duckdb.
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("duckdb is required to query the raw archive (pip install duckdb)")
+
+        pattern = os.path.join(self.root, '**', '*.parquet')
+        con = duckdb.connect()
+        try:
+            con.execute(f"""
+                CREATE VIEW raw_payloads AS
+                SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)
+            """)
+            con.execute("""
+                CREATE VIEW raw_jobs AS
+                SELECT * EXCLUDE (rn) FROM (
+                    SELECT *, row_number() OVER (
+                        PARTITION BY source, external_id ORDER BY fetched_at DESC
+                    ) AS rn
+                    FROM raw_payloads
+                ) WHERE rn = 1
+            """)
+            return con.execute(sql, params or []).fetchall()
+        finally:
+            con.close()
+
+
+_writer: Optional[RawArchiveWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_raw_archive() -> Optional[RawArchiveWriter]:
+    """
+    Process-wide writer for collectors, or None if RAW_ARCHIVE_DIR is unset
+    or pyarrow is missing. Buffered payloads are flushed at exit.
+    """
+    global _writer
+    root = os.getenv('RAW_ARCHIVE_DIR')
+    if not root or not PARQUET_AVAILABLE:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = RawArchiveWriter(root, flush_rows=int(os.getenv('RAW_ARCHIVE_FLUSH_ROWS', '5000')))
+            atexit.register(_writer.close)
+    return _writer
+
+
+def archive_raw_payloads(source: str, payloads: Iterable[Dict[str, Any]]):
+    """Hand raw payloads to the archive if it is enabled; never raises"""
+    writer = get_raw_archive()
+    if writer is None:
+        return
+    try:
+        writer.append(source, payloads)
+    except Exception as e:
+        logger.warning(f"Raw archive write failed for {source}: {e}")
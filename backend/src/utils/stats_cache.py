@@ -0,0 +1,82 @@
+"""
+In-process TTL cache for dashboard statistics
+
+Sidebar and /api/stats numbers barely change between requests, so each value
+is computed at most once per ttl per process and dropped explicitly when the
+process itself changes it:
+
+    stats = stats_cache.get_or_compute(('user_stats', user_id), load)
+    stats_cache.invalidate(('user_stats', user_id))   # after a CV upload
+    stats_cache.invalidate_prefix('user_stats')       # all users
+
+Environment variables:
+    STATS_CACHE_TTL   seconds a value is served from memory (default: 60)
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe key -> value cache with per-entry expiry"""
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       ttl: Optional[float] = None) -> Any:
+        """
+        Cached value for key, computing (outside the lock) and storing it on a miss
+
+        Exceptions from compute propagate and nothing is cached.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: Hashable):
+        """Drop key `prefix` and every tuple key starting with it"""
+        with self._lock:
+            for key in list(self._entries):
+                if key == prefix or (isinstance(key, tuple) and key and key[0] == prefix):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+stats_cache = TTLCache(ttl=float(os.getenv('STATS_CACHE_TTL', '60')))
@@ -0,0 +1,178 @@
+"""
+Batch planner and bisection retry tests
+Uses a local stand-in client, no API calls
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis.batch_planner import BatchPlanner, estimate_tokens
+from src.analysis.claude_analyzer import ClaudeJobAnalyzer
+from src.analysis.stream_parser import JobObjectStreamParser, parse_job_entries
+
+
+class _Response:
+    def __init__(self, text, stop_reason='end_turn', output_tokens=0):
+        self.content = [type('Block', (), {'text': text})()]
+        self.stop_reason = stop_reason
+        self.usage = type('Usage', (), {'input_tokens': 0, 'output_tokens': output_tokens})()
+
+
+class FlakyScoringClient:
+    """Returns malformed JSON for any batch larger than max_ok jobs"""
+
+    def __init__(self, max_ok):
+        self.max_ok = max_ok
+        self.batch_sizes = []
+        self.messages = self
+
+    def create(self, **params):
+        prompt = params['messages'][0]['content']
+        count = prompt.count('\nJOB_')
+        self.batch_sizes.append(count)
+        if count > self.max_ok:
+            return _Response('{"job_1": {"match_score": 8')
+        result = {f"job_{i}": {'match_score': 80, 'priority': 'high', 'reasoning': 'ok'}
+                  for i in range(1, count + 1)}
+        return _Response(json.dumps(result), output_tokens=count * 300)
+
+
+class TruncatingStreamClient:
+    """Streams a response that is cut off after the first two jobs"""
+
+    def __init__(self):
+        self.prompts = []
+        self.messages = self
+
+    def stream_text(self, **params):
+        prompt = params['messages'][0]['content']
+        self.prompts.append(prompt)
+        count = prompt.count('\nJOB_')
+        result = {f"job_{i}": {'match_score': 70 + i, 'reasoning': 'ok'} for i in range(1, count + 1)}
+        text = json.dumps(result)
+        if count > 2:
+            text = text[:text.index('"job_3"') + 20]
+        stream = [text[i:i + 7] for i in range(0, len(text), 7)]
+
+        class _Stream(list):
+            response = _Response(text, stop_reason='max_tokens' if count > 2 else 'end_turn')
+        return _Stream(stream)
+
+
+class DroppingStreamClient:
+    """Streams two complete entries, then fails like a dropped connection"""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.messages = self
+
+    def stream_text(self, **params):
+        prompt = params['messages'][0]['content']
+        count = prompt.count('\nJOB_')
+        self.batch_sizes.append(count)
+        result = {f"job_{i}": {'match_score': 70 + i, 'reasoning': 'ok'} for i in range(1, count + 1)}
+        text = json.dumps(result)
+        if count <= 2:
+            class _Stream(list):
+                response = _Response(text)
+            return _Stream([text])
+
+        def chunks():
+            yield text[:text.index('"job_3"')]
+            raise ConnectionError('stream dropped')
+        return chunks()
+
+
+def _jobs(n):
+    return [{'id': f'j{i}', 'title': f'Engineer {i}', 'company': 'Acme',
+             'ai_competencies': ['Leadership'], 'ai_key_skills': ['Python']} for i in range(n)]
+
+
+class TestBatchPlanner:
+    """Test token-budget packing"""
+
+    def test_output_budget_limits_batch_size(self):
+        planner = BatchPlanner('claude-3-5-haiku-20241022', output_tokens_per_item=500)
+        batches = planner.plan(list(range(40)), lambda item: 100)
+
+        # 8192 * 0.8 - 100 overhead leaves room for 12 items at 500 tokens each
+        assert [len(b) for b in batches] == [12, 12, 12, 4]
+        assert sum(batches, []) == list(range(40))
+
+    def test_input_budget_and_oversized_items(self):
+        planner = BatchPlanner('claude-3-5-haiku-20241022', output_tokens_per_item=10)
+        batches = planner.plan(['small', 'huge', 'small'],
+                               lambda item: 200000 if item == 'huge' else 10)
+        assert batches == [['small'], ['huge'], ['small']]
+
+    def test_observed_output_updates_estimate(self):
+        planner = BatchPlanner('claude-3-5-haiku-20241022', output_tokens_per_item=450)
+        planner.record_output(10, 10 * 250 + 100)
+        assert planner.output_tokens_per_item < 450
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens('') == 0
+        assert estimate_tokens('x' * 35) == 10
+
+
+class TestBisectionRetry:
+    """Test that unparseable batches are split instead of run job by job"""
+
+    def test_failed_batch_is_bisected(self):
+        analyzer = ClaudeJobAnalyzer(api_key='test')
+        analyzer.set_profile({'technical_skills': ['Python'], 'competencies': ['Leadership']})
+        analyzer.client = FlakyScoringClient(max_ok=3)
+
+        jobs = analyzer.analyze_batch(_jobs(12))
+
+        assert len(jobs) == 12
+        assert all(job['match_score'] == 80 for job in jobs)
+        assert [job['id'] for job in jobs] == [f'j{i}' for i in range(12)]
+        # 12 -> 6 + 6 -> 4 x 3: seven calls rather than twelve single-job calls
+        assert analyzer.client.batch_sizes == [12, 6, 3, 3, 6, 3, 3]
+
+
+class TestStreamParsing:
+    """Test incremental job_N parsing and salvage"""
+
+    def test_entries_emitted_as_they_close(self):
+        parser = JobObjectStreamParser()
+        assert parser.feed('```json\n{"job_1": {"match_score": 80, "note": "a } in text"}') == [
+            ('job_1', {'match_score': 80, 'note': 'a } in text'})
+        ]
+        assert parser.feed(', "job_2": {"skills": ["A", "B"]') == []
+        assert parser.feed('}}\n```') == [('job_2', {'skills': ['A', 'B']})]
+
+    def test_malformed_and_truncated_entries_are_skipped(self):
+        text = '{"job_1": {"match_score": 80}, "job_2": {"match_score": 7 "x": 1}, "job_3": {"match_score": 60}, "job_4": {"match_sc'
+        entries = parse_job_entries(text)
+        assert entries == {'job_1': {'match_score': 80}, 'job_3': {'match_score': 60}}
+
+    def test_streamed_results_and_missing_jobs_rescored(self):
+        analyzer = ClaudeJobAnalyzer(api_key='test')
+        analyzer.set_profile({'technical_skills': ['Python'], 'competencies': ['Leadership']})
+        analyzer.client = TruncatingStreamClient()
+
+        seen = []
+        jobs = analyzer.analyze_batch(_jobs(4), on_result=lambda job: seen.append(job['id']))
+
+        # Jobs 1-2 arrive from the truncated stream, 3-4 from one follow-up call
+        assert seen == ['j0', 'j1', 'j2', 'j3']
+        assert [job['match_score'] for job in jobs] == [71, 72, 71, 72]
+        assert len(analyzer.client.prompts) == 2
+
+    def test_interrupted_stream_keeps_parsed_entries(self):
+        analyzer = ClaudeJobAnalyzer(api_key='test')
+        analyzer.set_profile({'technical_skills': ['Python'], 'competencies': ['Leadership']})
+        analyzer.client = DroppingStreamClient()
+
+        seen = []
+        jobs = analyzer.analyze_batch(_jobs(4), on_result=lambda job: seen.append(job['id']))
+
+        # Jobs 1-2 are emitted once; only 3-4 are scored again
+        assert seen == ['j0', 'j1', 'j2', 'j3']
+        assert [job['match_score'] for job in jobs] == [71, 72, 71, 72]
+        assert analyzer.client.batch_sizes == [4, 2]
@@ -0,0 +1,120 @@
+"""
+Connection pool tests
+Uses an in-memory stand-in for psycopg2's ThreadedConnectionPool, no database
+"""
+
+import sys
+import threading
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('psycopg2')
+
+from src.database import connection_pool
+from src.database.connection_pool import ConnectionPool, PoolTimeout
+
+
+class FailingCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, *args):
+        raise RuntimeError("server closed the connection")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def cursor(self, cursor_factory=None):
+        return FailingCursor()
+
+
+class FakeThreadedPool:
+    def __init__(self, minconn, maxconn, dsn=None):
+        self.free = [FakeConnection() for _ in range(maxconn)]
+        self.closed = False
+
+    def getconn(self):
+        return self.free.pop()
+
+    def putconn(self, conn, close=False):
+        self.free.append(FakeConnection() if close else conn)
+
+    def closeall(self):
+        self.closed = True
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    monkeypatch.setattr(connection_pool.pool, 'ThreadedConnectionPool', FakeThreadedPool)
+    return lambda **kwargs: ConnectionPool('postgresql://test', **kwargs)
+
+
+class TestConnectionPool:
+    """Test checkout limits, release and metrics"""
+
+    def test_checkout_times_out_when_exhausted(self, make_pool):
+        db_pool = make_pool(maxconn=2, checkout_timeout=0.05)
+        first, second = db_pool.getconn(), db_pool.getconn()
+
+        with pytest.raises(PoolTimeout):
+            db_pool.getconn()
+        assert db_pool.stats()['timeouts'] == 1
+
+        db_pool.putconn(first)
+        assert db_pool.getconn() is first
+        db_pool.putconn(second)
+
+    def test_waiting_thread_gets_released_connection(self, make_pool):
+        db_pool = make_pool(maxconn=1, checkout_timeout=5)
+        conn = db_pool.getconn()
+        received = []
+
+        waiter = threading.Thread(target=lambda: received.append(db_pool.getconn()))
+        waiter.start()
+        db_pool.putconn(conn)
+        waiter.join(timeout=5)
+
+        assert received == [conn]
+
+    def test_context_manager_rolls_back_and_returns(self, make_pool):
+        db_pool = make_pool(maxconn=1, checkout_timeout=0.05)
+
+        with pytest.raises(ValueError):
+            with db_pool.connection() as conn:
+                raise ValueError("query failed")
+
+        assert conn.rollbacks == 1
+        assert db_pool.stats()['in_use'] == 0
+        with db_pool.connection() as again:
+            assert again is conn
+
+    def test_leak_detection(self, make_pool):
+        db_pool = make_pool(maxconn=2, leak_threshold=0)
+        db_pool.getconn()
+
+        suspects = db_pool.check_leaks()
+        assert len(suspects) == 1
+        assert 'test_leak_detection' in suspects[0]['stack']
+
+    def test_cv_manager_returns_connection_when_query_fails(self, make_pool):
+        pytest.importorskip('bcrypt')
+        from src.database.postgres_cv_operations import PostgresCVManager
+        db_pool = make_pool(maxconn=1, checkout_timeout=0.05)
+        manager = PostgresCVManager(db_pool)
+
+        assert manager.get_user_by_id(1) is None
+        assert manager.update_cv_status(1, 'archived') is False
+
+        assert db_pool.stats()['in_use'] == 0
+        assert db_pool.stats()['timeouts'] == 0
@@ -0,0 +1,84 @@
+"""
+Persisted CV embedding tests
+In-memory CV manager and model, no database
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching import cv_embeddings
+from src.matching.cv_embeddings import (CV_EMBEDDING_MODEL, cv_text_hash, embedding_from_bytes,
+                                        embedding_to_bytes, ensure_cv_embedding)
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+class FakeCVManager:
+    """Stores one embedding per cv_id like cv_profiles does"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_cv_embedding(self, cv_id, text_hash=None, model_name=None):
+        return cv_embeddings.stored_embedding(self.rows.get(cv_id), text_hash,
+                                              model_name or CV_EMBEDDING_MODEL)
+
+    def save_cv_embedding(self, cv_id, embedding, model_name, text_hash):
+        self.rows[cv_id] = {'cv_embedding': embedding, 'cv_embedding_model': model_name,
+                            'cv_embedding_hash': text_hash}
+        return True
+
+
+@pytest.fixture(autouse=True)
+def cv_text(monkeypatch):
+    """build_cv_text reduced to the summary field"""
+    module = types.SimpleNamespace(build_cv_text=lambda profile: profile.get('expertise_summary', ''))
+    monkeypatch.setattr(cv_embeddings, '_filter_module', module)
+
+
+class TestCVEmbeddings:
+    """Test reuse and invalidation of stored embeddings"""
+
+    def test_bytes_round_trip(self):
+        vector = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+
+        assert np.array_equal(embedding_from_bytes(embedding_to_bytes(vector)), vector)
+
+    def test_stored_embedding_is_reused_until_profile_text_changes(self):
+        manager, model = FakeCVManager(), FakeModel()
+        profile = {'cv_id': 1, 'expertise_summary': 'Data engineer'}
+
+        first = ensure_cv_embedding(manager, profile, model)
+        again = ensure_cv_embedding(manager, profile, model)
+        assert model.calls == 1
+        assert np.array_equal(first, again)
+
+        profile['expertise_summary'] = 'Senior data engineer'
+        changed = ensure_cv_embedding(manager, profile, model)
+        assert model.calls == 2
+        assert changed[0] == len('Senior data engineer')
+        assert manager.rows[1]['cv_embedding_hash'] == cv_text_hash('Senior data engineer')
+
+    def test_embedding_from_another_model_is_stale(self):
+        manager, model = FakeCVManager(), FakeModel()
+        profile = {'cv_id': 2, 'expertise_summary': 'Analyst'}
+        manager.save_cv_embedding(2, embedding_to_bytes([9.0, 9.0]), 'old-model', cv_text_hash('Analyst'))
+
+        assert manager.get_cv_embedding(2) is None
+        ensure_cv_embedding(manager, profile, model)
+        assert model.calls == 1
+        assert manager.rows[2]['cv_embedding_model'] == CV_EMBEDDING_MODEL
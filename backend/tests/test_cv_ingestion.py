@@ -0,0 +1,114 @@
+"""
+CV ingestion pipeline tests
+Fake handler and CV manager, no database or Claude
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('werkzeug')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.cv.ingestion import CVIngestionPipeline
+from src.utils.progress_bus import ProgressBus
+
+
+class FakeCVManager:
+    def __init__(self):
+        self.cvs = {7: {'id': 7, 'user_id': 3, 'status': 'processing', 'processing_stage': 'parsing'}}
+        self.stages = []
+        self.primary = {}
+        self.claims = 0
+
+    def get_cv(self, cv_id):
+        return self.cvs.get(cv_id)
+
+    def update_cv_processing(self, cv_id, stage, error=None):
+        self.stages.append((cv_id, stage, error))
+
+    def claim_stale_ingestions(self, stale_minutes=15):
+        self.claims += 1
+        return [{'id': 7, 'user_id': 3}] if self.claims == 1 else []
+
+    def get_primary_cv(self, user_id):
+        return self.primary.get(user_id)
+
+
+class FakeHandler:
+    def __init__(self, fail=False):
+        self.cv_manager = FakeCVManager()
+        self.fail = fail
+        self.calls = []
+
+    def process_cv(self, cv_id, set_as_primary=True, on_stage=None):
+        self.calls.append((cv_id, set_as_primary))
+        for stage in ('extracting', 'parsing', 'embedding', 'search_queries'):
+            on_stage(stage)
+            if self.fail and stage == 'parsing':
+                raise RuntimeError('Claude unavailable')
+        return {'success': True, 'cv_id': cv_id, 'parsing_cost': 0.01, 'is_primary': set_as_primary}
+
+
+class TestCVIngestion:
+    """Test stage tracking, failures and resume"""
+
+    def test_stages_are_recorded_and_published(self):
+        bus = ProgressBus()
+        completed = []
+        handler = FakeHandler()
+        pipeline = CVIngestionPipeline(handler, max_workers=1, bus=bus,
+                                       on_complete=lambda *args: completed.append(args))
+
+        result = pipeline.submit(11, 3).result(timeout=5)
+        pipeline.shutdown()
+
+        stages = [stage for cv_id, stage, _ in handler.cv_manager.stages]
+        assert stages == ['queued', 'extracting', 'parsing', 'embedding', 'search_queries', 'done']
+        assert [e['data']['stage'] for e in bus.events_since(3)] == stages
+        assert pipeline.status(11)['stage'] == 'done'
+        assert completed == [(3, 11, result)]
+
+    def test_failure_is_reported_with_message(self):
+        handler = FakeHandler(fail=True)
+        pipeline = CVIngestionPipeline(handler, max_workers=1, bus=ProgressBus())
+
+        result = pipeline.submit(11, 3).result(timeout=5)
+        pipeline.shutdown()
+
+        assert not result['success']
+        status = pipeline.status(11)
+        assert status['stage'] == 'failed' and 'Claude unavailable' in status['error']
+
+    def test_status_falls_back_to_cv_row(self):
+        pipeline = CVIngestionPipeline(FakeHandler(), max_workers=1, bus=ProgressBus())
+
+        assert pipeline.status(7)['stage'] == 'parsing'
+        assert pipeline.status(99) is None
+
+    def test_resume_pending_only_sets_primary_without_one(self):
+        handler = FakeHandler()
+        handler.cv_manager.primary[3] = {'id': 5}
+        pipeline = CVIngestionPipeline(handler, max_workers=1, bus=ProgressBus())
+
+        assert pipeline.resume_pending() == 1
+        pipeline.shutdown()
+
+        assert handler.calls == [(7, False)]
+
+    def test_resume_loop_keeps_claiming(self):
+        handler = FakeHandler()
+        pipeline = CVIngestionPipeline(handler, max_workers=1, bus=ProgressBus())
+
+        pipeline.start_resume_loop(interval=0.01)
+        deadline = time.time() + 5
+        while handler.cv_manager.claims < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        pipeline.shutdown()
+
+        # Resumed at startup, then claimed again on every pass
+        assert handler.cv_manager.claims >= 3
+        assert handler.calls == [(7, True)]
@@ -0,0 +1,68 @@
+"""
+Description embedding tests
+Chunking and pooling with a fake model, no database
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.description_embeddings import (chunk_text, clean_description, encode_jobs,
+                                                 job_chunks, pool_chunks)
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text.split())), 1.0] for text in texts])
+
+
+class TestDescriptionChunks:
+    """Test cleaning, chunking and pooling"""
+
+    def test_clean_description_strips_html_and_entities(self):
+        assert clean_description('<p>Python&nbsp;&amp; SQL</p>\n<ul><li>Docker</li></ul>') == 'Python & SQL Docker'
+
+    def test_chunks_overlap_and_are_capped(self):
+        words = ' '.join(f'w{i}' for i in range(500))
+
+        chunks = chunk_text(words, chunk_words=200, overlap=40, max_chunks=3)
+
+        assert len(chunks) == 3
+        assert chunks[0].split()[-40:] == chunks[1].split()[:40]
+        assert chunk_text(' '.join(words.split()[:150]), chunk_words=200, overlap=40) == [' '.join(words.split()[:150])]
+
+    def test_first_chunk_carries_header(self):
+        chunks = job_chunks({'title': 'Data Engineer', 'company': 'ACME', 'location': 'Berlin',
+                             'description': 'Build pipelines'})
+
+        assert chunks == ['Data Engineer / ACME / Berlin. Build pipelines']
+
+    def test_pooling_returns_unit_vectors(self):
+        embeddings = np.array([[3.0, 0.0], [0.0, 2.0]])
+
+        assert np.allclose(pool_chunks(embeddings, 'mean'), [2 ** -0.5, 2 ** -0.5])
+        assert np.allclose(pool_chunks(embeddings, 'max'), [2 ** -0.5, 2 ** -0.5])
+        with pytest.raises(ValueError):
+            pool_chunks(embeddings, 'sum')
+
+    def test_encode_jobs_uses_one_model_call_per_batch(self):
+        model = FakeModel()
+        jobs = [{'id': 1, 'title': 'A', 'description': ' '.join(['x'] * 300)},
+                {'id': 2, 'title': 'B', 'description': 'short'},
+                {'id': 3, 'title': None, 'description': '<br>'}]
+
+        vectors = encode_jobs(model, jobs)
+
+        assert len(model.calls) == 1
+        assert len(model.calls[0]) == 3
+        assert set(vectors) == {1, 2}
+        assert all(np.isclose(np.linalg.norm(v), 1.0) for v in vectors.values())
@@ -0,0 +1,102 @@
+"""
+Fleet matching tests
+Synthetic embeddings, no database or model
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.fleet_matcher import CVMatrixCache, keyword_boosts, location_mask, score_matches
+
+
+def _job(job_id, title, arrangement=None, cities=None, description=''):
+    return {'id': job_id, 'title': title, 'description': description,
+            'ai_work_arrangement': arrangement, 'cities_derived': cities, 'locations_derived': None}
+
+
+class TestFleetScoring:
+    """Test the users x jobs location mask, boosts and threshold"""
+
+    def test_location_mask_matches_remote_or_preferred_city(self):
+        jobs = [_job(1, 'A', 'Remote'), _job(2, 'B', 'On-site', ['Berlin-Mitte']),
+                _job(3, 'C', 'Hybrid', ['München'])]
+        mask = location_mask([[], ['berlin'], ['Hamburg']], jobs)
+
+        assert mask.tolist() == [[True, True, True], [True, True, False], [True, False, False]]
+
+    def test_keyword_boosts_follow_title_text_and_leadership_rules(self):
+        jobs = [_job(1, 'Senior Python Developer'), _job(2, 'Data Engineer', description='python, sql'),
+                _job(3, 'Head of Python Platform Engineering', description='Go')]
+        boosts = keyword_boosts([['python'], ['python', 'go', 'engineer']], jobs)
+
+        assert boosts[0] == pytest.approx([0.25, 0.05, 0.25])
+        # Capped at 0.3 like apply_keyword_boosts
+        assert boosts[1] == pytest.approx([0.25, 0.2, 0.3])
+
+    def test_score_matches_applies_mask_and_threshold(self):
+        users = [{'user_id': 10, 'preferences': {}},
+                 {'user_id': 20, 'preferences': {'search_locations': ['Köln']}}]
+        jobs = [_job(1, 'Analyst', 'On-site', ['Berlin']), _job(2, 'Clerk', 'Remote')]
+        cv_matrix = np.array([[1.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+        job_matrix = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+        matches = score_matches(users, cv_matrix, jobs, job_matrix, threshold=0.3)
+
+        assert [(m['user_id'], m['job_id'], m['semantic_score']) for m in matches] == [(10, 1, 100)]
+
+
+class TestCVMatrixCache:
+    """Test that only changed profiles are re-encoded"""
+
+    def test_reencodes_only_changed_profiles(self):
+        cache = CVMatrixCache()
+        encoded = []
+
+        def encode(stale):
+            encoded.append([u['profile']['id'] for u in stale])
+            return np.array([[float(u['profile']['id']), 1.0] for u in stale])
+
+        users = [{'user_id': 1, 'profile': {'id': 5, 'last_updated': 't1'}},
+                 {'user_id': 2, 'profile': {'id': 6, 'last_updated': 't1'}}]
+        first = cache.matrix(users, encode)
+        users[1]['profile'] = {'id': 7, 'last_updated': 't2'}
+        second = cache.matrix(users, encode)
+
+        assert encoded == [[5, 6], [7]]
+        assert np.allclose(np.linalg.norm(second, axis=1), 1.0)
+        assert np.allclose(first[0], second[0])
+
+
+class TestFleetMatchFollowUp:
+    """Test that fleet matches are announced and analyzed in the user's next run"""
+
+    def test_new_matches_are_published_per_user(self):
+        from src.matching.fleet_matcher import publish_matches
+        from src.utils.progress_bus import progress_bus
+
+        progress_bus.clear(901)
+        publish_matches([{'user_id': 901, 'job_id': 1, 'title': 'Analyst', 'semantic_score': 40},
+                         {'user_id': 901, 'job_id': 2, 'title': 'Engineer', 'semantic_score': 80}])
+
+        event = progress_bus.latest(901, 'matches')
+        assert event['source'] == 'fleet' and event['count'] == 2
+        assert [job['job_id'] for job in event['top']] == [2, 1]
+
+    def test_fleet_match_goes_to_analysis(self):
+        pytest.importorskip('psycopg2')
+        from src.matching.matcher import analysis_candidates
+
+        fresh = {'job': {'id': 1, 'title': 'Data Engineer'}, 'score': 64, 'matched_keywords': ['python']}
+        pending = [{'id': 7, 'title': 'ML Engineer', 'semantic_score': 71},
+                   {'id': 1, 'title': 'Data Engineer', 'semantic_score': 64},
+                   {'id': 8, 'title': 'Clerk', 'semantic_score': 35}]
+
+        candidates = analysis_candidates([fresh], pending)
+
+        assert [(c['job']['id'], c['score']) for c in candidates] == [(1, 64), (7, 71)]
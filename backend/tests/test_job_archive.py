@@ -0,0 +1,74 @@
+"""
+Job archive tests
+Checks partition naming and the retention predicate, no database
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import job_archive
+from src.database.job_archive import JobArchiver, archive_exists, partition_name, _next_month
+
+
+class FakeCursor:
+    def __init__(self, existing_tables):
+        self.existing_tables = existing_tables
+        self.result = None
+
+    def execute(self, sql, params=None):
+        self.result = params[0] if params[0] in self.existing_tables else None
+
+    def fetchone(self):
+        return (self.result,)
+
+
+class RegclassCursor:
+    """Answers the jobs_archive lookup, as a plain or RealDictCursor"""
+
+    def __init__(self, found, as_dict=False):
+        self.found = found
+        self.as_dict = as_dict
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchone(self):
+        return {'found': self.found} if self.as_dict else (self.found,)
+
+
+class TestJobArchive:
+    """Test monthly partitions and protected jobs"""
+
+    def test_monthly_partitions(self):
+        assert partition_name(date(2025, 3, 1)) == 'jobs_archive_2025_03'
+        assert _next_month(date(2025, 1, 1)) == date(2025, 2, 1)
+        assert _next_month(date(2025, 12, 1)) == date(2026, 1, 1)
+
+    def test_only_existing_tables_protect_jobs(self):
+        predicate = JobArchiver._protected_predicate(FakeCursor({'user_job_matches', 'applications'}))
+
+        assert "FROM user_job_matches r WHERE r.job_id = j.id AND r.status IN ('shortlisted'" in predicate
+        assert 'FROM applications r WHERE r.job_id = j.id)' in predicate
+        assert 'user_generated_resumes' not in predicate
+        assert JobArchiver._protected_predicate(FakeCursor(set())) == 'TRUE'
+
+    def test_move_deletes_remaining_matches(self):
+        cte = JobArchiver._clear_matches_cte(FakeCursor({'user_job_matches'}))
+
+        assert 'DELETE FROM user_job_matches m USING stale' in cte
+        assert JobArchiver._clear_matches_cte(FakeCursor(set())) == ''
+
+    def test_archive_lookup_until_migrated(self, monkeypatch):
+        monkeypatch.setattr(job_archive, '_archive_found', False)
+        missing = RegclassCursor(False)
+        assert not archive_exists(missing) and not archive_exists(missing)
+        # Not cached while missing, so running the migration needs no restart
+        assert missing.queries == 2
+
+        assert archive_exists(RegclassCursor(True, as_dict=True))
+        cached = RegclassCursor(False)
+        assert archive_exists(cached) and cached.queries == 0
@@ -0,0 +1,49 @@
+"""
+New-job filtering tests
+Uses a temporary SQLite JobDatabase, no external services
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.operations import JobDatabase
+from src.utils.helpers import filter_new_jobs
+
+
+def _job(job_id):
+    return {'job_id': job_id, 'source': 'test', 'title': f'Job {job_id}', 'company': 'Acme'}
+
+
+class TestFilterNewJobs:
+    """Test batched existence checks"""
+
+    def test_existing_and_deleted_jobs_are_filtered(self, tmp_path):
+        db = JobDatabase(str(tmp_path / 'jobs.db'))
+        db.add_job(_job('a'))
+        db.add_job(_job('b'))
+        db.update_job_status('b', 'deleted')
+
+        existing, deleted = db.get_known_job_ids(['a', 'b', 'c', None])
+        assert existing == {'a', 'b'}
+        assert deleted == {'b'}
+
+        new_jobs = filter_new_jobs([_job('a'), _job('b'), _job('c')], db)
+        assert [job['job_id'] for job in new_jobs] == ['c']
+
+    def test_large_batches_are_chunked(self, tmp_path):
+        db = JobDatabase(str(tmp_path / 'jobs.db'))
+        db.add_job(_job('job-1'))
+
+        existing, _ = db.get_known_job_ids(f'job-{i}' for i in range(1200))
+        assert existing == {'job-1'}
+
+    def test_deleted_lookup_only_checks_candidates(self, tmp_path):
+        db = JobDatabase(str(tmp_path / 'jobs.db'))
+        db.add_job(_job('a'))
+        db.add_job(_job('b'))
+        db.update_job_status('b', 'deleted')
+
+        assert db.find_deleted_job_ids(['a', 'b', 'c']) == {'b'}
+        assert db.find_deleted_job_ids(['a', 'c']) == set()
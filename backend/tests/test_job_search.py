@@ -0,0 +1,116 @@
+"""
+Job search query builder tests
+Checks the generated SQL and parameters, no database
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.job_search import (
+    build_search_query, select_columns, SEARCH_VECTOR_SCHEMA_SQL, TEXT_SEARCH_CONFIGS
+)
+
+
+class TestBuildSearchQuery:
+    """Test single-query OR groups and keyword ranking"""
+
+    def test_or_groups_share_one_query(self):
+        groups = [
+            {'location': 'Berlin'},
+            {'work_arrangement': 'Hybrid', 'location': 'Berlin', 'exclude_location': True},
+        ]
+        sql, params = build_search_query(groups, status='new', limit=50)
+
+        assert "((location ILIKE %s) OR ((location NOT ILIKE %s OR location IS NULL) AND ai_work_arrangement ILIKE %s))" in sql
+        assert 'ts_rank' not in sql
+        assert params == ['new', '%Berlin%', '%Berlin%', '%Hybrid%', 50]
+        assert sql.count('%s') == len(params)
+
+    def test_keywords_match_and_rank_in_both_languages(self):
+        groups = [{'keyword': 'python entwickler', 'min_score': 60}, {'keyword': 'data engineer'}]
+        sql, params = build_search_query(groups, status=None, limit=20)
+
+        assert "search_vector @@ (websearch_to_tsquery('german', %s) || websearch_to_tsquery('english', %s))" in sql
+        assert 'ORDER BY search_rank DESC, match_score DESC' in sql
+        assert 'status = %s' not in sql
+        assert params[:4] == ['python entwickler'] * 2 + ['data engineer'] * 2
+        assert params[4:] == [60, 'python entwickler', 'python entwickler',
+                              'data engineer', 'data engineer', 20]
+        assert sql.count('%s') == len(params)
+
+    def test_empty_groups_match_everything(self):
+        sql, params = build_search_query([], status='new', limit=10)
+        assert '(TRUE)' in sql
+        assert params == ['new', 10]
+
+    def test_search_vector_is_not_selected(self):
+        columns = select_columns(['id', 'title', 'search_vector'], alias='j')
+        sql, _ = build_search_query([{'keyword': 'python'}], status=None, limit=5,
+                                    columns=select_columns(['id', 'search_vector']))
+
+        assert columns == 'j."id", j."title"'
+        assert 'SELECT "id", ts_rank' in sql
+
+    def test_key_skills_use_the_query_configurations(self):
+        for config in TEXT_SEARCH_CONFIGS:
+            assert f"to_tsvector('{config}', coalesce(NEW.ai_key_skills::text" in SEARCH_VECTOR_SCHEMA_SQL
+        assert "'simple'" not in SEARCH_VECTOR_SCHEMA_SQL
+
+
+class ColumnCursor:
+    """pg_attribute lookups answer from `columns`; the search itself returns no rows"""
+
+    def __init__(self, columns, queries):
+        self.columns = columns
+        self.queries = queries
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        self.rows = [(name, 'text') for name in self.columns] if 'pg_attribute' in sql else []
+
+    def fetchall(self):
+        return self.rows
+
+
+class TestSearchJobs:
+    """Test PostgresDatabase.search_jobs_with_or_filters around the builder"""
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        pytest.importorskip('psycopg2')
+        from src.database import postgres_operations
+
+        monkeypatch.setattr(postgres_operations, '_column_types_cache', {'jobs': {'id': 'integer'}})
+        db = object.__new__(postgres_operations.PostgresDatabase)
+        db.columns = ['id', 'title']
+        db.queries = []
+        connection = type('Conn', (), {
+            '__enter__': lambda conn: conn,
+            '__exit__': lambda conn, *exc: False,
+            'cursor': lambda conn, cursor_factory=None: ColumnCursor(db.columns, db.queries),
+        })
+        db._connection = lambda: connection()
+        return db
+
+    def test_no_groups_match_nothing(self, db):
+        assert db.search_jobs_with_or_filters([]) == []
+        assert db.queries == []
+
+    def test_migration_is_picked_up_without_restart(self, db):
+        db.search_jobs_with_or_filters([{'keyword': 'python'}])
+        assert 'search_vector @@' not in db.queries[-1]
+
+        db.columns = ['id', 'title', 'search_vector']
+        db.search_jobs_with_or_filters([{'keyword': 'python'}])
+        assert 'search_vector @@' in db.queries[-1]
+        assert 'SELECT "id", "title", ts_rank' in db.queries[-1]
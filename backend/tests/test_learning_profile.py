@@ -0,0 +1,111 @@
+"""
+Feedback learning profile tests
+Fake feedback store, no database
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis.feedback_learner import FeedbackLearner
+from src.analysis.learning_profile import (
+    apply_feedback, build_profile, cache_key, learning_cache, preferences_from_profile
+)
+
+
+def _feedback(feedback_type, score, user_score=None, title='Data Engineer', alignments='', gaps='', reason=None):
+    return {'feedback_type': feedback_type, 'match_score_original': score, 'match_score_user': user_score,
+            'feedback_reason': reason, 'title': title, 'company': 'ACME', 'location': 'Berlin',
+            'key_alignments': alignments, 'potential_gaps': gaps}
+
+
+HISTORY = [  # newest first, as get_user_feedback returns it
+    _feedback('too_high', 80, 60, title='Sales Lead', gaps='["travel", "management"]'),
+    _feedback('agree', 85, title='ML Engineer', alignments='["python", "machine learning"]'),
+    _feedback('agree', 90, title='Data Lead', alignments='["python", "leadership"]'),
+    _feedback('disagree', 75, 50, title='Head of BI', reason='too much management, no python'),
+    _feedback('agree', 40, title='Analyst'),
+]
+
+
+class FakeFeedbackStore:
+    """get_user_feedback / learning profile storage of the PostgreSQL manager"""
+
+    def __init__(self, history, stored=None):
+        self.history = list(history)
+        self.stored = stored
+        self.reads = 0
+
+    def get_user_feedback(self, user_email, limit=50):
+        self.reads += 1
+        return self.history[:limit]
+
+    def get_learning_profile(self, user_email):
+        return self.stored
+
+    def save_learning_profile(self, user_email, profile):
+        self.stored = {'profile': profile, 'version': 1}
+        return self.stored
+
+    def add_feedback(self, feedback):
+        self.history.insert(0, feedback)
+        apply_feedback(self.stored['profile'], feedback)
+        self.stored = {'profile': self.stored['profile'], 'version': self.stored['version'] + 1}
+        learning_cache.invalidate(cache_key('user@example.com'))
+
+
+class TestLearningProfile:
+    """Test incremental updates and cached reads"""
+
+    def setup_method(self):
+        learning_cache.clear()
+
+    def test_incremental_update_matches_rebuild(self):
+        profile = build_profile(HISTORY[1:])
+
+        apply_feedback(profile, HISTORY[0])
+
+        assert profile == build_profile(HISTORY)
+
+    def test_preferences_from_profile(self):
+        prefs = preferences_from_profile(build_profile(HISTORY))
+
+        assert prefs['total_feedback'] == 5
+        assert prefs['agreement_rate'] == 60.0
+        assert [job['title'] for job in prefs['liked_job_examples']] == ['ML Engineer', 'Data Lead']
+        assert [job['title'] for job in prefs['disliked_job_examples']] == ['Sales Lead', 'Head of BI']
+        assert prefs['key_preferences']['valued_aspects'][0] == 'python'
+        assert prefs['key_preferences']['dealbreakers'][0] == 'management'
+        assert prefs['scoring_calibration']['score_bias'] == 22.5
+        assert prefs['scoring_calibration']['needs_calibration'] is True
+
+    def test_no_feedback(self):
+        assert preferences_from_profile(build_profile([]))['has_feedback'] is False
+        assert FeedbackLearner(FakeFeedbackStore([])).generate_learning_context('user@example.com') == ''
+
+    def test_reads_are_cached_until_feedback(self):
+        store = FakeFeedbackStore(HISTORY)
+        learner = FeedbackLearner(store)
+
+        context = learner.generate_learning_context('user@example.com')
+        FeedbackLearner(store).generate_learning_context('user@example.com')
+        learner.get_preference_summary('user@example.com')
+
+        assert 'Based on 5 previous feedback items' in context
+        assert store.reads == 1  # one rebuild, then the stored profile and cache
+
+        store.add_feedback(_feedback('agree', 95, title='Staff Engineer'))
+        context = learner.generate_learning_context('user@example.com')
+
+        assert 'Based on 6 previous feedback items' in context
+        assert '- Staff Engineer at ACME (score: 95)' in context
+        assert store.reads == 1
+
+    def test_stored_profile_of_old_format_is_rebuilt(self):
+        store = FakeFeedbackStore(HISTORY, stored={'profile': {'format': 0}, 'version': 3})
+
+        prefs = FeedbackLearner(store).analyze_user_preferences('user@example.com')
+
+        assert prefs['total_feedback'] == 5
+        assert store.reads == 1
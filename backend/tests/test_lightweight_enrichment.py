@@ -0,0 +1,128 @@
+"""
+Lightweight enrichment batching tests
+Uses a local stand-in client, no API or database calls
+"""
+
+import sys
+import json
+import time
+import threading
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.rate_limiter import RateLimiter
+
+
+class _Response:
+    def __init__(self, text):
+        self.content = [type('Block', (), {'text': text})()]
+        self.stop_reason = 'end_turn'
+        self.usage = type('Usage', (), {'input_tokens': 0, 'output_tokens': 200})()
+
+
+class BatchClient:
+    """Answers every job in the prompt except the ones listed in skip"""
+
+    def __init__(self, skip=()):
+        self.skip = {str(job_id) for job_id in skip}
+        self.prompts = []
+        self.messages = self
+
+    def create(self, **params):
+        prompt = params['messages'][0]['content']
+        self.prompts.append(prompt)
+        ids = [line.split()[1].rstrip(':') for line in prompt.splitlines() if line.startswith('JOB ')]
+        answer = {job_id: {'work_arrangement': 'Remote', 'employment_type': ['FULL_TIME'],
+                           'cities': ['Berlin']}
+                  for job_id in ids if job_id not in self.skip}
+        return _Response('```json\n' + json.dumps(answer) + '\n```')
+
+
+class TestRateLimiter:
+    """Test the shared request budget"""
+
+    def test_requests_are_spaced(self):
+        limiter = RateLimiter(requests_per_minute=600)  # one per 0.1s
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        assert time.monotonic() - start >= 0.28
+
+    def test_burst_is_shared_across_threads(self):
+        limiter = RateLimiter(requests_per_minute=60, burst=3)
+        acquired = []
+        threads = [threading.Thread(target=lambda: acquired.append(limiter.acquire())) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=2)
+        assert len(acquired) == 3 and max(acquired) < 0.5
+
+
+class TestBatchedExtraction:
+    """Test multi-job prompts keyed by job id"""
+
+    def test_results_keyed_by_job_id(self):
+        pytest.importorskip('psycopg2')
+        from scripts.enrich_lightweight import enrich_jobs_lightweight_batch, MODEL
+        from src.analysis.batch_planner import BatchPlanner
+
+        jobs = [{'id': job_id, 'title': 'Engineer', 'company': 'Acme', 'description': 'Python'}
+                for job_id in (101, 102, 103)]
+        client = BatchClient(skip=[102])
+        results = enrich_jobs_lightweight_batch(client, jobs, BatchPlanner(MODEL, output_tokens_per_item=80))
+
+        assert len(client.prompts) == 1
+        assert set(results) == {101, 103}
+        assert results[101]['work_arrangement'] == 'Remote'
+
+
+class TestEnrichmentWorker:
+    """Test the queue worker loop"""
+
+    def test_sleeps_only_when_queue_is_empty(self):
+        pytest.importorskip('psycopg2')
+        from scripts.enrich_lightweight import run_enrichment_worker
+
+        passes = iter([{'processed': 5, 'success': 4, 'failed': 1}, {'processed': 0}, RuntimeError('db down')])
+        calls, sleeps = [], []
+
+        def run(limit, **kwargs):
+            calls.append((limit, kwargs))
+            result = next(passes)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        totals = run_enrichment_worker(claim=50, poll_seconds=7, max_passes=3,
+                                       run=run, sleep=sleeps.append, batch_size=10)
+
+        assert calls[0] == (50, {'batch_size': 10})
+        assert totals == {'processed': 5, 'success': 4, 'failed': 1}
+        assert sleeps == [7, 7]
+
+    def test_cron_drain_is_bounded(self):
+        pytest.importorskip('psycopg2')
+        from scripts.enrich_lightweight import drain_enrichment_queue
+
+        limits = []
+
+        def run(limit, **kwargs):
+            limits.append(limit)
+            return {'processed': limit, 'success': limit, 'failed': 0}
+
+        totals = drain_enrichment_queue(max_jobs=120, claim=50, run=run)
+
+        assert limits == [50, 50, 20]
+        assert totals['processed'] == 120
+
+    def test_cron_drain_stops_when_queue_is_empty(self):
+        pytest.importorskip('psycopg2')
+        from scripts.enrich_lightweight import drain_enrichment_queue
+
+        passes = iter([{'processed': 30, 'success': 29, 'failed': 1}, {'processed': 0}])
+        totals = drain_enrichment_queue(max_jobs=1000, claim=50, run=lambda limit: next(passes))
+
+        assert totals == {'processed': 30, 'success': 29, 'failed': 1}
@@ -0,0 +1,152 @@
+"""
+LLM gateway tests
+Tests response caching and record/replay with a local stand-in client (no API calls)
+"""
+
+import os
+import sys
+import time
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.llm_gateway import (
+    LLMGateway, ResponseCache, LLMReplayMiss, make_cache_key
+)
+
+
+class _FakeMessage:
+    def __init__(self, text):
+        self.content = [type('Block', (), {'text': text})()]
+        self.model = 'fake-model'
+        self.stop_reason = 'end_turn'
+        self.usage = type('Usage', (), {'input_tokens': 10, 'output_tokens': 5})()
+
+
+class FakeClient:
+    """Stand-in for anthropic.Anthropic that counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **params):
+        self.calls += 1
+        return _FakeMessage(f"reply {self.calls}: {params['messages'][0]['content']}")
+
+
+REQUEST = {
+    'model': 'claude-3-5-haiku-20241022',
+    'max_tokens': 100,
+    'temperature': 0,
+    'messages': [{'role': 'user', 'content': 'score this job'}]
+}
+
+
+class TestLLMGateway:
+    """Test caching behaviour"""
+
+    def test_cache_key_is_order_independent(self):
+        reordered = dict(reversed(list(REQUEST.items())))
+        assert make_cache_key(REQUEST) == make_cache_key(reordered)
+        assert make_cache_key(REQUEST) != make_cache_key({**REQUEST, 'max_tokens': 200})
+
+    def test_repeated_request_served_from_cache(self, tmp_path):
+        client = FakeClient()
+        gateway = LLMGateway(client=client, mode='live', cache=ResponseCache(str(tmp_path)))
+
+        first = gateway.messages.create(**REQUEST)
+        second = gateway.messages.create(**REQUEST)
+
+        assert client.calls == 1
+        assert first.cached is False and second.cached is True
+        assert second.content[0].text == first.content[0].text
+        assert second.usage.input_tokens == 10
+
+    def test_cache_opt_out(self, tmp_path):
+        client = FakeClient()
+        gateway = LLMGateway(client=client, mode='live', cache=ResponseCache(str(tmp_path)))
+
+        gateway.messages.create(cache=False, **REQUEST)
+        gateway.messages.create(cache=False, **REQUEST)
+        assert client.calls == 2
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), ttl=60)
+        key = make_cache_key(REQUEST)
+        cache.put(key, {'text': 'old'})
+
+        path = cache._path(key)
+        stale = time.time() - 120
+        os.utime(path, (stale, stale))
+
+        assert cache.get(key) is None
+        assert not os.path.exists(path)
+
+    def test_size_bounded_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=2000)
+        keys = [make_cache_key({'n': i}) for i in range(20)]
+        for i, key in enumerate(keys):
+            cache.put(key, {'text': 'x' * 200})
+            stamp = time.time() - 1000 + i
+            os.utime(cache._path(key), (stamp, stamp))
+
+        assert cache._scan_size() <= 2000
+        # Most recently written entries survive
+        assert cache.get(keys[-1]) is not None
+        assert cache.get(keys[0]) is None
+
+
+    def test_stream_is_cached(self, tmp_path):
+        class StreamingClient(FakeClient):
+            def stream(self, **params):
+                client = self
+
+                class _Stream:
+                    def __enter__(self):
+                        client.calls += 1
+                        self.text_stream = iter(['{"job_1"', ': {}}'])
+                        return self
+
+                    def __exit__(self, *args):
+                        return False
+
+                    def get_final_message(self):
+                        return _FakeMessage('{"job_1": {}}')
+                return _Stream()
+
+        client = StreamingClient()
+        gateway = LLMGateway(client=client, mode='live', cache=ResponseCache(str(tmp_path)))
+
+        first = gateway.messages.stream_text(**REQUEST)
+        assert list(first) == ['{"job_1"', ': {}}']
+        assert first.response.cached is False
+
+        second = gateway.messages.stream_text(**REQUEST)
+        assert list(second) == ['{"job_1": {}}']
+        assert second.response.cached is True
+        assert client.calls == 1
+
+
+class TestRecordReplay:
+    """Test offline record/replay"""
+
+    def test_replay_recorded_response(self, tmp_path):
+        cassettes = ResponseCache(str(tmp_path / 'cassettes'))
+
+        recorder = LLMGateway(client=FakeClient(), mode='record', cache=None, cassettes=cassettes)
+        recorded = recorder.messages.create(**REQUEST)
+
+        # Replay never touches the client
+        player = LLMGateway(client=object(), mode='replay', cache=None, cassettes=cassettes)
+        replayed = player.messages.create(**REQUEST)
+
+        assert replayed.content[0].text == recorded.content[0].text
+        assert replayed.cached is True
+
+    def test_replay_miss_raises(self, tmp_path):
+        player = LLMGateway(client=object(), mode='replay', cache=None,
+                            cassettes=ResponseCache(str(tmp_path)))
+        with pytest.raises(LLMReplayMiss):
+            player.messages.create(**REQUEST)
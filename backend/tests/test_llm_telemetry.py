@@ -0,0 +1,97 @@
+"""
+LLM telemetry tests
+Tests the buffered writer and gateway instrumentation with an in-memory sink
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import llm_telemetry
+from src.utils.llm_telemetry import TelemetryWriter, configure_telemetry, estimate_call_cost, llm_user
+from src.utils.llm_gateway import LLMGateway, ResponseCache
+
+
+class FakeClient:
+    """Stand-in for anthropic.Anthropic"""
+
+    def __init__(self):
+        self.messages = self
+
+    def create(self, **params):
+        return type('Message', (), {
+            'content': [type('Block', (), {'text': 'ok'})()],
+            'model': params['model'],
+            'stop_reason': 'end_turn',
+            'usage': type('Usage', (), {'input_tokens': 10, 'output_tokens': 5})()
+        })()
+
+
+REQUEST = {
+    'model': 'claude-3-5-haiku-20241022',
+    'max_tokens': 100,
+    'messages': [{'role': 'user', 'content': 'score this job'}]
+}
+
+
+class MemoryDB:
+    """Stand-in for PostgresDatabase.insert_llm_calls"""
+
+    def __init__(self):
+        self.rows = []
+
+    def insert_llm_calls(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+
+@pytest.fixture
+def telemetry_db():
+    db = MemoryDB()
+    writer = configure_telemetry(db, flush_interval=60)
+    yield db, writer
+    writer.close()
+    llm_telemetry._writer = None
+
+
+class TestTelemetry:
+    """Test LLM call recording"""
+
+    def test_gateway_calls_are_recorded(self, tmp_path, telemetry_db):
+        db, writer = telemetry_db
+        gateway = LLMGateway(client=FakeClient(), mode='live', cache=ResponseCache(str(tmp_path)))
+
+        with llm_user(42):
+            gateway.messages.create(operation='batch_scoring', batch_size=12, **REQUEST)
+            gateway.messages.create(operation='batch_scoring', batch_size=12, **REQUEST)
+        writer.flush()
+
+        live, hit = db.rows
+        assert live['user_id'] == 42 and hit['user_id'] == 42
+        assert live['operation'] == 'batch_scoring' and live['batch_size'] == 12
+        assert (live['input_tokens'], live['output_tokens']) == (10, 5)
+        assert live['cache_hit'] is False and live['cost_usd'] > 0
+        assert hit['cache_hit'] is True and hit['cost_usd'] == 0.0
+
+    def test_writer_survives_sink_errors(self):
+        calls = []
+
+        def failing_sink(rows):
+            calls.append(len(rows))
+            raise RuntimeError("database down")
+
+        writer = TelemetryWriter(failing_sink, batch_size=2, flush_interval=60)
+        for _ in range(3):
+            writer.record({'provider': 'anthropic'})
+        writer.close()
+
+        assert sum(calls) == 3
+
+    def test_no_writer_is_noop(self):
+        llm_telemetry.record_llm_call('anthropic', 'claude-3-5-haiku-20241022', 100, 100)
+
+    def test_cost_estimate(self):
+        cost = estimate_call_cost('claude-3-5-haiku-20241022', 1_000_000, 1_000_000)
+        assert cost == pytest.approx(4.80)
@@ -0,0 +1,60 @@
+"""
+Match map materialization tests
+Tests the competency/skill cascade without database or model access
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.match_maps import build_match_maps
+
+
+PROFILE = {
+    'technical_skills': ['Python', 'PostgreSQL', 'Docker'],
+    'competencies': [{'name': 'Stakeholder Management', 'evidence': '...'}, 'Team Leadership']
+}
+
+
+class TestMatchMaps:
+    """Test the Claude -> keyword cascade (semantic tier disabled)"""
+
+    def test_claude_mappings_take_precedence(self):
+        job = {
+            'ai_competencies': ['Stakeholder Management', 'Budget Planning'],
+            'ai_key_skills': ['Python', 'Kubernetes'],
+            'competency_mappings': [{'job_requirement': 'Budget Planning', 'user_strength': 'Finance'}],
+            'skill_mappings': [{'job_skill': 'Kubernetes', 'user_skill': 'Docker'}]
+        }
+        maps = build_match_maps(job, PROFILE, use_semantic=False)
+
+        # Only mapped terms count, even if the profile would match the others
+        assert maps['competency_match_map'] == {'Budget Planning': True, 'Stakeholder Management': False}
+        assert maps['skill_match_map'] == {'Kubernetes': True, 'Python': False}
+
+    def test_keyword_fallback(self):
+        job = {
+            'ai_competencies': ['Stakeholder Management', 'Leadership', 'Budget Planning'],
+            'ai_key_skills': ['python', 'PostgreSQL Administration', 'Go'],
+            'key_alignments': ['Strong budget ownership and planning experience']
+        }
+        maps = build_match_maps(job, PROFILE, use_semantic=False)
+
+        comp_map = maps['competency_match_map']
+        assert comp_map['Stakeholder Management'] is True   # direct profile match
+        assert comp_map['Leadership'] is True               # fuzzy substring match
+        assert comp_map['Budget Planning'] is True          # key alignment word overlap
+
+        skill_map = maps['skill_match_map']
+        assert skill_map['Python'] is True                  # normalized casing, direct match
+        assert skill_map['PostgreSQL Administration'] is True
+        assert skill_map['Go'] is False
+
+    def test_no_profile_or_terms(self):
+        assert build_match_maps({}, None, use_semantic=False) == {
+            'competency_match_map': {},
+            'skill_match_map': {}
+        }
+        maps = build_match_maps({'ai_key_skills': ['Rust']}, None, use_semantic=False)
+        assert maps['skill_match_map'] == {'Rust': False}
@@ -0,0 +1,89 @@
+"""
+PDF extraction service tests
+Fake page extractors and a temporary cache directory, no real CVs
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parsers import pdf_extraction
+from src.parsers.pdf_extraction import PDFExtractor, TextCache, needs_fallback, split_pages
+
+GOOD_PAGE = 'Senior Data Engineer with ten years of Python, SQL and Spark experience.'
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """Three pages; the text layer of page 2 is empty (scanned/designed)"""
+    plumber_calls = []
+
+    def fast(file_path, first, last):
+        return [GOOD_PAGE, '', GOOD_PAGE.upper()][first:last]
+
+    def plumber(file_path, pages):
+        plumber_calls.append(list(pages))
+        return {index: f'plumber page {index + 1} ' * 5 for index in pages}
+
+    monkeypatch.setattr(pdf_extraction, 'page_count', lambda file_path: 3)
+    monkeypatch.setattr(pdf_extraction, 'fast_page_texts', fast)
+    monkeypatch.setattr(pdf_extraction, 'plumber_page_texts', plumber)
+    return plumber_calls
+
+
+class TestPDFExtraction:
+    """Test fallback selection, page splitting and the text cache"""
+
+    def test_needs_fallback_for_short_or_garbled_pages(self):
+        assert needs_fallback('   ')
+        assert not needs_fallback(GOOD_PAGE)
+        assert needs_fallback('\ue001' * 30 + GOOD_PAGE[:40])
+
+    def test_split_pages_into_contiguous_chunks(self):
+        assert split_pages(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+        assert split_pages([4, 9], 4) == [[4], [9]]
+
+    def test_only_bad_pages_use_pdfplumber(self, fake_pdf):
+        extractor = PDFExtractor(workers=1)
+
+        text = extractor.extract('cv.pdf')
+
+        assert fake_pdf == [[1]]
+        assert text.split('\n\n')[1].startswith('plumber page 2')
+        assert extractor.last_stats == {'pages': 3, 'fallback_pages': 1, 'processes': 1}
+
+    def test_without_fast_path_every_page_uses_pdfplumber(self, fake_pdf):
+        PDFExtractor(workers=1, use_fast=False).extract('cv.pdf')
+
+        assert fake_pdf == [[0, 1, 2]]
+
+    def test_text_cache_extracts_once_per_hash(self, tmp_path):
+        cv_file = tmp_path / 'cv.txt'
+        cv_file.write_text('CV contents')
+        cache = TextCache(str(tmp_path / 'cache'))
+        calls = []
+
+        def extract(file_path):
+            calls.append(file_path)
+            return 'extracted text'
+
+        assert cache.get_or_extract(str(cv_file), extract) == 'extracted text'
+        assert cache.get_or_extract(str(cv_file), extract) == 'extracted text'
+        assert len(calls) == 1
+        assert cache.get('0' * 64) is None
+
+    def test_real_pdf_text_layer(self, tmp_path):
+        pytest.importorskip('pypdfium2')
+        from scripts.benchmark_pdf_extraction import write_text_pdf
+
+        pdf_path = str(tmp_path / 'cv.pdf')
+        write_text_pdf(pdf_path, [[GOOD_PAGE], [GOOD_PAGE, 'Skills: Python (expert)']])
+
+        extractor = PDFExtractor(workers=1)
+        text = extractor.extract(pdf_path)
+
+        assert 'Skills: Python (expert)' in text
+        assert extractor.last_stats['fallback_pages'] == 0
@@ -0,0 +1,103 @@
+"""
+PDF rendering service tests
+Fake in-process renderer and a temporary cache directory, no WeasyPrint
+"""
+
+import os
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.resume.pdf_renderer import PDFCache, PDFRenderer, cache_key
+
+
+class FakeRender:
+    """Counts renders; optionally blocks until released"""
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def __call__(self, html):
+        self.calls.append(html)
+        if self.gate:
+            self.gate.wait(5)
+        if 'broken' in html:
+            raise ValueError('layout failed')
+        return b'%PDF-1.7 ' + html.encode('utf-8')
+
+
+class TestPDFRenderer:
+    """Test the content-hash cache, shared renders and metrics"""
+
+    def test_identical_html_renders_once(self, tmp_path):
+        render = FakeRender()
+        renderer = PDFRenderer(workers=0, cache=PDFCache(str(tmp_path)), render=render)
+
+        first = renderer.render('<p>Resume</p>')
+        second = renderer.render('<p>Resume</p>')
+        renderer.render('<p>Other</p>')
+
+        assert first == second == b'%PDF-1.7 <p>Resume</p>'
+        assert render.calls == ['<p>Resume</p>', '<p>Other</p>']
+        stats = renderer.stats()
+        assert stats['renders'] == 2 and stats['cache_hits'] == 1
+        assert 'p95_ms' in stats and stats['cache_hit_rate'] == round(1 / 3, 3)
+
+    def test_cache_survives_a_new_renderer(self, tmp_path):
+        PDFRenderer(workers=0, cache=PDFCache(str(tmp_path)), render=FakeRender()).render('<p>A</p>')
+        render = FakeRender()
+
+        PDFRenderer(workers=0, cache=PDFCache(str(tmp_path)), render=render).render('<p>A</p>')
+
+        assert render.calls == []
+
+    def test_failures_are_counted_and_not_cached(self, tmp_path):
+        render = FakeRender()
+        renderer = PDFRenderer(workers=0, cache=PDFCache(str(tmp_path)), render=render)
+
+        for _ in range(2):
+            try:
+                renderer.render('<p>broken</p>')
+            except ValueError:
+                pass
+
+        assert len(render.calls) == 2
+        assert renderer.stats()['errors'] == 2
+
+    def test_concurrent_requests_share_one_render(self):
+        gate = threading.Event()
+        render = FakeRender(gate=gate)
+        renderer = PDFRenderer(workers=0, cache=None, render=render)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(renderer.render('<p>Same</p>')))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(render.calls) == 1
+        assert len(results) == 3 and len(set(results)) == 1
+        assert renderer.stats()['shared'] == 2
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        cache = PDFCache(str(tmp_path), max_bytes=250)
+        keys = [cache_key(f'<p>{i}</p>') for i in range(3)]
+        cache.put(keys[0], b'a' * 100)
+        cache.put(keys[1], b'b' * 100)
+        # Reading the first entry makes the second the least recently used
+        old = time.time() - 60
+        os.utime(cache._path(keys[1]), (old, old))
+        assert cache.get(keys[0]) == b'a' * 100
+
+        cache.put(keys[2], b'c' * 100)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
@@ -0,0 +1,99 @@
+"""
+Profiling subsystem tests
+Temporary profile store, no database
+"""
+
+import os
+import sys
+import time
+import pstats
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.profiler import ProfileStore, background_profile, background_profiling_enabled, profile_run, span
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+class TestProfiler:
+    """Test span trees, both profile modes and store rotation"""
+
+    def test_spans_are_noops_without_a_run(self):
+        with span('outside') as stage:
+            _busy(0.01)
+
+        assert stage.duration >= 0.01
+        assert stage.children == []
+
+    def test_cprofile_run_records_span_tree_and_stats(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+
+        with profile_run('script', 'matching', mode='cprofile', store=store, user_id=7) as run:
+            with span('load', rows=3):
+                _busy(0.01)
+            with span('score'):
+                with span('batch', size=2):
+                    _busy(0.01)
+
+        entry = store.get(run.entry['id'])
+        assert entry['meta'] == {'user_id': 7}
+        assert [child['name'] for child in entry['spans']['children']] == ['load', 'score']
+        assert entry['spans']['children'][0]['attrs'] == {'rows': 3}
+        assert entry['spans']['children'][1]['children'][0]['name'] == 'batch'
+        assert any('_busy' in row['function'] for row in entry['top'])
+        stats = pstats.Stats(store.path(entry['id'], 'prof'))
+        assert any(name == '_busy' for _, _, name in stats.stats)
+
+    def test_sampling_run_writes_folded_stacks(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+
+        with profile_run('script', 'sampled', mode='sample', store=store) as run:
+            _busy(0.15)
+
+        assert run.entry['samples'] > 0
+        with open(store.path(run.entry['id'], 'folded')) as f:
+            assert '_busy' in f.read()
+
+    def test_errors_are_saved(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+
+        try:
+            with profile_run('background', 'failing', store=store):
+                raise RuntimeError('boom')
+        except RuntimeError:
+            pass
+
+        assert store.list()[0]['error'] == 'RuntimeError: boom'
+
+    def test_store_keeps_newest_runs(self, tmp_path):
+        store = ProfileStore(str(tmp_path), keep=2)
+        for i in range(3):
+            with profile_run('script', f'run{i}', mode='sample', store=store):
+                pass
+
+        assert [entry['name'] for entry in store.list()] == ['run2', 'run1']
+        assert len([name for name in os.listdir(tmp_path) if name.endswith('.json')]) == 2
+        assert store.path('../etc/passwd', 'json') is None
+
+    def test_background_jobs_follow_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+        monkeypatch.setenv('PROFILE_BACKGROUND', 'matching, backfill')
+
+        assert background_profiling_enabled('matching')
+        assert not background_profiling_enabled('cv_ingestion')
+
+        with background_profile('cv_ingestion'):
+            pass
+        assert ProfileStore().list() == []
+
+        with background_profile('matching', user_id=3):
+            with span('stage'):
+                pass
+        assert ProfileStore().list()[0]['meta'] == {'user_id': 3}
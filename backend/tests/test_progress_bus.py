@@ -0,0 +1,106 @@
+"""
+Progress bus tests
+In-process channels and SSE frames, no web server
+"""
+
+import sys
+import json
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.progress_bus import ProgressBus, StatusBoard
+
+
+def _frames(stream):
+    """Parse SSE frames into (id, event, data), skipping comments and retry"""
+    frames = []
+    for chunk in stream:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if ': ' in line
+                      and not line.startswith(':'))
+        if 'event' in fields:
+            frames.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return frames
+
+
+class TestProgressBus:
+    """Test publishing, resume and the matching_status adapter"""
+
+    def test_channels_are_per_user_with_increasing_ids(self):
+        bus = ProgressBus()
+        first = bus.publish(1, 'status', status='running')
+        bus.publish(2, 'status', status='running')
+        third = bus.publish(1, 'matches', count=3)
+
+        assert third > first
+        assert [e['event'] for e in bus.events_since(1)] == ['status', 'matches']
+        assert [e['id'] for e in bus.events_since(1, first)] == [third]
+
+    def test_history_is_bounded(self):
+        bus = ProgressBus(history=3)
+        for i in range(5):
+            bus.publish(1, 'status', progress=i)
+
+        assert [e['data']['progress'] for e in bus.events_since(1)] == [2, 3, 4]
+
+    def test_stream_resumes_after_last_event_id_and_ends_on_completion(self):
+        bus = ProgressBus()
+        board = StatusBoard(bus)
+        board[1] = {'status': 'running', 'progress': 0}
+        seen = bus.events_since(1)[-1]['id']
+        board[1].update({'progress': 50})
+        board[1] = {'status': 'completed', 'progress': 100}
+
+        frames = _frames(bus.stream(1, last_event_id=seen, keepalive=0.01, max_seconds=1))
+
+        assert [f[2]['progress'] for f in frames] == [50, 100]
+        assert frames[-1][2]['status'] == 'completed'
+
+    def test_new_stream_starts_from_snapshot(self):
+        bus = ProgressBus()
+        bus.publish(1, 'status', status='running', progress=10)
+        bus.publish(1, 'matches', count=7)
+        bus.publish(1, 'status', status='running', progress=55)
+
+        stream = bus.stream(1, keepalive=0.01, max_seconds=0.05)
+
+        assert [(f[1], f[2]) for f in _frames(stream)] == [('matches', {'count': 7}),
+                                                           ('status', {'status': 'running', 'progress': 55})]
+
+    def test_stream_wakes_on_publish(self):
+        bus = ProgressBus()
+        bus.publish(1, 'status', status='running')
+        stream = bus.stream(1, keepalive=5, max_seconds=5)
+        next(stream), next(stream)  # retry hint, snapshot
+
+        threading.Timer(0.05, bus.publish, args=(1, 'status'), kwargs={'status': 'error'}).start()
+
+        assert _frames([next(stream)])[0][2] == {'status': 'error'}
+
+    def test_status_board_keeps_dict_interface(self):
+        bus = ProgressBus()
+        board = StatusBoard(bus)
+        board[4] = {'status': 'running'}
+        board[4].update({'progress': 20})
+        board[4]['message'] = 'Saving'
+
+        assert 4 in board and board.get(4)['progress'] == 20
+        assert bus.latest(4, 'status') == {'status': 'running', 'progress': 20, 'message': 'Saving'}
+
+    def test_open_streams_are_capped_until_closed(self):
+        bus = ProgressBus(max_streams=2)
+        bus.publish(1, 'status', status='running')
+        first = bus.open_stream(1, keepalive=5, max_seconds=5)
+        second = bus.open_stream(2, keepalive=5, max_seconds=5)
+
+        assert bus.open_stream(3) is None
+        assert next(iter(first)) == "retry: 3000\n\n"
+
+        first.close()
+        first.close()  # closing twice frees one slot only
+        third = bus.open_stream(3, keepalive=5, max_seconds=5)
+        assert third is not None and bus.open_stream(4) is None
+
+        second.close()
+        third.close()
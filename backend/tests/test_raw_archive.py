@@ -0,0 +1,70 @@
+"""
+Raw payload archive tests
+Writes Parquet files to a temporary directory, no database
+"""
+
+import sys
+import pytest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('pyarrow')
+
+from src.utils.raw_archive import RawArchiveWriter, RawArchiveReader
+
+
+class TestRawArchive:
+    """Test buffered writes and partition-pruned reads"""
+
+    def test_payloads_are_partitioned_by_source_and_date(self, tmp_path):
+        writer = RawArchiveWriter(str(tmp_path), flush_rows=1000)
+        writer.append('activejobs', [{'id': 'a1', 'title': 'Engineer', 'organization': 'Acme'}],
+                      fetched_at=datetime(2025, 1, 30, 12))
+        writer.append('jsearch', [{'job_id': 'j1', 'job_title': 'Analyst'}],
+                      fetched_at=datetime(2025, 1, 31, 12))
+        assert writer.files_written == 0
+
+        writer.close()
+        assert writer.rows_written == 2
+        assert (tmp_path / 'source=activejobs' / 'date=2025-01-30').is_dir()
+
+        reader = RawArchiveReader(str(tmp_path))
+        table = reader.scan(source='activejobs')
+        assert table.column('external_id').to_pylist() == ['a1']
+        assert table.column('company').to_pylist() == ['Acme']
+
+        recent = reader.scan(since='2025-01-31', columns=['external_id', 'title'])
+        assert recent.to_pylist() == [{'external_id': 'j1', 'title': 'Analyst'}]
+
+    def test_flush_after_threshold(self, tmp_path):
+        writer = RawArchiveWriter(str(tmp_path), flush_rows=2)
+        writer.append('activejobs', [{'id': str(i)} for i in range(3)])
+        assert writer.rows_written == 3
+        assert RawArchiveReader(str(tmp_path)).has_data()
+
+    def test_failed_flush_keeps_only_unwritten_partitions(self, tmp_path, monkeypatch):
+        from src.utils import raw_archive
+
+        writer = RawArchiveWriter(str(tmp_path), flush_rows=1000)
+        writer.append('activejobs', [{'id': 'a1'}], fetched_at=datetime(2025, 1, 30, 12))
+        writer.append('jsearch', [{'job_id': 'j1'}], fetched_at=datetime(2025, 1, 31, 12))
+
+        write_table = raw_archive.pq.write_table
+        calls = []
+
+        def fail_second(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            return write_table(*args, **kwargs)
+
+        monkeypatch.setattr(raw_archive.pq, 'write_table', fail_second)
+        with pytest.raises(OSError):
+            writer.flush()
+        assert writer.rows_written == 1
+
+        monkeypatch.setattr(raw_archive.pq, 'write_table', write_table)
+        assert writer.flush() == 1
+        assert RawArchiveReader(str(tmp_path)).scan().num_rows == 2
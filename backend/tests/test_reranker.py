@@ -0,0 +1,79 @@
+"""
+Cross-encoder reranker tests
+Fake cross-encoder, no model download
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.matching.reranker import CrossEncoderReranker, cv_summary, job_passage, select_candidates
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words appear in the passage"""
+
+    def __init__(self, two_class=False):
+        self.two_class = two_class
+        self.batches = []
+
+    def predict(self, pairs, batch_size=16, show_progress_bar=False):
+        self.batches.append(len(pairs))
+        scores = []
+        for query, passage in pairs:
+            words = query.lower().replace(',', ' ').replace('.', ' ').split()
+            hits = sum(1 for word in set(words) if word in passage.lower())
+            scores.append(hits / max(len(set(words)), 1))
+        if self.two_class:
+            return np.array([[0.0, np.log(s / (1 - s)) if 0 < s < 1 else (10.0 if s else -10.0)]
+                             for s in scores])
+        return np.array(scores)
+
+
+def _candidate(job_id, title, description=''):
+    return {'job': {'id': job_id, 'title': title, 'description': description}, 'score': 60}
+
+
+class TestReranker:
+    """Test candidate selection and score recording"""
+
+    def test_select_candidates_applies_threshold_then_top_n(self):
+        scores = [0.2, 0.9, 0.5, 0.7]
+
+        assert select_candidates(scores) == [1, 3, 2, 0]
+        assert select_candidates(scores, top_n=2) == [1, 3]
+        assert select_candidates(scores, min_score=0.6) == [1, 3]
+
+    def test_texts_are_bounded_and_include_requirements(self):
+        profile = {'expertise_summary': 'Data engineer', 'technical_skills': ['Python'] * 500}
+        job = {'title': 'Data Engineer', 'ai_key_skills': ['SQL', 'dbt'],
+               'description': '<p>Build pipelines</p>' * 500}
+
+        assert cv_summary(profile).startswith('Data engineer. Python')
+        assert len(cv_summary(profile)) <= 800
+        assert job_passage(job).startswith('Data Engineer. SQL, dbt. Build pipelines')
+        assert len(job_passage(job)) <= 1500
+
+    def test_rerank_keeps_best_and_scores_all(self):
+        reranker = CrossEncoderReranker(top_n=2, min_score=0.0, batch_size=8, model=FakeCrossEncoder())
+        profile = {'expertise_summary': 'python data engineer'}
+        candidates = [_candidate(1, 'Office Assistant'), _candidate(2, 'Python Data Engineer'),
+                      _candidate(3, 'Data Analyst')]
+
+        kept, scores = reranker.rerank(profile, candidates)
+
+        assert [c['job']['id'] for c in kept] == [2, 3]
+        assert set(scores) == {1, 2, 3}
+        assert scores[2] > scores[3] > scores[1]
+
+    def test_two_class_outputs_become_probabilities(self):
+        reranker = CrossEncoderReranker(top_n=0, min_score=0.5, model=FakeCrossEncoder(two_class=True))
+
+        scores = reranker.score('python engineer', ['python engineer', 'chef'])
+
+        assert scores[0] > 0.99 and scores[1] < 0.01
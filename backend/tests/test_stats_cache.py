@@ -0,0 +1,125 @@
+"""
+Statistics cache tests
+In-process only, no database
+"""
+
+import sys
+import time
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.stats_cache import TTLCache
+
+
+class TestTTLCache:
+    """Test expiry and explicit invalidation"""
+
+    def test_value_is_computed_once_until_expiry(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'total_jobs': len(calls)}
+
+        assert cache.get_or_compute('job_stats', compute) == {'total_jobs': 1}
+        assert cache.get_or_compute('job_stats', compute) == {'total_jobs': 1}
+        assert cache.stats()['hits'] == 1
+
+        cache.set('job_stats', {'total_jobs': 5}, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get_or_compute('job_stats', compute) == {'total_jobs': 2}
+
+    def test_invalidate_prefix_drops_matching_keys(self):
+        cache = TTLCache(ttl=60)
+        cache.set(('user_stats', 1), {'cv_count': 1})
+        cache.set(('user_stats', 2), {'cv_count': 2})
+        cache.set('job_stats', {'total_jobs': 10})
+
+        cache.invalidate(('user_stats', 1))
+        assert cache.get(('user_stats', 1)) is None
+        assert cache.get(('user_stats', 2)) == {'cv_count': 2}
+
+        cache.invalidate_prefix('user_stats')
+        assert cache.get(('user_stats', 2)) is None
+        assert cache.get('job_stats') == {'total_jobs': 10}
+
+
+class RollupCursor:
+    """Answers the pg_class check and the live aggregate; the view itself is never read"""
+
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, *args):
+        self.db.queries.append(sql)
+        if 'relispopulated' in sql:
+            self.result = [(False,)]
+        elif self.db.live_error:
+            raise RuntimeError(self.db.live_error)
+        else:
+            self.result = self.db.live_rows
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+class RollupConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self, cursor_factory=None):
+        return RollupCursor(self.db)
+
+
+class TestStatsRollupFallback:
+    """Test that an unreadable rollup view is aggregated live and never cached empty"""
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        pytest.importorskip('psycopg2')
+        from src.database import postgres_operations
+
+        monkeypatch.setattr(postgres_operations, 'stats_cache', TTLCache(ttl=60))
+        db = object.__new__(postgres_operations.PostgresDatabase)
+        db.queries = []
+        db.live_error = None
+        db.live_rows = [('source', 'indeed', 7), ('source', '', 2), ('users', 'total', 3)]
+        db._connection = lambda: RollupConnection(db)
+        # Another thread holds the refresh lock, so the view stays unpopulated
+        db.refresh_statistics = lambda: False
+        return db
+
+    def test_unpopulated_view_is_aggregated_live(self, db):
+        from src.database.postgres_operations import STATS_ROLLUP_SELECT
+
+        stats = db.get_dashboard_statistics()
+
+        assert stats['total_jobs'] == 9
+        assert stats['total_users'] == 3
+        assert db.queries[-1] == STATS_ROLLUP_SELECT
+
+    def test_failed_load_is_not_cached(self, db):
+        db.live_error = "server closed the connection"
+        assert db.get_stats_rollup() == {}
+
+        db.live_error = None
+        assert db.get_stats_rollup()['source'] == {'indeed': 7, '': 2}
@@ -0,0 +1,72 @@
+"""
+Enrichment work queue tests
+Records the SQL issued on a stand-in connection, no database
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('psycopg2')
+
+from src.database.work_queue import EnrichmentQueue
+
+
+class RecordingCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.log.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, cursor_factory=None):
+        return RecordingCursor(self.log)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class TestEnrichmentQueue:
+    """Test that claims, attempts and failures are kept per task"""
+
+    def test_claim_only_checks_this_tasks_claims(self):
+        conn = RecordingConnection()
+        EnrichmentQueue(conn, 'description_encoding', worker_id='w1').claim_batch(10)
+        sql, params = conn.log[-1]
+
+        assert 'c.job_id = jobs.id AND c.task = %(task)s' in sql
+        assert 'ON CONFLICT (job_id, task)' in sql
+        assert 'enrichment_state' not in sql and 'enrichment_task' not in sql
+        assert params['task'] == 'description_encoding'
+
+    def test_fail_and_complete_touch_only_this_task(self):
+        conn = RecordingConnection()
+        queue = EnrichmentQueue(conn, 'encoding', worker_id='w1', max_attempts=2)
+        queue.fail([1, 2], 'model error')
+        queue.complete([3])
+
+        (fail_sql, fail_params), (complete_sql, complete_params) = conn.log
+        assert 'UPDATE job_enrichment_claims' in fail_sql and 'task = %(task)s' in fail_sql
+        assert fail_params['task'] == 'encoding' and fail_params['max_attempts'] == 2
+        assert 'DELETE FROM job_enrichment_claims' in complete_sql and 'task = %(task)s' in complete_sql
+        assert complete_params == {'ids': [3], 'task': 'encoding', 'worker': 'w1'}